@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Texto de modelo (sem LLM) para quando nenhum provider está disponível
+
+Sem API key, sem quota ou com Gemini e Groq fora do ar, a geração falhava e
+o policial ficava parado na seção. Com LLM_TEMPLATE_FALLBACK (padrão: ligado),
+o LLMService monta o texto da seção a partir das respostas, em
+milissegundos, seguindo a ordem da estrutura narrativa de cada
+_build_prompt_sectionN. Os steps são os das state machines (STEPS de cada
+BOStateMachineSectionN), que é o que a sessão guarda:
+
+- Seção 1 abre com "Cumprindo a ordem de serviço, prevista para ..."
+- cada resposta entra numa frase narrativa curta, na ordem das perguntas
+- respostas "Não informado" são omitidas; respostas negativas também,
+  quando a pergunta é opcional (histórico do local, facção, irregularidades...)
+- seção pulada (2.1 = NÃO etc.) não gera texto, como nos prompts
+- dois espaços entre frases; Seção 8 em 4 parágrafos
+
+O texto sai com provider FALLBACK_PROVIDER ("template"): não entra no cache
+de textos, a sessão marca a seção como fallback e o /generate_all gera
+de novo com o LLM quando ele voltar.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Provider informado quando o texto vem do modelo (eventos, respostas da API)
+FALLBACK_PROVIDER = "template"
+
+# Mesmas respostas negativas que pulam a seção nos _build_prompt_sectionN
+_NEGATIVE = {"NÃO", "NAO", "N", "NENHUM", "NEGATIVO"}
+_NEGATIVE_PHRASES = ("não", "nao", "sem ", "nenhum", "nada")
+
+# Pergunta que pula a seção quando a resposta é negativa (Seção 6: 6.2, resistência)
+SKIP_QUESTIONS = {2: "2.1", 3: "3.1", 4: "4.1", 5: "5.1", 6: "6.2", 7: "7.1"}
+
+# (step, frase com {} para a resposta, omitir quando a resposta for negativa)
+# As frases seguem a ordem da estrutura narrativa dos prompts. "({})" recebe
+# a resposta sem o "Sim" inicial e some da frase se só restar o "Sim".
+Frame = Tuple[str, str, bool]
+
+SECTION_FRAMES: Dict[int, List[Frame]] = {
+    1: [
+        ("1.3", "O acionamento ocorreu por meio de {}.", False),
+        ("1.4", "As informações recebidas relatavam {}.", False),
+        ("1.5.1", "A guarnição partiu de {}.", False),
+        ("1.5.2", "Durante o deslocamento, registrou-se {}.", True),
+        ("1.6", "O local indicado foi {}.", False),
+        ("1.7", "O local é conhecido como ponto de tráfico de drogas ({}).", True),
+        ("1.8", "A área sofre atuação de facção criminosa ({}).", True),
+    ],
+    2: [
+        ("2.4", "O veículo chamou a atenção da equipe ({}).", False),
+        ("2.5", "Ao perceber a presença policial, houve reação dos ocupantes ({}).", True),
+        ("2.6", "A ordem de parada foi dada por {}.", False),
+        ("2.7", "Após a ordem de parada, {}.", False),
+        ("2.8", "A perseguição terminou com a parada do veículo ({}).", True),
+        ("2.9", "Na abordagem, {}.", False),
+        ("2.10", "A busca no veículo foi realizada por {}.", False),
+        ("2.11", "A busca pessoal nos ocupantes foi realizada por {}.", False),
+        ("2.12", "Nas buscas, localizou-se {}.", True),
+        ("2.13", "O veículo apresentava irregularidades ({}).", True),
+    ],
+    3: [
+        ("3.2", "A equipe montou campana em {}.", False),
+        ("3.3", "A visão direta do local coube a {}.", False),
+        ("3.4", "A campana foi motivada por {}.", False),
+        ("3.5", "A campana durou {}.", False),
+        ("3.6", "Durante a campana, a equipe observou {}.", False),
+        ("3.7", "Durante a campana, houve abordagem de usuários ({}).", True),
+        ("3.8", "Ao notar a equipe, houve tentativa de fuga ({}).", True),
+    ],
+    4: [
+        ("4.2", "Antes do ingresso, a equipe constatou {}.", False),
+        ("4.3", "O fato foi presenciado por {}.", False),
+        ("4.4", "O ingresso no imóvel ocorreu por {}.", False),
+        ("4.5", "No ingresso, {}.", False),
+    ],
+    5: [
+        ("5.1", "Ao chegar ao local, a equipe observou {}.", False),
+        ("5.2", "A observação foi feita por {}.", False),
+        ("5.3", "Quanto aos abordados, observou-se {}.", False),
+    ],
+    6: [
+        ("6.1", "Houve ameaça ou uso de arma ({}).", True),
+        ("6.2", "O autor resistiu à abordagem ({}).", False),
+        ("6.3", "Na resistência, o autor {}.", False),
+        ("6.4", "Para contê-lo, {}.", False),
+        ("6.5", "O uso de algemas justificou-se por {}.", False),
+        ("6.6", "Quanto à integridade física do autor, {}.", False),
+    ],
+    7: [
+        ("7.2", "Foram apreendidos {}.", False),
+        ("7.3", "Também foram apreendidos {}.", True),
+        ("7.4", "No acondicionamento do material, {}.", False),
+    ],
+}
+
+# Seção 8: um parágrafo por bloco (voz de prisão, perfil, facção/provas, garantias/destino)
+SECTION8_PARAGRAPHS: List[List[Frame]] = [
+    [
+        ("8.1", "Foi dada voz de prisão ao autor ({}).", False),
+        ("8.2", "O preso foi conduzido à delegacia ({}).", False),
+    ],
+    [
+        ("8.3", "Sobre os fatos, o preso {}.", False),
+        ("8.4", "No tráfico, exercia a função de {}.", False),
+        ("8.5", "Em relação a passagens anteriores, {}.", False),
+        ("8.6", "Como sinais de dedicação ao crime, constatou-se {}.", False),
+    ],
+    [
+        ("8.7", "No que se refere à facção, {}.", False),
+        ("8.8", "Sobre destruição ou ocultação de provas, {}.", False),
+        ("8.9", "Acerca do envolvimento de menor, {}.", False),
+    ],
+    [
+        ("8.10", "As garantias constitucionais foram informadas ao preso por {}.", False),
+        ("8.11", "Presos e materiais apreendidos foram encaminhados ao destino final ({}).", False),
+    ],
+]
+
+# Início da resposta em minúsculo no meio da frase: artigo ("O Soldado" ->
+# "o Soldado") ou palavra comum ("Permaneceu em silêncio"). Nomes próprios
+# ("Sargento Silva") e siglas ("REDS 2024") ficam como estão.
+_LEADING_ARTICLE = re.compile(r"^(?:O|A|Os|As|Um|Uma)(?=\s)")
+_LEADING_WORD = re.compile(r"^[A-ZÀ-Ý][a-zà-ÿ]+(?=\s+[a-zà-ÿ])")
+_LEADING_YES = re.compile(r"^sim\b[\s,.;:-]*", re.IGNORECASE)
+
+
+def _answer(answers: Dict[str, str], step: str) -> str:
+    """Resposta sem espaços e pontuação final ("" se ausente ou "Não informado")."""
+    value = (answers.get(step) or "").strip().rstrip(".;,").strip()
+    return "" if value.lower() == "não informado" else value
+
+
+def _is_negative(value: str) -> bool:
+    lowered = value.lower()
+    return value.upper() in _NEGATIVE or lowered.startswith(_NEGATIVE_PHRASES)
+
+
+def _fill(frame: str, value: str) -> str:
+    """Encaixa a resposta na frase, no meio do período."""
+    if _LEADING_ARTICLE.match(value) or _LEADING_WORD.match(value):
+        value = value[0].lower() + value[1:]
+    if "({})" not in frame:
+        return frame.format(value)
+    value = _LEADING_YES.sub("", value)
+    return frame.format(value) if value else frame.replace(" ({})", "")
+
+
+def _sentences(answers: Dict[str, str], frames: Sequence[Frame]) -> List[str]:
+    sentences = []
+    for step, frame, optional in frames:
+        value = _answer(answers, step)
+        if value and not (optional and _is_negative(value)):
+            sentences.append(_fill(frame, value))
+    return sentences
+
+
+def _section1_opening(answers: Dict[str, str], enrich_datetime: Optional[Callable[[str], str]]) -> List[str]:
+    when = _answer(answers, "1.1")
+    if when and enrich_datetime:
+        when = enrich_datetime(when)
+    team = _answer(answers, "1.2")
+
+    subject = f"a equipe composta por {team}" if team else "a equipe"
+    if when:
+        return [f"Cumprindo a ordem de serviço, prevista para {when}, {subject} foi acionada para atender ocorrência de tráfico de drogas."]
+    return [f"{subject[0].upper()}{subject[1:]} foi acionada para atender ocorrência de tráfico de drogas."]
+
+
+def _section1_public_space(answers: Dict[str, str]) -> List[str]:
+    place = _answer(answers, "1.9.1")
+    distance = _answer(answers, "1.9.2")
+    if not place:
+        return []
+    if distance:
+        return [f"O local da ocorrência situa-se a aproximadamente {distance} de {place}."]
+    return [f"O local da ocorrência fica próximo de {place}."]
+
+
+def _section2_opening(answers: Dict[str, str]) -> List[str]:
+    where = _answer(answers, "2.2")
+    vehicle = _answer(answers, "2.3")
+    if where and vehicle:
+        return [f"Em {where}, a equipe visualizou o veículo {vehicle}."]
+    if vehicle:
+        return [f"A equipe visualizou o veículo {vehicle}."]
+    if where:
+        return [f"A equipe realizou a abordagem em {where}."]
+    return []
+
+
+def render_fallback(
+    section_number: int,
+    answers: Dict[str, str],
+    enrich_datetime: Optional[Callable[[str], str]] = None
+) -> str:
+    """
+    Texto da seção montado só com as respostas ("" se a seção foi pulada
+    ou não há nenhuma resposta aproveitável).
+
+    enrich_datetime: o mesmo LLMService._enrich_datetime usado no prompt
+    ("22/03 às 21:11" -> "sexta-feira, 22 de março de 2025, às 21h11min").
+    """
+    skip_question = SKIP_QUESTIONS.get(section_number)
+    if skip_question and (answers.get(skip_question) or "").strip().upper() in _NEGATIVE:
+        return ""
+
+    if section_number == 8:
+        paragraphs = [_sentences(answers, frames) for frames in SECTION8_PARAGRAPHS]
+        return "\n\n".join("  ".join(p) for p in paragraphs if p)
+
+    if section_number not in SECTION_FRAMES:
+        raise ValueError(f"Seção {section_number} não suportada")
+
+    sentences = _sentences(answers, SECTION_FRAMES[section_number])
+    if section_number == 1:
+        sentences = _section1_opening(answers, enrich_datetime) + sentences + _section1_public_space(answers)
+    elif section_number == 2:
+        sentences = _section2_opening(answers) + sentences
+    return "  ".join(sentences)
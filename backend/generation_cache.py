@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de textos gerados pelo LLM (content-addressed)
+
+A chave é o hash de (seção, respostas normalizadas, provider, versão do prompt).
+Respostas idênticas - duplo clique, retry após 500, sessão reconstruída pelo
+/sync_session - reaproveitam o texto sem gastar quota do provider.
+
+Dois níveis:
+- memória: LRU limitado a LLM_CACHE_MAX_ENTRIES entradas
+- persistente: tabela generation_cache no mesmo banco dos bo_events
+
+No caminho assíncrono use get_any_async()/set_async(): o nível persistente é
+SQLite síncrono e roda numa thread (asyncio.to_thread), fora do event loop.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from logger import BOLogger
+except ImportError:
+    from backend.logger import BOLogger
+
+
+# Tamanho do nível em memória (LRU)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+
+
+def normalize_answers(section_data: Dict[str, str]) -> Dict[str, str]:
+    """
+    Normaliza respostas para que diferenças irrelevantes não mudem a chave:
+    espaços nas pontas e espaços repetidos. Maiúsculas/minúsculas são mantidas
+    (nomes e placas importam para o texto).
+    """
+    return {
+        step: re.sub(r"\s+", " ", str(answer)).strip()
+        for step, answer in sorted(section_data.items())
+    }
+
+
+def make_cache_key(
+    section_number: int,
+    section_data: Dict[str, str],
+    provider: str,
+    prompt_version: str
+) -> str:
+    """Gera a chave SHA-256 de uma geração."""
+    payload = json.dumps(
+        {
+            "section": section_number,
+            "answers": normalize_answers(section_data),
+            "provider": provider,
+            "prompt_version": prompt_version
+        },
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Cache de dois níveis (memória LRU + banco) para textos gerados."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, persistent: bool = True):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Contadores expostos em /api/llm/cache
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o texto em cache ou None (conta hit/miss)."""
+        _, text = self.get_any([key])
+        return text
+
+    def get_any(self, keys: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Retorna (chave, texto) da primeira chave encontrada, na ordem dada.
+        Conta um único hit ou miss para o conjunto (uma requisição).
+        """
+        hit = self._memory_get(keys)
+        if hit is None:
+            hit = self._persistent_get(keys)
+        return hit
+
+    async def get_any_async(self, keys: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """get_any() com a leitura do banco numa thread (não bloqueia o event loop)."""
+        hit = self._memory_get(keys)
+        if hit is None:
+            hit = await asyncio.to_thread(self._persistent_get, keys)
+        return hit
+
+    def _memory_get(self, keys: List[str]) -> Optional[Tuple[str, str]]:
+        """Hit no LRU ou None (sem contar miss: o nível persistente ainda vai ser consultado)."""
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return key, self._entries[key]
+        return None
+
+    def _persistent_get(self, keys: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Consulta o banco (bloqueante); conta o hit ou o miss da requisição."""
+        if self.persistent:
+            for key in keys:
+                try:
+                    text = BOLogger.get_cached_generation(key)
+                except Exception as e:
+                    # Falha no banco nunca deve impedir a geração
+                    print(f"[DEBUG] Erro ao ler cache persistente: {e}")
+                    break
+
+                if text is not None:
+                    with self._lock:
+                        self.persistent_hits += 1
+                        self._remember(key, text)
+                    return key, text
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def set(
+        self,
+        key: str,
+        text: str,
+        section_number: int,
+        provider: str,
+        prompt_version: str
+    ) -> None:
+        """Guarda o texto nos dois níveis. Textos vazios não são guardados."""
+        if self._store(key, text) and self.persistent:
+            self._persist(key, text, section_number, provider, prompt_version)
+
+    async def set_async(
+        self,
+        key: str,
+        text: str,
+        section_number: int,
+        provider: str,
+        prompt_version: str
+    ) -> None:
+        """set() com a gravação no banco numa thread (não bloqueia o event loop)."""
+        if self._store(key, text) and self.persistent:
+            await asyncio.to_thread(self._persist, key, text, section_number, provider, prompt_version)
+
+    def _store(self, key: str, text: str) -> bool:
+        """Guarda no LRU; False para texto vazio (nada a persistir)."""
+        if not text:
+            return False
+
+        with self._lock:
+            self._remember(key, text)
+            self.stores += 1
+        return True
+
+    def _persist(self, key: str, text: str, section_number: int, provider: str, prompt_version: str) -> None:
+        """Grava no banco (bloqueante). Falhas só são logadas."""
+        try:
+            BOLogger.save_cached_generation(
+                cache_key=key,
+                section=section_number,
+                provider=provider,
+                prompt_version=prompt_version,
+                generated_text=text
+            )
+        except Exception as e:
+            print(f"[DEBUG] Erro ao gravar cache persistente: {e}")
+
+    def _remember(self, key: str, text: str) -> None:
+        """Insere no LRU (chamar com _lock adquirido)."""
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Esvazia o nível em memória (o persistente é mantido)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso (cada hit é uma chamada ao provider economizada)."""
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "provider_calls_saved": hits,
+                "memory_entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self.persistent
+            }
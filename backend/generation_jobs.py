@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Jobs de geração em segundo plano
+
+Com POST /chat?background=1 a conclusão de seção não espera o LLM: a geração
+vira um job, a resposta sai na hora (HTTP 202 + job_id) e o cliente consulta
+GET /jobs/{job_id} até o job terminar.
+
+Os jobs rodam num pool de workers (GENERATION_WORKERS tarefas asyncio) dentro
+do processo. Como o job não depende da conexão HTTP, o texto é gravado na
+sessão e no BOLogger mesmo se o cliente cair - a quota gasta não se perde.
+"""
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from logger import now_brasilia
+except ImportError:
+    from backend.logger import now_brasilia
+
+
+# Tamanho do pool e da fila de jobs
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
+GENERATION_QUEUE_MAX = int(os.getenv("GENERATION_QUEUE_MAX", "100"))
+
+# Jobs concluídos mantidos para consulta (os mais antigos são descartados)
+GENERATION_JOBS_RETAINED = int(os.getenv("GENERATION_JOBS_RETAINED", "1000"))
+
+
+class JobQueueFullError(Exception):
+    """Fila de jobs cheia (GENERATION_QUEUE_MAX)."""
+
+
+class GenerationJob:
+    """Uma geração de seção em segundo plano."""
+
+    def __init__(
+        self,
+        session_id: str,
+        section: int,
+        provider: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]]
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.section = section
+        self.provider = provider
+        self.status = "queued"  # queued -> running -> done | error
+        self.created_at: datetime = now_brasilia()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self._run = run
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "session_id": self.session_id,
+            "section": self.section,
+            "llm_provider": self.provider,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Fila + pool de workers asyncio para os jobs de geração."""
+
+    def __init__(
+        self,
+        workers: int = GENERATION_WORKERS,
+        max_queue: int = GENERATION_QUEUE_MAX,
+        max_retained: int = GENERATION_JOBS_RETAINED
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_retained = max_retained
+        self.jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Contadores expostos em stats()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(
+        self,
+        session_id: str,
+        section: int,
+        provider: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> GenerationJob:
+        """
+        Enfileira um job (chamar de dentro do event loop).
+        `run` faz a geração e a gravação; o dict retornado vira job.result.
+
+        Raises:
+            JobQueueFullError: fila cheia
+        """
+        self._ensure_workers()
+
+        job = GenerationJob(session_id, section, provider, run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Fila de geração cheia. Tente novamente em instantes.")
+
+        self.jobs[job.job_id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self.jobs.get(job_id)
+
+    def _ensure_workers(self) -> None:
+        """Sobe o pool no event loop atual (na primeira chamada ou se o loop mudou)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: GenerationJob) -> None:
+        job.status = "running"
+        job.started_at = now_brasilia()
+        try:
+            job.result = await job._run()
+            job.status = "done"
+            self.completed += 1
+        except Exception as e:
+            # HTTPException do record_generation_error traz status_code/detail
+            job.error = {
+                "status_code": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", str(e))
+            }
+            job.status = "error"
+            self.failed += 1
+            print(f"[DEBUG] Job {job.job_id} (Seção {job.section}) falhou: {job.error['detail']}")
+        finally:
+            job.finished_at = now_brasilia()
+            job._run = None  # libera a closure (sessão, state machine)
+
+    def _trim(self) -> None:
+        """Descarta os jobs concluídos mais antigos além de max_retained."""
+        excess = len(self.jobs) - self.max_retained
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self.jobs.values() if j.finished][:excess]:
+            del self.jobs[job_id]
+
+    async def drain(self) -> None:
+        """Espera a fila esvaziar (usado no desligamento e nos testes)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self) -> None:
+        """Termina os jobs pendentes e encerra os workers."""
+        await self.drain()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "running": sum(1 for j in self.jobs.values() if j.status == "running"),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retained": len(self.jobs)
+        }
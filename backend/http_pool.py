@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de conexões HTTP compartilhado pelos clientes dos providers
+
+O Groq fala HTTP (httpx): em vez de cada cliente montar o próprio pool com
+os padrões do SDK, LLMService passa um httpx.Client/AsyncClient criado aqui,
+com tamanho do pool e keep-alive configuráveis (e HTTP/2 opcional, se o
+pacote h2 estiver instalado). O Gemini usa um canal gRPC persistente do
+próprio SDK (HTTP/2, uma conexão multiplexada), que não tem pool a ajustar.
+
+Depois de um período ocioso (típico no free tier do Render) a primeira
+chamada pagaria DNS + TCP + TLS. O warm-up no lifespan do FastAPI abre as
+conexões antes do primeiro /chat com chamadas que não gastam quota de
+geração (models.list no Groq, count_tokens no Gemini).
+
+Contadores de requisições, conexões novas e handshakes TLS (via trace do
+httpcore) ficam em /api/llm/pool: requisições - conexões novas = reusos.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+
+# Pool de conexões HTTP dos providers
+LLM_HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "20"))
+LLM_HTTP_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_KEEPALIVE_CONNECTIONS", "10"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "300"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Warm-up no startup (desligar com LLM_WARMUP=false) e prazo de cada handshake
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() in ("1", "true", "yes")
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", "10"))
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ProviderHTTPPool:
+    """httpx.Client + httpx.AsyncClient compartilhados, com contadores de reuso."""
+
+    def __init__(
+        self,
+        pool_size: int = LLM_HTTP_POOL_SIZE,
+        keepalive_connections: int = LLM_HTTP_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = LLM_HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = LLM_HTTP2
+    ):
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and _h2_available()
+        if http2 and not self.http2:
+            print("[DEBUG] LLM_HTTP2=true mas o pacote h2 não está instalado; usando HTTP/1.1")
+
+        self.sync_client = httpx.Client(
+            limits=self.limits,
+            http2=self.http2,
+            event_hooks={"request": [self._trace_sync]}
+        )
+        self.async_client = httpx.AsyncClient(
+            limits=self.limits,
+            http2=self.http2,
+            event_hooks={"request": [self._trace_async]}
+        )
+
+        # Contadores expostos em /api/llm/pool
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.warmups: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------------
+    # Contadores (trace do httpcore)
+    # ------------------------------------------------------------------------
+
+    def _on_trace_event(self, event_name: str) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def _trace_sync(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = lambda event_name, info: self._on_trace_event(event_name)
+
+    async def _trace_async(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+        async def trace(event_name, info):
+            self._on_trace_event(event_name)
+
+        request.extensions["trace"] = trace
+
+    # ------------------------------------------------------------------------
+    # Warm-up
+    # ------------------------------------------------------------------------
+
+    async def warm_up(
+        self,
+        targets: Dict[str, Callable[[], Awaitable[Any]]],
+        timeout: float = LLM_WARMUP_TIMEOUT
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Executa os handshakes de warm-up em paralelo (um por provider).
+        Falha no warm-up só é registrada: a primeira geração abre a conexão.
+        """
+        async def run(provider: str, call: Callable[[], Awaitable[Any]]) -> None:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(call(), timeout)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"[DEBUG] Warm-up do {provider} falhou: {error}")
+            self.warmups[provider] = {
+                "ok": error is None,
+                "ms": int((time.perf_counter() - started) * 1000),
+                "at": datetime.now(timezone.utc).isoformat(),
+                "error": error
+            }
+
+        await asyncio.gather(*[run(provider, call) for provider, call in targets.items()])
+        return self.warmups
+
+    # ------------------------------------------------------------------------
+    # Estatísticas e encerramento
+    # ------------------------------------------------------------------------
+
+    def _pool_connections(self, client) -> Optional[Dict[str, int]]:
+        """Conexões abertas/ociosas do pool httpcore (None se a versão não expuser)."""
+        try:
+            connections = client._transport._pool.connections
+            return {
+                "open": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle())
+            }
+        except Exception:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry_s": self.limits.keepalive_expiry,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": max(0, self.requests - self.new_connections),
+            "tls_handshakes": self.tls_handshakes,
+            "connections": {
+                "sync": self._pool_connections(self.sync_client),
+                "async": self._pool_connections(self.async_client)
+            },
+            "warmup": self.warmups
+        }
+
+    async def aclose(self) -> None:
+        await self.async_client.aclose()
+        self.sync_client.close()
@@ -1,15 +1,266 @@
 import os
-from typing import Dict
-import google.generativeai as genai
-from groq import Groq
+import asyncio
+import json
+import threading
+import time
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
 from datetime import datetime
 import re
 import locale
 
+try:
+    from generation_cache import GenerationCache, make_cache_key
+    from quota_scheduler import QuotaScheduler, AdmissionError
+    from prompt_templates import PROMPT_REGISTRY, RenderedPrompt, WHOLE_BO_SECTION
+    from llm_telemetry import LLMTelemetry
+    from output_linter import OutputLinter
+    from http_pool import ProviderHTTPPool
+    from fallback_renderer import FALLBACK_PROVIDER, render_fallback
+    from replay_provider import (
+        LLM_REPLAY_MODE, Cassette, ReplayProvider, ReplayGeminiModel, ReplayGroq, prompt_hash
+    )
+except ImportError:
+    from backend.generation_cache import GenerationCache, make_cache_key
+    from backend.quota_scheduler import QuotaScheduler, AdmissionError
+    from backend.prompt_templates import PROMPT_REGISTRY, RenderedPrompt, WHOLE_BO_SECTION
+    from backend.llm_telemetry import LLMTelemetry
+    from backend.output_linter import OutputLinter
+    from backend.http_pool import ProviderHTTPPool
+    from backend.fallback_renderer import FALLBACK_PROVIDER, render_fallback
+    from backend.replay_provider import (
+        LLM_REPLAY_MODE, Cassette, ReplayProvider, ReplayGeminiModel, ReplayGroq, prompt_hash
+    )
+
 # Carregar variáveis do .env
 load_dotenv()
 
+# Revisão dos blocos de respostas - alterar sempre que algum _build_prompt* mudar
+# (invalida o cache). Mudanças nas partes estáticas já mudam o hash do template.
+PROMPT_VERSION = "2026-10-18"
+
+# Cache de textos gerados (desligar com LLM_CACHE_ENABLED=false)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Controle de quota por provider (desligar com LLM_SCHEDULER_ENABLED=false)
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Modelos usados em todas as seções
+GEMINI_MODEL = "gemini-2.5-flash"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Máximo de gerações simultâneas no caminho assíncrono
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Prazo por chamada de cada provider (segundos). Estourou: timeout -> failover
+LLM_TIMEOUTS = {
+    "gemini": float(os.getenv("LLM_TIMEOUT_GEMINI", "30")),
+    "groq": float(os.getenv("LLM_TIMEOUT_GROQ", "20")),
+}
+
+# Ordem de failover entre providers (vazio desliga o failover)
+LLM_PROVIDER_CHAIN = [
+    p.strip() for p in os.getenv("LLM_PROVIDER_CHAIN", "gemini,groq").split(",")
+    if p.strip() in ("gemini", "groq")
+]
+
+# Modo corrida: os providers da cadeia recebem o mesmo prompt em paralelo e
+# vale a primeira resposta aprovada na checagem de sanidade. Gasta quota dos
+# dois, por isso é opt-in e só para as seções de LLM_RACE_SECTIONS (7 e 8,
+# escritas na delegacia, onde a latência pesa mais)
+LLM_RACE_MODE = os.getenv("LLM_RACE_MODE", "false").lower() in ("1", "true", "yes")
+LLM_RACE_SECTIONS = [
+    int(s) for s in os.getenv("LLM_RACE_SECTIONS", "7,8").split(",") if s.strip().isdigit()
+]
+LLM_RACE_MIN_CHARS = int(os.getenv("LLM_RACE_MIN_CHARS", "80"))
+LLM_RACE_MAX_CHARS = int(os.getenv("LLM_RACE_MAX_CHARS", "6000"))
+
+# BO inteiro em uma chamada (generate_bo_async): a resposta traz várias seções,
+# então o Groq precisa de mais tokens de saída e o prazo por provider é multiplicado
+LLM_WHOLE_BO_MAX_TOKENS = int(os.getenv("LLM_WHOLE_BO_MAX_TOKENS", "8000"))
+LLM_WHOLE_BO_TIMEOUT_FACTOR = float(os.getenv("LLM_WHOLE_BO_TIMEOUT_FACTOR", "3"))
+
+# Sem nenhum provider disponível (sem API key, quota, rate limit, timeout), monta o
+# texto da seção a partir das respostas em vez de falhar (ver fallback_renderer.py)
+LLM_TEMPLATE_FALLBACK = os.getenv("LLM_TEMPLATE_FALLBACK", "true").lower() in ("1", "true", "yes")
+
+# Bloco de código em volta do JSON (```json ... ```), que alguns modelos insistem em mandar
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+# Início de resposta que recusa a tarefa em vez de redigir o trecho
+_REFUSAL = re.compile(
+    r"\b(?:n[ãa]o posso|n[ãa]o consigo (?:ajudar|gerar|redigir)|como (?:um )?modelo de linguagem|"
+    r"desculpe|lamento|I can(?:'|no)t|I'm sorry|I am unable|as an AI)\b",
+    re.IGNORECASE
+)
+
+# Cliente de provider ainda não criado: os SDKs (google.generativeai ~0,7s,
+# groq) só são importados no primeiro uso ou no warm-up, não no import do módulo
+_UNLOADED = object()
+
+
+class ProviderUnavailableError(Exception):
+    """
+    Provider sem capacidade no momento (quota, rate limit ou timeout).
+    A mesma requisição pode ser atendida pelo próximo provider da cadeia.
+    """
+
+    def __init__(self, message: str, provider: str, reason: str):
+        super().__init__(message)
+        self.provider = provider
+        self.reason = reason  # "quota" | "rate_limit" | "timeout"
+
+
+class MissingAPIKeyError(ValueError):
+    """API key do provider não configurada (GEMINI_API_KEY / GROQ_API_KEY)."""
+
+
+# Erros de disponibilidade que viram texto de modelo; qualquer outro (bug no
+# prompt, na telemetria) continua chegando ao chamador
+TEMPLATE_FALLBACK_ERRORS = (ProviderUnavailableError, AdmissionError, MissingAPIKeyError)
+
+
+def _is_timeout(error: Exception) -> bool:
+    """Timeout do cliente (asyncio, httpx/Groq ou DeadlineExceeded do Gemini)."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    name = type(error).__name__
+    error_msg = str(error).lower()
+    return "Timeout" in name or "DeadlineExceeded" in name or "timed out" in error_msg or "deadline exceeded" in error_msg
+
+
+# 429 do Gemini (ResourceExhausted): a quota violada vem no quota_id
+# ("GenerateRequestsPerDayPerProjectPerModel-FreeTier" / "...PerMinute...")
+# e a espera sugerida em retry_delay { seconds: N }
+_GEMINI_DAILY_QUOTA = re.compile(r"per_?day", re.IGNORECASE)
+_GEMINI_RETRY_DELAY = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+_GEMINI_DAILY_RETRY_SECONDS = 3600
+
+
+def _gemini_quota_reason(error: Exception) -> str:
+    """
+    "quota" só quando o 429 confirma a quota diária (quota_id PerDay ou
+    retry_delay acima de 1 hora); qualquer outro 429 é limite por minuto
+    ("rate_limit"), que não zera o bucket diário do agendador.
+    """
+    details = f"{error} {getattr(error, 'details', '') or ''}"
+    if _GEMINI_DAILY_QUOTA.search(details):
+        return "quota"
+    delay = _GEMINI_RETRY_DELAY.search(details)
+    if delay and int(delay.group(1)) > _GEMINI_DAILY_RETRY_SECONDS:
+        return "quota"
+    return "rate_limit"
+
+
+def _gemini_usage(response) -> Dict[str, Optional[int]]:
+    """Tokens informados pelo Gemini (None quando ausentes)."""
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None) if usage else None,
+        "completion_tokens": getattr(usage, "candidates_token_count", None) if usage else None,
+        # Tokens do prompt que o Gemini serviu do cache de contexto
+        "cached_tokens": getattr(usage, "cached_content_token_count", None) if usage else None,
+    }
+
+
+def _groq_usage(usage) -> Dict[str, Optional[int]]:
+    """Tokens informados pelo Groq (response.usage ou x_groq.usage no streaming)."""
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) if usage else None,
+        "completion_tokens": getattr(usage, "completion_tokens", None) if usage else None,
+        # Tokens do prompt que o Groq serviu do cache de prefixo
+        "cached_tokens": getattr(details, "cached_tokens", None) if details else None,
+    }
+
+
+async def _iterate_until(stream, deadline: float) -> AsyncIterator:
+    """Itera o stream do provider com prazo total (asyncio.TimeoutError ao estourar)."""
+    iterator = stream.__aiter__()
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        try:
+            chunk = await asyncio.wait_for(iterator.__anext__(), remaining)
+        except StopAsyncIteration:
+            return
+        yield chunk
+
+
+def race_sanity_problem(
+    text: str,
+    min_chars: int = LLM_RACE_MIN_CHARS,
+    max_chars: int = LLM_RACE_MAX_CHARS
+) -> Optional[str]:
+    """Motivo para descartar uma resposta no modo corrida (None se aprovada)."""
+    text = (text or "").strip()
+    if not text:
+        return "empty"
+    if _REFUSAL.search(text[:200]):
+        return "refusal"
+    if len(text) < min_chars:
+        return "too_short"
+    if len(text) > max_chars:
+        return "too_long"
+    return None
+
+
+class WholeBOResult(NamedTuple):
+    """Resultado de generate_bo_async()."""
+    texts: Dict[int, str]      # seção -> texto (cache, chamada única ou "" se pulada)
+    providers: Dict[int, str]  # seção -> provider que gerou o texto
+    fallback: Dict[int, str]   # seção -> motivo; o chamador gera essas uma a uma
+
+
+def parse_whole_bo(raw: str, sections: List[int], max_chars: int = LLM_RACE_MAX_CHARS) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """
+    Separa a resposta JSON {"N": texto} do BO inteiro por seção.
+
+    Retorna (textos válidos, {seção: motivo}) - motivos: invalid_json,
+    missing, not_text, empty, refusal, too_long. Só a seção com problema
+    cai para a geração individual; as demais são aproveitadas.
+    """
+    raw = (raw or "").strip()
+    fenced = _CODE_FENCE.match(raw)
+    if fenced:
+        raw = fenced.group(1)
+
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        # Texto em volta do objeto: tenta do primeiro "{" ao último "}"
+        start, end = raw.find("{"), raw.rfind("}")
+        try:
+            payload = json.loads(raw[start:end + 1]) if 0 <= start < end else None
+        except ValueError:
+            payload = None
+    if not isinstance(payload, dict):
+        return {}, {section: "invalid_json" for section in sections}
+
+    texts, problems = {}, {}
+    for section in sections:
+        value = payload.get(str(section))
+        if value is None:
+            problems[section] = "missing"
+        elif not isinstance(value, str):
+            problems[section] = "not_text"
+        else:
+            problem = race_sanity_problem(value, 1, max_chars)
+            if problem:
+                problems[section] = problem
+            else:
+                texts[section] = value.strip()
+    return texts, problems
+
+
+def _error_class(error: Exception, original: Exception) -> str:
+    """Classe do erro na telemetria: motivo do failover ou tipo da exceção original."""
+    if isinstance(error, ProviderUnavailableError):
+        return error.reason
+    return type(original).__name__
+
+
 class LLMService:
     """
     Serviço para integração com diferentes LLMs.
@@ -22,22 +273,157 @@ class LLMService:
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.groq_api_key = os.getenv("GROQ_API_KEY")
 
-        # Configurar Gemini
-        if self.gemini_api_key:
-            genai.configure(api_key=self.gemini_api_key)
-            # Usar gemini-2.5-flash (20 req/dia no free tier)
-            # NOTA: Se atingir limite diário, aguardar reset às 00:00 UTC ou upgrade para tier pago
-            self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-        else:
-            self.gemini_model = None
+        # Clientes do Gemini e do Groq criados sob demanda (ver _load_gemini/_load_groq)
+        self._gemini_model = _UNLOADED
+        self._gemini_section_models = _UNLOADED
+        self._groq_client = _UNLOADED
+        self._groq_async_client = _UNLOADED
+        self._load_lock = threading.Lock()
 
-        # Configurar Groq
-        if self.groq_api_key:
-            # Usar llama-3.3-70b-versatile (14.400 req/dia no free tier)
-            self.groq_client = Groq(api_key=self.groq_api_key)
-        else:
-            self.groq_client = None
+        # Pool HTTP compartilhado (tamanho/keep-alive configuráveis, ver http_pool.py)
+        self.http_pool = ProviderHTTPPool()
+
+        # Templates de prompt (parte estática montada uma vez, ver prompt_templates.py)
+        self.prompts = PROMPT_REGISTRY
+
+        # Modo offline (LLM_REPLAY_MODE, ver replay_provider.py)
+        self.replay_mode = LLM_REPLAY_MODE
+        self.replay = None
+        self.cassette = None
+        if self.replay_mode == "replay":
+            self.use_replay(ReplayProvider())
+        elif self.replay_mode == "record":
+            self.cassette = Cassette()
+
+        # Prazo por chamada de cada provider (caminho assíncrono)
+        self.timeouts = dict(LLM_TIMEOUTS)
+
+        # Limita chamadas simultâneas aos providers (caminho assíncrono)
+        self._semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+        # No replay, cache e quota ficam só em memória: textos sintéticos não
+        # entram no generation_cache e a quota real gravada não é consumida
+        persistent = self.replay is None
+
+        # Cache de textos gerados (memória + banco)
+        self.cache = GenerationCache(persistent=persistent) if LLM_CACHE_ENABLED else None
+
+        # Cadeia de failover (ver _provider_chain)
+        self.provider_chain = list(LLM_PROVIDER_CHAIN)
+
+        # Latência, tokens e erros por provider/seção (ver llm_telemetry.py)
+        self.telemetry = LLMTelemetry()
+
+        # Modo corrida (ver _race_async)
+        self.race_mode = LLM_RACE_MODE
+        self.race_sections = set(LLM_RACE_SECTIONS)
+        self.race_bounds = (LLM_RACE_MIN_CHARS, LLM_RACE_MAX_CHARS)
+        self._race_losers = set()
+
+        # Correção/sinalização local das regras de redação (ver output_linter.py)
+        self.linter = OutputLinter()
+
+        # Texto de modelo quando nenhum provider atende (ver _template_fallback)
+        self.template_fallback = LLM_TEMPLATE_FALLBACK
+
+        # Quota diária/por minuto e fila de admissão (ver quota_scheduler.py)
+        self.scheduler = QuotaScheduler(persistent=persistent) if LLM_SCHEDULER_ENABLED else None
     
+    # ------------------------------------------------------------------------
+    # Clientes dos providers (SDK importado no primeiro uso)
+    # ------------------------------------------------------------------------
+
+    def _load_gemini(self) -> None:
+        """Importa o SDK do Gemini e cria os modelos ainda não definidos."""
+        with self._load_lock:
+            if self._gemini_model is not _UNLOADED and self._gemini_section_models is not _UNLOADED:
+                return
+            model, section_models = None, {}
+            if self.gemini_api_key:
+                import google.generativeai as genai
+                genai.configure(api_key=self.gemini_api_key)
+                # Usar gemini-2.5-flash (20 req/dia no free tier)
+                # NOTA: Se atingir limite diário, aguardar reset às 00:00 UTC ou upgrade para tier pago
+                model = genai.GenerativeModel(GEMINI_MODEL)
+                # Um modelo por seção com a parte estática do prompt como system_instruction
+                section_models = {
+                    section: genai.GenerativeModel(GEMINI_MODEL, system_instruction=template.system)
+                    for section, template in PROMPT_REGISTRY.templates.items()
+                }
+            if self._gemini_model is _UNLOADED:
+                self._gemini_model = model
+            if self._gemini_section_models is _UNLOADED:
+                self._gemini_section_models = section_models
+
+    def _load_groq(self) -> None:
+        """Importa o SDK do Groq e cria os clientes ainda não definidos."""
+        with self._load_lock:
+            if self._groq_client is not _UNLOADED and self._groq_async_client is not _UNLOADED:
+                return
+            client, async_client = None, None
+            if self.groq_api_key:
+                from groq import Groq, AsyncGroq
+                # Usar llama-3.3-70b-versatile (14.400 req/dia no free tier)
+                client = Groq(
+                    api_key=self.groq_api_key,
+                    timeout=LLM_TIMEOUTS["groq"],
+                    http_client=self.http_pool.sync_client
+                )
+                async_client = AsyncGroq(
+                    api_key=self.groq_api_key,
+                    timeout=LLM_TIMEOUTS["groq"],
+                    http_client=self.http_pool.async_client
+                )
+            if self._groq_client is _UNLOADED:
+                self._groq_client = client
+            if self._groq_async_client is _UNLOADED:
+                self._groq_async_client = async_client
+
+    def load_providers(self) -> None:
+        """Carrega os dois SDKs de uma vez (warm-up, fora do caminho do primeiro /chat)."""
+        self._load_gemini()
+        self._load_groq()
+
+    @property
+    def gemini_model(self):
+        if self._gemini_model is _UNLOADED:
+            self._load_gemini()
+        return self._gemini_model
+
+    @gemini_model.setter
+    def gemini_model(self, value) -> None:
+        self._gemini_model = value
+
+    @property
+    def gemini_section_models(self) -> Dict:
+        if self._gemini_section_models is _UNLOADED:
+            self._load_gemini()
+        return self._gemini_section_models
+
+    @gemini_section_models.setter
+    def gemini_section_models(self, value: Dict) -> None:
+        self._gemini_section_models = value
+
+    @property
+    def groq_client(self):
+        if self._groq_client is _UNLOADED:
+            self._load_groq()
+        return self._groq_client
+
+    @groq_client.setter
+    def groq_client(self, value) -> None:
+        self._groq_client = value
+
+    @property
+    def groq_async_client(self):
+        if self._groq_async_client is _UNLOADED:
+            self._load_groq()
+        return self._groq_async_client
+
+    @groq_async_client.setter
+    def groq_async_client(self, value) -> None:
+        self._groq_async_client = value
+
     def _enrich_datetime(self, datetime_str: str) -> str:
         """
         Enriquece string de data/hora com ano e dia da semana se necessário.
@@ -91,7 +477,8 @@ class LLMService:
     
     def _build_prompt(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói o prompt usando os modelos do Claudio como referência.
+        Constrói o bloco de respostas da Seção 1. As regras e os modelos do
+        Claudio (parte estática) estão em prompt_templates.SECTION1_SYSTEM.
         
         Baseado nos documentos:
         - 1 Início do BO.docx (6 modelos diferentes)
@@ -128,72 +515,11 @@ class LLMService:
             answer = section_data.get(key, "Não informado")
             answers_text += f"{question}: {answer}\n"
         
-        prompt = f"""Você é um assistente especializado em redigir Boletins de Ocorrência policiais de tráfico de drogas, seguindo o manual do Claudio Moreira.
-
-Sua tarefa é gerar o texto da SEÇÃO 1 - CONTEXTO DA OCORRÊNCIA com base nas informações coletadas.
-
-INFORMAÇÕES COLETADAS:
-{answers_text}
-
-⚠️ REGRA CRÍTICA - NUNCA INVENTAR INFORMAÇÕES:
-- Use APENAS as informações fornecidas acima
-- Se algo não foi informado, NÃO invente (número de OS, horário, endereço completo, etc)
-- Se falta informação, use formulações genéricas: "a equipe foi acionada", "no local indicado"
-- PROIBIDO inventar: números, nomes, horários, endereços, facções, prefixos
-
-REGRAS DE REDAÇÃO (nunca violar):
-1. Narração em 3ª pessoa, voz ativa, ordem direta
-2. Frases curtas, estilo jornalístico, dois espaços entre frases
-3. Norma culta - ZERO juridiquês, ZERO gerúndio, ZERO "linguagem policial"
-4. PROIBIDO termos vazios: "em atitude suspeita", "resistiu ativamente", "movimentação típica"
-5. Substituições obrigatórias: "veio a óbito"→"foi a óbito"; "caiu ao solo"→"caiu no chão"
-6. Individualizar locais: use o endereço FORNECIDO, não invente números ou nomes
-7. Evitar repetições: use pronomes ou sinônimos ("a guarnição", "os militares", "a equipe")
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos ou códigos (Ex: Art. 33, Lei 11.343/06, CPP). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-⚠️ OBSERVAÇÃO CRÍTICA DO CLAUDIO:
-"Não existe patrulhamento de rotina, operação de rotina... É sempre a atividade seguida do objetivo."
-Exemplos CORRETOS:
-- "Patrulhamento preventivo para combater o tráfico de drogas"
-- "Incursão para localizar foragidos"
-- "Operação para desarticular ponto de tráfico"
-Exemplos ERRADOS:
-- "Patrulhamento de rotina" ❌
-- "Operação de rotina" ❌
-
-ESTRUTURA ESPERADA (baseada nos modelos do Claudio):
-1. Início com contexto temporal: "Cumprindo a ordem de serviço, prevista para [dia da semana], [dia] de [mês] de [ano], por volta das [hora]h[min]min..."
-2. Identificar equipe: "a equipe composta pelo [posto + nome]..." (ou "pelos [posto + nomes]" se múltiplos)
-3. Se prefixo fornecido: "na viatura [prefixo]..."
-4. Descrever acionamento: "foi acionada para...", "recebeu determinação para...", "foi empenhada para..." (SEMPRE com objetivo específico)
-5. Informar conteúdo da ordem: O que foi fornecido - use VARIAÇÃO: "A ordem indicava...", "Segundo a denúncia...", "O acionamento reportava..."
-6. Deslocamento (se houve): Se resposta 1.5 = SIM, incluir: "A guarnição partiu de [local 1.5.1]..." e se houve alterações [1.5.2], mencionar
-7. Detalhar local: Use EXATAMENTE o que foi fornecido - "O local indicado foi..." ou "no endereço..."
-8. Histórico do local (se aplicável): "O endereço consta em registros anteriores..." ou "O local possui histórico..." [resposta 1.7]
-9. Facção (se aplicável): "A área é dominada pela facção..." [resposta 1.8]
-10. Proximidade de interesse público: Se resposta 1.9 = SIM, incluir: "O local da ocorrência situa-se a aproximadamente [1.9.2] do/da [1.9.1]." (NÃO mencione leis ou artigos)
-
-EXEMPLOS DE QUALIDADE (do manual do Claudio):
-
-✅ CERTO (informações completas):
-"Cumprindo a ordem de serviço nº 123/2024, prevista para sexta-feira, 15 de março de 2024, por volta das 14h30min, a equipe composta pelo Sgt João Silva e Cb Pedro Santos, na viatura prefixo 1234, foi acionada para atender ocorrência de tráfico de drogas.  A ordem de serviço indicava denúncia anônima via COPOM reportando comercialização de entorpecentes na Rua das Flores, número 123, bairro Centro, próximo ao Bar do João.  O endereço consta em registros e relatórios anteriores como ponto de tráfico e reincidência de denúncias.  Segundo as denúncias e boletins anteriores, trata-se de área sob influência da facção denominada XYZ."
-
-✅ TAMBÉM CERTO (informações parciais - SEM INVENTAR):
-"No dia 22 de março de 2025, a guarnição foi acionada via COPOM para atender denúncia anônima de tráfico de drogas.  O local indicado foi a Rua das Acácias, bairro Floresta.  O endereço possui histórico de operações anteriores relacionadas ao tráfico."
-
-❌ ERRADO (inventou informações):
-"No dia 22/03, às 14h30min..." (inventou horário)
-"...ordem de serviço nº 123/2024..." (inventou número de OS)
-"...número 456..." (inventou número do endereço)
-
-FORMATO DE SAÍDA:
-- Parágrafo corrido, SEM bullet points
-- Dois espaços entre frases
-- Completude: incluir elementos FORNECIDOS, sem inventar
-
-GERE AGORA o texto da Seção 1 usando SOMENTE as informações fornecidas:"""
-
-        return prompt
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""INFORMAÇÕES COLETADAS:
+{answers_text}"""
+
+        return answers_block
     
     async def generate_section_text(
         self,
@@ -201,87 +527,950 @@ GERE AGORA o texto da Seção 1 usando SOMENTE as informações fornecidas:"""
         provider: str = "gemini"
     ) -> str:
         """
-        Gera o texto da seção usando o LLM escolhido.
+        Gera o texto da Seção 1 usando o LLM escolhido (caminho assíncrono).
         """
+        return await self.generate_text_async(1, section_data, provider)
+
+    # ========================================================================
+    # DESPACHO GENÉRICO (todas as seções)
+    # ========================================================================
+
+    def _answers_block(self, section_number: int, section_data: Dict[str, str]) -> str:
+        """Bloco com as respostas da seção (vazio: seção pulada)."""
+        builders = {
+            1: self._build_prompt,
+            2: self._build_prompt_section2,
+            3: self._build_prompt_section3,
+            4: self._build_prompt_section4,
+            5: self._build_prompt_section5,
+            6: self._build_prompt_section6,
+            7: self._build_prompt_section7,
+            8: self._build_prompt_section8,
+        }
+        if section_number not in builders:
+            raise ValueError(f"Seção {section_number} não suportada")
+        return builders[section_number](section_data)
+
+    def _build_section_prompt(self, section_number: int, section_data: Dict[str, str]) -> Optional[RenderedPrompt]:
+        """
+        Retorna o prompt da seção solicitada: parte estática do template
+        (pré-compilada) + bloco com as respostas.
+        None indica seção pulada (nada a gerar).
+        """
+        return self.prompts.render(section_number, self._answers_block(section_number, section_data))
+
+    def _prompt_version(self, section_number: int) -> str:
+        """Versão usada na chave do cache: revisão manual + hash do template da seção."""
+        return f"{PROMPT_VERSION}/{self.prompts.get(section_number).version}"
+
+    def prompt_stats(self) -> Dict:
+        """Tamanho dos prompts por seção e tokens estáticos reaproveitáveis."""
+        return {"prompt_version": PROMPT_VERSION, **self.prompts.stats()}
+
+    def _check_provider(self, provider: str, section_number: int) -> None:
+        """Rejeita providers não suportados com a mesma mensagem de sempre."""
+        if provider in ("gemini", "groq"):
+            return
+        if provider == "claude":
+            raise NotImplementedError(f"Claude ainda não implementado para Seção {section_number}")
+        if provider == "openai":
+            raise NotImplementedError(f"OpenAI ainda não implementado para Seção {section_number}")
+        raise ValueError(f"Provider {provider} não suportado")
+
+    def _provider_chain(self, provider: str) -> List[str]:
+        """
+        Ordem de tentativa para uma requisição: o provider escolhido primeiro,
+        depois os demais de LLM_PROVIDER_CHAIN que estejam configurados.
+        Provider escolhido sem API key é pulado quando há alternativa.
+        """
+        fallbacks = [
+            p for p in self.provider_chain
+            if p != provider and self._is_configured(p)
+        ]
+        if not fallbacks or self._is_configured(provider):
+            return [provider] + fallbacks
+        return fallbacks
+
+    def _is_configured(self, provider: str) -> bool:
+        # Sem carregar o SDK: antes do primeiro uso basta ter a API key (/health)
         if provider == "gemini":
-            return self._generate_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_with_groq(section_data)
-        elif provider == "claude":
-            # TODO: implementar depois
-            raise NotImplementedError("Claude ainda não implementado")
-        elif provider == "openai":
-            # TODO: implementar depois
-            raise NotImplementedError("OpenAI ainda não implementado")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
+            if self._gemini_model is _UNLOADED:
+                return bool(self.gemini_api_key)
+            return self._gemini_model is not None
+        if provider == "groq":
+            if self._groq_async_client is _UNLOADED:
+                return bool(self.groq_api_key)
+            return self._groq_async_client is not None
+        return False
+
+    def _on_unavailable(self, error: "ProviderUnavailableError", section_number: int) -> None:
+        """Provider recusou (quota/rate limit/timeout): ajusta o bucket e segue a cadeia."""
+        print(f"[FAILOVER] {error.provider} indisponível ({error.reason}) na Seção {section_number}, tentando próximo provider")
+        if self.scheduler:
+            self.scheduler.mark_unavailable(error.provider, error.reason)
+
+    def _template_fallback(self, section_number: int, section_data: Dict[str, str], error: Exception) -> str:
+        """Nenhum provider atendeu: texto de modelo montado com as respostas (não vai para o cache)."""
+        print(f"[FALLBACK] Nenhum provider disponível na Seção {section_number} ({error}), usando texto de modelo")
+        self.telemetry.record_template_fallback(section_number)
+        return render_fallback(section_number, section_data, self._enrich_datetime)
+
+    async def _admit(self, candidates: List[str]) -> str:
+        """Próximo provider a tentar: o primeiro com quota (esperando na fila se preciso)."""
+        if not self.scheduler:
+            return candidates[0]
+        return await self.scheduler.acquire(candidates)
+
+    def _admit_nowait(self, candidates: List[str]) -> str:
+        """Igual a _admit(), sem fila (caminho síncrono)."""
+        if not self.scheduler:
+            return candidates[0]
+        provider = self.scheduler.try_acquire(candidates)
+        if provider is None:
+            raise AdmissionError(
+                "Quota dos providers de IA esgotada no momento. Aguarde e tente novamente.",
+                retry_after=self.scheduler.seconds_until_available(candidates)
+            )
+        return provider
 
-    def _generate_with_gemini(self, section_data: Dict[str, str]) -> str:
+    def _generate_sync(self, section_number: int, section_data: Dict[str, str], provider: str) -> str:
         """
-        Gera texto usando Gemini.
+        Caminho síncrono (bloqueante), mantido para scripts e testes.
+        Dentro do FastAPI use generate_text_async().
         """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-        
+        self._check_provider(provider, section_number)
+
+        prompt = self._build_section_prompt(section_number, section_data)
+
+        # Se prompt vazio (seção pulada), retornar vazio
+        if not prompt:
+            return ""
+
+        candidates = self._provider_chain(provider)
+        cache_keys, _, cached = self._cache_lookup(section_number, section_data, candidates)
+        if cached is not None:
+            return self.linter.lint(section_number, cached, section_data).text
+
+        last_error = None
+        while candidates:
+            candidate = self._admit_nowait(candidates)
+            candidates.remove(candidate)
+            started = time.perf_counter()
+            try:
+                if candidate == "gemini":
+                    text = self._call_gemini(prompt, section_number)
+                else:
+                    text = self._call_groq(prompt, section_number)
+            except ProviderUnavailableError as e:
+                self._on_unavailable(e, section_number)
+                last_error = e
+                continue
+
+            self._cache_store(cache_keys.get(candidate), text, section_number, candidate)
+            self._record_cassette(prompt, candidate, text, started)
+            return self.linter.lint(section_number, text, section_data).text
+
+        raise last_error
+
+    async def generate_text_async(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        provider: str = "gemini",
+        use_cache: bool = True
+    ) -> str:
+        """
+        Gera o texto de qualquer seção (1-8) sem bloquear o event loop.
+
+        Usa os clientes assíncronos nativos (generate_content_async do Gemini
+        e AsyncGroq) e limita as chamadas simultâneas a LLM_MAX_CONCURRENCY,
+        para que uma geração lenta não segure /chat, /sync_session ou /health.
+
+        Args:
+            section_number: Número da seção (1-8)
+            section_data: Dicionário com respostas {step: answer}
+            provider: "gemini" ou "groq"
+            use_cache: False força nova chamada ao provider (ex: "regerar")
+
+        Returns:
+            Texto gerado ou string vazia se seção foi pulada
+        """
+        text, _ = await self.generate_with_provider_async(section_number, section_data, provider, use_cache)
+        return text
+
+    async def generate_with_provider_async(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        provider: str = "gemini",
+        use_cache: bool = True
+    ) -> Tuple[str, str]:
+        """
+        Igual a generate_text_async(), mas retorna também o provider que
+        atendeu a requisição.
+
+        Se o provider escolhido estiver sem quota, com rate limit ou estourar
+        o tempo limite, tenta o próximo de LLM_PROVIDER_CHAIN na mesma
+        requisição (ex: gemini -> groq). Com o QuotaScheduler ativo, providers
+        sem saldo são pulados antes da chamada e, se nenhum tiver saldo,
+        a requisição espera na fila (AdmissionError se não couber).
+
+        Se nenhum provider atender (TEMPLATE_FALLBACK_ERRORS) e
+        LLM_TEMPLATE_FALLBACK estiver ligado, retorna o texto de modelo com
+        provider FALLBACK_PROVIDER. Outros erros chegam ao chamador.
+
+        No modo corrida (LLM_RACE_MODE, seções de LLM_RACE_SECTIONS) os
+        providers da cadeia com saldo recebem o prompt ao mesmo tempo e
+        vale a primeira resposta aprovada (ver _race_async).
+
+        Returns:
+            (texto gerado, provider que gerou)
+        """
+        self._check_provider(provider, section_number)
+
+        prompt = self._build_section_prompt(section_number, section_data)
+
+        # Se prompt vazio (seção pulada), retornar vazio
+        if not prompt:
+            return "", provider
+
+        # Mesmas respostas já geradas antes: não chama o provider nem gasta quota
+        candidates = self._provider_chain(provider)
+        cache_keys, cached_provider, cached = await self._cache_lookup_async(
+            section_number, section_data, candidates, use_cache
+        )
+        if cached is not None:
+            return cached, cached_provider
+
         try:
-            prompt = self._build_prompt(section_data)
-            
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-            
-            # Extrair texto
-            generated_text = response.text.strip()
-            
-            return generated_text
-            
-        except Exception as e:
-            error_msg = str(e)
+            # Modo corrida: sem saldo para nenhum provider agora, segue para a fila normal
+            if self.race_mode and section_number in self.race_sections and len(candidates) > 1:
+                racers = self._admit_racers(candidates)
+                if racers:
+                    return await self._race_async(prompt, section_number, racers, cache_keys)
+
+            text, candidate = await self._call_with_failover(prompt, candidates)
+        except TEMPLATE_FALLBACK_ERRORS as e:
+            if not self.template_fallback:
+                raise
+            return self._template_fallback(section_number, section_data, e), FALLBACK_PROVIDER
+
+        await self._cache_store_async(cache_keys.get(candidate), text, section_number, candidate)
+        return text, candidate
+
+    async def _call_with_failover(self, prompt: RenderedPrompt, candidates: List[str]) -> Tuple[str, str]:
+        """
+        Envia o prompt ao primeiro provider de `candidates` com quota e segue a
+        cadeia se ele estiver indisponível. Retorna (texto, provider).
+        """
+        candidates = list(candidates)
+        last_error = None
+        while candidates:
+            candidate = await self._admit(candidates)
+            candidates.remove(candidate)
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    if candidate == "gemini":
+                        text = await self._call_gemini_async(prompt, prompt.section)
+                    else:
+                        text = await self._call_groq_async(prompt, prompt.section)
+            except ProviderUnavailableError as e:
+                self._on_unavailable(e, prompt.section)
+                last_error = e
+                continue
+
+            self._record_cassette(prompt, candidate, text, started)
+            return text, candidate
+
+        raise last_error
+
+    async def generate_bo_async(
+        self,
+        sections: Dict[int, Dict[str, str]],
+        provider: str = "gemini",
+        use_cache: bool = True
+    ) -> WholeBOResult:
+        """
+        Gera várias seções do BO com uma só chamada ao provider (1 da quota
+        diária em vez de uma por seção).
+
+        Seções já em cache não entram no prompt. As demais vão juntas, com os
+        mesmos blocos de respostas de _build_prompt_sectionN e as regras de
+        cada seção (ver PromptRegistry.render_whole_bo), pedindo um JSON
+        {"N": texto}. Cada texto válido vai para o cache da seção, como se
+        tivesse sido gerado sozinho.
+
+        Seções com problema no JSON (parse_whole_bo) voltam em `fallback`
+        para o chamador gerar uma a uma, assim como a única seção restante
+        quando só uma não está em cache ("single_section": não há o que
+        juntar). Erro do provider (sem quota em nenhum, etc.) é levantado.
+
+        Args:
+            sections: {número da seção: respostas}
+            provider: "gemini" ou "groq" (primeiro da cadeia de failover)
+            use_cache: False força nova chamada (ex: "regerar")
+        """
+        if not sections:
+            return WholeBOResult({}, {}, {})
+        self._check_provider(provider, min(sections))
+
+        texts: Dict[int, str] = {}
+        providers: Dict[int, str] = {}
+        blocks: Dict[int, str] = {}
+        cache_keys: Dict[int, Dict[str, str]] = {}
+        candidates = self._provider_chain(provider)
+        for section_number, section_data in sorted(sections.items()):
+            block = self._answers_block(section_number, section_data)
+            if not block:
+                texts[section_number], providers[section_number] = "", provider
+                continue
+            keys, cached_provider, cached = await self._cache_lookup_async(
+                section_number, section_data, candidates, use_cache
+            )
+            if cached is not None:
+                texts[section_number], providers[section_number] = cached, cached_provider
+            else:
+                blocks[section_number], cache_keys[section_number] = block, keys
+
+        if len(blocks) < 2:
+            return WholeBOResult(texts, providers, {section: "single_section" for section in blocks})
+
+        prompt = self.prompts.render_whole_bo(blocks)
+        raw, served = await self._call_with_failover(prompt, candidates)
+        parsed, fallback = parse_whole_bo(raw, list(blocks), self.race_bounds[1])
+
+        for section_number, text in parsed.items():
+            await self._cache_store_async(cache_keys[section_number].get(served), text, section_number, served)
+            texts[section_number], providers[section_number] = text, served
+
+        self.telemetry.record_whole_bo(len(blocks), fallback)
+        if fallback:
+            print(f"[DEBUG] BO inteiro ({served}): seções para geração individual {fallback}")
+        return WholeBOResult(texts, providers, fallback)
+
+    def _admit_racers(self, candidates: List[str]) -> List[str]:
+        """Providers da cadeia com saldo agora (cada um consome 1 token da quota)."""
+        if not self.scheduler:
+            return list(candidates)
+        return [p for p in candidates if self.scheduler.try_acquire([p]) == p]
+
+    async def _race_async(
+        self,
+        prompt: RenderedPrompt,
+        section_number: int,
+        racers: List[str],
+        cache_keys: Dict[str, str]
+    ) -> Tuple[str, str]:
+        """
+        Dispara o mesmo prompt em todos os `racers` e devolve a primeira
+        resposta aprovada por race_sanity_problem() como (texto, provider).
+
+        O perdedor não é cancelado (a quota já foi gasta): termina em segundo
+        plano, vai para o cache do provider dele e registra a margem na
+        telemetria. Sem resposta aprovada, devolve a primeira não vazia (como
+        o modo normal faria) ou levanta o último erro.
+        """
+        async def run(provider: str) -> Tuple[str, float, float]:
+            started = time.perf_counter()
+            async with self._semaphore:
+                if provider == "gemini":
+                    text = await self._call_gemini_async(prompt, section_number)
+                else:
+                    text = await self._call_groq_async(prompt, section_number)
+            return text, started, time.perf_counter()
+
+        tasks = {asyncio.ensure_future(run(provider)): provider for provider in racers}
+        pending = set(tasks)
+        fallback = None
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = tasks[task]
+                    try:
+                        text, started, finished = task.result()
+                    except ProviderUnavailableError as e:
+                        self._on_unavailable(e, section_number)
+                        last_error = e
+                        continue
+                    except Exception as e:
+                        last_error = e
+                        continue
+
+                    problem = race_sanity_problem(text, *self.race_bounds)
+                    if problem:
+                        self.telemetry.record_race_rejection(section_number, provider, problem)
+                        if fallback is None and text:
+                            fallback = (text, provider)
+                        continue
+
+                    await self._cache_store_async(cache_keys.get(provider), text, section_number, provider)
+                    self._record_cassette(prompt, provider, text, started)
+                    if len(racers) > 1:
+                        self.telemetry.record_race(section_number, provider)
+                        print(f"[DEBUG] Corrida Seção {section_number}: {provider} venceu")
+                    for loser in pending:
+                        self._follow_race_loser(loser, tasks[loser], prompt, section_number, cache_keys, finished)
+                    pending = set()
+                    return text, provider
+        finally:
+            # Chamador cancelado antes de haver vencedor: ninguém vai usar as respostas
+            for task in pending:
+                task.cancel()
+
+        if len(racers) > 1:
+            self.telemetry.record_race(section_number, None)
+        if fallback:
+            return fallback
+        if last_error:
+            raise last_error
+        return "", racers[0]
+
+    def _follow_race_loser(
+        self,
+        task: asyncio.Future,
+        provider: str,
+        prompt: RenderedPrompt,
+        section_number: int,
+        cache_keys: Dict[str, str],
+        winner_finished: float
+    ) -> None:
+        """Quando o perdedor terminar: margem na telemetria e texto no cache dele."""
+        self._race_losers.add(task)
+
+        def settle(done: asyncio.Future) -> None:
+            self._race_losers.discard(done)
+            if done.cancelled():
+                return
+            try:
+                text, started, finished = done.result()
+            except ProviderUnavailableError as e:
+                self._on_unavailable(e, section_number)
+                self.telemetry.record_race_margin(section_number, None)
+                return
+            except Exception:
+                self.telemetry.record_race_margin(section_number, None)
+                return
+
+            problem = race_sanity_problem(text, *self.race_bounds)
+            if problem:
+                self.telemetry.record_race_rejection(section_number, provider, problem)
+                self.telemetry.record_race_margin(section_number, None)
+                return
+            self.telemetry.record_race_margin(section_number, (finished - winner_finished) * 1000)
+            self._record_cassette(prompt, provider, text, started)
+            # Callback roda no event loop: a gravação no cache vira uma task própria
+            store = asyncio.ensure_future(self._cache_store_async(cache_keys.get(provider), text, section_number, provider))
+            self._race_losers.add(store)
+            store.add_done_callback(self._race_losers.discard)
+
+        task.add_done_callback(settle)
+
+    async def stream_text_async(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        provider: str = "gemini",
+        served: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Igual a generate_text_async(), mas entrega o texto em trechos conforme
+        o provider responde (Gemini stream=True / Groq stream=True).
+
+        O chamador é responsável por juntar os trechos e aplicar strip()
+        no texto final. Seção pulada não emite nenhum trecho.
 
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
+        Failover só acontece antes do primeiro trecho: depois que o texto
+        começou a sair, um erro do provider é repassado ao chamador.
+        Se `served` for informado, served["provider"] recebe o provider
+        que gerou o texto. Cadeia inteira falhou antes do primeiro trecho:
+        sai o texto de modelo (FALLBACK_PROVIDER), se ligado.
+        """
+        self._check_provider(provider, section_number)
+
+        prompt = self._build_section_prompt(section_number, section_data)
 
-            raise Exception(f"Erro ao gerar texto com Gemini: {error_msg}")
+        # Se prompt vazio (seção pulada), nada a emitir
+        if not prompt:
+            return
 
-    def _generate_with_groq(self, section_data: Dict[str, str]) -> str:
+        # Cache hit: o texto inteiro sai como um único trecho
+        candidates = self._provider_chain(provider)
+        cache_keys, cached_provider, cached = await self._cache_lookup_async(section_number, section_data, candidates)
+        if cached is not None:
+            if served is not None:
+                served["provider"] = cached_provider
+            yield cached
+            return
+
+        chunks = self._stream_with_failover(prompt, section_number, candidates, cache_keys, served)
+        emitted = False
+        try:
+            async for chunk in chunks:
+                emitted = True
+                yield chunk
+        except TEMPLATE_FALLBACK_ERRORS as e:
+            if emitted or not self.template_fallback:
+                raise
+            if served is not None:
+                served["provider"] = FALLBACK_PROVIDER
+            yield self._template_fallback(section_number, section_data, e)
+        finally:
+            await chunks.aclose()
+
+    async def _stream_with_failover(
+        self,
+        prompt: RenderedPrompt,
+        section_number: int,
+        candidates: List[str],
+        cache_keys: Dict[str, str],
+        served: Optional[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """Trechos do primeiro provider de `candidates` que atender (failover antes do primeiro trecho)."""
+        last_error = None
+        while candidates:
+            candidate = await self._admit(candidates)
+            candidates.remove(candidate)
+            if served is not None:
+                served["provider"] = candidate
+
+            received = []
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    if candidate == "gemini":
+                        chunks = self._stream_gemini_async(prompt, section_number)
+                    else:
+                        chunks = self._stream_groq_async(prompt, section_number)
+
+                    async for chunk in chunks:
+                        received.append(chunk)
+                        yield chunk
+            except ProviderUnavailableError as e:
+                if received:
+                    raise
+                self._on_unavailable(e, section_number)
+                last_error = e
+                continue
+
+            text = "".join(received).strip()
+            await self._cache_store_async(cache_keys.get(candidate), text, section_number, candidate)
+            self._record_cassette(prompt, candidate, text, started)
+            return
+
+        raise last_error
+
+    # ------------------------------------------------------------------------
+    # Cache de textos gerados
+    # ------------------------------------------------------------------------
+
+    def _cache_lookup(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        candidates: List[str],
+        use_cache: bool = True
+    ) -> Tuple[Dict[str, str], Optional[str], Optional[str]]:
         """
-        Gera texto da Seção 1 usando Groq (Llama 3.3 70B).
-        14.400 req/dia no free tier vs 20 do Gemini.
+        Procura texto em cache gerado por qualquer provider da cadeia (na ordem).
+        Retorna ({provider: chave}, provider do hit, texto). Sem cache: ({}, None, None).
         """
+        keys = self._cache_keys(section_number, section_data, candidates, use_cache)
+        if not keys:
+            return {}, None, None
+        return self._cache_hit(keys, self.cache.get_any(list(keys.values())))
+
+    async def _cache_lookup_async(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        candidates: List[str],
+        use_cache: bool = True
+    ) -> Tuple[Dict[str, str], Optional[str], Optional[str]]:
+        """_cache_lookup() para o caminho assíncrono: o SQLite do cache roda numa thread."""
+        keys = self._cache_keys(section_number, section_data, candidates, use_cache)
+        if not keys:
+            return {}, None, None
+        return self._cache_hit(keys, await self.cache.get_any_async(list(keys.values())))
+
+    def _cache_keys(
+        self,
+        section_number: int,
+        section_data: Dict[str, str],
+        candidates: List[str],
+        use_cache: bool
+    ) -> Dict[str, str]:
+        if not self.cache or not use_cache:
+            return {}
+        return {
+            candidate: make_cache_key(section_number, section_data, candidate, self._prompt_version(section_number))
+            for candidate in candidates
+        }
+
+    @staticmethod
+    def _cache_hit(
+        keys: Dict[str, str],
+        hit: Tuple[Optional[str], Optional[str]]
+    ) -> Tuple[Dict[str, str], Optional[str], Optional[str]]:
+        hit_key, text = hit
+        hit_provider = next((c for c, k in keys.items() if k == hit_key), None)
+        return keys, hit_provider, text
+
+    def _cache_store(self, cache_key: Optional[str], text: str, section_number: int, provider: str) -> None:
+        if self.cache and cache_key:
+            self.cache.set(cache_key, text, section_number, provider, self._prompt_version(section_number))
+
+    async def _cache_store_async(self, cache_key: Optional[str], text: str, section_number: int, provider: str) -> None:
+        if self.cache and cache_key:
+            await self.cache.set_async(cache_key, text, section_number, provider, self._prompt_version(section_number))
+
+    def cache_stats(self) -> Dict:
+        """Contadores do cache (hits = chamadas ao provider economizadas)."""
+        if not self.cache:
+            return {"enabled": False}
+        return {"enabled": True, "prompt_version": PROMPT_VERSION, **self.cache.stats()}
+
+    # ------------------------------------------------------------------------
+    # Record/replay (ver replay_provider.py)
+    # ------------------------------------------------------------------------
+
+    def use_replay(self, replay: ReplayProvider) -> None:
+        """Troca os clientes do Gemini e do Groq pelas imitações do replay (sem rede)."""
+        self.replay_mode = "replay"
+        self.replay = replay
+        if not replay.sections:
+            replay.sections = {template.system: section for section, template in self.prompts.templates.items()}
+        self.gemini_model = ReplayGeminiModel(replay)
+        self.gemini_section_models = {
+            section: ReplayGeminiModel(replay, system_instruction=template.system)
+            for section, template in self.prompts.templates.items()
+        }
+        self.groq_client = ReplayGroq(replay, asynchronous=False)
+        self.groq_async_client = ReplayGroq(replay, asynchronous=True)
+
+    def _record_cassette(self, prompt: RenderedPrompt, provider: str, text: str, started: float) -> None:
+        """No modo record, grava a resposta real no cassette (chave = hash do prompt)."""
+        if not self.cassette or not text:
+            return
+        try:
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            self.cassette.put(prompt_hash(prompt.system, prompt.user), text, prompt.section, provider, latency_ms)
+        except Exception as e:
+            print(f"[DEBUG] Erro ao gravar cassette: {e}")
+
+    def replay_stats(self) -> Dict:
+        """Modo do provider e contadores do replay (cassette, sintético, erros injetados)."""
+        stats = {"mode": self.replay_mode}
+        if self.replay:
+            stats.update(self.replay.stats())
+        elif self.cassette:
+            stats.update({"cassette": self.cassette.path, "cassette_entries": len(self.cassette.entries)})
+        return stats
+
+    # ------------------------------------------------------------------------
+    # Conexões (ver http_pool.py)
+    # ------------------------------------------------------------------------
+
+    async def warm_up(self) -> Dict:
+        """
+        Abre as conexões com os providers configurados antes do primeiro /chat,
+        com chamadas que não consomem quota de geração. Não roda no replay.
+        """
+        if self.replay:
+            return {}
+
+        # Importa os SDKs numa thread: o loop segue atendendo /health enquanto isso
+        await asyncio.to_thread(self.load_providers)
+
+        targets = {}
+        if self.groq_api_key and self.groq_async_client is not None:
+            targets["groq"] = self.groq_async_client.models.list
+        model = self.gemini_section_models.get(1) or self.gemini_model
+        if self.gemini_api_key and model is not None:
+            targets["gemini"] = lambda: model.count_tokens_async("ok")
+        return await self.http_pool.warm_up(targets)
+
+    def pool_stats(self) -> Dict:
+        """Estado do pool HTTP e resultado do último warm-up."""
+        return self.http_pool.stats()
+
+    async def aclose(self) -> None:
+        await self.http_pool.aclose()
+
+    def metrics(self) -> Dict:
+        """Histogramas de latência, tokens e erros por provider e por seção."""
+        return self.telemetry.stats()
+
+    def lint_stats(self) -> Dict:
+        """Violações corrigidas e sinalizadas pelo linter, por regra."""
+        return self.linter.stats()
+
+    def quota_stats(self) -> Dict:
+        """Saldo de quota por provider e profundidade da fila de admissão."""
+        if not self.scheduler:
+            return {"enabled": False}
+        stats = self.scheduler.stats()
+        for provider, budget in stats["providers"].items():
+            budget["configured"] = self._is_configured(provider)
+        return {"enabled": True, **stats}
+
+    # ------------------------------------------------------------------------
+    # Chamadas aos providers
+    # ------------------------------------------------------------------------
+
+    def _gemini_error(self, error: Exception, section_number: int) -> Exception:
+        """Traduz erro do Gemini para mensagem amigável."""
+        error_msg = str(error)
+
+        # Tratar erro de quota excedida
+        if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
+            if _gemini_quota_reason(error) == "quota":
+                return ProviderUnavailableError(
+                    "Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.",
+                    provider="gemini",
+                    reason="quota"
+                )
+            return ProviderUnavailableError(
+                "Limite de requisições por minuto do Gemini atingido. Aguarde alguns segundos.",
+                provider="gemini",
+                reason="rate_limit"
+            )
+
+        if _is_timeout(error):
+            return ProviderUnavailableError(
+                f"Tempo limite excedido ao gerar texto da Seção {section_number} com Gemini.",
+                provider="gemini",
+                reason="timeout"
+            )
+
+        return Exception(f"Erro ao gerar texto da Seção {section_number} com Gemini: {error_msg}")
+
+    def _groq_error(self, error: Exception, section_number: int) -> Exception:
+        """Traduz erro do Groq para mensagem amigável."""
+        error_msg = str(error)
+
+        # Tratar erro de rate limit
+        if "rate_limit" in error_msg.lower() or "429" in error_msg:
+            return ProviderUnavailableError(
+                "Limite de requisições do Groq atingido. Aguarde alguns segundos.",
+                provider="groq",
+                reason="rate_limit"
+            )
+
+        if _is_timeout(error):
+            return ProviderUnavailableError(
+                f"Tempo limite excedido ao gerar texto da Seção {section_number} com Groq.",
+                provider="groq",
+                reason="timeout"
+            )
+
+        return Exception(f"Erro ao gerar texto da Seção {section_number} com Groq: {error_msg}")
+
+    def _groq_request(self, prompt: RenderedPrompt) -> Dict:
+        """Parâmetros da chamada Groq (parte estática do template como mensagem system)."""
+        request = {
+            "model": GROQ_MODEL,
+            "messages": [
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": prompt.user}
+            ],
+            "temperature": 0.3,  # Baixa criatividade (importante para BOs)
+            "max_tokens": 2000
+        }
+        if prompt.section == WHOLE_BO_SECTION:
+            request["max_tokens"] = LLM_WHOLE_BO_MAX_TOKENS
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def _gemini_options(self, prompt: RenderedPrompt) -> Dict:
+        """Argumentos extras do generate_content (BO inteiro: saída JSON)."""
+        if prompt.section == WHOLE_BO_SECTION:
+            return {"generation_config": {"response_mime_type": "application/json"}}
+        return {}
+
+    def _timeout(self, provider: str, prompt: RenderedPrompt) -> float:
+        """Prazo da chamada (BO inteiro: multiplicado por LLM_WHOLE_BO_TIMEOUT_FACTOR)."""
+        if prompt.section == WHOLE_BO_SECTION:
+            return self.timeouts[provider] * LLM_WHOLE_BO_TIMEOUT_FACTOR
+        return self.timeouts[provider]
+
+    def _gemini_request(self, prompt: RenderedPrompt):
+        """
+        Modelo e conteúdo da chamada Gemini: o modelo da seção já carrega a
+        parte estática como system_instruction; sem ele, vai o prompt inteiro.
+        """
+        model = self.gemini_section_models.get(prompt.section)
+        if model is not None:
+            return model, prompt.user
+        return self.gemini_model, prompt.full
+
+    def _record_success(
+        self,
+        prompt: RenderedPrompt,
+        provider: str,
+        started: float,
+        text: str,
+        usage: Dict[str, Optional[int]]
+    ) -> None:
+        """Conta o envio nos templates e registra latência/tokens na telemetria."""
+        self.prompts.record_call(prompt, usage["cached_tokens"])
+        self.telemetry.record(
+            provider=provider,
+            section=prompt.section,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            prompt_text=prompt.full,
+            completion_text=text,
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"]
+        )
+
+    def _record_failure(self, prompt: RenderedPrompt, provider: str, started: float, error: Exception) -> Exception:
+        """Traduz o erro do provider, registra na telemetria e devolve o erro traduzido."""
+        if provider == "gemini":
+            translated = self._gemini_error(error, prompt.section)
+        else:
+            translated = self._groq_error(error, prompt.section)
+
+        self.telemetry.record(
+            provider=provider,
+            section=prompt.section,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            prompt_text=prompt.full,
+            error_class=_error_class(translated, error)
+        )
+        return translated
+
+    def _record_cancelled(self, prompt: RenderedPrompt, provider: str, started: float) -> None:
+        """Chamada abandonada (cliente desconectou): entra na telemetria como 'cancelled'."""
+        self.telemetry.record(
+            provider=provider,
+            section=prompt.section,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            prompt_text=prompt.full,
+            error_class="cancelled"
+        )
+
+    def _call_gemini(self, prompt: RenderedPrompt, section_number: int) -> str:
+        if not self.gemini_model:
+            raise MissingAPIKeyError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
+
+        started = time.perf_counter()
+        try:
+            model, contents = self._gemini_request(prompt)
+            response = model.generate_content(contents)
+            text = response.text.strip()
+        except Exception as e:
+            raise self._record_failure(prompt, "gemini", started, e)
+
+        self._record_success(prompt, "gemini", started, text, _gemini_usage(response))
+        return text
+
+    def _call_groq(self, prompt: RenderedPrompt, section_number: int) -> str:
         if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
+            raise MissingAPIKeyError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
 
+        started = time.perf_counter()
         try:
-            prompt = self._build_prompt(section_data)
-
-            # Groq usa formato OpenAI chat completions
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",  # Melhor modelo do Groq
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,  # Baixa criatividade (importante para BOs)
-                max_tokens=2000
+            response = self.groq_client.chat.completions.create(**self._groq_request(prompt))
+            text = response.choices[0].message.content.strip()
+        except Exception as e:
+            raise self._record_failure(prompt, "groq", started, e)
+
+        self._record_success(prompt, "groq", started, text, _groq_usage(getattr(response, "usage", None)))
+        return text
+
+    async def _call_gemini_async(self, prompt: RenderedPrompt, section_number: int) -> str:
+        if not self.gemini_model:
+            raise MissingAPIKeyError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
+
+        started = time.perf_counter()
+        try:
+            model, contents = self._gemini_request(prompt)
+            response = await asyncio.wait_for(
+                model.generate_content_async(contents, **self._gemini_options(prompt)),
+                self._timeout("gemini", prompt)
             )
+            text = response.text.strip()
+        except asyncio.CancelledError:
+            self._record_cancelled(prompt, "gemini", started)
+            raise
+        except Exception as e:
+            raise self._record_failure(prompt, "gemini", started, e)
 
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
+        self._record_success(prompt, "gemini", started, text, _gemini_usage(response))
+        return text
 
+    async def _call_groq_async(self, prompt: RenderedPrompt, section_number: int) -> str:
+        if not self.groq_async_client:
+            raise MissingAPIKeyError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
+
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.groq_async_client.chat.completions.create(**self._groq_request(prompt)),
+                self._timeout("groq", prompt)
+            )
+            text = response.choices[0].message.content.strip()
+        except asyncio.CancelledError:
+            self._record_cancelled(prompt, "groq", started)
+            raise
         except Exception as e:
-            error_msg = str(e)
+            raise self._record_failure(prompt, "groq", started, e)
+
+        self._record_success(prompt, "groq", started, text, _groq_usage(getattr(response, "usage", None)))
+        return text
 
-            # Tratar erro de rate limit do Groq
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
+    async def _stream_gemini_async(self, prompt: RenderedPrompt, section_number: int) -> AsyncIterator[str]:
+        if not self.gemini_model:
+            raise MissingAPIKeyError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
+
+        started = time.perf_counter()
+        received = []
+        try:
+            model, contents = self._gemini_request(prompt)
+            deadline = started + self.timeouts["gemini"]
+            response = await asyncio.wait_for(model.generate_content_async(contents, stream=True), self.timeouts["gemini"])
+            async for chunk in _iterate_until(response, deadline):
+                if chunk.text:
+                    received.append(chunk.text)
+                    yield chunk.text
+        except asyncio.CancelledError:
+            self._record_cancelled(prompt, "gemini", started)
+            raise
+        except Exception as e:
+            raise self._record_failure(prompt, "gemini", started, e)
 
-            raise Exception(f"Erro ao gerar texto com Groq: {error_msg}")
+        self._record_success(prompt, "gemini", started, "".join(received), _gemini_usage(response))
+
+    async def _stream_groq_async(self, prompt: RenderedPrompt, section_number: int) -> AsyncIterator[str]:
+        if not self.groq_async_client:
+            raise MissingAPIKeyError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
+
+        started = time.perf_counter()
+        received = []
+        usage = None
+        try:
+            deadline = started + self.timeouts["groq"]
+            stream = await asyncio.wait_for(
+                self.groq_async_client.chat.completions.create(**self._groq_request(prompt), stream=True),
+                self.timeouts["groq"]
+            )
+            async for chunk in _iterate_until(stream, deadline):
+                # O último chunk traz o usage em x_groq
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    received.append(delta)
+                    yield delta
+        except asyncio.CancelledError:
+            self._record_cancelled(prompt, "groq", started)
+            raise
+        except Exception as e:
+            raise self._record_failure(prompt, "groq", started, e)
+
+        self._record_success(prompt, "groq", started, "".join(received), _groq_usage(usage))
 
     def validate_api_keys(self) -> Dict[str, bool]:
         """
@@ -299,7 +1488,8 @@ GERE AGORA o texto da Seção 1 usando SOMENTE as informações fornecidas:"""
 
     def _build_prompt_section2(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 2 baseado no material do Claudio.
+        Constrói o bloco de respostas da Seção 2 (a parte estática do prompt,
+        baseada no material do Claudio, está em prompt_templates.SECTION2_SYSTEM).
 
         Fonte:
         - materiais-claudio/_03_busca_veicular.txt
@@ -325,21 +1515,8 @@ GERE AGORA o texto da Seção 1 usando SOMENTE as informações fornecidas:"""
         material_encontrado = section_data.get("2.12", "Não informado")
         irregularidades = section_data.get("2.13", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 2 (Abordagem a Veículo) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. Descreva PASSO A PASSO: visualização → comportamento → ordem de parada → reação → busca
-6. Gere texto em parágrafo único, fluido, SEM quebras de linha
-7. NÃO use juridiquês, gerúndio ou termos vagos como "atitude suspeita"
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos ou códigos (Ex: Art. 33, Lei 11.343/06, CPP, STF). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-DADOS FORNECIDOS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO:
 
 - Local e contexto onde foi visto: {local_contexto}
 - Marca/modelo/cor/placa: {veiculo_desc}
@@ -352,57 +1529,9 @@ DADOS FORNECIDOS PELO USUÁRIO:
 - Busca no veículo (quem e onde): {busca_veiculo}
 - Busca pessoal nos ocupantes: {busca_pessoal}
 - Material encontrado (o que, com quem, onde): {material_encontrado}
-- Irregularidades veiculares: {irregularidades}
-
-EXEMPLOS CORRETOS (do material do Claudio):
-
-✅ Exemplo 1 – Conduta atípica observada:
-"Durante patrulhamento pelo Bairro Pinhalzinho, a equipe visualizou um veículo VW/Fox prata, placa DWL9I93, transitando em alta velocidade e mudando repentinamente o sentido de direção ao notar a aproximação da viatura. O Sargento Lucas determinou a perseguição, sendo o carro alcançado na Rodovia IMG-880, onde foi procedida a abordagem. O condutor apresentava visível nervosismo e mantinha o olhar fixo no banco traseiro. Diante da fundada suspeita de transporte de ilícitos, foi realizada busca no interior do veículo, sendo localizados cinco tabletes de substância análoga à cocaína no porta-malas, além de duas buchas de maconha no bolso traseiro da calça do motorista."
-
-✅ Exemplo 2 – Denúncia corroborada + comportamento evasivo:
-"Durante operação de combate ao tráfico, a guarnição recebeu via COPOM denúncia informando que um veículo Fiat Palio, cor preta, placa ABC-1234, estaria sendo utilizado para transporte de drogas entre os bairros Esperança e São João. Ao transitar pela Rua das Acácias, o Cabo Almeida visualizou o veículo denunciado. O condutor, ao perceber a viatura, reduziu a velocidade, olhou diversas vezes para o retrovisor e tentou entrar em um beco lateral. Foi dada ordem de parada, prontamente atendida. Durante a vistoria, foi localizado um invólucro contendo substância análoga à maconha sob o banco do passageiro, além de valores fracionados no console central."
-
-✅ Exemplo 3 – Apoio da inteligência:
-"Em patrulhamento com o objetivo de combater o tráfico de drogas, após levantamento do setor de inteligência da PM indicando o uso de um Chevrolet Onix branco, placa RST-8899, no transporte de drogas, a equipe visualizou o veículo estacionado em frente à Rua das Oliveiras, local apontado como ponto de entrega. Durante a observação, o condutor recebeu rapidamente um pacote de um motociclista e o colocou no porta-malas. Diante da fundada suspeita de crime de tráfico, o Sargento Marcos determinou a abordagem, sendo o pacote arrecadado e constatado tratar-se de substância análoga à cocaína embalada para comércio."
-
-❌ ERROS A EVITAR (do material do Claudio):
-
-• "O veículo foi abordado por suspeita" (genérico, sem fatos concretos)
-• "Condutor nervoso" (sem descrever COMO estava nervoso - tremores? olhar fixo? tentou esconder algo?)
-• "Local conhecido por tráfico" (sem base factual - qual informação prévia? qual relatório?)
-• "Foi feita revista no veículo" (sem dizer O MOTIVO da busca - qual fundada suspeita?)
+- Irregularidades veiculares: {irregularidades}"""
 
-ESTRUTURA NARRATIVA (seguir esta ordem):
-
-1. Contexto inicial: onde, em que situação o veículo foi visualizado
-2. Descrição do veículo: marca, modelo, cor, placa
-3. Comportamento observado: o que chamou atenção (CONCRETO, não vago)
-4. Identificação: qual policial viu primeiro, de onde viu
-5. Reação do motorista/ocupantes: manobra brusca, fuga, descarte de objeto (ou ausência de reação)
-6. Ordem de parada: como foi dada (sirene, megafone, sinal), quem deu
-7. Resposta à ordem: veículo parou ou houve perseguição?
-8. Motivo da parada (se houve perseguição): desistiu, cercado, bateu, capotou
-9. Abordagem dos ocupantes: quem abordou, quantos ocupantes, posicionamento
-10. Busca veicular: quem vistoriou o veículo e quais partes (porta-luvas, bancos, porta-malas, etc)
-11. Busca pessoal: quem realizou busca pessoal em cada ocupante
-12. Material encontrado: o que foi localizado, com quem estava, em qual parte do veículo/corpo
-13. Irregularidades (se houver): veículo furtado/roubado/clonado com REDS
-
-IMPORTANTE - SEPARAÇÃO DE BUSCA PESSOAL E BUSCA VEICULAR:
-
-- A busca PESSOAL (nos ocupantes) e a busca NO VEÍCULO são atos DIFERENTES
-- Cada busca deve ter SEU RESPONSÁVEL identificado (graduação + nome)
-- Isso é CRÍTICO para a CADEIA DE CUSTÓDIA: quem encontrou o quê e onde
-- Se alguma resposta estiver como "Não informado", simplesmente OMITA aquela informação (não invente)
-- Descreva SEMPRE: motivo da atenção → reação do motorista → ordem de parada → resposta (parou/perseguição) → abordagem → busca veicular → busca pessoal → o que foi encontrado
-- Use conectivos para fluidez: "ao notar", "diante de", "sendo que", "durante", "onde"
-- Mantenha coerência temporal: visualização → reação → ordem → parou/perseguição → abordagem → busca veicular → busca pessoal → material encontrado
-- A busca VEICULAR agora vem ANTES da busca PESSOAL na narrativa
-- Se houver irregularidade no veículo (REDS, furto, etc.), mencionar ao final
-
-Gere APENAS o texto da Seção 2 agora (um único parágrafo contínuo):"""
-
-        return prompt
+        return answers_block
 
     def generate_section2_text(self, section_data: Dict[str, str], provider: str = "gemini") -> str:
         """
@@ -419,97 +1548,14 @@ Gere APENAS o texto da Seção 2 agora (um único parágrafo contínuo):"""
         if section_data.get("2.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section2_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section2_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 2")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 2")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section2_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 2 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section2(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 2 com Gemini: {error_msg}")
-
-    def _generate_section2_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 2 (Abordagem a Veículo) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section2(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 2 com Groq: {error_msg}")
+        return self._generate_sync(2, section_data, provider)
 
     # ==================== SEÇÃO 3: CAMPANA ====================
 
     def _build_prompt_section3(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 3 (Campana - Vigilância Velada).
+        Constrói o bloco de respostas da Seção 3 (Campana - Vigilância Velada).
+        Parte estática do prompt: prompt_templates.SECTION3_SYSTEM.
 
         Fonte:
         - materiais-claudio/_secao_-_campana.txt
@@ -529,21 +1575,8 @@ Gere APENAS o texto da Seção 2 agora (um único parágrafo contínuo):"""
         usuarios = section_data.get("3.7", "Não informado")
         fuga = section_data.get("3.8", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 3 (Campana - Vigilância Velada) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. Descreva ATOS CONCRETOS observados, NÃO impressões subjetivas
-6. Gere texto em 2-3 parágrafos fluidos
-7. NÃO use juridiquês, gerúndio ou termos vagos como "atitude suspeita"
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos ou códigos (Ex: Art. 33, Lei 11.343/06, CPP, STF). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-DADOS FORNECIDOS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO:
 
 - Local da campana: {local_campana}
 - Policial com visão direta: {policial_visao}
@@ -551,46 +1584,9 @@ DADOS FORNECIDOS PELO USUÁRIO:
 - Duração: {duracao}
 - O que foi observado (atos concretos): {observacoes}
 - Abordagem de usuários: {usuarios}
-- Tentativa de fuga: {fuga}
-
-ESTRUTURA NARRATIVA (seguir esta ordem):
+- Tentativa de fuga: {fuga}"""
 
-1. Motivação: por que foi realizada a campana (denúncia, inteligência, histórico)
-2. Local e posicionamento: onde a equipe se posicionou, quem tinha visão
-3. Duração: quanto tempo durou (contínua ou alternada)
-4. Observações concretas: descrever ATOS específicos (não generalizações)
-   - Exemplo correto: "tirou invólucros da mochila e entregou a dois rapazes de moto"
-   - Exemplo errado: "estava em atitude suspeita"
-5. Usuários (se houver): quantos, o que tinham, o que disseram
-6. Fuga (se houver): como tentou fugir ao perceber a equipe
-7. Fundada suspeita: conectar observações com decisão de abordar
-
-EXEMPLOS CORRETOS:
-
-✅ Exemplo 1:
-"Motivados por denúncia anônima recebida via COPOM informando comercialização de drogas na esquina da Rua das Flores com Avenida Brasil, a guarnição posicionou-se atrás do muro da casa nº 145, a aproximadamente 30 metros do local denunciado. O Sargento Silva tinha visão desobstruída da porta do bar do João, enquanto o Cabo Almeida observava a lateral do estabelecimento. Durante 15 minutos de vigilância contínua, foi observado um homem de camiseta vermelha retirando pequenos invólucros de uma mochila preta e entregando a dois indivíduos que chegaram de motocicleta. Após receberem os invólucros, os indivíduos entregaram dinheiro ao homem de vermelho. Durante a campana, foi abordado um usuário que saía do local. Ele portava 2 porções de substância análoga à cocaína e relatou ter comprado do 'cara de vermelho' por R$ 50,00. Ao perceber a movimentação policial, o homem de vermelho correu para o beco ao lado do bar, tentando fugir em direção à Rua Sete. Diante das observações concretas e do relato do usuário, caracterizou-se fundada suspeita para a abordagem."
-
-✅ Exemplo 2:
-"Com base em informações da inteligência policial sobre comercialização de drogas no Beco da Rua Principal, a equipe realizou campana posicionada dentro da viatura estacionada no nº 233 da Rua Sete, a um quarteirão do ponto. Durante 20 minutos de vigilância alternada, o Soldado Faria conseguia ver a entrada do beco de sua posição. Foi observada uma mulher que recebia dinheiro de diversas pessoas e retirava algo do bolso esquerdo, entregando aos compradores. As trocas eram rápidas e ocorriam em sequência. Diante do comportamento compatível com comercialização de entorpecentes, a equipe decidiu realizar a abordagem."
-
-❌ ERROS A EVITAR:
-
-• "Local conhecido por tráfico" (sem informação prévia específica)
-• "Comportamento suspeito" (vago - descrever O QUE exatamente fez)
-• "Vários usuários" (quantificar - 2? 5? 10?)
-• "Comercializando drogas" (descrever OS ATOS - entregou invólucros? recebeu dinheiro?)
-
-IMPORTANTE:
-
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação (não invente)
-- Se resposta for "NÃO" para usuários ou fuga, não mencione no texto
-- Sempre conectar observações concretas → fundada suspeita
-- Dois espaços entre frases
-- Manter coerência temporal e espacial
-
-Gere APENAS o texto da Seção 3 agora (2-3 parágrafos fluidos):"""
-
-        return prompt
+        return answers_block
 
     def generate_section3_text(self, section_data: Dict[str, str], provider: str = "gemini") -> str:
         """
@@ -607,91 +1603,7 @@ Gere APENAS o texto da Seção 3 agora (2-3 parágrafos fluidos):"""
         if section_data.get("3.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section3_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section3_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 3")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 3")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section3_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 3 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section3(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 3 com Gemini: {error_msg}")
-
-    def _generate_section3_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 3 (Campana - Vigilância Velada) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section3(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 3 com Groq: {error_msg}")
+        return self._generate_sync(3, section_data, provider)
 
     # ============================================================================
     # SEÇÃO 4: ENTRADA EM DOMICÍLIO
@@ -699,7 +1611,8 @@ Gere APENAS o texto da Seção 3 agora (2-3 parágrafos fluidos):"""
 
     def _build_prompt_section4(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 4 (Entrada em Domicílio).
+        Constrói o bloco de respostas da Seção 4 (Entrada em Domicílio).
+        Parte estática do prompt: prompt_templates.SECTION4_SYSTEM.
 
         Fonte:
         - materiais-claudio/_04_entrada_em_domicilio.txt
@@ -716,76 +1629,15 @@ Gere APENAS o texto da Seção 3 agora (2-3 parágrafos fluidos):"""
         tipo_ingresso = section_data.get("4.4", "Não informado")
         acoes_policiais = section_data.get("4.5", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 4 (Entrada em Domicílio) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. A JUSTA CAUSA deve vir ANTES da entrada no texto narrativo
-6. Descreva FATOS CONCRETOS observados (não impressões subjetivas)
-7. Gere texto em 2-3 parágrafos fluidos
-8. NÃO use juridiquês, gerúndio ou termos vagos
-9. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos, códigos ou jurisprudência (Ex: Art. 33, Lei 11.343/06, CPP, STF). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-CONTEXTO TÉCNICO (para sua compreensão, NÃO incluir no texto gerado):
-
-O ingresso em domicílio sem mandado judicial só é legítimo quando houver FUNDADAS RAZÕES, devidamente justificadas, de que ocorre flagrante delito no interior do imóvel. A justa causa deve existir ANTES da entrada. Não basta alegar que "encontrou drogas depois".
-
-ELEMENTOS CONCRETOS EXIGIDOS (pelo menos um):
-- Visualização de ilícito em andamento (pela janela, porta)
-- Perseguição contínua sem perda de contato visual
-- Flagrante auditivo (sons de embalagem, descargas)
-- Odor intenso característico
-- Autorização expressa do morador
-
-DADOS FORNECIDOS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO:
 
 - O que foi visto/ouvido/sentido ANTES do ingresso: {justa_causa}
 - Qual policial presenciou e o que viu: {policial_presenciou}
 - Como ocorreu o ingresso: {tipo_ingresso}
-- Ação de cada policial: {acoes_policiais}
-
-ESTRUTURA NARRATIVA (seguir esta ordem):
-
-1. Justa causa ANTERIOR: descrever O QUE foi visto/ouvido/sentido ANTES de entrar
-2. Quem presenciou: qual policial viu e o que exatamente observou
-3. Tipo de ingresso: perseguição contínua, autorização ou flagrante visual/auditivo
-4. Ações dos policiais: quem entrou primeiro, por onde, quem ficou na contenção, o que encontraram
-
-EXEMPLOS CORRETOS:
+- Ação de cada policial: {acoes_policiais}"""
 
-✅ Exemplo 1 - Perseguição contínua:
-"Durante patrulhamento na Rua São Miguel, a equipe visualizou um indivíduo entregando pequenos invólucros a terceiros e recebendo dinheiro. Ao perceber a presença policial, o suspeito correu, adentrando o imóvel nº 120. O Sargento Silva manteve contato visual ininterrupto com o alvo desde a rua até o interior da residência. A guarnição iniciou perseguição imediata, acompanhando-o até a cozinha, onde o autor tentou esconder uma sacola embaixo da pia. O Sargento Silva entrou primeiro pela porta principal que estava aberta. O Cabo Almeida ficou na contenção do portão. No interior da sacola, foram localizadas diversas porções de substância análoga à cocaína."
-
-✅ Exemplo 2 - Flagrante visual/auditivo:
-"Durante incursão pelo Beco das Palmeiras, os militares perceberam forte odor característico de maconha vindo do interior do imóvel nº 88. O Sargento Almeida, ao olhar pela janela que dava para o beco, visualizou um homem embalando invólucros sobre a mesa da sala. Diante do flagrante delito observado antes da entrada, o Sargento Almeida determinou o ingresso imediato. O Sargento Almeida entrou primeiro pela porta lateral. O Soldado Pires permaneceu na contenção externa. Foram arrecadadas diversas porções de maconha, balança de precisão e dinheiro fracionado sobre a mesa."
-
-✅ Exemplo 3 - Autorização do morador:
-"No local, o suspeito franqueou voluntariamente a entrada dos militares após identificação da equipe, autorizando expressamente a vistoria no interior da residência. Na presença do morador, o Cabo Silva localizou uma mochila contendo tabletes de substância análoga à maconha sobre o guarda-roupa do quarto."
-
-❌ ERROS A EVITAR (causam NULIDADE):
-
-• "Entramos por ser local conhecido por tráfico" (sem justa causa anterior)
-• "O suspeito correu pra dentro" (sem ver ilícito antes da entrada)
-• "Havia denúncia de drogas" (denúncia não é justa causa sem constatação direta)
-• "Entramos e encontramos drogas" (justa causa posterior não vale)
-• "Comportamento nervoso" (sem fato concreto anterior)
-
-IMPORTANTE:
-
-- A justa causa (4.2) É O PONTO CENTRAL - deve ser CLARA e ANTERIOR à entrada
-- Sempre explicitar: viu O QUÊ, ouviu O QUÊ, sentiu O QUÊ (odor de quê)
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação
-- Dois espaços entre frases
-- Manter coerência temporal: antes de entrar → ingresso → o que foi encontrado
-
-Gere APENAS o texto da Seção 4 agora (2-3 parágrafos fluidos):"""
-
-        return prompt
+        return answers_block
 
     def generate_section4_text(self, section_data: Dict[str, str], provider: str = "gemini") -> str:
         """
@@ -802,91 +1654,7 @@ Gere APENAS o texto da Seção 4 agora (2-3 parágrafos fluidos):"""
         if section_data.get("4.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section4_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section4_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 4")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 4")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section4_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 4 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section4(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 4 com Gemini: {error_msg}")
-
-    def _generate_section4_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 4 (Entrada em Domicílio) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section4(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 4 com Groq: {error_msg}")
+        return self._generate_sync(4, section_data, provider)
 
     # ========================================================================
     # SEÇÃO 5: FUNDADA SUSPEITA
@@ -907,95 +1675,12 @@ Gere APENAS o texto da Seção 4 agora (2-3 parágrafos fluidos):"""
         if section_data.get("5.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section5_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section5_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 5")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 5")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section5_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 5 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section5(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 5 com Gemini: {error_msg}")
-
-    def _generate_section5_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 5 (Fundada Suspeita) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section5(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 5 com Groq: {error_msg}")
+        return self._generate_sync(5, section_data, provider)
 
     def _build_prompt_section5(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 5 (Fundada Suspeita).
+        Constrói o bloco de respostas da Seção 5 (Fundada Suspeita).
+        Parte estática do prompt: prompt_templates.SECTION5_SYSTEM.
 
         Fonte:
         - materiais-claudio/_01_fundada_suspeita.txt
@@ -1011,96 +1696,14 @@ Gere APENAS o texto da Seção 4 agora (2-3 parágrafos fluidos):"""
         quem_viu = section_data.get("5.3", "Não informado")
         caracteristicas = section_data.get("5.4", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 5 (Fundada Suspeita) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. Descreva FATOS CONCRETOS observados (não impressões subjetivas)
-6. Gere texto em 2-3 parágrafos fluidos
-7. NÃO use juridiquês, gerúndio ou termos vagos como "em atitude suspeita"
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos, códigos ou jurisprudência (Ex: Art. 33, Lei 11.343/06, CPP, STF, HC). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-CONTEXTO TÉCNICO (para sua compreensão, NÃO incluir no texto gerado):
-
-A busca pessoal exige INDÍCIOS CONCRETOS E OBJETIVOS, não sendo suficiente:
-- Nervosismo isolado (sem contexto)
-- Mera presença em local de criminalidade
-- "Atitude suspeita" (termo vago e inadmissível)
-
-BASES LEGÍTIMAS PARA BUSCA PESSOAL (pelo menos uma):
-
-1. CONDUTA VISÍVEL E ANORMAL:
-   - Correr ou fugir ao avistar a viatura
-   - Desfazer-se de objetos (jogar sacola, arremessar algo)
-   - Vigiar terceiros de forma sistemática
-   - Simular transações comerciais (entrega rápida + dinheiro)
-
-2. INFORMAÇÃO PRÉVIA CONFIÁVEL:
-   - Denúncia anônima corroborada por observação direta
-   - BOs anteriores do local (registros de tráfico)
-   - Relatórios de inteligência
-   - Registros de monitoramento
-
-3. CONTEXTO SENSÍVEL RECONHECIDO:
-   - Ponto de tráfico comprovado (por registros ou investigações)
-   - Área com ocorrências recentes documentadas
-
-REQUISITOS DA ABORDAGEM:
-
-1. Sequência lógica dos fatos observados (o que vimos → comportamento anormal → abordagem)
-2. Individualização das percepções ("O Sgt. Silva viu X", "O Cb. Almeida observou Y")
-3. Conexão entre comportamento e suspeita de crime específico
-
-DADOS FORNECIDOS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO:
 
 - O que a equipe viu ao chegar: {o_que_viu}
 - Quem viu, de onde viu e o que exatamente observou: {quem_viu}
-- Características e ações dos abordados: {caracteristicas}
+- Características e ações dos abordados: {caracteristicas}"""
 
-ESTRUTURA NARRATIVA (seguir esta ordem):
-
-1. Contexto de chegada: o que a equipe visualizou ao chegar no local
-2. Observação específica: qual policial viu e o que exatamente observou
-3. Comportamento suspeito: reação dos abordados ao perceberem a viatura
-4. Identificação: características físicas, roupas e identificação completa (nome + vulgo)
-
-EXEMPLOS CORRETOS:
-
-✅ Exemplo 1 - Flagrante visual + reação suspeita:
-"Durante patrulhamento pela Rua das Palmeiras, região com registros anteriores de tráfico de drogas, a equipe visualizou um homem de camisa vermelha e bermuda jeans retirando pequenos invólucros de um buraco no muro e entregando-os a motociclistas que paravam rapidamente. O Sargento João, de dentro da viatura estacionada a aproximadamente 20 metros do local, observou o suspeito realizando pelo menos três entregas e recebendo dinheiro em troca. Ao perceber a aproximação da viatura, o indivíduo demonstrou nervosismo acentuado, guardou parte do material no bolso e tentou fugir em direção ao beco lateral. Foi realizada abordagem ao suspeito, posteriormente identificado como JOÃO DA SILVA SANTOS, vulgo 'Vermelho', CPF 123.456.789-00, residente na Rua das Palmeiras, nº 45."
-
-✅ Exemplo 2 - Local conhecido + comportamento anormal:
-"No local indicado pela denúncia, conhecido por registros de tráfico conforme BOs 2024-123 e 2024-456, a equipe observou um indivíduo de camiseta azul realizando contato rápido com motoristas que paravam por cerca de 10 segundos. O Cabo Almeida, posicionado na esquina oposta, viu o suspeito entregar pequenos pacotes e receber valores em espécie. Ao avistar a viatura, o indivíduo jogou uma pochete no chão e correu em direção ao Bar Central. Após cerco tático, foi abordado o indivíduo CARLOS SANTOS OLIVEIRA, alcunha 'Marreco', altura aproximada de 1,80m, trajando camiseta azul e bermuda preta."
-
-✅ Exemplo 3 - Vigilância + transação ilícita:
-"Na Rua Central, altura do número 200, durante operação de combate ao tráfico, o Soldado Pires visualizou um homem de boné preto realizando vigilância constante, olhando repetidamente para os dois lados da rua. Momentos depois, dois indivíduos se aproximaram, receberam algo das mãos do homem de boné e entregaram dinheiro. A troca durou menos de cinco segundos. Ao perceber a presença policial, o suspeito tentou esconder objetos na cintura e se desfez de uma sacola plástica. Foi abordado MARCOS VIEIRA DA COSTA, vulgo 'Marquinhos', morador da Rua Central, nº 220, trajando boné preto, camiseta branca e calça jeans."
-
-❌ ERROS A EVITAR (causam NULIDADE):
-
-• "Em atitude suspeita" (termo vago demais - INADMISSÍVEL)
-• "Demonstrou nervosismo" (sem descrever COMO demonstrou)
-• "Área conhecida pelo tráfico" (sem base objetiva - BOs, registros)
-• "Foi abordado por fundadas suspeitas" (conclusão jurídica, não é fato)
-• "Indivíduo suspeito" (sem descrever O QUE gerou suspeita)
-• Não individualizar as características físicas de cada abordado
-
-IMPORTANTE:
-
-- A observação ANTES da abordagem é crucial (o que vimos que motivou a abordagem)
-- Sempre descrever COMPORTAMENTOS CONCRETOS (correu, jogou, vigiava, entregava)
-- Cada abordado deve ter descrição individualizada (roupa + porte + gestos + nome completo + vulgo)
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação
-- Dois espaços entre frases
-- Manter coerência temporal: observação → comportamento → abordagem → identificação
-
-GERE AGORA O TEXTO DA SEÇÃO 5, seguindo RIGOROSAMENTE as regras acima:"""
-
-        return prompt
+        return answers_block
 
     # ========================================================================
     # SEÇÃO 6: REAÇÃO E USO DA FORÇA
@@ -1121,95 +1724,12 @@ GERE AGORA O TEXTO DA SEÇÃO 5, seguindo RIGOROSAMENTE as regras acima:"""
         if section_data.get("6.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section6_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section6_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 6")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 6")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section6_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 6 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section6(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 6 com Gemini: {error_msg}")
-
-    def _generate_section6_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 6 (Reação e Uso da Força) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section6(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 6 com Groq: {error_msg}")
+        return self._generate_sync(6, section_data, provider)
 
     def _build_prompt_section6(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 6 (Reação e Uso da Força).
+        Constrói o bloco de respostas da Seção 6 (Reação e Uso da Força).
+        Parte estática do prompt: prompt_templates.SECTION6_SYSTEM.
 
         Fonte:
         - materiais-claudio/_02_uso_da_forca_e_algemas.txt
@@ -1227,58 +1747,8 @@ GERE AGORA O TEXTO DA SEÇÃO 5, seguindo RIGOROSAMENTE as regras acima:"""
         justificativa_algemas = section_data.get("6.4", "Não informado")
         ferimentos = section_data.get("6.5", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 6 (Reação e Uso da Força) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. Descreva AÇÕES CONCRETAS (não impressões subjetivas)
-6. Gere texto em 4 parágrafos fluidos e objetivos
-7. PROIBIDO usar expressões genéricas como "resistiu ativamente", "uso moderado da força", "ficou agressivo"
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos, códigos, súmulas ou jurisprudência (Ex: Art. 33, Lei 11.343/06, Súmula Vinculante 11, STF, Decreto). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-CONTEXTO TÉCNICO (para sua compreensão, NÃO incluir no texto gerado):
-
-O uso de algemas só é lícito em caso de resistência, fundado receio de fuga ou perigo à integridade física própria ou alheia. A força e as algemas são REAÇÕES, nunca decisões prévias. Deve-se narrar comportamentos CONCRETOS que geraram a necessidade, sem clichês ou termos vagos.
-
-ESTRUTURA NARRATIVA OBRIGATÓRIA (4 PARÁGRAFOS):
-
-PARÁGRAFO 1 - RESISTÊNCIA:
-- O que o autor fez? (empurrou, correu, desferiu soco, etc.)
-- Contra quem? (nome e graduação do policial)
-- Em que contexto? (durante abordagem, ao ser revistado, etc.)
-
-PARÁGRAFO 2 - TÉCNICA E RESULTADO:
-- Quem aplicou? (graduação + nome)
-- Qual técnica? (chave de braço, cotovelada, taser, etc.)
-- Qual resultado? (imobilizou, neutralizou, conteve)
-
-PARÁGRAFO 3 - ALGEMAS:
-- Por que foi necessário? (risco de fuga, agressividade, etc.)
-- Quem algemou?
-
-PARÁGRAFO 4 - INTEGRIDADE FÍSICA:
-- Houve lesão? (sim/não)
-- Se sim: qual lesão, como ocorreu, onde foi atendido, nº da ficha
-- Se não: mencionar que a guarnição verificou integridade
-
-ERROS A EVITAR (NULIDADE CERTA):
-❌ "Foi necessário uso moderado da força" (genérico)
-❌ "O autor resistiu" (sem descrever como)
-❌ "Foi algemado por segurança" (sem fato concreto)
-❌ "Houve resistência ativa" (linguagem policial vaga)
-❌ "O autor ficou agressivo" (subjetivo)
-❌ "Nada a relatar" sobre integridade (omissão legal)
-
-REGRA DE OURO: "Narrar AÇÕES, não IMPRESSÕES"
-
----
-
-INFORMAÇÕES FORNECIDAS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""INFORMAÇÕES FORNECIDAS PELO USUÁRIO:
 
 Descrição da resistência (o que o autor FEZ):
 {descricao_resistencia}
@@ -1290,24 +1760,9 @@ Justificativa das algemas (fato objetivo):
 {justificativa_algemas}
 
 Ferimentos e integridade física:
-{ferimentos}
-
----
+{ferimentos}"""
 
-IMPORTANTE:
-
-- A força e as algemas são REAÇÕES a comportamentos concretos (nunca decisões arbitrárias)
-- Sempre descrever AÇÕES ESPECÍFICAS (correu, empurrou, desferiu soco, tentou fugir)
-- Cada policial mencionado deve ter graduação + nome
-- A integridade física é OBRIGATÓRIA (com ou sem ferimentos, deve-se relatar)
-- Se houver ferimentos, SEMPRE mencionar: lesão + causa + hospital/UPA + nº da ficha
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação
-- Dois espaços entre frases
-- Manter coerência temporal: resistência → contenção → algemas → verificação de integridade
-
-GERE AGORA O TEXTO DA SEÇÃO 6, seguindo RIGOROSAMENTE as regras acima:"""
-
-        return prompt
+        return answers_block
 
     # ========================================================================
     # SEÇÃO 7: APREENSÕES E CADEIA DE CUSTÓDIA
@@ -1328,95 +1783,12 @@ GERE AGORA O TEXTO DA SEÇÃO 6, seguindo RIGOROSAMENTE as regras acima:"""
         if section_data.get("7.1", "").strip().upper() in ["NÃO", "NAO", "N", "NENHUM", "NEGATIVO"]:
             return ""
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section7_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section7_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 7")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 7")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section7_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 7 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section7(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 7 com Gemini: {error_msg}")
-
-    def _generate_section7_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 7 (Apreensões e Cadeia de Custódia) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section7(section_data)
-
-            # Se prompt vazio (seção pulada), retornar vazio
-            if not prompt:
-                return ""
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 7 com Groq: {error_msg}")
+        return self._generate_sync(7, section_data, provider)
 
     def _build_prompt_section7(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 7 (Apreensões e Cadeia de Custódia).
+        Constrói o bloco de respostas da Seção 7 (Apreensões e Cadeia de Custódia).
+        Parte estática do prompt: prompt_templates.SECTION7_SYSTEM.
 
         Fonte:
         - materiais-claudio/_pacotao_2.txt (Seção E)
@@ -1433,79 +1805,8 @@ GERE AGORA O TEXTO DA SEÇÃO 6, seguindo RIGOROSAMENTE as regras acima:"""
         objetos = section_data.get("7.3", "Não informado")
         acondicionamento = section_data.get("7.4", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 7 (Apreensões e Cadeia de Custódia) do BO de tráfico de drogas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. A CADEIA DE CUSTÓDIA é CRÍTICA: quem encontrou + onde + como acondicionou + para onde levou
-6. Gere texto em 2-3 parágrafos fluidos
-7. NÃO use juridiquês ou termos genéricos como "foi apreendido material ilícito"
-8. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos, códigos ou jurisprudência (Ex: Art. 33, Lei 11.343/06, CPP). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-CONTEXTO TÉCNICO (para sua compreensão, NÃO incluir no texto gerado):
-
-A cadeia de custódia assegura a integridade de drogas apreendidas desde a apreensão até o depósito, documentando QUEM a detinha, QUANDO, ONDE e COMO.
-
-PRINCÍPIOS DA CADEIA DE CUSTÓDIA (obrigatórios):
-1. Identificar QUEM encontrou o material (graduação + nome)
-2. Descrever ONDE encontrou (local preciso - não genérico)
-3. Informar COMO acondicionou (invólucro, saco plástico, número)
-4. Registrar PARA ONDE levou (CEFLAN, delegacia, central)
-
-ESTRUTURA NARRATIVA (2-3 PARÁGRAFOS):
-
-PARÁGRAFO 1 - SUBSTÂNCIAS ENTORPECENTES:
-- Tipo de droga (crack, cocaína, maconha)
-- Quantidade exata (pedras, pinos, gramas, tabletes)
-- Embalagem (invólucros plásticos, lata, sacola, mochila)
-- Local PRECISO onde foi encontrado (caixa azul em cima da geladeira, buraco no muro)
-- QUEM encontrou (graduação + nome completo do policial)
-
-Exemplo CORRETO:
-"O Soldado Breno encontrou 14 pedras de substância análoga ao crack dentro de uma lata azul sobre o banco de concreto próximo ao portão da casa 12. A Soldado Pires localizou 23 pinos de cocaína em um buraco no muro da lateral do imóvel."
-
-PARÁGRAFO 2 - OBJETOS LIGADOS AO TRÁFICO (se houver):
-- Dinheiro (valores fracionados típicos de venda - R$ 10, R$ 20)
-- Celulares (quantidade e marca)
-- Balança de precisão
-- Armas, cadernos de contabilidade, embalagens vazias
-
-Exemplo CORRETO:
-"Foram apreendidos R$ 450,00 em notas de R$ 10 e R$ 20, típicas de comercialização, 2 celulares Samsung, 1 balança de precisão e uma caderneta com anotações de contabilidade do tráfico."
-
-Se a resposta indicar "Nenhum objeto" ou similar, usar:
-"Não foram apreendidos objetos ligados ao tráfico além das substâncias entorpecentes."
-
-PARÁGRAFO 3 - ACONDICIONAMENTO E GUARDA:
-- Como foi lacrado (invólucro 01, 02, saco plástico, etc.)
-- Quem ficou responsável (graduação + nome)
-- Destino do material (CEFLAN, delegacia civil, central)
-- Fotografias realizadas (mencionar se foram feitas)
-
-Exemplo CORRETO:
-"O Soldado Faria lacrou as substâncias no invólucro 01 e os objetos no invólucro 02, fotografou todos os itens no local e ficou responsável pelo material até a entrega na CEFLAN 2."
-
----
-
-ERROS A EVITAR (NULIDADE CERTA):
-
-❌ "Apreensão feita conforme protocolo" (genérico demais)
-❌ "Várias drogas foram apreendidas" (sem quantificar exatamente)
-❌ "Material entregue" (sem dizer QUEM entregou e PARA ONDE)
-❌ "Drogas localizadas" (sem dizer ONDE exatamente e por QUEM)
-❌ "Material acondicionado adequadamente" (sem descrever COMO)
-❌ "Encaminhado à delegacia" (sem identificar quem ficou responsável)
-
-REGRA DE OURO: Quantidade exata + Local preciso + Nome do policial + Destino
-
----
-
-DADOS FORNECIDOS PELO USUÁRIO:
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO:
 
 Substâncias apreendidas (tipo, quantidade, embalagem, local, quem encontrou):
 {substancias}
@@ -1514,22 +1815,9 @@ Objetos ligados ao tráfico (dinheiro, celulares, balança, etc.):
 {objetos}
 
 Acondicionamento e guarda (como lacrou, responsável, destino):
-{acondicionamento}
-
----
-
-IMPORTANTE:
+{acondicionamento}"""
 
-- A cadeia de custódia é A PROVA MAIS IMPORTANTE em processo de tráfico
-- Sem individualizar QUEM encontrou, o processo pode ser ANULADO
-- Se objetos = "Nenhum" ou similar, mencionar brevemente e seguir para acondicionamento
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação
-- Dois espaços entre frases
-- Manter coerência: substâncias → objetos (se houver) → acondicionamento
-
-GERE AGORA O TEXTO DA SEÇÃO 7, seguindo RIGOROSAMENTE as regras acima:"""
-
-        return prompt
+        return answers_block
 
     # ========================================================================
     # SEÇÃO 8: Condução e Pós-Ocorrência (ÚLTIMA SEÇÃO - MARCA BO COMPLETO)
@@ -1548,87 +1836,12 @@ GERE AGORA O TEXTO DA SEÇÃO 7, seguindo RIGOROSAMENTE as regras acima:"""
         """
         # Seção 8 NÃO tem skip logic - todas as 11 perguntas são obrigatórias
 
-        # Gerar com provider selecionado
-        if provider == "gemini":
-            return self._generate_section8_with_gemini(section_data)
-        elif provider == "groq":
-            return self._generate_section8_with_groq(section_data)
-        elif provider == "claude":
-            raise NotImplementedError("Claude ainda não implementado para Seção 8")
-        elif provider == "openai":
-            raise NotImplementedError("OpenAI ainda não implementado para Seção 8")
-        else:
-            raise ValueError(f"Provider {provider} não suportado")
-
-    def _generate_section8_with_gemini(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 8 usando Gemini.
-        """
-        if not self.gemini_model:
-            raise ValueError("Gemini API key não configurada. Configure GEMINI_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section8(section_data)
-
-            # Gerar texto
-            response = self.gemini_model.generate_content(prompt)
-
-            # Extrair texto
-            generated_text = response.text.strip()
-
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de quota excedida
-            if "429" in error_msg or "quota" in error_msg.lower() or "ResourceExhausted" in error_msg:
-                raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 8 com Gemini: {error_msg}")
-
-    def _generate_section8_with_groq(self, section_data: Dict[str, str]) -> str:
-        """
-        Gera texto da Seção 8 (Condução e Pós-Ocorrência) usando Groq.
-        """
-        if not self.groq_client:
-            raise ValueError("Groq API key não configurada. Configure GROQ_API_KEY no .env")
-
-        try:
-            prompt = self._build_prompt_section8(section_data)
-
-            # Gerar texto
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em redigir Boletins de Ocorrência policiais no padrão da PMMG."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            return generated_text
-
-        except Exception as e:
-            error_msg = str(e)
-
-            # Tratar erro de rate limit
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                raise Exception("Limite de requisições do Groq atingido. Aguarde alguns segundos.")
-
-            raise Exception(f"Erro ao gerar texto da Seção 8 com Groq: {error_msg}")
+        return self._generate_sync(8, section_data, provider)
 
     def _build_prompt_section8(self, section_data: Dict[str, str]) -> str:
         """
-        Constrói prompt para Seção 8 (Condução e Pós-Ocorrência) - ÚLTIMA SEÇÃO.
+        Constrói o bloco de respostas da Seção 8 (Condução e Pós-Ocorrência) - ÚLTIMA SEÇÃO.
+        Parte estática do prompt: prompt_templates.SECTION8_SYSTEM.
 
         Fonte:
         - materiais-claudio/_pacotao_2.txt (Seção F)
@@ -1651,51 +1864,8 @@ GERE AGORA O TEXTO DA SEÇÃO 7, seguindo RIGOROSAMENTE as regras acima:"""
         garantias = section_data.get("8.10", "Não informado")
         destino = section_data.get("8.11", "Não informado")
 
-        # Construir prompt baseado no material do Claudio
-        prompt = f"""Você é um redator especializado em Boletins de Ocorrência policiais da Polícia Militar de Minas Gerais. Sua tarefa é gerar o trecho da SEÇÃO 8 (Condução e Pós-Ocorrência) do BO de tráfico de drogas.
-
-**IMPORTANTE:** Esta é a ÚLTIMA seção do BO. O texto deve consolidar a narrativa final da ocorrência com base nas 11 perguntas respondidas.
-
-REGRAS OBRIGATÓRIAS (Claudio Moreira - autor de "Polícia na Prática"):
-
-1. NUNCA invente informações não fornecidas pelo usuário
-2. Use APENAS os dados das respostas fornecidas abaixo
-3. Escreva em terceira pessoa, tempo passado
-4. Use linguagem técnica, objetiva e norma culta
-5. Gere texto em 3-4 parágrafos fluidos
-6. NÃO use juridiquês ou termos genéricos
-7. ⚠️ NUNCA CITAR LEIS: Não mencione artigos, leis, incisos, códigos ou jurisprudência (Ex: Art. 33, Lei 11.343/06, CPP, Lei 13.869/19). O policial apenas DESCREVE OS FATOS, a tipificação legal é feita pelo delegado.
-
-CONTEXTO TÉCNICO (para sua compreensão, NÃO incluir no texto gerado):
-
-A prisão em flagrante deve ser documentada com voz de prisão, leitura de direitos constitucionais, verificação de integridade física e condução adequada.
-
-ESTRUTURA NARRATIVA (3-4 PARÁGRAFOS):
-
-PARÁGRAFO 1 - VOZ DE PRISÃO E TRANSPORTE:
-- QUEM deu voz de prisão (graduação + nome)
-- Por QUAL CRIME (descrever o fato, NÃO citar artigo de lei)
-- Como foi transportado (viatura, prefixo, posição)
-
-PARÁGRAFO 2 - DECLARAÇÕES E PERFIL DO PRESO:
-- Declaração do preso (literal) OU "permaneceu em silêncio"
-- Função no tráfico (vapor, gerente, olheiro) se identificada
-- Passagens anteriores (REDS) se houver
-- Sinais de dedicação ao crime (ostentação, tatuagens) se houver
-
-PARÁGRAFO 3 - ORGANIZAÇÃO CRIMINOSA E PROVAS:
-- Papel na facção (ocasional ou contínua) se identificado
-- Tentativas de destruir/ocultar provas ou intimidar se houver
-- Envolvimento de menor se houver
-
-PARÁGRAFO 4 - GARANTIAS E DESTINO:
-- QUEM informou garantias constitucionais (graduação + nome)
-- Destino dos PRESOS (delegacia específica)
-- Destino dos MATERIAIS (CEFLAN)
-
----
-
-DADOS FORNECIDOS PELO USUÁRIO (11 PERGUNTAS):
+        # Bloco de respostas (regras e exemplos: prompt_templates.py)
+        answers_block = f"""DADOS FORNECIDOS PELO USUÁRIO (11 PERGUNTAS):
 
 1. Voz de prisão (quem deu e por qual crime):
 {voz_prisao}
@@ -1728,18 +1898,6 @@ DADOS FORNECIDOS PELO USUÁRIO (11 PERGUNTAS):
 {garantias}
 
 11. Destino (presos e materiais):
-{destino}
-
----
-
-IMPORTANTE:
-
-- Esta é a ÚLTIMA seção - finalize a narrativa de forma completa
-- Se alguma resposta indicar "Não", "Sem", "Nenhum", mencione brevemente quando relevante
-- Se alguma resposta estiver como "Não informado", OMITA aquela informação
-- Dois espaços entre frases
-- Integre naturalmente as informações das 11 perguntas no texto
-
-GERE AGORA O TEXTO DA SEÇÃO 8, seguindo RIGOROSAMENTE as regras acima:"""
+{destino}"""
 
-        return prompt
+        return answers_block
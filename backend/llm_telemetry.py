@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetria das chamadas aos providers de LLM
+
+Cada chamada ao Gemini/Groq (sucesso ou erro) é registrada em memória, por
+provider e por seção:
+- latência em histograma de buckets fixos (LLM_LATENCY_BUCKETS_MS), com
+  p50/p95/p99 estimados a partir dos buckets
+- tamanho do prompt em caracteres e tokens
+- tokens da resposta
+- classe do erro (quota, rate_limit, timeout ou o tipo da exceção)
+
+Tokens vêm do usage informado pelo provider; quando ele não informa
+(streaming do Groq, modo replay), usa-se a estimativa de ~4 caracteres por
+token (marcado em tokens_estimated).
+
+No modo corrida (LLM_RACE_MODE) cada disputa também registra, por seção,
+quem venceu, por quanto (ms entre a resposta do vencedor e a do perdedor)
+e as respostas reprovadas na checagem de sanidade.
+
+A chamada do BO inteiro (várias seções num JSON) aparece como seção 0 e
+conta em "whole_bo" quantas seções foram juntas e quantas caíram para a
+geração individual, por motivo.
+
+Seções atendidas pelo texto de modelo (nenhum provider disponível, ver
+fallback_renderer.py) são contadas em "template_fallbacks".
+
+Os contadores são do processo (zeram no restart) e ficam em /api/llm/metrics.
+Cache hits não chegam ao provider e por isso não aparecem aqui.
+"""
+import bisect
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from prompt_templates import estimate_tokens
+except ImportError:
+    from backend.prompt_templates import estimate_tokens
+
+
+# Limites superiores dos buckets de latência (ms); o último bucket é "acima disso"
+LLM_LATENCY_BUCKETS_MS = [
+    int(b) for b in os.getenv("LLM_LATENCY_BUCKETS_MS", "250,500,1000,2000,4000,8000,16000,32000").split(",")
+    if b.strip()
+]
+
+
+class LatencyHistogram:
+    """Histograma de latências com buckets fixos."""
+
+    def __init__(self, bounds: List[int]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimativa por interpolação linear dentro do bucket (None sem amostras)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return round(min(estimate, self.max_ms), 1)
+            seen += bucket_count
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max_ms, 1) if self.count else None,
+            "buckets": self.counts[:]
+        }
+
+
+class CallStats:
+    """Agregado de um provider, de uma seção ou de um par (provider, seção)."""
+
+    def __init__(self, bounds: List[int]):
+        self.latency = LatencyHistogram(bounds)
+        self.calls = 0
+        self.errors = 0
+        self.error_classes: Dict[str, int] = {}
+        self.prompt_chars = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_estimated = 0  # chamadas sem usage do provider
+
+    def add(
+        self,
+        latency_ms: float,
+        prompt_chars: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool,
+        error_class: Optional[str]
+    ) -> None:
+        self.calls += 1
+        self.latency.observe(latency_ms)
+        self.prompt_chars += prompt_chars
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        if estimated:
+            self.tokens_estimated += 1
+        if error_class:
+            self.errors += 1
+            self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        successes = self.calls - self.errors
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 3) if self.calls else 0.0,
+            "error_classes": dict(self.error_classes),
+            "latency_ms": self.latency.snapshot(),
+            "avg_prompt_chars": self.prompt_chars // self.calls if self.calls else 0,
+            "avg_prompt_tokens": self.prompt_tokens // self.calls if self.calls else 0,
+            "avg_completion_tokens": self.completion_tokens // successes if successes else 0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_estimated": self.tokens_estimated
+        }
+
+
+class RaceStats:
+    """Disputas do modo corrida de uma seção."""
+
+    def __init__(self, bounds: List[int]):
+        self.races = 0
+        self.wins: Dict[str, int] = {}
+        self.no_winner = 0
+        self.rejected: Dict[str, Dict[str, int]] = {}  # provider -> motivo -> n
+        self.loser_failed = 0
+        self.margin = LatencyHistogram(bounds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "races": self.races,
+            "wins": dict(self.wins),
+            "no_winner": self.no_winner,
+            "rejected": {provider: dict(reasons) for provider, reasons in self.rejected.items()},
+            "loser_failed": self.loser_failed,
+            "margin_ms": self.margin.snapshot()
+        }
+
+
+class LLMTelemetry:
+    """Histogramas e contadores por provider, por seção e por (provider, seção)."""
+
+    def __init__(self, buckets_ms: Optional[List[int]] = None):
+        self.buckets_ms = sorted(buckets_ms or LLM_LATENCY_BUCKETS_MS)
+        self._stats: Dict[Tuple[Optional[str], Optional[int]], CallStats] = {}
+        self._races: Dict[int, RaceStats] = {}
+        self._whole_bo = {"calls": 0, "sections": 0, "fallback": {}}
+        self._template_fallbacks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        provider: str,
+        section: int,
+        latency_ms: float,
+        prompt_text: str,
+        completion_text: str = "",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        error_class: Optional[str] = None
+    ) -> None:
+        """
+        Registra uma chamada. Tokens None (provider não informou) são estimados
+        a partir do texto; em erro, completion_tokens fica 0.
+        """
+        estimated = prompt_tokens is None or (completion_tokens is None and not error_class)
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt_text)
+        if completion_tokens is None:
+            completion_tokens = 0 if error_class else estimate_tokens(completion_text)
+
+        values = (latency_ms, len(prompt_text), prompt_tokens, completion_tokens, estimated, error_class)
+        with self._lock:
+            for key in ((provider, None), (None, section), (provider, section)):
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = CallStats(self.buckets_ms)
+                stats.add(*values)
+
+    def _race_stats(self, section: int) -> RaceStats:
+        """Chamar com _lock adquirido."""
+        stats = self._races.get(section)
+        if stats is None:
+            stats = self._races[section] = RaceStats(self.buckets_ms)
+        return stats
+
+    def record_race(self, section: int, winner: Optional[str]) -> None:
+        """Uma disputa terminou para o chamador (winner None: nenhuma resposta aprovada)."""
+        with self._lock:
+            stats = self._race_stats(section)
+            stats.races += 1
+            if winner:
+                stats.wins[winner] = stats.wins.get(winner, 0) + 1
+            else:
+                stats.no_winner += 1
+
+    def record_race_rejection(self, section: int, provider: str, reason: str) -> None:
+        """Resposta reprovada na checagem de sanidade (vazia, recusa, tamanho)."""
+        with self._lock:
+            reasons = self._race_stats(section).rejected.setdefault(provider, {})
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+    def record_race_margin(self, section: int, margin_ms: Optional[float]) -> None:
+        """Resposta do perdedor chegou margin_ms depois (None: perdedor falhou)."""
+        with self._lock:
+            stats = self._race_stats(section)
+            if margin_ms is None:
+                stats.loser_failed += 1
+            else:
+                stats.margin.observe(margin_ms)
+
+    def record_whole_bo(self, sections: int, fallback: Dict[int, str]) -> None:
+        """Chamada do BO inteiro com `sections` seções; fallback: {seção: motivo}."""
+        with self._lock:
+            self._whole_bo["calls"] += 1
+            self._whole_bo["sections"] += sections
+            reasons = self._whole_bo["fallback"]
+            for reason in fallback.values():
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def record_template_fallback(self, section: int) -> None:
+        """Seção entregue com o texto de modelo (nenhum provider atendeu)."""
+        with self._lock:
+            self._template_fallbacks[section] = self._template_fallbacks.get(section, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._races.clear()
+            self._template_fallbacks.clear()
+            self._whole_bo = {"calls": 0, "sections": 0, "fallback": {}}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        providers: agregado por provider
+        sections: agregado por seção, com o detalhe por provider em "providers"
+        races: disputas do modo corrida por seção
+        whole_bo: chamadas do BO inteiro, seções juntas e fallbacks por motivo
+        template_fallbacks: seções entregues com o texto de modelo, por seção
+        """
+        with self._lock:
+            providers = {
+                provider: stats.snapshot()
+                for (provider, section), stats in self._stats.items()
+                if section is None
+            }
+            sections: Dict[int, Dict[str, Any]] = {}
+            for (provider, section), stats in self._stats.items():
+                if provider is None:
+                    sections.setdefault(section, {"providers": {}}).update(stats.snapshot())
+            for (provider, section), stats in self._stats.items():
+                if provider is not None and section is not None:
+                    sections[section]["providers"][provider] = stats.snapshot()
+            races = {section: stats.snapshot() for section, stats in sorted(self._races.items())}
+            whole_bo = {**self._whole_bo, "fallback": dict(self._whole_bo["fallback"])}
+            template_fallbacks = dict(sorted(self._template_fallbacks.items()))
+
+        return {
+            "buckets_ms": self.buckets_ms,
+            "providers": dict(sorted(providers.items())),
+            "sections": dict(sorted(sections.items())),
+            "races": races,
+            "whole_bo": whole_bo,
+            "template_fallbacks": template_fallbacks
+        }
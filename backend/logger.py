@@ -4,10 +4,12 @@ Suporta SQLite (local) e PostgreSQL (produção)
 """
 
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, Column, String, DateTime, JSON, Integer, Text
+from sqlalchemy import create_engine, BigInteger, Column, String, DateTime, JSON, Integer, Float, Text, Index, func, inspect, or_, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
@@ -71,10 +73,14 @@ class BOSession(Base):
 class BOEvent(Base):
     """Evento individual dentro de uma sessão de BO"""
     __tablename__ = "bo_events"
+    # Leitura dos eventos de um BO em ordem (reconstrução da sessão, logs)
+    __table_args__ = (Index("ix_bo_events_bo_id_timestamp", "bo_id", "timestamp"),)
     
     event_id = Column(String(50), primary_key=True)
     bo_id = Column(String(50), nullable=False)
     timestamp = Column(DateTime, default=lambda: datetime.now(BRASILIA_TZ))  # ✅ Lambda callable
+    # Desempate entre eventos com o mesmo timestamp (ex: pendentes gravados no mesmo loop)
+    seq = Column(BigInteger, nullable=True, default=lambda: next_event_seq())
     event_type = Column(String(50), nullable=False)
     data = Column(JSON, nullable=True)
     
@@ -118,8 +124,62 @@ class Feedback(Base):
         }
 
 
-# Criar tabelas
-Base.metadata.create_all(engine)
+class GenerationCacheEntry(Base):
+    """Texto gerado pelo LLM, indexado pelo hash das respostas (cache persistente)"""
+    __tablename__ = "generation_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 (seção + respostas + provider + versão do prompt)
+    section = Column(Integer, nullable=False)
+    provider = Column(String(20), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    generated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(BRASILIA_TZ))
+    hit_count = Column(Integer, default=0)
+
+
+class ProviderQuota(Base):
+    """Consumo de quota por provider (sobrevive a restarts do backend)"""
+    __tablename__ = "provider_quota"
+
+    provider = Column(String(20), primary_key=True)
+    day = Column(String(10), nullable=False)          # Dia UTC (YYYY-MM-DD) do contador diário
+    daily_used = Column(Integer, default=0)
+    minute_tokens = Column(Float, nullable=False)     # Tokens restantes no bucket por minuto
+    minute_updated_at = Column(Float, nullable=False)  # Epoch do último refill do bucket
+
+
+# Criação das tabelas: no lifespan do FastAPI (init_db) e, fora dele (scripts,
+# testes), na primeira sessão aberta por get_db - nunca no import do módulo
+_db_initialized = False
+_db_init_lock = threading.Lock()
+
+_event_seq_lock = threading.Lock()
+_last_event_seq = 0
+
+
+def next_event_seq() -> int:
+    """Ordem de gravação dos eventos: ns do relógio, estritamente crescente no processo."""
+    global _last_event_seq
+    with _event_seq_lock:
+        _last_event_seq = max(_last_event_seq + 1, time.time_ns())
+        return _last_event_seq
+
+
+def init_db() -> None:
+    """Cria as tabelas que ainda não existem (idempotente, roda uma vez por processo)."""
+    global _db_initialized
+    if _db_initialized:
+        return
+    with _db_init_lock:
+        if not _db_initialized:
+            Base.metadata.create_all(engine)
+            # create_all não cria coluna nem índice novo em tabela que já existe
+            if "seq" not in {column["name"] for column in inspect(engine).get_columns("bo_events")}:
+                with engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE bo_events ADD COLUMN seq BIGINT"))
+            for index in BOEvent.__table__.indexes:
+                index.create(engine, checkfirst=True)
+            _db_initialized = True
 
 # ============================================================================
 # FUNÇÕES DE LOGGING
@@ -128,6 +188,7 @@ Base.metadata.create_all(engine)
 @contextmanager
 def get_db():
     """Context manager para sessão do banco"""
+    init_db()
     db = SessionLocal()
     try:
         yield db
@@ -209,6 +270,21 @@ class BOLogger:
         
         return event_id
     
+    @staticmethod
+    def log_events(bo_id: str, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Registra vários eventos ({"event_type", "data"}) num commit só, na
+        ordem da lista. Returns: event_ids
+        """
+        event_ids = []
+        with get_db() as db:
+            for item in events:
+                event_id = f"evt_{uuid.uuid4().hex[:8]}"
+                db.add(BOEvent(event_id=event_id, bo_id=bo_id, event_type=item["event_type"], data=item.get("data") or {}))
+                event_ids.append(event_id)
+            db.commit()
+        return event_ids
+
     @staticmethod
     def update_session_status(bo_id: str, status: str):
         """Atualiza status da sessão"""
@@ -219,7 +295,25 @@ class BOLogger:
                 if status == "completed":
                     session.completed_at = now_brasilia()  # ✅ Usar now_brasilia()
                 db.commit()
-    
+
+    @staticmethod
+    def mark_sessions_abandoned(bo_ids: List[str]) -> int:
+        """
+        Marca como abandoned as sessões ainda active (sessões removidas da
+        memória pelo sweeper). Um UPDATE por lote de 500, um commit no fim.
+        Retorna quantas foram marcadas.
+        """
+        marked = 0
+        with get_db() as db:
+            for start in range(0, len(bo_ids), 500):
+                chunk = bo_ids[start:start + 500]
+                marked += db.query(BOSession).filter(
+                    BOSession.bo_id.in_(chunk),
+                    BOSession.status == "active"
+                ).update({"status": "abandoned"}, synchronize_session=False)
+            db.commit()
+        return marked
+
     @staticmethod
     def add_feedback(
         bo_id: str,
@@ -264,9 +358,47 @@ class BOLogger:
     def get_events(bo_id: str) -> List[Dict]:
         """Retorna todos os eventos de uma sessão"""
         with get_db() as db:
-            events = db.query(BOEvent).filter(BOEvent.bo_id == bo_id).order_by(BOEvent.timestamp).all()
+            events = db.query(BOEvent).filter(BOEvent.bo_id == bo_id).order_by(BOEvent.timestamp, BOEvent.seq).all()
             return [e.to_dict() for e in events]
     
+    @staticmethod
+    def _replay_filter(bo_id: str, event_types: List[str]):
+        return (
+            BOEvent.bo_id == bo_id,
+            or_(BOEvent.event_type.in_(event_types), BOEvent.event_type.like("section%_completed"))
+        )
+
+    @staticmethod
+    def count_replay_events(bo_id: str, event_types: List[str]) -> int:
+        """Quantidade de eventos de get_replay_events (sem ler os dados)"""
+        with get_db() as db:
+            return db.query(func.count(BOEvent.event_id)).filter(
+                *BOLogger._replay_filter(bo_id, event_types)
+            ).scalar() or 0
+
+    @staticmethod
+    def get_replay_events(bo_id: str, event_types: List[str]) -> List[Dict]:
+        """
+        Eventos do BO que reconstroem a sessão (event_types, mais os
+        sectionN_completed), em ordem, pelo índice (bo_id, timestamp); seq
+        desempata eventos gravados no mesmo instante.
+        """
+        with get_db() as db:
+            events = db.query(BOEvent).filter(
+                *BOLogger._replay_filter(bo_id, event_types)
+            ).order_by(BOEvent.timestamp, BOEvent.seq).all()
+            return [e.to_dict() for e in events]
+
+    @staticmethod
+    def get_section_completed_events(limit: Optional[int] = None) -> List[Dict]:
+        """Eventos sectionN_completed de todas as sessões, mais antigos primeiro (regressão de prompt)"""
+        with get_db() as db:
+            query = db.query(BOEvent).filter(BOEvent.event_type.like("section%_completed"))
+            query = query.order_by(BOEvent.timestamp, BOEvent.event_id)
+            if limit:
+                query = query.limit(limit)
+            return [e.to_dict() for e in query.all()]
+    
     @staticmethod
     def get_feedbacks(bo_id: str) -> List[Dict]:
         """Retorna todos os feedbacks de uma sessão"""
@@ -304,6 +436,75 @@ class BOLogger:
                 "sessions": [s.to_dict() for s in sessions]
             }
     
+    @staticmethod
+    def get_cached_generation(cache_key: str) -> Optional[str]:
+        """Retorna texto do cache persistente (ou None) e incrementa hit_count"""
+        with get_db() as db:
+            entry = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == cache_key).first()
+            if not entry:
+                return None
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+            return entry.generated_text
+
+    @staticmethod
+    def save_cached_generation(
+        cache_key: str,
+        section: int,
+        provider: str,
+        prompt_version: str,
+        generated_text: str
+    ):
+        """Grava (ou substitui) um texto no cache persistente"""
+        with get_db() as db:
+            entry = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == cache_key).first()
+            if entry:
+                entry.generated_text = generated_text
+            else:
+                db.add(GenerationCacheEntry(
+                    cache_key=cache_key,
+                    section=section,
+                    provider=provider,
+                    prompt_version=prompt_version,
+                    generated_text=generated_text,
+                    hit_count=0
+                ))
+            db.commit()
+
+    @staticmethod
+    def load_provider_quotas() -> Dict[str, Dict[str, Any]]:
+        """Retorna o estado salvo dos buckets de quota, por provider"""
+        with get_db() as db:
+            return {
+                row.provider: {
+                    "day": row.day,
+                    "daily_used": row.daily_used or 0,
+                    "minute_tokens": row.minute_tokens,
+                    "minute_updated_at": row.minute_updated_at
+                }
+                for row in db.query(ProviderQuota).all()
+            }
+
+    @staticmethod
+    def save_provider_quota(
+        provider: str,
+        day: str,
+        daily_used: int,
+        minute_tokens: float,
+        minute_updated_at: float
+    ):
+        """Grava (ou atualiza) o estado dos buckets de quota de um provider"""
+        with get_db() as db:
+            row = db.query(ProviderQuota).filter(ProviderQuota.provider == provider).first()
+            if not row:
+                row = ProviderQuota(provider=provider)
+                db.add(row)
+            row.day = day
+            row.daily_used = daily_used
+            row.minute_tokens = minute_tokens
+            row.minute_updated_at = minute_updated_at
+            db.commit()
+
     @staticmethod
     def get_stats() -> Dict[str, Any]:
         """Retorna estatísticas gerais"""
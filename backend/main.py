@@ -1,12 +1,21 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import uvicorn
 from pathlib import Path
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import json
+import math
+import operator
+import os
+import uuid
 
 # Imports compatíveis com local E Render
 try:
@@ -19,7 +28,10 @@ try:
     from state_machine_section6 import BOStateMachineSection6
     from state_machine_section7 import BOStateMachineSection7
     from state_machine_section8 import BOStateMachineSection8
-    from llm_service import LLMService
+    from llm_service import LLMService, ProviderUnavailableError, WholeBOResult
+    from quota_scheduler import AdmissionError
+    from generation_jobs import JobManager, JobQueueFullError
+    from http_pool import LLM_WARMUP
     from validator import ResponseValidator
     from validator_section2 import ResponseValidatorSection2
     from validator_section3 import ResponseValidatorSection3
@@ -28,7 +40,15 @@ try:
     from validator_section6 import ResponseValidatorSection6
     from validator_section7 import ResponseValidatorSection7
     from validator_section8 import ResponseValidatorSection8
-    from logger import BOLogger, now_brasilia
+    from output_linter import LintResult
+    from generation_cache import normalize_answers
+    from text_diff import word_diff
+    from single_flight import SingleFlight, answers_hash
+    from fallback_renderer import FALLBACK_PROVIDER
+    from session_store import SessionConflictError, create_session_store, encode_session, read_snapshot, request_scope, write_snapshot
+    from session_state import new_session_state
+    from session_replay import REPLAYED_EVENTS, SessionReplayer
+    from logger import BOLogger, now_brasilia, init_db
 except ImportError:
     # Fallback quando roda de fora da pasta backend/ (Render)
     from backend.state_machine import BOStateMachine
@@ -39,7 +59,10 @@ except ImportError:
     from backend.state_machine_section6 import BOStateMachineSection6
     from backend.state_machine_section7 import BOStateMachineSection7
     from backend.state_machine_section8 import BOStateMachineSection8
-    from backend.llm_service import LLMService
+    from backend.llm_service import LLMService, ProviderUnavailableError, WholeBOResult
+    from backend.quota_scheduler import AdmissionError
+    from backend.generation_jobs import JobManager, JobQueueFullError
+    from backend.http_pool import LLM_WARMUP
     from backend.validator import ResponseValidator
     from backend.validator_section2 import ResponseValidatorSection2
     from backend.validator_section3 import ResponseValidatorSection3
@@ -48,12 +71,48 @@ except ImportError:
     from backend.validator_section6 import ResponseValidatorSection6
     from backend.validator_section7 import ResponseValidatorSection7
     from backend.validator_section8 import ResponseValidatorSection8
-    from backend.logger import BOLogger, now_brasilia
+    from backend.output_linter import LintResult
+    from backend.generation_cache import normalize_answers
+    from backend.text_diff import word_diff
+    from backend.single_flight import SingleFlight, answers_hash
+    from backend.fallback_renderer import FALLBACK_PROVIDER
+    from backend.session_store import SessionConflictError, create_session_store, encode_session, read_snapshot, request_scope, write_snapshot
+    from backend.session_state import new_session_state
+    from backend.session_replay import REPLAYED_EVENTS, SessionReplayer
+    from backend.logger import BOLogger, now_brasilia, init_db
 
 # Versão do sistema
 APP_VERSION = "0.12.12"
 
-app = FastAPI(title="BO Inteligente API", version=APP_VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema do banco criado aqui, não no import (cold start mais curto)
+    await asyncio.to_thread(init_db)
+    # Sessões do snapshot voltam antes da primeira requisição
+    await asyncio.to_thread(restore_sessions)
+    if llm_service.scheduler:
+        await asyncio.to_thread(llm_service.scheduler.load)
+    # Warm-up das conexões com os providers em segundo plano (não atrasa o startup)
+    warmup = asyncio.create_task(llm_service.warm_up()) if LLM_WARMUP else None
+    # Sessões sem uso saem da memória (e viram abandoned no banco)
+    sweeper = asyncio.create_task(sweep_sessions_forever()) if SESSION_SWEEP_INTERVAL > 0 else None
+    snapshotter = asyncio.create_task(snapshot_sessions_forever()) if SESSION_SNAPSHOT_INTERVAL > 0 and snapshots_enabled() else None
+    yield
+    if warmup and not warmup.done():
+        warmup.cancel()
+    for task in (sweeper, snapshotter):
+        if task:
+            task.cancel()
+    # Desligamento: termina os jobs de geração já aceitos (texto vai para o log)
+    await generation_jobs.shutdown()
+    # e grava as sessões (já com os textos desses jobs) para o próximo startup
+    await snapshot_sessions()
+    # Quota consumida por esses jobs ainda na fila de gravação
+    if llm_service.scheduler:
+        await asyncio.to_thread(llm_service.scheduler.flush)
+    await llm_service.aclose()
+
+app = FastAPI(title="BO Inteligente API", version=APP_VERSION, lifespan=lifespan)
 
 # Configurar CORS
 app.add_middleware(
@@ -64,7 +123,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Armazenamento em memória (session_id -> session_data)
+# Sessões em andamento (session_id -> session_data), no backend de SESSION_STORE
+# (memória, SQLite ou Redis - ver session_store.py). Cada sessão é um
+# SessionState (session_state.py): campos em __slots__, acesso como dict
 # Estrutura: {
 #     session_id: {
 #         "bo_id": int,
@@ -84,10 +145,111 @@ app.add_middleware(
 #         "section4_text": str,
 #         "section5_text": str,
 #         "section6_text": str,
-#         "section7_text": str
+#         "section7_text": str,
+#         "sectionN_fallback": bool  # texto de modelo, sem LLM (criado na geração)
 #     }
 # }
-sessions: Dict[str, Dict] = {}
+sessions = create_session_store()
+
+# Intervalo (s) do sweeper que remove da memória as sessões sem uso (SESSION_IDLE_TTL)
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+sweeper_stats = {"runs": 0, "evicted": 0, "marked_abandoned": 0, "errors": 0, "last_run": None}
+
+async def sweep_sessions() -> int:
+    """
+    Uma passada do sweeper: remove as sessões expiradas e marca como
+    abandoned, num UPDATE só, as que já estavam no banco.
+    """
+    evicted = sessions.sweep()
+    sweeper_stats["runs"] += 1
+    sweeper_stats["evicted"] += len(evicted)
+    sweeper_stats["last_run"] = now_brasilia().isoformat()
+
+    bo_ids = [item["bo_id"] for item in evicted if item["logged_to_db"] and item["bo_id"]]
+    if not bo_ids:
+        return 0
+    try:
+        marked = await asyncio.to_thread(BOLogger.mark_sessions_abandoned, bo_ids)
+    except Exception as e:
+        sweeper_stats["errors"] += 1
+        print(f"[DEBUG] Erro ao marcar {len(bo_ids)} sessões como abandoned: {e}")
+        return 0
+    sweeper_stats["marked_abandoned"] += marked
+    return marked
+
+async def sweep_sessions_forever() -> None:
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await sweep_sessions()
+        except Exception as e:
+            sweeper_stats["errors"] += 1
+            print(f"[DEBUG] Erro no sweeper de sessões: {e}")
+
+# Snapshot das sessões em memória num arquivo local (vazio desliga): gravado a
+# cada SESSION_SNAPSHOT_INTERVAL segundos e no desligamento, lido no startup
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "./bo_sessions_snapshot.gz")
+SESSION_SNAPSHOT_INTERVAL = float(os.getenv("SESSION_SNAPSHOT_INTERVAL", "60"))
+
+snapshot_stats = {
+    "path": SESSION_SNAPSHOT_PATH or None, "saves": 0, "last_saved": None, "sessions": 0,
+    "bytes": 0, "restored": 0, "expired": 0, "errors": 0
+}
+_snapshot_changes = None
+
+def snapshots_enabled() -> bool:
+    # Backends sqlite/redis já guardam as sessões fora do processo
+    return bool(SESSION_SNAPSHOT_PATH) and hasattr(sessions, "snapshot_items")
+
+def restore_sessions() -> int:
+    """Carrega o snapshot no startup (antes de aceitar requisições)."""
+    global _snapshot_changes
+    if not snapshots_enabled():
+        return 0
+    try:
+        restored, expired = sessions.restore(read_snapshot(SESSION_SNAPSHOT_PATH))
+    except Exception as e:
+        snapshot_stats["errors"] += 1
+        print(f"[DEBUG] Erro ao carregar snapshot de sessões: {e}")
+        return 0
+    snapshot_stats["restored"] += restored
+    snapshot_stats["expired"] += expired
+    _snapshot_changes = sessions.changes
+    if restored or expired:
+        print(f"[DEBUG] Snapshot: {restored} sessões restauradas, {expired} expiradas")
+    return restored
+
+async def snapshot_sessions() -> bool:
+    """
+    Grava o snapshot se alguma sessão mudou desde o último. As sessões são
+    serializadas no event loop, em lotes (nenhuma requisição as altera no
+    meio); gzip e disco ficam numa thread.
+    """
+    global _snapshot_changes
+    if not snapshots_enabled() or sessions.changes == _snapshot_changes:
+        return False
+    changes = sessions.changes
+    items = sessions.snapshot_items()
+    entries = []
+    for index, (session_id, idle, session_data) in enumerate(items):
+        entries.append((session_id, idle, encode_session(session_data)))
+        if index % 200 == 199:
+            await asyncio.sleep(0)
+    try:
+        size = await asyncio.to_thread(write_snapshot, SESSION_SNAPSHOT_PATH, entries)
+    except Exception as e:
+        snapshot_stats["errors"] += 1
+        print(f"[DEBUG] Erro ao gravar snapshot de sessões: {e}")
+        return False
+    _snapshot_changes = changes
+    snapshot_stats.update(saves=snapshot_stats["saves"] + 1, last_saved=now_brasilia().isoformat(), sessions=len(entries), bytes=size)
+    return True
+
+async def snapshot_sessions_forever() -> None:
+    while True:
+        await asyncio.sleep(SESSION_SNAPSHOT_INTERVAL)
+        await snapshot_sessions()
 
 # Models
 class ChatRequest(BaseModel):
@@ -95,6 +257,7 @@ class ChatRequest(BaseModel):
     message: str
     current_section: Optional[int] = 1  # Novo campo
     llm_provider: Optional[str] = "gemini"
+    bo_id: Optional[str] = None  # Sessão perdida no servidor: reconstruída pelos eventos do BO
 
 class ChatResponse(BaseModel):
     session_id: str
@@ -107,6 +270,8 @@ class ChatResponse(BaseModel):
     section_skipped: Optional[bool] = False  # NOVO: True se seção foi pulada
     validation_error: Optional[str] = None
     event_id: Optional[str] = None
+    lint_warnings: Optional[List[str]] = None  # Violações que o linter não corrigiu (revisar)
+    fallback: Optional[bool] = None  # True: texto de modelo, sem LLM (o /generate_all gera de novo)
 
 class NewSessionResponse(BaseModel):
     session_id: str
@@ -116,6 +281,50 @@ class NewSessionResponse(BaseModel):
 class UpdateAnswerRequest(BaseModel):
     message: str
     llm_provider: Optional[str] = "gemini"
+    bo_id: Optional[str] = None
+
+class RegenerateSectionResponse(BaseModel):
+    session_id: str
+    bo_id: str
+    step: str
+    section: int
+    next_step: str
+    regenerated: bool
+    reason: Optional[str] = None  # answer_unchanged, section_incomplete, section_skipped
+    generated_text: str = ""
+    old_text: str = ""
+    diff: List[Dict[str, str]] = []  # {"op": equal|insert|delete|replace, "old", "new"}
+    llm_provider: Optional[str] = None
+    generation_time_ms: Optional[int] = None
+    lint_warnings: Optional[List[str]] = None
+    fallback: Optional[bool] = None  # texto de modelo (nenhum provider disponível)
+
+class GenerateAllRequest(BaseModel):
+    session_id: str
+    llm_provider: Optional[str] = "gemini"
+    regenerate: bool = False  # True: gera de novo também seções que já têm texto
+    single_call: Optional[bool] = None  # True: todas as seções numa chamada (padrão: GENERATE_ALL_SINGLE_CALL)
+
+class SectionGenerationResult(BaseModel):
+    section: int
+    status: str  # generated, error
+    generated_text: Optional[str] = None
+    llm_provider: Optional[str] = None
+    generation_time_ms: Optional[int] = None
+    lint_warnings: Optional[List[str]] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    single_call: Optional[bool] = None  # texto veio da chamada única do BO inteiro
+    fallback_reason: Optional[str] = None  # por que a seção saiu da chamada única
+    fallback: Optional[bool] = None  # texto de modelo (nenhum provider disponível)
+
+class GenerateAllResponse(BaseModel):
+    session_id: str
+    bo_id: str
+    results: List[SectionGenerationResult]
+    skipped_sections: List[int]
+    already_generated: List[int]
+    elapsed_ms: int
 
 class FeedbackRequest(BaseModel):
     bo_id: str
@@ -129,6 +338,71 @@ class FeedbackRequest(BaseModel):
 # Inicializar serviço de LLM
 llm_service = LLMService()
 
+# Máximo de seções geradas em paralelo por chamada a /generate_all
+GENERATE_ALL_CONCURRENCY = int(os.getenv("GENERATE_ALL_CONCURRENCY", "8"))
+
+# /generate_all gera todas as seções numa chamada ao provider (JSON por seção)
+GENERATE_ALL_SINGLE_CALL = os.getenv("GENERATE_ALL_SINGLE_CALL", "false").lower() in ("1", "true", "yes")
+
+# Jobs de geração em segundo plano (POST /chat?background=1)
+generation_jobs = JobManager()
+
+# Gerações idênticas simultâneas (mesma sessão, seção e respostas) viram uma só
+generation_flights = SingleFlight()
+
+# Intervalo (s) entre verificações de desconexão do cliente durante a geração
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.5"))
+
+def save_session(session_id: Optional[str], session_data: Optional[Dict] = None, quiet: bool = False) -> None:
+    """
+    Grava a sessão no SESSION_STORE. Se outra requisição (ou outro worker)
+    gravou depois da leitura, responde 409; com quiet, só registra no log
+    (caminhos sem resposta ao cliente, como jobs e streams).
+    """
+    if not session_id or session_id not in sessions:
+        return
+    try:
+        sessions.save(session_id, session_data)
+    except SessionConflictError as e:
+        if quiet:
+            print(f"[DEBUG] {e}; alterações desta requisição descartadas")
+            return
+        raise HTTPException(status_code=409, detail="Sessão alterada em outra aba ou requisição. Recarregue e tente novamente.")
+
+async def session_io(func, *args):
+    """
+    Chamada ao SESSION_STORE fora do event loop quando o backend faz I/O
+    bloqueante (sqlite/redis); no memory roda direto.
+    """
+    if sessions.blocking:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+def persist_session(endpoint):
+    """
+    Grava a sessão da requisição (session_id do corpo ou da URL) ao fim do
+    endpoint, inclusive quando ele termina com HTTPException.
+
+    A sessão é lida uma vez no início, numa thread (request_scope): dentro
+    do endpoint, `in sessions` e sessions[...] não voltam ao banco.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        body = kwargs.get("request_body")
+        session_id = kwargs.get("session_id") or (
+            body.get("session_id") if isinstance(body, dict) else getattr(body, "session_id", None)
+        )
+        with request_scope():
+            session_data = await session_io(sessions.get, session_id) if session_id else None
+            try:
+                response = await endpoint(*args, **kwargs)
+            except Exception:
+                await session_io(save_session, session_id, session_data, True)
+                raise
+            await session_io(save_session, session_id, session_data)
+            return response
+    return wrapper
+
 def get_client_ip(request: Request) -> str:
     """Obtém IP real do cliente (considera proxy)"""
     return request.headers.get("X-Forwarded-For", request.client.host)
@@ -147,13 +421,25 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "database": "connected"}
+    quota = llm_service.quota_stats()
+    llm_capacity = {"enabled": False}
+    if quota["enabled"]:
+        llm_capacity = {
+            "providers": {
+                name: {
+                    "available": budget["available"] and budget["configured"],
+                    "daily_remaining": budget["daily_remaining"],
+                    "minute_remaining": budget["minute_remaining"]
+                }
+                for name, budget in quota["providers"].items()
+            },
+            "queue_depth": quota["queue_depth"]
+        }
+    return {"status": "ok", "database": "connected", "llm": llm_capacity}
 
 @app.post("/new_session", response_model=NewSessionResponse)
 async def new_session(request: Request):
     """Inicia nova sessão de BO com logging (começa sempre pela Seção 1)"""
-    import uuid
-
     # Criar session_id (UUID)
     session_id = str(uuid.uuid4())
 
@@ -161,39 +447,21 @@ async def new_session(request: Request):
     # Só será registrado após 2 respostas válidas (lazy session creation)
     ip_address = get_client_ip(request)
     user_agent = request.headers.get("User-Agent")
-    bo_id = f"BO-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8]}"
+    bo_id = new_bo_id()
 
     # Criar estrutura de sessão com múltiplas seções
-    sessions[session_id] = {
-        "bo_id": bo_id,
-        "logged_to_db": False,        # Flag para controlar se já foi registrado no banco
-        "answer_count": 0,             # Contador de respostas válidas
-        "pending_events": [],          # Eventos a serem registrados quando atingir 2 respostas
-        "ip_address": ip_address,      # Guardar para usar no create_session depois
-        "user_agent": user_agent,      # Guardar para usar no create_session depois
-        "sections": {
-            1: BOStateMachine(),
-            # Seções 2, 3, 4, 5 e 6 serão inicializadas quando usuário clicar em "Iniciar Seção X"
-        },
-        "current_section": 1,
-        "section1_text": "",
-        "section2_text": "",
-        "section3_text": "",
-        "section4_text": "",
-        "section5_text": "",
-        "section6_text": "",
-        "section7_text": "",
-        "section8_text": ""
-    }
+    # Seções 2 a 8 são inicializadas quando o usuário clicar em "Iniciar Seção X";
+    # ip_address/user_agent ficam guardados para o create_session depois
+    session_data = new_session_state(bo_id, ip_address=ip_address, user_agent=user_agent)
 
-    state_machine = sessions[session_id]["sections"][1]
+    state_machine = session_data["sections"][1]
 
     # Primeira pergunta
     first_question = state_machine.get_current_question()
 
     # Armazenar evento para logar depois (quando atingir 2 respostas)
     # ao invés de logar imediatamente
-    sessions[session_id]["pending_events"].append({
+    session_data["pending_events"].append({
         "event_type": "question_asked",
         "data": {
             "step": state_machine.current_step,
@@ -201,6 +469,7 @@ async def new_session(request: Request):
             "section": 1
         }
     })
+    await session_io(operator.setitem, sessions, session_id, session_data)
 
     return NewSessionResponse(
         session_id=session_id,
@@ -208,6 +477,51 @@ async def new_session(request: Request):
         first_question=first_question
     )
 
+def new_bo_id() -> str:
+    """bo_id no formato BO-AAAAMMDD-xxxxxxxx (registrado no banco só depois)"""
+    return f"BO-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8]}"
+
+def recreate_session(session_id: str) -> Dict:
+    """
+    Sessão desconhecida (servidor reiniciou sem snapshot, ou sessão removida
+    pelo sweeper): recria com um bo_id novo. O evento session_recreated
+    segue a mesma regra dos outros (banco só a partir de 2 respostas).
+    """
+    session_data = new_session_state(new_bo_id())
+    sessions[session_id] = session_data
+    log_session_event(session_data, "session_recreated", {"session_id": session_id, "reason": "backend_restart"})
+    return session_data
+
+# Sessões reconstruídas a partir dos eventos do BO (ver session_replay.py)
+session_replayer = SessionReplayer(
+    lambda bo_id: BOLogger.count_replay_events(bo_id, REPLAYED_EVENTS),
+    lambda bo_id: BOLogger.get_replay_events(bo_id, REPLAYED_EVENTS)
+)
+
+def rebuild_session(session_id: str, bo_id: Optional[str]) -> Optional[Dict]:
+    """
+    Sessão desconhecida com bo_id conhecido: refaz o estado pelos eventos do
+    BO no banco (answer_submitted, edições, seções puladas, textos). None se
+    o BO não tem eventos (ainda não foi gravado) ou o banco falhou.
+    """
+    if not bo_id:
+        return None
+    try:
+        session_data = session_replayer.rebuild(bo_id)
+        if session_data is None:
+            return None
+        # Sessão removida pelo sweeper volta a ficar ativa
+        stored = BOLogger.get_session(bo_id)
+        if stored and stored.get("status") == "abandoned":
+            BOLogger.update_session_status(bo_id, "active")
+    except Exception as e:
+        print(f"[DEBUG] Erro ao reconstruir sessão do BO {bo_id}: {e}")
+        return None
+
+    sessions[session_id] = session_data
+    log_session_event(session_data, "session_rebuilt", {"session_id": session_id, "answer_count": session_data["answer_count"]})
+    return session_data
+
 def ensure_session_logged(session_id: str) -> bool:
     """
     Garante que a sessão foi registrada no banco de dados.
@@ -261,35 +575,398 @@ def ensure_session_logged(session_id: str) -> bool:
 
     return True
 
+def log_session_event(session_data: Dict, event_type: str, data: Dict[str, Any]) -> Optional[str]:
+    """
+    Registra evento no banco se a sessão já foi registrada; caso contrário,
+    adiciona à fila de eventos pendentes (lazy session creation).
+
+    Returns:
+        event_id se gravado no banco, None se ficou na fila
+    """
+    if session_data.get("logged_to_db", False):
+        return BOLogger.log_event(
+            bo_id=session_data["bo_id"],
+            event_type=event_type,
+            data=data
+        )
+
+    session_data.setdefault("pending_events", []).append({
+        "event_type": event_type,
+        "data": data
+    })
+    return None
+
+def record_section_completed(
+    session_data: Dict,
+    section_number: int,
+    provider: str,
+    generated_text: str,
+    generation_time_ms: int,
+    answers: Dict[str, str],
+    requested_provider: Optional[str] = None,
+    single_call: bool = False
+) -> LintResult:
+    """
+    Passa o texto pelo linter, guarda o resultado na sessão e registra o
+    evento sectionN_completed.
+
+    `provider` é quem realmente gerou o texto; se houve failover, o provider
+    escolhido pelo usuário vai em failover_from. Correções e sinalizações
+    do linter vão em "lint". single_call marca textos da chamada única do
+    BO inteiro. Texto de modelo (provider FALLBACK_PROVIDER) fica marcado
+    com "fallback" no evento e sectionN_fallback na sessão, para o
+    /generate_all gerar de novo com o LLM. Retorna o LintResult (texto
+    final em .text).
+    """
+    lint = llm_service.linter.lint(section_number, generated_text, answers)
+    generated_text = lint.text
+    session_data[f"section{section_number}_text"] = generated_text
+    session_data[f"section{section_number}_fallback"] = provider == FALLBACK_PROVIDER
+
+    # IMPORTANTE: Seção 8 é a ÚLTIMA - marcar BO como completo
+    if section_number == 8:
+        BOLogger.update_session_status(session_data["bo_id"], "completed")
+
+    event_data = {
+        "section": section_number,
+        "llm_provider": provider,
+        "generated_text": generated_text,
+        "generation_time_ms": generation_time_ms,
+        "answers": answers
+    }
+    if requested_provider and requested_provider != provider:
+        event_data["failover_from"] = requested_provider
+    if lint.issues:
+        event_data["lint"] = lint.to_dict()
+    if single_call:
+        event_data["single_call"] = True
+    if provider == FALLBACK_PROVIDER:
+        event_data["fallback"] = True
+
+    # Log: texto gerado
+    log_session_event(session_data, f"section{section_number}_completed", event_data)
+    return lint
+
+def record_generation_error(session_data: Dict, provider: str, error: Exception) -> HTTPException:
+    """Registra generation_error e devolve a HTTPException amigável correspondente."""
+    error_msg = str(error)
+
+    # Log: erro na geração
+    log_session_event(session_data, "generation_error", {
+        "error": error_msg,
+        "llm_provider": provider
+    })
+
+    # Fila de admissão cheia ou sem quota em nenhum provider
+    if isinstance(error, AdmissionError):
+        return HTTPException(
+            status_code=429,
+            detail=f"⏳ {error_msg}",
+            headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+        )
+
+    # Mensagens mais amigáveis baseadas no tipo de erro
+    if "quota" in error_msg.lower() or "429" in error_msg:
+        return HTTPException(
+            status_code=429,
+            detail="⏳ Limite diário da API Gemini atingido. Aguarde ou troque de modelo."
+        )
+
+    # Todos os providers da cadeia sem capacidade (rate limit / timeout)
+    if isinstance(error, ProviderUnavailableError):
+        return HTTPException(status_code=429, detail=f"⏳ {error_msg}")
+
+    return HTTPException(status_code=500, detail=f"❌ Erro ao gerar texto: {error_msg}")
+
+class ClientDisconnectedError(Exception):
+    """Cliente fechou a conexão antes de a geração terminar."""
+
+async def await_unless_disconnected(request: Optional[Request], awaitable):
+    """
+    Aguarda a geração verificando request.is_disconnected() a cada
+    DISCONNECT_POLL_INTERVAL segundos. Se o cliente sair (aba fechada,
+    conexão móvel caiu), cancela a chamada ao provider - libera o worker
+    e não gasta mais quota - e levanta ClientDisconnectedError.
+    """
+    if request is None:
+        return await awaitable
+
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    return await task  # terminou junto com a desconexão
+                except asyncio.CancelledError:
+                    raise ClientDisconnectedError()
+    finally:
+        if not task.done():
+            task.cancel()
+
+def record_generation_cancelled(session_data: Dict, section_number: int, provider: str, start_time: datetime) -> HTTPException:
+    """Registra generation_cancelled (cliente saiu no meio da geração)."""
+    log_session_event(session_data, "generation_cancelled", {
+        "section": section_number,
+        "llm_provider": provider,
+        "elapsed_ms": int((datetime.now() - start_time).total_seconds() * 1000),
+        "reason": "client_disconnected"
+    })
+    print(f"[DEBUG] Geração da Seção {section_number} cancelada: cliente desconectou")
+    return HTTPException(status_code=499, detail="Cliente desconectou; geração cancelada.")
+
+async def generate_and_record(
+    session_id: str,
+    section_number: int,
+    answers: Dict[str, str],
+    provider: str,
+    use_cache: bool = True
+) -> Tuple[LintResult, str, int]:
+    """
+    Gera o texto da seção e grava (record_section_completed), uma vez só
+    por (session_id, seção, hash das respostas): requisições idênticas que
+    chegam enquanto a geração está em andamento recebem o mesmo resultado
+    ou a mesma HTTPException, sem nova chamada ao provider nem evento
+    duplicado.
+
+    Returns:
+        (LintResult com o texto final, provider que gerou, generation_time_ms)
+    """
+    session_data = await session_io(operator.getitem, sessions, session_id)
+
+    async def run() -> Tuple[LintResult, str, int]:
+        start_time = datetime.now()
+        try:
+            # Failover automático se o provider escolhido estiver sem quota
+            generated_text, served_provider = await llm_service.generate_with_provider_async(
+                section_number=section_number,
+                section_data=answers,
+                provider=provider,
+                use_cache=use_cache
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise record_generation_error(session_data, provider, e)
+
+        generation_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        lint = record_section_completed(
+            session_data=session_data,
+            section_number=section_number,
+            provider=served_provider,
+            generated_text=generated_text,
+            generation_time_ms=generation_time_ms,
+            answers=answers,
+            requested_provider=provider
+        )
+        # Jobs em segundo plano terminam depois da resposta: grava aqui
+        await session_io(save_session, session_id, session_data, True)
+        return lint, served_provider, generation_time_ms
+
+    key = (session_id, section_number, answers_hash(answers))
+    return await generation_flights.do(key, run)
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Formata um evento Server-Sent Events (data sempre em JSON)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_section_generation(
+    session_id: str,
+    state_machine,
+    current_section: int,
+    provider: str,
+    event_id: Optional[str]
+):
+    """
+    Gera o texto da seção emitindo os tokens assim que chegam do provider.
+
+    Usa a mesma chave de single-flight de generate_and_record: se a mesma
+    geração já estiver em andamento (duplo toque, retry do frontend, com ou
+    sem streaming), esta requisição espera o resultado dela e emite só o
+    "done" - uma chamada ao provider e um sectionN_completed.
+
+    Eventos emitidos:
+        token -> {"text": "..."} (um por trecho recebido)
+        done  -> ChatResponse completo (texto final já gravado na sessão)
+        error -> {"status_code": 429|500, "detail": "..."}
+    """
+    session_data = await session_io(operator.getitem, sessions, session_id)
+    answers = state_machine.get_all_answers()
+    start_time = datetime.now()
+    served = {"provider": provider}
+    key = (session_id, current_section, answers_hash(answers))
+    tokens: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> Tuple[LintResult, str, int]:
+        chunks: List[str] = []
+        try:
+            async for chunk in llm_service.stream_text_async(current_section, answers, provider, served=served):
+                chunks.append(chunk)
+                tokens.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise record_generation_error(session_data, provider, e)
+        finally:
+            tokens.put_nowait(None)  # fim do stream para quem emite os tokens
+
+        generation_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+
+        # Só grava texto e evento depois que o stream fechou; o "done" leva o
+        # texto já corrigido pelo linter (substitui o que foi montado pelos tokens)
+        lint = record_section_completed(
+            session_data=session_data,
+            section_number=current_section,
+            provider=served["provider"],
+            generated_text="".join(chunks).strip(),
+            generation_time_ms=generation_time_ms,
+            answers=answers,
+            requested_provider=provider
+        )
+        await session_io(save_session, session_id, session_data, True)
+        return lint, served["provider"], generation_time_ms
+
+    shared, leader = generation_flights.join(key, run)
+    flight = asyncio.ensure_future(generation_flights.wait(shared))
+    try:
+        if leader:
+            while True:
+                chunk = await tokens.get()
+                if chunk is None:
+                    break
+                yield sse_event("token", {"text": chunk})
+        lint, served_provider, _ = await flight
+    except asyncio.CancelledError:
+        # Starlette cancela o stream quando o cliente desconecta
+        record_generation_cancelled(session_data, current_section, served["provider"], start_time)
+        raise
+    except HTTPException as error:
+        yield sse_event("error", {"status_code": error.status_code, "detail": error.detail})
+        return
+    finally:
+        # Desistência deste cliente; a geração só para se ninguém mais espera
+        if not flight.done():
+            flight.cancel()
+
+    response = ChatResponse(
+        session_id=session_id,
+        bo_id=session_data["bo_id"],
+        generated_text=lint.text,
+        is_section_complete=True,
+        current_step=state_machine.current_step,
+        current_section=current_section,
+        event_id=event_id,
+        lint_warnings=lint.warnings or None,
+        fallback=served_provider == FALLBACK_PROVIDER or None
+    )
+    yield sse_event("done", jsonable_encoder(response))
+
+async def generate_section_response(
+    session_id: str,
+    state_machine,
+    current_section: int,
+    provider: str,
+    event_id: Optional[str],
+    request: Optional[Request] = None
+) -> ChatResponse:
+    """
+    Gera o texto da seção (sem bloquear o event loop), grava na sessão e
+    registra sectionN_completed. Em caso de erro levanta a HTTPException
+    de record_generation_error.
+
+    Com `request`, a geração é cancelada se o cliente desconectar
+    (evento generation_cancelled). Jobs em segundo plano não passam request.
+    Duplo envio com as mesmas respostas reaproveita a geração em andamento
+    (ver generate_and_record).
+    """
+    session_data = await session_io(operator.getitem, sessions, session_id)
+    answers = state_machine.get_all_answers()
+    start_time = datetime.now()
+
+    try:
+        lint, served_provider, _ = await await_unless_disconnected(
+            request,
+            generate_and_record(session_id, current_section, answers, provider)
+        )
+    except ClientDisconnectedError:
+        raise record_generation_cancelled(session_data, current_section, provider, start_time)
+
+    return ChatResponse(
+        session_id=session_id,
+        bo_id=session_data["bo_id"],
+        generated_text=lint.text,
+        is_section_complete=True,
+        current_step=state_machine.current_step,
+        current_section=current_section,
+        event_id=event_id,
+        lint_warnings=lint.warnings or None,
+        fallback=served_provider == FALLBACK_PROVIDER or None
+    )
+
+def submit_generation_job(
+    session_id: str,
+    state_machine,
+    current_section: int,
+    provider: str,
+    event_id: Optional[str]
+) -> JSONResponse:
+    """
+    Enfileira a geração da seção e responde 202 com o job_id.
+
+    O job grava o texto na sessão e no log mesmo se o cliente desconectar;
+    o resultado (ChatResponse) fica em GET /jobs/{job_id}.
+    """
+    async def run() -> Dict[str, Any]:
+        response = await generate_section_response(
+            session_id=session_id,
+            state_machine=state_machine,
+            current_section=current_section,
+            provider=provider,
+            event_id=event_id
+        )
+        return jsonable_encoder(response)
+
+    try:
+        job = generation_jobs.submit(session_id, current_section, provider, run)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"⏳ {e}", headers={"Retry-After": "5"})
+
+    status_url = f"/jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "status": job.status,
+            "status_url": status_url,
+            "session_id": session_id,
+            "bo_id": sessions[session_id]["bo_id"],
+            "current_section": current_section,
+            "current_step": state_machine.current_step,
+            "event_id": event_id
+        },
+        headers={"Location": status_url}
+    )
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request_body: ChatRequest, request: Request):
-    """Processa resposta com logging completo (suporta múltiplas seções)"""
+@persist_session
+async def chat(request_body: ChatRequest, request: Request, stream: bool = False, background: bool = False):
+    """
+    Processa resposta com logging completo (suporta múltiplas seções).
+
+    Com ?stream=1, a conclusão de seção responde em text/event-stream
+    (ver stream_section_generation); com ?background=1, responde 202 com
+    um job_id para consultar em GET /jobs/{job_id}. Os demais casos
+    continuam em JSON.
+    """
     session_id = request_body.session_id
     current_section = request_body.current_section or 1
 
     # Verificar sessão - se não existir, recriar (útil quando backend reinicia)
-    if session_id not in sessions:
-        # Recriar sessão automaticamente
-        bo_id = BOLogger.create_bo()
-        sessions[session_id] = {
-            "bo_id": bo_id,
-            "sections": {
-                1: BOStateMachine()
-            },
-            "section1_text": "",
-            "section2_text": "",
-            "section3_text": "",
-            "section4_text": "",
-            "section5_text": "",
-            "section6_text": "",
-            "section7_text": "",
-            "section8_text": ""
-        }
-        BOLogger.log_event(
-            bo_id=bo_id,
-            event_type="session_recreated",
-            data={"session_id": session_id, "reason": "backend_restart"}
-        )
+    if session_id not in sessions and not rebuild_session(session_id, request_body.bo_id):
+        recreate_session(session_id)
 
     session_data = sessions[session_id]
     bo_id = session_data["bo_id"]
@@ -470,151 +1147,38 @@ async def chat(request_body: ChatRequest, request: Request):
                 event_id=event_id
             )
 
-        # Gerar texto com método correto baseado na seção
-        try:
-            start_time = datetime.now()
-
-            # Gerar texto usando método específico da seção
-            if current_section == 1:
-                generated_text = await llm_service.generate_section_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section1_text"] = generated_text
-            elif current_section == 2:
-                generated_text = llm_service.generate_section2_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section2_text"] = generated_text
-            elif current_section == 3:
-                generated_text = llm_service.generate_section3_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section3_text"] = generated_text
-            elif current_section == 4:
-                generated_text = llm_service.generate_section4_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section4_text"] = generated_text
-            elif current_section == 5:
-                generated_text = llm_service.generate_section5_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section5_text"] = generated_text
-            elif current_section == 6:
-                generated_text = llm_service.generate_section6_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section6_text"] = generated_text
-            elif current_section == 7:
-                generated_text = llm_service.generate_section7_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section7_text"] = generated_text
-            elif current_section == 8:
-                generated_text = llm_service.generate_section8_text(
-                    section_data=state_machine.get_all_answers(),
-                    provider=request_body.llm_provider
-                )
-                session_data["section8_text"] = generated_text
-                # IMPORTANTE: Seção 8 é a ÚLTIMA - marcar BO como completo
-                BOLogger.update_session_status(bo_id, "completed")
-            else:
-                raise ValueError(f"Seção {current_section} não suportada")
-
-            generation_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-
-            # Log: texto gerado
-            if is_logged:
-                BOLogger.log_event(
-                    bo_id=bo_id,
-                    event_type=f"section{current_section}_completed",
-                    data={
-                        "section": current_section,
-                        "llm_provider": request_body.llm_provider,
-                        "generated_text": generated_text,
-                        "generation_time_ms": generation_time_ms,
-                        "answers": state_machine.get_all_answers()
-                    }
-                )
-            else:
-                # Adicionar à fila de eventos pendentes
-                session_data["pending_events"].append({
-                    "event_type": f"section{current_section}_completed",
-                    "data": {
-                        "section": current_section,
-                        "llm_provider": request_body.llm_provider,
-                        "generated_text": generated_text,
-                        "generation_time_ms": generation_time_ms,
-                        "answers": state_machine.get_all_answers()
-                    }
-                })
-
-            # Atualizar status da sessão apenas se todas as seções foram concluídas
-            if current_section == 1:
-                pass  # Não marca como "completed" ainda, pois tem Seção 2, 3, 4, 5, 6 e 7
-            elif current_section == 2:
-                pass  # Não marca como "completed" ainda, pois tem Seção 3, 4, 5, 6 e 7
-            elif current_section == 3:
-                pass  # Não marca como "completed" ainda, pois tem Seção 4, 5, 6 e 7
-            elif current_section == 4:
-                pass  # Não marca como "completed" ainda, pois tem Seção 5, 6 e 7
-            elif current_section == 5:
-                pass  # Não marca como "completed" ainda, pois tem Seção 6 e 7
-            elif current_section == 6:
-                pass  # Não marca como "completed" ainda, pois tem Seção 7
-            elif current_section == 7:
-                pass  # Não marca como "completed" ainda, pois tem Seção 8
-            # Seção 8 marcará como "completed" quando implementada
+        # Modo streaming (?stream=1): tokens via Server-Sent Events
+        if stream:
+            return StreamingResponse(
+                stream_section_generation(
+                    session_id=session_id,
+                    state_machine=state_machine,
+                    current_section=current_section,
+                    provider=request_body.llm_provider,
+                    event_id=event_id
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
 
-            return ChatResponse(
+        # Modo assíncrono (?background=1): gera num job e responde 202 na hora
+        if background:
+            return submit_generation_job(
                 session_id=session_id,
-                bo_id=bo_id,
-                generated_text=generated_text,
-                is_section_complete=True,
-                current_step=state_machine.current_step,
+                state_machine=state_machine,
                 current_section=current_section,
+                provider=request_body.llm_provider,
                 event_id=event_id
             )
-            
-        except Exception as e:
-            error_msg = str(e)
-
-            # Log: erro na geração
-            if is_logged:
-                BOLogger.log_event(
-                    bo_id=bo_id,
-                    event_type="generation_error",
-                    data={
-                        "error": error_msg,
-                        "llm_provider": request_body.llm_provider
-                    }
-                )
-            else:
-                # Adicionar à fila de eventos pendentes
-                session_data["pending_events"].append({
-                    "event_type": "generation_error",
-                    "data": {
-                        "error": error_msg,
-                        "llm_provider": request_body.llm_provider
-                    }
-                })
-
-            # Mensagens mais amigáveis baseadas no tipo de erro
-            if "quota" in error_msg.lower() or "429" in error_msg:
-                user_msg = "⏳ Limite diário da API Gemini atingido. Aguarde ou troque de modelo."
-                status_code = 429
-            else:
-                user_msg = f"❌ Erro ao gerar texto: {error_msg}"
-                status_code = 500
-
-            raise HTTPException(status_code=status_code, detail=user_msg)
+
+        return await generate_section_response(
+            session_id=session_id,
+            state_machine=state_machine,
+            current_section=current_section,
+            provider=request_body.llm_provider,
+            event_id=event_id,
+            request=request
+        )
     
     # Próxima pergunta
     next_question = state_machine.get_current_question()
@@ -652,6 +1216,7 @@ async def chat(request_body: ChatRequest, request: Request):
     )
 
 @app.post("/start_section/{section_number}")
+@persist_session
 async def start_section(section_number: int, request_body: dict):
     """
     Inicia uma nova seção do BO.
@@ -974,6 +1539,7 @@ async def start_section(section_number: int, request_body: dict):
     raise HTTPException(status_code=400, detail="Seção inválida")
 
 @app.post("/skip_section/{section_number}")
+@persist_session
 async def skip_section(section_number: int, request_body: dict):
     """
     Pula uma seção opcional (2-7) sem iniciar.
@@ -1035,6 +1601,7 @@ async def skip_section(section_number: int, request_body: dict):
     }
 
 @app.post("/sync_session")
+@persist_session
 async def sync_session(request_body: dict):
     """
     Sincroniza sessão inteira de uma vez (restauração de rascunho).
@@ -1042,7 +1609,9 @@ async def sync_session(request_body: dict):
     Body: {
         "session_id": "uuid",
         "answers": {"1.1": "...", "1.2": "...", "2.1": "..."},
-        "llm_provider": "groq"
+        "llm_provider": "groq",
+        "bo_id": "BO-..."  # opcional: sessão perdida no servidor é reconstruída
+                           # pelos eventos do BO e só as respostas novas são aplicadas
     }
 
     Returns: {
@@ -1059,12 +1628,21 @@ async def sync_session(request_body: dict):
     if not session_id:
         raise HTTPException(status_code=400, detail="session_id é obrigatório")
 
+    # Sessão perdida no servidor: com o bo_id do rascunho, reconstrói pelos eventos
+    rebuilt = None
     if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        rebuilt = rebuild_session(session_id, request_body.get("bo_id"))
+        if rebuilt is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
 
     session_data = sessions[session_id]
     bo_id = session_data["bo_id"]
 
+    # Respostas que vieram dos eventos não são validadas nem aplicadas de novo
+    if rebuilt is not None:
+        answered = {step for state_machine in rebuilt["sections"].values() for step in state_machine.answers}
+        answers = {step: answer for step, answer in answers.items() if step not in answered}
+
     # Contar quantas respostas válidas existem antes de sincronizar
     valid_answer_count = 0
     for step in answers.keys():
@@ -1093,7 +1671,7 @@ async def sync_session(request_body: dict):
             valid_answer_count += 1
 
     # Atualizar contador na sessão
-    session_data["answer_count"] = valid_answer_count
+    session_data["answer_count"] = valid_answer_count + (rebuilt["answer_count"] if rebuilt is not None else 0)
 
     # Se tiver >= 2 respostas, garantir que sessão está no banco
     if valid_answer_count >= 2:
@@ -1102,7 +1680,8 @@ async def sync_session(request_body: dict):
     # Ordenar steps (1.1, 1.2, ..., 2.1, 2.2, ...)
     sorted_steps = sorted(answers.keys(), key=lambda s: tuple(map(int, s.split('.'))))
 
-    current_section = 1
+    current_section = session_data.get("current_section", 1) if rebuilt is not None else 1
+    synced_events = []
 
     for step in sorted_steps:
         answer = answers[step]
@@ -1161,6 +1740,17 @@ async def sync_session(request_body: dict):
         # Armazenar e avançar
         state_machine.store_answer(answer)
         state_machine.next_step()
+        synced_events.append({
+            "event_type": "answer_submitted",
+            "data": {"step": step, "answer": answer, "is_valid": True, "synced": True}
+        })
+
+    # Log: respostas aplicadas (a próxima reconstrução pelos eventos as inclui)
+    if synced_events:
+        if session_data.get("logged_to_db", False):
+            BOLogger.log_events(bo_id, synced_events)
+        else:
+            session_data.setdefault("pending_events", []).extend(synced_events)
 
     # Retornar estado final
     final_section = current_section
@@ -1181,26 +1771,167 @@ async def sync_session(request_body: dict):
         "bo_id": bo_id
     }
 
-@app.put("/chat/{session_id}/answer/{step}")
-async def update_answer(session_id: str, step: str, update_request: UpdateAnswerRequest):
-    """Atualiza resposta com logging"""
-    # Verificar sessão - recriar se necessário
+@app.post("/generate_all", response_model=GenerateAllResponse)
+@persist_session
+async def generate_all(request_body: GenerateAllRequest, request: Request):
+    """
+    Gera de uma vez o texto de todas as seções concluídas (e não puladas)
+    que ainda não têm texto - típico depois de restaurar rascunho pelo
+    /sync_session. Seções com texto de modelo (gerado sem LLM, ver
+    fallback_renderer.py) também entram, para trocar pelo texto do LLM.
+
+    As seções são geradas em paralelo (até GENERATE_ALL_CONCURRENCY por vez),
+    com os mesmos prompts do /chat. Cada seção tem seu próprio resultado:
+    erro em uma não impede as outras. Se o cliente desconectar, as seções
+    ainda em geração são canceladas (generation_cancelled).
+
+    Com single_call (ou GENERATE_ALL_SINGLE_CALL), as seções vão todas numa
+    chamada ao provider, que devolve um JSON com o texto de cada uma. Seções
+    que vierem com problema (ou todas, se a chamada falhar) são geradas uma
+    a uma, como no modo normal.
+    """
+    session_id = request_body.session_id
+
     if session_id not in sessions:
-        bo_id = BOLogger.create_bo()
-        sessions[session_id] = {
-            "bo_id": bo_id,
-            "sections": {
-                1: BOStateMachine()
-            },
-            "section1_text": "",
-            "section2_text": "",
-            "section3_text": "",
-            "section4_text": "",
-            "section5_text": "",
-            "section6_text": "",
-            "section7_text": "",
-            "section8_text": ""
-        }
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+
+    session_data = sessions[session_id]
+    provider = request_body.llm_provider
+
+    pending: List[int] = []
+    skipped_sections: List[int] = []
+    already_generated: List[int] = []
+    for section_number, state_machine in sorted(session_data["sections"].items()):
+        if not state_machine.is_section_complete():
+            continue
+        if getattr(state_machine, "was_section_skipped", lambda: False)():
+            skipped_sections.append(section_number)
+        elif (
+            session_data.get(f"section{section_number}_text")
+            and not session_data.get(f"section{section_number}_fallback")
+            and not request_body.regenerate
+        ):
+            already_generated.append(section_number)
+        else:
+            pending.append(section_number)
+
+    semaphore = asyncio.Semaphore(GENERATE_ALL_CONCURRENCY)
+
+    async def generate_section(section_number: int) -> SectionGenerationResult:
+        answers = session_data["sections"][section_number].get_all_answers()
+        async with semaphore:
+            start_time = datetime.now()
+            try:
+                lint, served_provider, generation_time_ms = await generate_and_record(
+                    session_id,
+                    section_number,
+                    answers,
+                    provider,
+                    use_cache=not request_body.regenerate
+                )
+            except asyncio.CancelledError:
+                record_generation_cancelled(session_data, section_number, provider, start_time)
+                raise
+            except HTTPException as error:
+                return SectionGenerationResult(
+                    section=section_number,
+                    status="error",
+                    status_code=error.status_code,
+                    error=error.detail
+                )
+
+        return SectionGenerationResult(
+            section=section_number,
+            status="generated",
+            generated_text=lint.text,
+            llm_provider=served_provider,
+            generation_time_ms=generation_time_ms,
+            lint_warnings=lint.warnings or None,
+            fallback=served_provider == FALLBACK_PROVIDER or None
+        )
+
+    async def generate_single_call() -> List[SectionGenerationResult]:
+        answers = {n: session_data["sections"][n].get_all_answers() for n in pending}
+        start_time = datetime.now()
+        try:
+            batch = await llm_service.generate_bo_async(answers, provider, use_cache=not request_body.regenerate)
+        except asyncio.CancelledError:
+            for section_number in pending:
+                record_generation_cancelled(session_data, section_number, provider, start_time)
+            raise
+        except Exception as e:
+            print(f"[DEBUG] Chamada única do BO falhou ({e}); gerando seção a seção")
+            batch = WholeBOResult({}, {}, {n: "error" for n in pending})
+        generation_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+
+        results: Dict[int, SectionGenerationResult] = {}
+        for section_number, text in batch.texts.items():
+            lint = record_section_completed(
+                session_data,
+                section_number,
+                batch.providers[section_number],
+                text,
+                generation_time_ms,
+                answers[section_number],
+                requested_provider=provider,
+                single_call=True
+            )
+            results[section_number] = SectionGenerationResult(
+                section=section_number,
+                status="generated",
+                generated_text=lint.text,
+                llm_provider=batch.providers[section_number],
+                generation_time_ms=generation_time_ms,
+                lint_warnings=lint.warnings or None,
+                single_call=True
+            )
+
+        fallback = list(batch.fallback)
+        for section_number, result in zip(fallback, await asyncio.gather(*[generate_section(n) for n in fallback])):
+            result.fallback_reason = batch.fallback[section_number]
+            results[section_number] = result
+        return [results[n] for n in pending]
+
+    single_call = GENERATE_ALL_SINGLE_CALL if request_body.single_call is None else request_body.single_call
+    start_time = datetime.now()
+    try:
+        if single_call and len(pending) > 1:
+            generation = generate_single_call()
+        else:
+            generation = asyncio.gather(*[generate_section(n) for n in pending])
+        results = await await_unless_disconnected(request, generation)
+    except ClientDisconnectedError:
+        raise HTTPException(status_code=499, detail="Cliente desconectou; geração cancelada.")
+
+    return GenerateAllResponse(
+        session_id=session_id,
+        bo_id=session_data["bo_id"],
+        results=list(results),
+        skipped_sections=skipped_sections,
+        already_generated=already_generated,
+        elapsed_ms=int((datetime.now() - start_time).total_seconds() * 1000)
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """Estado de um job de geração (queued, running, done ou error)."""
+    job = generation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+def apply_answer_edit(session_id: str, step: str, message: str, bo_id: Optional[str] = None) -> Tuple[Dict, Any, str]:
+    """
+    Valida e grava a nova resposta de um step (evento answer_edited).
+    Levanta HTTPException 400 para step ou resposta inválidos. Sessão
+    desconhecida é reconstruída pelos eventos de bo_id (se informado) ou recriada.
+
+    Returns:
+        (session_data, state_machine da seção do step, resposta antiga)
+    """
+    # Verificar sessão - reconstruir ou recriar se necessário
+    if session_id not in sessions and not rebuild_session(session_id, bo_id):
+        recreate_session(session_id)
 
     session_data = sessions[session_id]
     bo_id = session_data["bo_id"]
@@ -1252,21 +1983,21 @@ async def update_answer(session_id: str, step: str, update_request: UpdateAnswer
 
     # Validar nova resposta usando validator correto
     if step.startswith("1."):
-        is_valid, error_message = ResponseValidator.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidator.validate(step, message)
     elif step.startswith("2."):
-        is_valid, error_message = ResponseValidatorSection2.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection2.validate(step, message)
     elif step.startswith("3."):
-        is_valid, error_message = ResponseValidatorSection3.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection3.validate(step, message)
     elif step.startswith("4."):
-        is_valid, error_message = ResponseValidatorSection4.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection4.validate(step, message)
     elif step.startswith("5."):
-        is_valid, error_message = ResponseValidatorSection5.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection5.validate(step, message)
     elif step.startswith("6."):
-        is_valid, error_message = ResponseValidatorSection6.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection6.validate(step, message)
     elif step.startswith("7."):
-        is_valid, error_message = ResponseValidatorSection7.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection7.validate(step, message)
     elif step.startswith("8."):
-        is_valid, error_message = ResponseValidatorSection8.validate(step, update_request.message)
+        is_valid, error_message = ResponseValidatorSection8.validate(step, message)
     else:
         raise HTTPException(status_code=400, detail=f"Step inválido: {step}")
 
@@ -1284,19 +2015,21 @@ async def update_answer(session_id: str, step: str, update_request: UpdateAnswer
                 event.get('data', {}).get('step') == step):
                 old_answer = event.get('data', {}).get('answer', '')
                 break
-            
-    BOLogger.log_event(
-        bo_id=bo_id,
-        event_type="answer_edited",
-        data={
-            "step": step,
-            "old_answer": old_answer,
-            "new_answer": update_request.message
-        }
-    )
+
+    # Mesma resposta (a menos de espaços): nada a registrar
+    if normalize_answers({step: old_answer}) != normalize_answers({step: message}):
+        BOLogger.log_event(
+            bo_id=bo_id,
+            event_type="answer_edited",
+            data={
+                "step": step,
+                "old_answer": old_answer,
+                "new_answer": message
+            }
+        )
     
     # Atualizar
-    state_machine.answers[step] = update_request.message.strip()
+    state_machine.answers[step] = message.strip()
     
     # Se current_step ainda aponta para step editado,
     # significa que usuário estava travado por erro de validação.
@@ -1304,7 +2037,15 @@ async def update_answer(session_id: str, step: str, update_request: UpdateAnswer
     if state_machine.current_step == step:
         state_machine.next_step()
         print(f"[BUG FIX] Avançando state_machine de {step} para {state_machine.current_step}")
-    
+
+    return session_data, state_machine, old_answer
+
+@app.put("/chat/{session_id}/answer/{step}")
+@persist_session
+async def update_answer(session_id: str, step: str, update_request: UpdateAnswerRequest):
+    """Atualiza resposta com logging"""
+    _, state_machine, _ = apply_answer_edit(session_id, step, update_request.message, update_request.bo_id)
+
     return {
         "success": True,
         "message": "Resposta atualizada com sucesso",
@@ -1312,6 +2053,75 @@ async def update_answer(session_id: str, step: str, update_request: UpdateAnswer
         "next_step": state_machine.current_step
     }
 
+@app.put("/chat/{session_id}/answer/{step}/regenerate", response_model=RegenerateSectionResponse)
+@persist_session
+async def update_answer_and_regenerate(
+    session_id: str,
+    step: str,
+    update_request: UpdateAnswerRequest,
+    request: Request
+):
+    """
+    Atualiza a resposta (como PUT /chat/{session_id}/answer/{step}) e
+    regenera só a seção dona do step.
+
+    Não chama o provider se a resposta normalizada (espaços) não mudou, nem
+    se a seção ainda não foi concluída ou foi pulada. As demais seções não
+    são tocadas. Voltar a uma resposta anterior reaproveita o cache.
+    A resposta traz o texto antigo, o novo e o diff palavra a palavra.
+    """
+    section_number = int(step.split(".")[0]) if step.split(".")[0].isdigit() else 0
+    # Resposta antiga vem da state machine já reconstruída/recriada por apply_answer_edit
+    session_data, state_machine, previous = apply_answer_edit(session_id, step, update_request.message, update_request.bo_id)
+    old_text = session_data.get(f"section{section_number}_text", "") or ""
+
+    def unchanged(reason: str) -> RegenerateSectionResponse:
+        return RegenerateSectionResponse(
+            session_id=session_id,
+            bo_id=session_data["bo_id"],
+            step=step,
+            section=section_number,
+            next_step=state_machine.current_step,
+            regenerated=False,
+            reason=reason,
+            generated_text=old_text,
+            old_text=old_text
+        )
+
+    if previous and normalize_answers({step: previous}) == normalize_answers({step: update_request.message}):
+        return unchanged("answer_unchanged")
+    if not state_machine.is_section_complete():
+        return unchanged("section_incomplete")
+    if getattr(state_machine, "was_section_skipped", lambda: False)():
+        return unchanged("section_skipped")
+
+    provider = update_request.llm_provider or "gemini"
+    answers = state_machine.get_all_answers()
+    start_time = datetime.now()
+    try:
+        lint, served_provider, generation_time_ms = await await_unless_disconnected(
+            request,
+            generate_and_record(session_id, section_number, answers, provider)
+        )
+    except ClientDisconnectedError:
+        raise record_generation_cancelled(session_data, section_number, provider, start_time)
+
+    return RegenerateSectionResponse(
+        session_id=session_id,
+        bo_id=session_data["bo_id"],
+        step=step,
+        section=section_number,
+        next_step=state_machine.current_step,
+        regenerated=True,
+        generated_text=lint.text,
+        old_text=old_text,
+        diff=word_diff(old_text, lint.text),
+        llm_provider=served_provider,
+        generation_time_ms=generation_time_ms,
+        lint_warnings=lint.warnings or None,
+        fallback=served_provider == FALLBACK_PROVIDER or None
+    )
+
 # ============================================================================
 # ENDPOINTS DE FEEDBACK
 # ============================================================================
@@ -1400,6 +2210,51 @@ async def get_stats():
     """Estatísticas gerais do sistema"""
     return BOLogger.get_stats()
 
+@app.get("/api/sessions/cache")
+async def get_sessions_cache_stats():
+    """Sessões em memória: ocupação, limites, remoções (TTL/LRU/bytes), sweeper, snapshot e reconstruções."""
+    return {
+        **sessions.stats(),
+        "sweeper": dict(sweeper_stats),
+        "snapshot": dict(snapshot_stats),
+        "replay": session_replayer.stats()
+    }
+
+@app.get("/api/llm/cache")
+async def get_llm_cache_stats():
+    """Uso do cache de textos gerados (quanto de quota foi economizado)"""
+    return {**llm_service.cache_stats(), "single_flight": generation_flights.stats()}
+
+@app.get("/api/llm/prompts")
+async def get_llm_prompt_stats():
+    """Tamanho dos prompts por seção (parte estática vs respostas) e tokens economizados"""
+    return llm_service.prompt_stats()
+
+@app.get("/api/llm/quota")
+async def get_llm_quota():
+    """Saldo diário/por minuto de cada provider e profundidade da fila de geração"""
+    return llm_service.quota_stats()
+
+@app.get("/api/llm/metrics")
+async def get_llm_metrics():
+    """Latência (histograma), tokens e erros das chamadas aos providers, por provider e seção."""
+    return llm_service.metrics()
+
+@app.get("/api/llm/pool")
+async def get_llm_pool_stats():
+    """Pool HTTP dos providers: conexões, reusos, handshakes TLS e warm-up."""
+    return llm_service.pool_stats()
+
+@app.get("/api/llm/replay")
+async def get_llm_replay_stats():
+    """Modo do provider (off/record/replay) e contadores do replay."""
+    return llm_service.replay_stats()
+
+@app.get("/api/llm/lint")
+async def get_llm_lint_stats():
+    """Violações das regras de redação corrigidas e sinalizadas pelo linter."""
+    return llm_service.lint_stats()
+
 @app.get("/api/feedbacks")
 async def list_feedbacks(
     feedback_type: Optional[str] = None,
@@ -1428,24 +2283,28 @@ async def list_feedbacks(
 @app.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """Deleta sessão"""
-    if session_id in sessions:
-        bo_id, _ = sessions[session_id]
-        BOLogger.update_session_status(bo_id, "abandoned")
-        del sessions[session_id]
+    session_data = await session_io(sessions.get, session_id)
+    if session_data is not None:
+        if session_data.get("logged_to_db"):
+            BOLogger.update_session_status(session_data["bo_id"], "abandoned")
+        await session_io(operator.delitem, sessions, session_id)
         return {"message": "Sessão deletada"}
     raise HTTPException(status_code=404, detail="Sessão não encontrada")
 
 @app.get("/session/{session_id}/status")
 async def session_status(session_id: str):
     """Status da sessão"""
-    if session_id not in sessions:
+    session_data = await session_io(sessions.get, session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Sessão não encontrada")
-    
-    bo_id, state_machine = sessions[session_id]
-    
+
+    current_section = session_data.get("current_section", 1)
+    state_machine = session_data["sections"][current_section]
+
     return {
         "session_id": session_id,
-        "bo_id": bo_id,
+        "bo_id": session_data["bo_id"],
+        "current_section": current_section,
         "current_step": state_machine.current_step,
         "is_complete": state_machine.is_section_complete(),
         "answers_count": len(state_machine.answers)
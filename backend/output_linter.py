@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Linter local do texto gerado pelo LLM (pós-processamento, sem nova chamada)
+
+Os prompts proíbem citar leis, termos vazios ("em atitude suspeita") e
+gerúndio, e exigem dois espaços entre frases. Quando o modelo ignora essas
+regras, o texto passa por aqui antes de ir para a sessão:
+
+- sentence_spacing: espaço simples entre frases -> dois espaços (corrigido)
+- law_citation: "Art. 33", "Lei 11.343/06", CPP... Trechos como
+  "(Art. 33 da Lei 11.343/06)" ou ", conforme o Art. 33" são removidos;
+  citação no meio da frase ou como predicado ("foi enquadrado no art. 33")
+  fica sinalizada
+- empty_term: "em atitude suspeita" como adjunto (", em atitude suspeita,")
+  é removido; os demais termos vazios ficam sinalizados
+- gerund: sinalizado (reescrever exige o contexto da frase)
+- invented_number: número no texto que não aparece nas respostas do
+  policial (nem na data enriquecida) - sinalizado
+
+As correções são determinísticas (mesmo texto -> mesmo resultado) e todas
+as expressões regulares são compiladas no import. Contadores por regra
+ficam em /api/llm/lint.
+"""
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+# Pós-processamento do texto gerado (desligar com LLM_OUTPUT_LINT=false)
+LLM_OUTPUT_LINT = os.getenv("LLM_OUTPUT_LINT", "true").lower() in ("1", "true", "yes")
+
+# Abreviações seguidas de ponto que não terminam frase
+_ABBREVIATIONS = {
+    "sr", "sra", "srta", "dr", "dra", "prof", "sgt", "sd", "cb", "ten", "cap",
+    "maj", "cel", "subten", "av", "r", "rod", "n", "nº", "no", "km", "ltda", "cia", "art"
+}
+
+_SENTENCE_GAP = re.compile(r"(?<=[.!?])[ \t]+(?=[\"“'(]?[A-ZÀ-ÖØ-Þ])")
+
+# Citação legal: artigo, lei, súmula, código ou tribunal
+_CITATION = (
+    r"(?:"
+    r"\bart(?:igo)?s?\.?\s*\d+[º°]?(?:-[A-Z])?(?:\s*,?\s*(?:§\s*\d+[º°]?|inciso\s+[IVXL]+|par[áa]grafo\s+[úu]nico))*"
+    r"(?:\s+d[oa]\s+(?:lei\s*(?:n[º°o]?\.?\s*)?\d{1,2}\.?\d{3}(?:/\d{2,4})?|c[óo]digo\s+(?:de\s+processo\s+)?penal|cpp?|ctb|eca))?"
+    r"|\blei\s*(?:n[º°o]?\.?\s*)?\d{1,2}\.?\d{3}(?:/\d{2,4})?"
+    r"|\bs[úu]mula\s*(?:vinculante\s*)?(?:n[º°o]?\.?\s*)?\d+"
+    r"|\bc[óo]digo\s+(?:de\s+processo\s+)?penal\b"
+    r"|\b(?:CPP|CPB|CTB|ECA|STF|STJ)\b"
+    r")"
+)
+_CITATION_RE = re.compile(_CITATION, re.IGNORECASE)
+# "(Art. 33 da Lei 11.343/06)"
+_CITATION_PARENTHETICAL = re.compile(
+    rf"\s*\(\s*(?:cf\.\s*|conforme\s+)?{_CITATION}(?:\s*(?:,|e|c/c)\s*{_CITATION})*\s*\)",
+    re.IGNORECASE
+)
+# ", conforme o Art. 33 da Lei 11.343/06" (até a próxima pontuação); entre
+# vírgulas, leva as duas e sobra um espaço ("O autor, conforme ..., foi preso").
+# Só é removida quando vem depois de vírgula (adjunto): sem a vírgula a
+# citação é o predicado ("O autor foi enquadrado no art. 33") e fica sinalizada
+_CITATION_CLAUSE = re.compile(
+    r",\s*(?:conforme|nos\s+termos\s+d[oa]s?|previst[oa]s?\s+n[oa]s?|tipificad[oa]s?\s+n[oa]s?|"
+    r"com\s+base\s+n[oa]s?|de\s+acordo\s+com|incurs[oa]s?\s+n[oa]s?|enquadrad[oa]s?\s+n[oa]s?)\s+"
+    rf"(?:[oa]s?\s+)?{_CITATION}(?:\s*(?:,|e|c/c)\s*(?:[oa]s?\s+)?{_CITATION})*"
+    r"(?:(?P<trail>\s*,\s*)|(?=\s*[.;]|\s*$))",
+    re.IGNORECASE
+)
+
+# Termos vazios proibidos pelos prompts
+_EMPTY_TERMS = re.compile(
+    r"\b(?:em\s+atitude\s+suspeita|atitude\s+suspeita|resistiu\s+ativamente|"
+    r"movimenta[çc][ãa]o\s+t[íi]pica|comportamento\s+suspeito)\b",
+    re.IGNORECASE
+)
+# ", em atitude suspeita," e "em atitude suspeita" antes de um adjunto de lugar
+_EMPTY_TERM_APPOSITIVE = re.compile(r",\s*em\s+atitude\s+suspeita\s*,", re.IGNORECASE)
+_EMPTY_TERM_ADVERBIAL = re.compile(
+    r"\s+em\s+atitude\s+suspeita(?=\s+(?:na|no|nas|nos|em|junto|pr[óo]ximo|perto|ao|à|defronte)\b)",
+    re.IGNORECASE
+)
+
+# Gerúndio (-ando/-endo/-indo/-ondo) em minúscula; nomes próprios ficam de fora
+_GERUND = re.compile(r"\b[a-zà-öø-ÿ]{2,}(?:ando|endo|indo|ondo)\b")
+_NOT_GERUNDS = {
+    "quando", "comando", "bando", "brando", "nefando", "segundo", "fundo", "mundo",
+    "profundo", "oriundo", "redondo", "lindo", "findo", "infindo", "hediondo",
+    "estupendo", "tremendo", "horrendo", "reverendo", "dividendo", "adendo", "vindo",
+    "contrabando", "desmando", "abundo", "moribundo", "rotundo"
+}
+
+# Números (inclusive com separador: 11.343, 1,80, 123.456.789-00)
+_NUMBER = re.compile(r"\d+(?:[.,/:-]\d+)*")
+_DIGITS = re.compile(r"\d+")
+
+# Números por extenso nas respostas também autorizam os dígitos no texto
+_NUMBER_WORDS = {
+    "um": 1, "uma": 1, "dois": 2, "duas": 2, "três": 3, "tres": 3, "quatro": 4,
+    "cinco": 5, "seis": 6, "sete": 7, "oito": 8, "nove": 9, "dez": 10, "onze": 11,
+    "doze": 12, "treze": 13, "catorze": 14, "quatorze": 14, "quinze": 15,
+    "dezesseis": 16, "dezessete": 17, "dezoito": 18, "dezenove": 19, "vinte": 20,
+    "trinta": 30, "quarenta": 40, "cinquenta": 50, "cem": 100, "meia": 30
+}
+_WORD = re.compile(r"[a-zà-ÿ]+", re.IGNORECASE)
+
+# Limpeza depois de remover trechos
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"[ \t]+([.,;:!?])")
+_DOUBLE_COMMA = re.compile(r",\s*,")
+_EXTRA_SPACES = re.compile(r"(?<=\S)[ \t]{3,}")
+
+RULES = ("sentence_spacing", "law_citation", "empty_term", "gerund", "invented_number")
+
+
+class LintIssue(NamedTuple):
+    rule: str
+    excerpt: str
+    repaired: bool
+
+
+class LintResult:
+    """Texto após as correções e a lista de violações encontradas."""
+
+    def __init__(self, text: str, issues: List[LintIssue]):
+        self.text = text
+        self.issues = issues
+
+    @property
+    def warnings(self) -> List[str]:
+        """Violações que continuam no texto (o policial deve revisar)."""
+        messages = {
+            "law_citation": "Cita lei/artigo",
+            "empty_term": "Termo vazio",
+            "gerund": "Gerúndio",
+            "invented_number": "Número que não está nas respostas",
+        }
+        return [
+            f"{messages.get(issue.rule, issue.rule)}: \"{issue.excerpt}\""
+            for issue in self.issues if not issue.repaired
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "repaired": [{"rule": i.rule, "excerpt": i.excerpt} for i in self.issues if i.repaired],
+            "flagged": [{"rule": i.rule, "excerpt": i.excerpt} for i in self.issues if not i.repaired],
+        }
+
+
+def _normalize_number(digits: str) -> str:
+    return digits.lstrip("0") or "0"
+
+
+def allowed_numbers(answers: Dict[str, str]) -> Set[str]:
+    """Números que o texto pode conter: os das respostas (dígitos e por extenso) e o ano."""
+    allowed = {"0"}
+    for answer in answers.values():
+        answer = str(answer or "")
+        allowed.update(_normalize_number(d) for d in _DIGITS.findall(answer))
+        for word in _WORD.findall(answer.lower()):
+            if word in _NUMBER_WORDS:
+                allowed.add(str(_NUMBER_WORDS[word]))
+    # _enrich_datetime completa a data com o ano corrente
+    year = datetime.now().year
+    allowed.update({str(year - 1), str(year)})
+    return allowed
+
+
+def fix_sentence_spacing(text: str) -> Tuple[str, int]:
+    """Dois espaços entre frases (abreviações como "Sgt." e "nº." são preservadas)."""
+    fixed = 0
+
+    def replace(match: "re.Match") -> str:
+        nonlocal fixed
+        end = match.start() - 1  # posição da pontuação
+        word = text[max(text.rfind(" ", 0, end), text.rfind("\n", 0, end)) + 1:end]
+        word = word.lower().lstrip("(\"“'")
+        if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+            return match.group(0)
+        if match.group(0) == "  ":
+            return match.group(0)
+        fixed += 1
+        return "  "
+
+    return _SENTENCE_GAP.sub(replace, text), fixed
+
+
+def _drop_citation(match: "re.Match") -> str:
+    """Citação entre vírgulas vira um espaço; nos demais casos some."""
+    return " " if match.groupdict().get("trail") else ""
+
+
+def _tidy(text: str) -> str:
+    """Espaços soltos que sobram depois de remover um trecho."""
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+    text = _DOUBLE_COMMA.sub(",", text)
+    return _EXTRA_SPACES.sub("  ", text)
+
+
+class OutputLinter:
+    """Detecta e corrige violações das regras de redação no texto gerado."""
+
+    def __init__(self, enabled: bool = LLM_OUTPUT_LINT):
+        self.enabled = enabled
+        self.texts = 0
+        self.texts_with_issues = 0
+        self.repaired = {rule: 0 for rule in RULES}
+        self.flagged = {rule: 0 for rule in RULES}
+        self._lock = threading.Lock()
+
+    def lint(self, section_number: int, text: str, answers: Optional[Dict[str, str]] = None) -> LintResult:
+        """
+        Corrige o que é determinístico e sinaliza o resto.
+        Texto vazio (seção pulada) ou linter desligado passam intactos.
+        """
+        if not self.enabled or not text:
+            return LintResult(text, [])
+
+        issues: List[LintIssue] = []
+
+        # Citações legais: remove parênteses e orações "conforme o Art. ..."
+        for pattern in (_CITATION_PARENTHETICAL, _CITATION_CLAUSE):
+            for match in pattern.finditer(text):
+                issues.append(LintIssue("law_citation", match.group(0).strip(" ,()"), True))
+            text = pattern.sub(_drop_citation, text)
+        for match in _CITATION_RE.finditer(text):
+            issues.append(LintIssue("law_citation", match.group(0), False))
+
+        # Termos vazios: remove só quando é adjunto (a frase continua correta)
+        for pattern, replacement in ((_EMPTY_TERM_APPOSITIVE, ""), (_EMPTY_TERM_ADVERBIAL, "")):
+            for match in pattern.finditer(text):
+                issues.append(LintIssue("empty_term", match.group(0).strip(" ,"), True))
+            text = pattern.sub(replacement, text)
+        for match in _EMPTY_TERMS.finditer(text):
+            issues.append(LintIssue("empty_term", match.group(0), False))
+
+        text = _tidy(text)
+
+        # Gerúndio: só sinaliza (uma vez por palavra)
+        seen: Set[str] = set()
+        for match in _GERUND.finditer(text):
+            word = match.group(0)
+            if word not in _NOT_GERUNDS and word not in seen:
+                seen.add(word)
+                issues.append(LintIssue("gerund", word, False))
+
+        # Números que não vieram das respostas
+        if answers is not None:
+            allowed = allowed_numbers(answers)
+            reported: Set[str] = set()
+            for match in _NUMBER.finditer(text):
+                number = match.group(0)
+                invented = [d for d in _DIGITS.findall(number) if _normalize_number(d) not in allowed]
+                if invented and number not in reported:
+                    reported.add(number)
+                    issues.append(LintIssue("invented_number", number, False))
+
+        text, spacing_fixes = fix_sentence_spacing(text)
+        if spacing_fixes:
+            issues.append(LintIssue("sentence_spacing", f"{spacing_fixes} frase(s)", True))
+
+        self._record(issues)
+        if issues:
+            print(f"[DEBUG] Linter Seção {section_number}: "
+                  f"{sum(i.repaired for i in issues)} corrigido(s), {sum(not i.repaired for i in issues)} sinalizado(s)")
+        return LintResult(text, issues)
+
+    def _record(self, issues: List[LintIssue]) -> None:
+        with self._lock:
+            self.texts += 1
+            if issues:
+                self.texts_with_issues += 1
+            for issue in issues:
+                counters = self.repaired if issue.repaired else self.flagged
+                counters[issue.rule] = counters.get(issue.rule, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "texts": self.texts,
+                "texts_with_issues": self.texts_with_issues,
+                "repaired": dict(self.repaired),
+                "flagged": dict(self.flagged),
+            }
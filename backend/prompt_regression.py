@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Regeneração em lote dos BOs registrados (regressão de prompt)
+
+Quando um _build_prompt_sectionN ou template de prompt_templates.py muda, não
+há como ver o efeito nos casos reais. Este job lê os eventos
+sectionN_completed do bo_events, gera de novo cada seção com os prompts do
+código atual (PROMPT_VERSION + hash do template) e o provider escolhido, e
+grava, por caso, o texto original, o novo, latência, tokens e o quanto mudou.
+
+- Retomável: cada resultado vai para o arquivo JSONL assim que sai. Rodar de
+  novo com o mesmo --out pula os casos já feitos com a mesma versão de prompt
+  e provider (erros são tentados de novo). Sem quota no provider
+  (AdmissionError), o job para sem perder nada e continua na próxima execução
+- Concorrência limitada (--concurrency) e ritmo máximo (--rpm)
+- Sem cache de textos (sempre chama o provider) e sem failover: o resultado
+  é do provider pedido. A quota diária continua valendo (LLM_QUOTA_*)
+- Offline: com LLM_REPLAY_MODE=replay (ou --replay) usa o provider de
+  replay_provider.py, sem rede nem quota
+
+Ao final grava <out>.summary.json com as estatísticas por seção (latência,
+tokens, tamanho, similaridade com o texto original, avisos do linter).
+
+Executar (a partir de backend/):
+    python prompt_regression.py --provider groq --out regressao.jsonl
+    python prompt_regression.py --replay --sections 7,8 --out regressao.jsonl
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    from logger import BOLogger
+    from llm_service import LLMService
+    from prompt_templates import estimate_tokens
+    from quota_scheduler import AdmissionError
+    from replay_provider import ReplayProvider
+    from single_flight import answers_hash
+    from text_diff import similarity
+except ImportError:
+    from backend.logger import BOLogger
+    from backend.llm_service import LLMService
+    from backend.prompt_templates import estimate_tokens
+    from backend.quota_scheduler import AdmissionError
+    from backend.replay_provider import ReplayProvider
+    from backend.single_flight import answers_hash
+    from backend.text_diff import similarity
+
+
+class RegressionCase(NamedTuple):
+    """Uma seção gerada em produção (evento sectionN_completed)."""
+    event_id: str
+    bo_id: str
+    section: int
+    answers: Dict[str, str]
+    original_text: str
+    original_provider: Optional[str]
+    original_time_ms: Optional[int]
+
+
+def load_cases(
+    events: Iterable[Dict[str, Any]],
+    sections: Optional[List[int]] = None,
+    dedupe: bool = True
+) -> List[RegressionCase]:
+    """
+    Casos a partir dos eventos sectionN_completed (na ordem recebida).
+
+    Eventos sem respostas, com texto vazio (seção pulada) ou com texto de
+    modelo (fallback, sem LLM) ficam de fora. Com dedupe, respostas repetidas da mesma seção (regeração, duplo envio)
+    viram um caso só - o primeiro.
+    """
+    cases = []
+    seen = set()
+    for event in events:
+        data = event.get("data") or {}
+        section = data.get("section")
+        answers = data.get("answers")
+        if not isinstance(section, int) or not answers or not data.get("generated_text"):
+            continue
+        if data.get("fallback"):
+            continue
+        if sections and section not in sections:
+            continue
+        if dedupe:
+            key = (section, answers_hash(answers))
+            if key in seen:
+                continue
+            seen.add(key)
+        cases.append(RegressionCase(
+            event_id=event["event_id"],
+            bo_id=event["bo_id"],
+            section=section,
+            answers=answers,
+            original_text=data["generated_text"],
+            original_provider=data.get("llm_provider"),
+            original_time_ms=data.get("generation_time_ms")
+        ))
+    return cases
+
+
+class RateLimiter:
+    """Espaça o início das chamadas para no máximo `rpm` por minuto (0 = sem limite)."""
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                await asyncio.sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + self.interval
+
+
+def checkpoint_key(event_id: str, provider: str, prompt_version: str) -> str:
+    """Mudar o prompt da seção ou o provider gera um caso novo."""
+    return f"{event_id}|{provider}|{prompt_version}"
+
+
+def read_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """Último resultado de cada caso já gravado no JSONL (linhas inválidas são ignoradas)."""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                records[record["key"]] = record
+            except (ValueError, KeyError, TypeError):
+                continue  # última linha cortada por uma interrupção
+    return records
+
+
+async def run_batch(
+    service: LLMService,
+    cases: List[RegressionCase],
+    out_path: str,
+    provider: str = "gemini",
+    concurrency: int = 2,
+    rpm: float = 0,
+    progress: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Gera os casos ainda não feitos e acrescenta um registro por caso em
+    out_path. Retorna {"done", "skipped", "errors", "stopped"}.
+    """
+    done = read_checkpoint(out_path)
+    todo = []
+    skipped = 0
+    for case in cases:
+        key = checkpoint_key(case.event_id, provider, service._prompt_version(case.section))
+        if done.get(key, {}).get("status") == "ok":
+            skipped += 1
+        else:
+            todo.append((key, case))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(rpm)
+    stop = asyncio.Event()
+    counts = {"done": 0, "skipped": skipped, "errors": 0, "stopped": False}
+
+    with open(out_path, "a", encoding="utf-8") as out:
+        def write(record: Dict[str, Any]) -> None:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        async def run(key: str, case: RegressionCase) -> None:
+            async with semaphore:
+                if stop.is_set():
+                    return
+                await limiter.wait()
+                record = await regenerate_case(service, case, provider)
+                if record is None:
+                    # Sem quota: o caso fica para a próxima execução
+                    if not stop.is_set():
+                        progress("[REGRESSÃO] Sem quota no provider; parando (rode de novo para continuar)")
+                    stop.set()
+                    return
+                record["key"] = key
+                write(record)
+                counts["done" if record["status"] == "ok" else "errors"] += 1
+                progress(f"[REGRESSÃO] {counts['done'] + counts['errors']}/{len(todo)} "
+                         f"Seção {case.section} {case.event_id}: {record['status']}")
+
+        await asyncio.gather(*[run(key, case) for key, case in todo])
+
+    counts["stopped"] = stop.is_set()
+    return counts
+
+
+async def regenerate_case(service: LLMService, case: RegressionCase, provider: str) -> Optional[Dict[str, Any]]:
+    """Gera um caso e monta o registro de comparação (None: sem quota)."""
+    prompt = service._build_section_prompt(case.section, case.answers)
+    record = {
+        "event_id": case.event_id,
+        "bo_id": case.bo_id,
+        "section": case.section,
+        "provider": provider,
+        "prompt_version": service._prompt_version(case.section),
+        "prompt_tokens_est": estimate_tokens(prompt.full) if prompt else 0,
+        "original": {
+            "text": case.original_text,
+            "provider": case.original_provider,
+            "generation_time_ms": case.original_time_ms,
+            "chars": len(case.original_text)
+        },
+        "run_at": datetime.now().isoformat()
+    }
+
+    started = time.perf_counter()
+    try:
+        text, served = await service.generate_with_provider_async(case.section, case.answers, provider, use_cache=False)
+    except AdmissionError:
+        return None
+    except Exception as e:
+        record.update({"status": "error", "error": str(e), "latency_ms": int((time.perf_counter() - started) * 1000)})
+        return record
+
+    lint = service.linter.lint(case.section, text, case.answers)
+    record.update({
+        "status": "ok",
+        "served_provider": served,
+        "latency_ms": int((time.perf_counter() - started) * 1000),
+        "completion_tokens_est": estimate_tokens(lint.text),
+        "new": {"text": lint.text, "chars": len(lint.text)},
+        "similarity": round(similarity(case.original_text, lint.text), 3),
+        "lint": lint.to_dict() if lint.issues else None
+    })
+    return record
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, math.ceil(pct / 100 * len(values)) - 1))]
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Estatísticas por seção dos registros (só o último de cada caso)."""
+    by_section: Dict[int, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_section.setdefault(record["section"], []).append(record)
+
+    sections = {}
+    for section, items in sorted(by_section.items()):
+        ok = [r for r in items if r["status"] == "ok"]
+        latencies = [r["latency_ms"] for r in ok]
+        original_times = [r["original"]["generation_time_ms"] for r in ok if r["original"].get("generation_time_ms")]
+        sections[section] = {
+            "cases": len(items),
+            "errors": len(items) - len(ok),
+            "prompt_versions": sorted({r["prompt_version"] for r in items}),
+            "latency_ms": {"p50": _percentile(latencies, 50), "p95": _percentile(latencies, 95)},
+            "original_latency_ms": {"p50": _percentile(original_times, 50), "p95": _percentile(original_times, 95)},
+            "avg_prompt_tokens_est": sum(r["prompt_tokens_est"] for r in ok) // len(ok) if ok else 0,
+            "avg_completion_tokens_est": sum(r["completion_tokens_est"] for r in ok) // len(ok) if ok else 0,
+            "avg_chars": {
+                "original": sum(r["original"]["chars"] for r in ok) // len(ok) if ok else 0,
+                "new": sum(r["new"]["chars"] for r in ok) // len(ok) if ok else 0
+            },
+            "avg_similarity": round(sum(r["similarity"] for r in ok) / len(ok), 3) if ok else None,
+            "lint_flagged": sum(len((r.get("lint") or {}).get("flagged", [])) for r in ok)
+        }
+
+    return {
+        "cases": sum(s["cases"] for s in sections.values()),
+        "errors": sum(s["errors"] for s in sections.values()),
+        "sections": sections
+    }
+
+
+def make_service(replay: bool = False) -> LLMService:
+    """LLMService do job: sem cache, sem failover e sem texto de modelo (no replay, sem quota)."""
+    service = LLMService()
+    if replay and service.replay is None:
+        service.use_replay(ReplayProvider())
+    if service.replay is not None:
+        service.scheduler = None
+    service.cache = None
+    service.provider_chain = []
+    service.template_fallback = False
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default="prompt_regression.jsonl", help="JSONL de resultados (também é o checkpoint)")
+    parser.add_argument("--summary", default=None, help="Resumo por seção (padrão: <out>.summary.json)")
+    parser.add_argument("--provider", default="gemini", choices=["gemini", "groq"])
+    parser.add_argument("--sections", default="", help="Ex: 7,8 (padrão: todas)")
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de eventos lidos do bo_events")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--rpm", type=float, default=10, help="Chamadas por minuto (0 = sem limite)")
+    parser.add_argument("--no-dedupe", action="store_true", help="Manter respostas repetidas da mesma seção")
+    parser.add_argument("--replay", action="store_true", help="Usar o provider offline (LLM_REPLAY_MODE=replay)")
+    args = parser.parse_args()
+
+    sections = [int(s) for s in args.sections.split(",") if s.strip().isdigit()]
+    cases = load_cases(BOLogger.get_section_completed_events(args.limit), sections or None, dedupe=not args.no_dedupe)
+    service = make_service(args.replay)
+    print(f"[REGRESSÃO] {len(cases)} casos, provider {args.provider}, modo {service.replay_mode}")
+
+    counts = asyncio.run(run_batch(service, cases, args.out, args.provider, args.concurrency, args.rpm))
+
+    # Resumo só dos casos desta seleção, com a versão de prompt atual
+    keys = {checkpoint_key(c.event_id, args.provider, service._prompt_version(c.section)) for c in cases}
+    records = [r for key, r in read_checkpoint(args.out).items() if key in keys]
+    summary = {
+        "provider": args.provider,
+        "mode": service.replay_mode,
+        "generated_at": datetime.now().isoformat(),
+        "run": counts,
+        **summarize(records),
+        "telemetry": service.metrics()["providers"]
+    }
+    summary_path = args.summary or f"{os.path.splitext(args.out)[0]}.summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"[REGRESSÃO] feitos {counts['done']}, já feitos {counts['skipped']}, erros {counts['errors']}"
+          f"{' (parado: sem quota)' if counts['stopped'] else ''}")
+    print(f"[REGRESSÃO] resultados em {args.out}, resumo em {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Agendador de gerações com controle de quota por provider
+
+Cada provider tem dois buckets:
+- diário: LLM_QUOTA_<PROVIDER>_RPD requisições, zera à meia-noite UTC
+  (mesmo horário do reset do free tier do Gemini)
+- por minuto: token bucket com LLM_QUOTA_<PROVIDER>_RPM tokens, reabastecido
+  continuamente (RPM/60 tokens por segundo)
+
+Antes de cada chamada ao LLM o LLMService pede um provider ao agendador:
+o primeiro da cadeia com saldo nos dois buckets é escolhido. Sem saldo, a
+requisição espera na fila (no máximo LLM_QUEUE_MAX_WAIT segundos, com até
+LLM_QUEUE_MAX requisições esperando); fora desses limites é recusada com
+AdmissionError, que o /chat devolve como HTTP 429 com Retry-After.
+
+O consumo é gravado na tabela provider_quota, então um restart do backend
+não "devolve" a quota diária já gasta. A gravação não acontece na admissão:
+o estado mais recente de cada provider fica pendente e uma thread própria
+grava em lote, fora do event loop e do _lock.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, Any, List, Optional
+
+try:
+    from logger import BOLogger
+except ImportError:
+    from backend.logger import BOLogger
+
+
+# Limites padrão do free tier (gemini-2.5-flash / llama-3.3-70b-versatile)
+DEFAULT_LIMITS = {
+    "gemini": {"rpd": 20, "rpm": 10},
+    "groq": {"rpd": 14400, "rpm": 30},
+}
+
+# Fila de admissão
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "32"))
+LLM_QUEUE_MAX_WAIT = float(os.getenv("LLM_QUEUE_MAX_WAIT", "20"))
+
+
+# Uma única thread de gravação: as escritas saem na ordem e a leitura do
+# load() passa pela mesma fila (vê tudo que já foi admitido antes dela)
+_QUOTA_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quota-writer")
+
+
+def load_limits() -> Dict[str, Dict[str, int]]:
+    """Limites por provider, sobrescrevíveis por LLM_QUOTA_<PROVIDER>_RPD/RPM."""
+    limits = {}
+    for provider, defaults in DEFAULT_LIMITS.items():
+        prefix = f"LLM_QUOTA_{provider.upper()}"
+        limits[provider] = {
+            "rpd": int(os.getenv(f"{prefix}_RPD", str(defaults["rpd"]))),
+            "rpm": int(os.getenv(f"{prefix}_RPM", str(defaults["rpm"]))),
+        }
+    return limits
+
+
+def utc_day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def seconds_until_utc_midnight(timestamp: float) -> float:
+    now = datetime.fromtimestamp(timestamp, timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class AdmissionError(Exception):
+    """Requisição recusada: nenhum provider com saldo dentro da espera máxima, ou fila cheia."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderBudget:
+    """Buckets diário e por minuto de um provider."""
+
+    def __init__(self, provider: str, rpd: int, rpm: int, now: float):
+        self.provider = provider
+        self.rpd = rpd
+        self.rpm = rpm
+        self.day = utc_day(now)
+        self.daily_used = 0
+        self.minute_tokens = float(rpm)
+        self.minute_updated_at = now
+
+    def refill(self, now: float) -> None:
+        """Zera o contador diário na virada do dia e reabastece o bucket por minuto."""
+        today = utc_day(now)
+        if today != self.day:
+            self.day = today
+            self.daily_used = 0
+
+        elapsed = max(0.0, now - self.minute_updated_at)
+        self.minute_tokens = min(float(self.rpm), self.minute_tokens + elapsed * self.rpm / 60.0)
+        self.minute_updated_at = now
+
+    @property
+    def disabled(self) -> bool:
+        """LLM_QUOTA_<PROVIDER>_RPM=0 ou _RPD=0: provider desligado."""
+        return self.rpm <= 0 or self.rpd <= 0
+
+    def has_budget(self) -> bool:
+        return not self.disabled and self.daily_used < self.rpd and self.minute_tokens >= 1.0
+
+    def consume(self) -> None:
+        self.daily_used += 1
+        self.minute_tokens -= 1.0
+
+    def seconds_until_available(self, now: float) -> float:
+        """Quanto falta para haver saldo (0 se já há; desligado: até a meia-noite UTC)."""
+        if self.disabled or self.daily_used >= self.rpd:
+            return seconds_until_utc_midnight(now)
+        if self.minute_tokens < 1.0:
+            return (1.0 - self.minute_tokens) * 60.0 / self.rpm
+        return 0.0
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "daily_limit": self.rpd,
+            "daily_remaining": max(0, self.rpd - self.daily_used),
+            "minute_limit": self.rpm,
+            "minute_remaining": int(self.minute_tokens),
+            "available": self.has_budget(),
+            "disabled": self.disabled,
+            "seconds_until_available": None if self.disabled else round(self.seconds_until_available(now), 1),
+        }
+
+
+class QuotaScheduler:
+    """Escolhe o provider com saldo e segura a requisição na fila quando não há nenhum."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, int]]] = None,
+        max_queue: int = LLM_QUEUE_MAX,
+        max_wait: float = LLM_QUEUE_MAX_WAIT,
+        persistent: bool = True,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.persistent = persistent
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        now = self.clock()
+        self.budgets: Dict[str, ProviderBudget] = {
+            provider: ProviderBudget(provider, limit["rpd"], limit["rpm"], now)
+            for provider, limit in (limits or load_limits()).items()
+        }
+
+        # Contadores expostos em /api/llm/quota
+        self.queue_depth = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+        # Estado gravado lido no primeiro uso (ou no lifespan), não no import
+        self._loaded = not self.persistent
+        # Estado a gravar por provider (só o mais recente importa)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------------
+    # Admissão
+    # ------------------------------------------------------------------------
+
+    def try_acquire(self, chain: List[str]) -> Optional[str]:
+        """
+        Consome 1 token do primeiro provider da cadeia com saldo.
+        Retorna o provider escolhido, ou None se nenhum tem saldo agora.
+        Providers sem limite configurado são sempre aceitos.
+        """
+        self.load()
+        now = self.clock()
+        with self._lock:
+            for provider in chain:
+                budget = self.budgets.get(provider)
+                if budget is None:
+                    self.admitted += 1
+                    return provider
+
+                budget.refill(now)
+                if budget.has_budget():
+                    budget.consume()
+                    self.admitted += 1
+                    self._save(budget)
+                    return provider
+        return None
+
+    async def acquire(self, chain: List[str]) -> str:
+        """
+        Versão com fila de try_acquire(): espera saldo em algum provider da
+        cadeia por até max_wait segundos.
+
+        Raises:
+            AdmissionError: fila cheia ou nenhum saldo dentro da espera máxima
+        """
+        provider = self.try_acquire(chain)
+        if provider:
+            return provider
+
+        with self._lock:
+            queue_full = self.queue_depth >= self.max_queue
+            if queue_full:
+                self.rejected += 1
+            else:
+                self.queue_depth += 1
+                self.queued += 1
+
+        if queue_full:
+            raise AdmissionError(
+                "Muitas gerações aguardando na fila. Tente novamente em instantes.",
+                retry_after=self.seconds_until_available(chain)
+            )
+
+        deadline = self.clock() + self.max_wait
+        try:
+            while True:
+                wait = self.seconds_until_available(chain)
+                remaining = deadline - self.clock()
+                if wait > remaining:
+                    with self._lock:
+                        self.rejected += 1
+                    raise AdmissionError(
+                        "Quota dos providers de IA esgotada no momento. Aguarde e tente novamente.",
+                        retry_after=wait
+                    )
+
+                await asyncio.sleep(max(wait, 0.05))
+
+                provider = self.try_acquire(chain)
+                if provider:
+                    return provider
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+
+    def mark_unavailable(self, provider: str, reason: str) -> None:
+        """
+        Ajusta o bucket quando o provider recusa por conta própria
+        (limite real menor que o configurado ou consumo fora deste backend).
+        """
+        self.load()
+        budget = self.budgets.get(provider)
+        if budget is None:
+            return
+
+        with self._lock:
+            budget.refill(self.clock())
+            if reason == "quota":
+                budget.daily_used = budget.rpd
+            elif reason == "rate_limit":
+                budget.minute_tokens = 0.0
+            else:
+                return
+            self._save(budget)
+
+    def seconds_until_available(self, chain: List[str]) -> float:
+        """
+        Menor espera entre os providers da cadeia. Providers desligados
+        (RPM/RPD = 0) não entram; se só sobram eles, a espera vai até a
+        meia-noite UTC (nunca infinita: vira o Retry-After do 429).
+        """
+        self.load()
+        now = self.clock()
+        with self._lock:
+            waits = []
+            for provider in chain:
+                budget = self.budgets.get(provider)
+                if budget is None:
+                    return 0.0
+                if budget.disabled:
+                    continue
+                budget.refill(now)
+                waits.append(budget.seconds_until_available(now))
+        return min(waits) if waits else seconds_until_utc_midnight(now)
+
+    # ------------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------------
+
+    def load(self) -> None:
+        """Lê o estado gravado uma única vez (idempotente)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            saved = _QUOTA_WRITER.submit(BOLogger.load_provider_quotas).result()
+        except Exception as e:
+            print(f"[DEBUG] Erro ao carregar quotas salvas: {e}")
+            return
+
+        for provider, state in saved.items():
+            budget = self.budgets.get(provider)
+            if budget is None:
+                continue
+            budget.day = state["day"]
+            budget.daily_used = state["daily_used"]
+            budget.minute_tokens = min(float(budget.rpm), state["minute_tokens"])
+            budget.minute_updated_at = state["minute_updated_at"]
+
+    def _save(self, budget: ProviderBudget) -> None:
+        """Agenda a gravação do estado do bucket (chamar com _lock adquirido; não bloqueia)."""
+        if not self.persistent:
+            return
+        scheduled = budget.provider in self._pending
+        self._pending[budget.provider] = {
+            "provider": budget.provider,
+            "day": budget.day,
+            "daily_used": budget.daily_used,
+            "minute_tokens": budget.minute_tokens,
+            "minute_updated_at": budget.minute_updated_at,
+        }
+        if not scheduled:
+            _QUOTA_WRITER.submit(self._write_pending, budget.provider)
+
+    def _write_pending(self, provider: str) -> None:
+        """Grava o último estado pendente do provider (roda na thread de gravação)."""
+        with self._lock:
+            state = self._pending.pop(provider, None)
+        if state is None:
+            return
+        try:
+            BOLogger.save_provider_quota(**state)
+        except Exception as e:
+            # Falha no banco nunca deve impedir a geração
+            print(f"[DEBUG] Erro ao gravar quota: {e}")
+
+    def flush(self) -> None:
+        """Espera as gravações pendentes terminarem (desligamento e testes)."""
+        _QUOTA_WRITER.submit(lambda: None).result()
+
+    # ------------------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Saldo atual por provider e estado da fila."""
+        self.load()
+        now = self.clock()
+        with self._lock:
+            providers = {}
+            for provider, budget in self.budgets.items():
+                budget.refill(now)
+                providers[provider] = budget.snapshot(now)
+
+            return {
+                "providers": providers,
+                "queue_depth": self.queue_depth,
+                "max_queue": self.max_queue,
+                "max_wait_s": self.max_wait,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Provider offline (record/replay) para testes de carga e CI
+
+LLM_REPLAY_MODE escolhe o modo:
+- off (padrão): chamadas reais ao Gemini/Groq
+- record: chamadas reais; cada texto gerado é gravado no cassette
+- replay: nenhuma chamada de rede. Os clientes do Gemini e do Groq são
+  trocados por imitações que respondem a partir do cassette (chave = hash
+  do prompt) e, para prompts não gravados, por um gerador sintético
+  determinístico
+
+No replay a latência é a gravada no cassette ou, no gerador sintético, uma
+lognormal com mediana LLM_REPLAY_LATENCY_MS (sorteada a partir do hash do
+prompt, então é sempre a mesma para o mesmo prompt). LLM_REPLAY_LATENCY_SCALE
+multiplica todas as esperas (0 = velocidade máxima). LLM_REPLAY_ERROR_RATE
+injeta erros com as mesmas mensagens dos providers reais, para exercitar
+failover, fila de quota e tratamento de erro.
+
+As imitações expõem a mesma interface dos SDKs (generate_content[_async] e
+chat.completions.create), então cache, failover e agendador de quota rodam
+exatamente como em produção.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from prompt_templates import WHOLE_BO_HEADER_PATTERN, WHOLE_BO_INSTRUCTION
+except ImportError:
+    from backend.prompt_templates import WHOLE_BO_HEADER_PATTERN, WHOLE_BO_INSTRUCTION
+
+
+# Modo do provider: off | record | replay
+LLM_REPLAY_MODE = os.getenv("LLM_REPLAY_MODE", "off").strip().lower()
+
+# Arquivo do cassette (relativo ao diretório de execução, como o bo_logs.db)
+LLM_REPLAY_CASSETTE = os.getenv("LLM_REPLAY_CASSETTE", "llm_cassette.json")
+
+# Latência do gerador sintético (lognormal) e escala aplicada a todas as esperas
+LLM_REPLAY_LATENCY_MS = float(os.getenv("LLM_REPLAY_LATENCY_MS", "1500"))
+LLM_REPLAY_LATENCY_SIGMA = float(os.getenv("LLM_REPLAY_LATENCY_SIGMA", "0.4"))
+LLM_REPLAY_LATENCY_SCALE = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+
+# Erros injetados: fração das chamadas e tipos sorteados
+LLM_REPLAY_ERROR_RATE = float(os.getenv("LLM_REPLAY_ERROR_RATE", "0"))
+LLM_REPLAY_ERROR_KINDS = [
+    kind.strip() for kind in os.getenv("LLM_REPLAY_ERROR_KINDS", "rate_limit,quota,timeout").split(",")
+    if kind.strip()
+]
+LLM_REPLAY_SEED = int(os.getenv("LLM_REPLAY_SEED", "0"))
+
+# Mensagens no formato dos SDKs reais (classificadas por _gemini_error/_groq_error)
+ERROR_MESSAGES = {
+    "quota": "429 Resource has been exhausted (e.g. check quota). "
+             "quota_id: \"GenerateRequestsPerDayPerProjectPerModel-FreeTier\"",
+    "rate_limit": "Error code: 429 - {'error': {'code': 'rate_limit_exceeded'}}",
+    "server": "500 Internal error encountered.",
+}
+
+
+def prompt_hash(system: str, user: str) -> str:
+    """Chave do cassette: SHA-256 da parte estática + respostas do prompt."""
+    payload = json.dumps({"system": system, "user": user}, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Respostas gravadas, em JSON: {"entries": {hash: {text, latency_ms, ...}}}."""
+
+    def __init__(self, path: str = LLM_REPLAY_CASSETTE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f).get("entries", {})
+            except Exception as e:
+                print(f"[DEBUG] Erro ao carregar cassette {path}: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def put(self, key: str, text: str, section: int, provider: str, latency_ms: int) -> None:
+        """Grava (ou regrava) uma resposta e salva o arquivo."""
+        with self._lock:
+            self.entries[key] = {
+                "section": section,
+                "provider": provider,
+                "text": text,
+                "latency_ms": latency_ms,
+                "recorded_at": datetime.now(timezone.utc).isoformat()
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": self.entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def synthetic_text(section: int, user: str) -> str:
+    """Texto determinístico montado com as respostas do prompt (sem os rótulos)."""
+    facts = []
+    for line in user.splitlines():
+        line = line.strip()
+        if not line or line.endswith(":"):
+            continue  # cabeçalhos, rótulos e a instrução final
+        value = line.split(": ", 1)[1] if ": " in line else line
+        if value and value != "Não informado":
+            facts.append(value.rstrip("."))
+
+    text = f"Texto sintético da Seção {section} (modo replay)."
+    if facts:
+        text += " " + ". ".join(facts) + "."
+    return text
+
+
+def synthetic_whole_bo(user: str) -> str:
+    """
+    JSON {"N": texto sintético} para o prompt do BO inteiro. No Gemini o
+    prompt chega inteiro (regras + respostas, com os mesmos marcadores):
+    vale o último bloco de cada seção, que é o das respostas.
+    """
+    answers = user.split(WHOLE_BO_INSTRUCTION.splitlines()[0])[0]
+    parts = WHOLE_BO_HEADER_PATTERN.split(answers)
+    texts = {}
+    for section, block in zip(parts[1::2], parts[2::2]):
+        texts[section] = synthetic_text(int(section), block)
+    return json.dumps(texts, ensure_ascii=False)
+
+
+class ReplayProvider:
+    """Responde do cassette ou do gerador sintético, com latência e erros simulados."""
+
+    def __init__(
+        self,
+        cassette: Optional[Cassette] = None,
+        latency_ms: float = LLM_REPLAY_LATENCY_MS,
+        latency_sigma: float = LLM_REPLAY_LATENCY_SIGMA,
+        latency_scale: float = LLM_REPLAY_LATENCY_SCALE,
+        error_rate: float = LLM_REPLAY_ERROR_RATE,
+        error_kinds: Optional[List[str]] = None,
+        seed: int = LLM_REPLAY_SEED,
+        sections: Optional[Dict[str, int]] = None
+    ):
+        """`sections` mapeia a parte estática de cada template para o número da seção."""
+        self.cassette = cassette if cassette is not None else Cassette()
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds if error_kinds is not None else list(LLM_REPLAY_ERROR_KINDS)
+        self.sections = sections or {}
+        self._errors_rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Contadores expostos em /api/llm/replay
+        self.cassette_hits = 0
+        self.synthetic = 0
+        self.injected_errors: Dict[str, int] = {}
+
+    def respond(self, provider: str, system: str, user: str) -> Tuple[Optional[str], float, Optional[str]]:
+        """
+        Sorteia a resposta de uma chamada.
+        Retorna (texto, espera em segundos, tipo de erro ou None).
+        """
+        key = prompt_hash(system, user)
+        entry = self.cassette.get(key)
+
+        if entry is not None:
+            text, latency_ms = entry["text"], float(entry.get("latency_ms") or 0)
+        else:
+            section = self.sections.get(system, 0)
+            if section == 0 and WHOLE_BO_HEADER_PATTERN.search(user):
+                text = synthetic_whole_bo(user)
+            else:
+                text = synthetic_text(section, user)
+            latency_ms = self._synthetic_latency_ms(key, provider)
+
+        with self._lock:
+            error = None
+            if self.error_kinds and self._errors_rng.random() < self.error_rate:
+                error = self._errors_rng.choice(self.error_kinds)
+                self.injected_errors[error] = self.injected_errors.get(error, 0) + 1
+            elif entry is not None:
+                self.cassette_hits += 1
+            else:
+                self.synthetic += 1
+
+        return (None if error else text), latency_ms * self.latency_scale / 1000.0, error
+
+    def _synthetic_latency_ms(self, key: str, provider: str) -> float:
+        """Lognormal determinística por (prompt, provider)."""
+        rng = random.Random(f"{key}:{provider}")
+        return self.latency_ms * math.exp(rng.gauss(0.0, self.latency_sigma))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cassette": self.cassette.path,
+            "cassette_entries": len(self.cassette.entries),
+            "cassette_hits": self.cassette_hits,
+            "synthetic": self.synthetic,
+            "injected_errors": dict(self.injected_errors),
+            "error_rate": self.error_rate,
+            "latency_ms": self.latency_ms,
+            "latency_scale": self.latency_scale
+        }
+
+
+def _raise_injected(kind: str) -> None:
+    if kind == "timeout":
+        raise asyncio.TimeoutError()
+    raise Exception(ERROR_MESSAGES.get(kind, ERROR_MESSAGES["server"]))
+
+
+def _chunks(text: str) -> List[str]:
+    """Divide o texto em trechos de ~5 palavras (imitando o streaming)."""
+    words = re.findall(r"\S+\s*", text)
+    return ["".join(words[i:i + 5]) for i in range(0, len(words), 5)]
+
+
+class _ReplayStream:
+    """Stream assíncrono: o primeiro trecho sai após 40% da latência, o resto se espalha."""
+
+    def __init__(self, pieces: List[Any], wait: float):
+        self.pieces = pieces
+        self.wait = wait
+        self.usage = None
+        self.usage_metadata = None
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if not self.pieces:
+            return
+        await asyncio.sleep(self.wait * 0.4)
+        step = self.wait * 0.6 / len(self.pieces)
+        for piece in self.pieces:
+            yield piece
+            await asyncio.sleep(step)
+
+
+# ----------------------------------------------------------------------------
+# Imitações dos SDKs
+# ----------------------------------------------------------------------------
+
+class ReplayGeminiModel:
+    """Imita genai.GenerativeModel (system_instruction = parte estática do prompt)."""
+
+    def __init__(self, replay: ReplayProvider, system_instruction: str = ""):
+        self.replay = replay
+        self.system_instruction = system_instruction
+
+    def generate_content(self, contents: str, **kwargs):
+        text, wait, error = self.replay.respond("gemini", self.system_instruction, contents)
+        time.sleep(wait)
+        if error:
+            _raise_injected(error)
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+    async def generate_content_async(self, contents: str, stream: bool = False, **kwargs):
+        text, wait, error = self.replay.respond("gemini", self.system_instruction, contents)
+        if stream and not error:
+            return _ReplayStream([SimpleNamespace(text=piece) for piece in _chunks(text)], wait)
+
+        await asyncio.sleep(wait)
+        if error:
+            _raise_injected(error)
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+class ReplayGroq:
+    """Imita Groq / AsyncGroq (chat.completions.create)."""
+
+    def __init__(self, replay: ReplayProvider, asynchronous: bool = True):
+        self.replay = replay
+        create = self._create_async if asynchronous else self._create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    def _respond(self, messages: List[Dict[str, str]]):
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in messages if m["role"] == "user"), "")
+        return self.replay.respond("groq", system, user)
+
+    def _create(self, messages: List[Dict[str, str]], **kwargs):
+        text, wait, error = self._respond(messages)
+        time.sleep(wait)
+        if error:
+            _raise_injected(error)
+        return _groq_completion(text)
+
+    async def _create_async(self, messages: List[Dict[str, str]], stream: bool = False, **kwargs):
+        text, wait, error = self._respond(messages)
+        if stream and not error:
+            pieces = [
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+                for piece in _chunks(text)
+            ]
+            return _ReplayStream(pieces, wait)
+
+        await asyncio.sleep(wait)
+        if error:
+            _raise_injected(error)
+        return _groq_completion(text)
+
+
+def _groq_completion(text: str):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Reconstrução de uma sessão a partir dos eventos do BO (bo_events)
+
+Cada resposta válida já é gravada como answer_submitted (step + resposta),
+assim como edições, seções puladas e textos gerados. Quando a sessão some
+da memória (restart sem snapshot, sweeper, outro worker com backend
+memory), o servidor refaz as state machines repetindo esses eventos na
+ordem, em vez de depender do rascunho do navegador e do /sync_session
+(que valida de novo o mapa inteiro de respostas).
+
+Regras do replay (mesmas do /chat, /start_section, /skip_section e edição):
+
+- answer_submitted: store_answer + next_step na seção do step, se o step
+  é o atual da state machine; fora de ordem, só grava a resposta
+- answer_edited: troca a resposta; se o step era o atual, avança
+- section_skipped: seção pulada pelo botão ("NÃO" na primeira pergunta)
+- section_started: seção atual
+- sectionN_completed: texto gerado (e flag de texto de modelo)
+
+SessionReplayer guarda o resultado por bo_id; enquanto o BO não tiver
+evento novo desses tipos (contagem pelo índice de bo_id), reconstruir de
+novo é só decodificar o JSON guardado.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from session_state import SECTION_CLASSES, SessionState, new_session_state
+    from session_store import decode_session, encode_session
+except ImportError:
+    from backend.session_state import SECTION_CLASSES, SessionState, new_session_state
+    from backend.session_store import decode_session, encode_session
+
+# Eventos que alteram o estado da sessão (além dos sectionN_completed)
+REPLAYED_EVENTS = ["answer_submitted", "answer_edited", "section_skipped", "section_started"]
+
+
+def _section_of(step: str) -> Optional[int]:
+    try:
+        section_number = int(str(step).split(".")[0])
+    except ValueError:
+        return None
+    return section_number if section_number in SECTION_CLASSES else None
+
+
+def _state_machine(session_data: SessionState, section_number: int):
+    sections = session_data["sections"]
+    if section_number not in sections:
+        sections[section_number] = SECTION_CLASSES[section_number]()
+    return sections[section_number]
+
+
+def replay_events(bo_id: str, events: List[Dict[str, Any]]) -> Optional[SessionState]:
+    """
+    Sessão reconstruída a partir dos eventos do BO, em ordem de timestamp
+    (None se nenhum evento altera a sessão). A sessão volta marcada como já
+    gravada no banco, sem eventos pendentes.
+    """
+    session_data = new_session_state(bo_id, logged_to_db=True)
+    replayed = 0
+
+    for event in events:
+        event_type = event.get("event_type") or ""
+        data = event.get("data") or {}
+
+        if event_type == "answer_submitted":
+            section_number = _section_of(data.get("step"))
+            answer = data.get("answer")
+            if section_number is None or answer is None:
+                continue
+            state_machine = _state_machine(session_data, section_number)
+            if state_machine.current_step == data["step"]:
+                state_machine.store_answer(answer)
+                state_machine.next_step()
+            else:
+                state_machine.answers[data["step"]] = answer.strip()
+            session_data["current_section"] = section_number
+            session_data["answer_count"] += 1
+
+        elif event_type == "answer_edited":
+            section_number = _section_of(data.get("step"))
+            if section_number is None or data.get("new_answer") is None:
+                continue
+            state_machine = _state_machine(session_data, section_number)
+            state_machine.answers[data["step"]] = data["new_answer"].strip()
+            if state_machine.current_step == data["step"]:
+                state_machine.next_step()
+
+        elif event_type == "section_skipped":
+            section_number = data.get("section")
+            if section_number not in SECTION_CLASSES:
+                continue
+            state_machine = session_data["sections"].get(section_number)
+            if state_machine is None or not state_machine.is_section_complete():
+                state_machine = SECTION_CLASSES[section_number]()
+                state_machine.store_answer("NÃO")
+                session_data["sections"][section_number] = state_machine
+            session_data["current_section"] = section_number
+
+        elif event_type == "section_started":
+            section_number = data.get("section")
+            if section_number not in SECTION_CLASSES:
+                continue
+            _state_machine(session_data, section_number)
+            session_data["current_section"] = section_number
+
+        elif event_type.startswith("section") and event_type.endswith("_completed"):
+            section_number = data.get("section")
+            if section_number not in SECTION_CLASSES:
+                continue
+            session_data[f"section{section_number}_text"] = data.get("generated_text") or ""
+            session_data[f"section{section_number}_fallback"] = bool(data.get("fallback"))
+
+        else:
+            continue
+        replayed += 1
+
+    return session_data if replayed else None
+
+
+class SessionReplayer:
+    """
+    Reconstrói sessões por bo_id com cache (LRU de até max_entries BOs).
+
+    count_events(bo_id) -> quantos eventos de replay o BO tem e
+    load_events(bo_id) -> esses eventos em ordem (BOLogger.count_replay_events
+    e get_replay_events no main.py).
+    """
+
+    def __init__(
+        self,
+        count_events: Callable[[str], int],
+        load_events: Callable[[str], List[Dict[str, Any]]],
+        max_entries: int = 256
+    ):
+        self._count_events = count_events
+        self._load_events = load_events
+        self.max_entries = max_entries
+        # bo_id -> (eventos no banco quando reconstruído, sessão em JSON)
+        self._cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_found = 0
+        self.events_replayed = 0
+
+    def rebuild(self, bo_id: str) -> Optional[SessionState]:
+        """Sessão nova (objetos próprios) com o estado do BO, ou None se não há eventos."""
+        count = self._count_events(bo_id)
+        if not count:
+            self.not_found += 1
+            return None
+
+        cached = self._cache.get(bo_id)
+        if cached and cached[0] == count:
+            self._cache.move_to_end(bo_id)
+            self.hits += 1
+            return decode_session(cached[1])
+
+        self.misses += 1
+        events = self._load_events(bo_id)
+        self.events_replayed += len(events)
+        session_data = replay_events(bo_id, events)
+        if session_data is None:
+            self.not_found += 1
+            return None
+
+        self._cache[bo_id] = (count, encode_session(session_data))
+        self._cache.move_to_end(bo_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return session_data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_found": self.not_found,
+            "events_replayed": self.events_replayed
+        }
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Sessão de BO em andamento com __slots__ (SessionState)
+
+Cada sessão era um dict livre: bo_id, flags, pending_events, oito chaves
+sectionN_text e as state machines de cada seção, cada uma com seu próprio
+__dict__. Com milhares de sessões abertas, a maior parte da memória era
+estrutura (tabelas de hash), não resposta de policial.
+
+- SessionState guarda os campos fixos em __slots__ e continua se
+  comportando como dict (session_data["bo_id"], .get, in, setdefault),
+  então o main.py, o session_store e os testes que montam dicts não mudam.
+  Chaves fora da lista (sectionN_fallback e afins) vão para um dict extra,
+  criado só quando aparece a primeira
+- as state machines também têm __slots__; perguntas e steps ficam na classe
+- session_footprint() mede os bytes de uma sessão sem contar o que é
+  compartilhado entre sessões (classes, tabelas de perguntas e steps)
+
+Benchmark: python tests/benchmarks/bench_session_memory.py
+"""
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    from state_machine import BOStateMachine
+    from state_machine_section2 import BOStateMachineSection2
+    from state_machine_section3 import BOStateMachineSection3
+    from state_machine_section4 import BOStateMachineSection4
+    from state_machine_section5 import BOStateMachineSection5
+    from state_machine_section6 import BOStateMachineSection6
+    from state_machine_section7 import BOStateMachineSection7
+    from state_machine_section8 import BOStateMachineSection8
+except ImportError:
+    from backend.state_machine import BOStateMachine
+    from backend.state_machine_section2 import BOStateMachineSection2
+    from backend.state_machine_section3 import BOStateMachineSection3
+    from backend.state_machine_section4 import BOStateMachineSection4
+    from backend.state_machine_section5 import BOStateMachineSection5
+    from backend.state_machine_section6 import BOStateMachineSection6
+    from backend.state_machine_section7 import BOStateMachineSection7
+    from backend.state_machine_section8 import BOStateMachineSection8
+
+SECTION_CLASSES = {
+    1: BOStateMachine,
+    2: BOStateMachineSection2,
+    3: BOStateMachineSection3,
+    4: BOStateMachineSection4,
+    5: BOStateMachineSection5,
+    6: BOStateMachineSection6,
+    7: BOStateMachineSection7,
+    8: BOStateMachineSection8,
+}
+
+# Campos fixos da sessão (ver estrutura no main.py)
+SESSION_FIELDS = (
+    "bo_id", "logged_to_db", "answer_count", "pending_events",
+    "ip_address", "user_agent", "sections", "current_section",
+    "section1_text", "section2_text", "section3_text", "section4_text",
+    "section5_text", "section6_text", "section7_text", "section8_text",
+)
+_FIELD_SET = frozenset(SESSION_FIELDS)
+
+
+class SessionState(MutableMapping):
+    """
+    Sessão com os campos de SESSION_FIELDS em slots e interface de dict.
+    Slot não preenchido = chave ausente (como no dict de antes).
+    """
+
+    __slots__ = SESSION_FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields):
+        self._extra = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in SESSION_FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"SessionState({dict(self)!r})"
+
+
+def new_session_state(bo_id: str, **fields) -> SessionState:
+    """Sessão nova: seção 1 iniciada, textos vazios."""
+    session_data = SessionState(
+        bo_id=bo_id,
+        logged_to_db=False,
+        answer_count=0,
+        pending_events=[],
+        sections={1: BOStateMachine()},
+        current_section=1,
+    )
+    for number in range(1, 9):
+        session_data[f"section{number}_text"] = ""
+    session_data.update(fields)
+    return session_data
+
+
+# ============================================================================
+# Footprint
+# ============================================================================
+
+_shared_ids: Optional[frozenset] = None
+
+
+def _shared_object_ids() -> frozenset:
+    """ids das tabelas de classe (perguntas, steps e suas strings)."""
+    global _shared_ids
+    if _shared_ids is None:
+        ids = set()
+        for cls in SECTION_CLASSES.values():
+            for table in (cls.QUESTIONS, cls.STEPS):
+                ids.add(id(table))
+                ids.update(id(item) for item in table)
+                if isinstance(table, dict):
+                    ids.update(id(value) for value in table.values())
+        _shared_ids = frozenset(ids)
+    return _shared_ids
+
+
+def _is_shared(obj: Any) -> bool:
+    # None, bools, inteiros pequenos e "" são singletons do interpretador
+    if obj is None or obj is True or obj is False or (type(obj) is str and not obj):
+        return True
+    if type(obj) is int and -5 <= obj <= 256:
+        return True
+    return isinstance(obj, type)
+
+
+def session_footprint(session_data: Any) -> int:
+    """
+    Bytes de uma sessão: o objeto, as state machines, respostas, textos e
+    eventos pendentes. O que é compartilhado entre sessões não conta.
+    """
+    shared = _shared_object_ids()
+    seen = set()
+    total = 0
+    stack = [session_data]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in shared or _is_shared(obj):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, int, float)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    value = getattr(obj, slot, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+
+def footprint_stats(sessions: Iterable[Any], sample: int = 50) -> Dict[str, Any]:
+    """Média e máximo de session_footprint() numa amostra de até `sample` sessões."""
+    sizes = []
+    for session_data in sessions:
+        if len(sizes) >= sample:
+            break
+        sizes.append(session_footprint(session_data))
+    if not sizes:
+        return {"sampled": 0, "avg_bytes": None, "max_bytes": None}
+    return {"sampled": len(sizes), "avg_bytes": sum(sizes) // len(sizes), "max_bytes": max(sizes)}
@@ -0,0 +1,803 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento das sessões de BO em andamento (SESSION_STORE)
+
+O main.py guardava tudo num dict do módulo, o que prende a API a um único
+processo do uvicorn. SessionStore mantém a mesma interface de dict
+(sessions[id], in, del, get) e acrescenta save(), com versão por sessão:
+
+- memory (padrão): o dict de sempre, um processo só
+- sqlite: arquivo local em modo WAL (SESSION_STORE_PATH), para vários
+  workers na mesma máquina (uvicorn --workers N)
+- redis: qualquer servidor que fale o protocolo do Redis (SESSION_STORE_URL),
+  para workers em máquinas diferentes. Cliente próprio (RESP), sem dependência
+
+Nos backends compartilhados cada worker guarda a última versão que leu de
+cada sessão. Ler de novo só decodifica a sessão se outro worker gravou
+depois; save() só grava se a versão no banco ainda for a lida (versionamento
+otimista) - senão levanta SessionConflictError e a requisição recebe 409.
+
+Sessões abandonadas não ficam para sempre na memória: SESSION_IDLE_TTL,
+SESSION_MAX_ENTRIES e SESSION_MAX_BYTES limitam o dict (ou, nos backends
+compartilhados, a cópia local de cada worker) e o sweep() periódico do
+main.py remove as expiradas.
+
+Nos backends compartilhados cada acesso é I/O bloqueante: o main.py roda
+as leituras e gravações numa thread (asyncio.to_thread) e abre um
+request_scope() por requisição, em que cada sessão é lida uma vez só.
+
+No backend memory, o main.py grava periodicamente e no desligamento um
+snapshot das sessões (write_snapshot, SESSION_SNAPSHOT_PATH) e o carrega
+no startup (read_snapshot + restore): um deploy não perde o progresso dos
+policiais nem obriga o frontend a reenviar tudo pelo /sync_session.
+"""
+import gzip
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+try:
+    from session_state import SECTION_CLASSES, SessionState, footprint_stats
+except ImportError:
+    from backend.session_state import SECTION_CLASSES, SessionState, footprint_stats
+
+# Backend das sessões: memory | sqlite | redis
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "./bo_sessions.db")
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "redis://localhost:6379/0")
+SESSION_STORE_PREFIX = os.getenv("SESSION_STORE_PREFIX", "bo:session:")
+
+# Limites das sessões em memória: tempo sem uso (s), quantidade e bytes de JSON
+# (0 desliga). Nos backends compartilhados valem para a cópia local de cada worker
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "43200"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "5000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", "0"))
+
+# Estado de uma state machine (o resto - perguntas, steps - é da classe)
+STATE_FIELDS = ("current_step", "step_index", "answers", "section_skipped")
+
+
+class SessionConflictError(Exception):
+    """Outra requisição (ou outro worker) gravou a sessão depois que ela foi lida."""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Sessão {session_id} alterada por outra requisição")
+        self.session_id = session_id
+
+
+# ============================================================================
+# Serialização
+# ============================================================================
+
+def encode_session(session_data: Dict[str, Any]) -> str:
+    """Sessão -> JSON (state machines viram só o estado, seções viram chaves str)."""
+    sections = {
+        str(number): {
+            field: getattr(state_machine, field)
+            for field in STATE_FIELDS if hasattr(state_machine, field)
+        }
+        for number, state_machine in session_data.get("sections", {}).items()
+    }
+    return json.dumps({**session_data, "sections": sections}, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_session(payload: str) -> SessionState:
+    """JSON de encode_session() -> sessão com as state machines de cada seção."""
+    session_data = SessionState(json.loads(payload))
+    sections = {}
+    for number, state in session_data.get("sections", {}).items():
+        cls = SECTION_CLASSES[int(number)]
+        state_machine = cls()
+        for field, value in state.items():
+            setattr(state_machine, field, value)
+        # Steps apontam para as strings da tabela da classe (uma cópia por processo)
+        steps = _canonical_steps(cls)
+        state_machine.current_step = steps.get(state_machine.current_step, state_machine.current_step)
+        state_machine.answers = {steps.get(step, step): answer for step, answer in state_machine.answers.items()}
+        sections[int(number)] = state_machine
+    session_data["sections"] = sections
+    return session_data
+
+
+_steps_by_class: Dict[type, Dict[str, str]] = {}
+
+
+def _canonical_steps(cls: type) -> Dict[str, str]:
+    steps = _steps_by_class.get(cls)
+    if steps is None:
+        steps = _steps_by_class[cls] = {step: step for step in cls.STEPS}
+    return steps
+
+
+# ============================================================================
+# Snapshot (arquivo local com as sessões do MemorySessionStore)
+# ============================================================================
+
+SNAPSHOT_FORMAT = 1
+
+
+def write_snapshot(path: str, entries: List[Tuple[str, float, str]]) -> int:
+    """
+    Grava (session_id, segundos sem uso, JSON) em gzip, uma sessão por
+    linha, num arquivo temporário trocado pelo definitivo no fim (um
+    snapshot interrompido não estraga o anterior). Retorna o tamanho em bytes.
+    """
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "saved_at": time.time(), "sessions": len(entries)}) + "\n")
+        for session_id, idle, payload in entries:
+            # O JSON da sessão não tem quebra de linha nem tab (json.dumps escapa)
+            f.write(f"{json.dumps([session_id, round(idle, 1)])}\t{payload}\n")
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_snapshot(path: str) -> List[Tuple[str, float, str]]:
+    """
+    Lê um arquivo de write_snapshot(). O tempo sem uso inclui o tempo que o
+    servidor ficou parado. Arquivo ausente: lista vazia; linhas corrompidas
+    (gravação interrompida) são ignoradas.
+    """
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Formato de snapshot desconhecido: {header.get('format')}")
+        downtime = max(0.0, time.time() - header["saved_at"])
+        try:
+            for line in f:
+                key, _, payload = line.rstrip("\n").partition("\t")
+                try:
+                    session_id, idle = json.loads(key)
+                except ValueError:
+                    continue
+                if payload:
+                    entries.append((session_id, idle + downtime, payload))
+        except (EOFError, OSError) as e:
+            print(f"[DEBUG] Snapshot de sessões truncado ({e}); {len(entries)} sessões lidas")
+    return entries
+
+
+# Sessões já lidas na requisição atual (backends compartilhados), por (store, session_id)
+_request_sessions: ContextVar[Optional[Dict[tuple, Dict[str, Any]]]] = ContextVar("request_sessions", default=None)
+
+
+@contextmanager
+def request_scope():
+    """
+    Escopo de uma requisição: nos backends compartilhados cada sessão é lida
+    do banco uma vez só (`in` seguido de [] e os get() seguintes devolvem o
+    mesmo objeto). save() continua conferindo a versão.
+    """
+    pinned: Dict[tuple, Dict[str, Any]] = {}
+    token = _request_sessions.set(pinned)
+    try:
+        yield
+    finally:
+        # Tarefas criadas na requisição (jobs) herdam o dict: voltam a ler do banco
+        pinned.clear()
+        _request_sessions.reset(token)
+
+
+# ============================================================================
+# Backends
+# ============================================================================
+
+class MemorySessionStore:
+    """
+    Dict em memória do processo, com limite: sessões sem uso há mais de
+    `ttl` segundos saem no sweep(); acima de `max_entries` sessões (ou de
+    `max_bytes` de JSON, se ligado) sai a usada há mais tempo (LRU).
+    """
+
+    backend = "memory"
+    # Acesso sem I/O: pode rodar direto no event loop
+    blocking = False
+
+    def __init__(
+        self,
+        ttl: float = SESSION_IDLE_TTL,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        max_bytes: int = SESSION_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+
+        # Ordem = ordem de uso (mais antiga primeiro)
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+
+        # Removidas desde o último sweep() (o main marca como abandoned no banco)
+        self._evicted: List[Dict[str, Any]] = []
+        self.evictions = {"ttl": 0, "lru": 0, "bytes": 0}
+        self.conflicts = 0
+        # Incrementa a cada gravação/remoção (snapshot só quando mudou algo)
+        self.changes = 0
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        session_data = self._data[session_id]
+        self._touch(session_id)
+        return session_data
+
+    def __setitem__(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        self._data[session_id] = session_data
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        self.changes += 1
+        self._touch(session_id)
+        self._measure(session_id, session_data)
+        self._enforce_limits(keep=session_id)
+
+    def __delitem__(self, session_id: str) -> None:
+        del self._data[session_id]
+        self._forget(session_id)
+        self.changes += 1
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, session_id: str, default=None):
+        if session_id not in self._data:
+            return default
+        return self[session_id]
+
+    def version(self, session_id: str) -> Optional[int]:
+        return self._versions.get(session_id)
+
+    def save(self, session_id: str, session_data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Marca a sessão como gravada (nova versão). session_data é o objeto
+        lido no início da requisição; se a sessão foi trocada ou removida
+        desde então, SessionConflictError.
+        """
+        current = self._data.get(session_id)
+        if current is None or (session_data is not None and session_data is not current):
+            self.conflicts += 1
+            raise SessionConflictError(session_id)
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        self.changes += 1
+        self._touch(session_id)
+        self._measure(session_id, current)
+        self._enforce_limits(keep=session_id)
+        return self._versions[session_id]
+
+    def sweep(self) -> List[Dict[str, Any]]:
+        """
+        Remove as sessões sem uso há mais de ttl e devolve todas as removidas
+        desde o último sweep (TTL e limite): session_id, bo_id, logged_to_db, reason.
+        """
+        if self.ttl > 0:
+            deadline = self._clock() - self.ttl
+            while self._data:
+                session_id = next(iter(self._data))
+                if self._last_used[session_id] > deadline:
+                    break
+                self._evict(session_id, "ttl")
+
+        evicted, self._evicted = self._evicted, []
+        return evicted
+
+    def snapshot_items(self) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """(session_id, segundos sem uso, sessão), da usada há mais tempo para a mais recente."""
+        now = self._clock()
+        return [
+            (session_id, now - self._last_used[session_id], session_data)
+            for session_id, session_data in self._data.items()
+        ]
+
+    def restore(self, entries: List[Tuple[str, float, str]]) -> Tuple[int, int]:
+        """
+        Carrega sessões de um snapshot (session_id, segundos sem uso, JSON),
+        mantendo a ordem de uso e o tempo sem uso. Sessões já expiradas
+        (ttl) e ids já presentes ficam de fora. Retorna (carregadas, expiradas).
+        """
+        restored = expired = 0
+        for session_id, idle, payload in sorted(entries, key=lambda entry: -entry[1]):
+            if self.ttl > 0 and idle >= self.ttl:
+                expired += 1
+                continue
+            if session_id in self._data:
+                continue
+            try:
+                session_data = decode_session(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[DEBUG] Sessão {session_id} do snapshot ignorada: {e}")
+                continue
+            self[session_id] = session_data
+            self._last_used[session_id] = self._clock() - idle
+            restored += 1
+        return restored, expired
+
+    def _touch(self, session_id: str) -> None:
+        self._data.move_to_end(session_id)
+        self._last_used[session_id] = self._clock()
+
+    def _measure(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        """Tamanho da sessão em JSON (só com max_bytes ligado: custa um encode por gravação)."""
+        if not self.max_bytes:
+            return
+        size = len(encode_session(session_data).encode("utf-8"))
+        self._bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _enforce_limits(self, keep: str) -> None:
+        while len(self._data) > 1:
+            if self.max_entries and len(self._data) > self.max_entries:
+                reason = "lru"
+            elif self.max_bytes and self._bytes > self.max_bytes:
+                reason = "bytes"
+            else:
+                return
+            oldest = next(iter(self._data))
+            if oldest == keep:
+                return
+            self._evict(oldest, reason)
+
+    def _evict(self, session_id: str, reason: str) -> None:
+        session_data = self._data.pop(session_id)
+        self._forget(session_id)
+        self.changes += 1
+        self.evictions[reason] += 1
+        self._evicted.append({
+            "session_id": session_id,
+            "bo_id": session_data.get("bo_id"),
+            "logged_to_db": session_data.get("logged_to_db", False),
+            "reason": reason
+        })
+
+    def _forget(self, session_id: str) -> None:
+        self._versions.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        self._bytes -= self._sizes.pop(session_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        oldest = next(iter(self._data), None)
+        return {
+            "backend": self.backend,
+            "sessions": len(self._data),
+            "bytes": self._bytes if self.max_bytes else None,
+            "oldest_idle_s": round(now - self._last_used[oldest], 1) if oldest else None,
+            "limits": {"ttl_s": self.ttl, "max_entries": self.max_entries, "max_bytes": self.max_bytes},
+            "evictions": dict(self.evictions),
+            "pending_sweep": len(self._evicted),
+            "footprint": footprint_stats(reversed(self._data.values())),
+            "conflicts": self.conflicts
+        }
+
+
+class SharedSessionStore:
+    """
+    Base dos backends compartilhados entre workers: guarda em memória a
+    última versão lida de cada sessão e só decodifica de novo quando a
+    versão no banco mudou.
+
+    Subclasses implementam _read_version, _read, _write, _write_any,
+    _delete e _ids.
+    """
+
+    backend = "shared"
+    blocking = True
+
+    def __init__(
+        self,
+        ttl: float = SESSION_IDLE_TTL,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        # session_id -> (versão, sessão, último uso), em ordem de uso
+        self._local: "OrderedDict[str, Tuple[int, Dict[str, Any], float]]" = OrderedDict()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.conflicts = 0
+        self.reloads = 0
+        self.evictions = {"ttl": 0, "lru": 0}
+
+    # -- interface de dict ---------------------------------------------------
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        pinned = _request_sessions.get()
+        if pinned is not None and (self, session_id) in pinned:
+            return pinned[(self, session_id)]
+
+        session_data = self._load(session_id)
+        if pinned is not None:
+            pinned[(self, session_id)] = session_data
+        return session_data
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        version = self._read_version(session_id)
+        if version is None:
+            self._local.pop(session_id, None)
+            raise KeyError(session_id)
+
+        cached = self._local.get(session_id)
+        if cached and cached[0] == version:
+            self._remember(session_id, version, cached[1])
+            return cached[1]
+
+        row = self._read(session_id)
+        if row is None:
+            self._local.pop(session_id, None)
+            raise KeyError(session_id)
+        version, payload = row
+        session_data = decode_session(payload)
+        self._remember(session_id, version, session_data)
+        self.reloads += 1
+        return session_data
+
+    def __setitem__(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        version = self._write_any(session_id, encode_session(session_data))
+        self._remember(session_id, version, session_data)
+        pinned = _request_sessions.get()
+        if pinned is not None:
+            pinned[(self, session_id)] = session_data
+
+    def __delitem__(self, session_id: str) -> None:
+        self._local.pop(session_id, None)
+        pinned = _request_sessions.get()
+        if pinned is not None:
+            pinned.pop((self, session_id), None)
+        if not self._delete(session_id):
+            raise KeyError(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        if not isinstance(session_id, str):
+            return False
+        if _request_sessions.get() is not None:
+            # Lê a sessão inteira: o [] que vem depois não volta ao banco
+            return self.get(session_id) is not None
+        return self._read_version(session_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids())
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
+    def get(self, session_id: str, default=None):
+        try:
+            return self[session_id]
+        except KeyError:
+            return default
+
+    def version(self, session_id: str) -> Optional[int]:
+        return self._read_version(session_id)
+
+    def save(self, session_id: str, session_data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Grava a sessão se ninguém gravou desde a leitura. session_data é o
+        objeto lido no início da requisição (padrão: o último lido neste worker).
+        """
+        cached = self._local.get(session_id)
+        if cached is None or (session_data is not None and session_data is not cached[1]):
+            self.conflicts += 1
+            raise SessionConflictError(session_id)
+
+        expected, session_data, _ = cached
+        version = self._write(session_id, encode_session(session_data), expected)
+        if version is None:
+            self._local.pop(session_id, None)
+            self.conflicts += 1
+            raise SessionConflictError(session_id)
+        self._remember(session_id, version, session_data)
+        return version
+
+    def sweep(self) -> List[Dict[str, Any]]:
+        """
+        Descarta as cópias locais sem uso há mais de ttl. A sessão continua
+        no backend (outro worker pode estar usando), então nada é devolvido
+        para marcar como abandoned.
+        """
+        if self.ttl > 0:
+            deadline = self._clock() - self.ttl
+            while self._local:
+                session_id, (_, _, last_used) = next(iter(self._local.items()))
+                if last_used > deadline:
+                    break
+                del self._local[session_id]
+                self.evictions["ttl"] += 1
+        return []
+
+    def _remember(self, session_id: str, version: int, session_data: Dict[str, Any]) -> None:
+        self._local[session_id] = (version, session_data, self._clock())
+        self._local.move_to_end(session_id)
+        while self.max_entries and len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.evictions["lru"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "sessions": len(self),
+            "cached": len(self._local),
+            "limits": {"ttl_s": self.ttl, "max_entries": self.max_entries},
+            "evictions": dict(self.evictions),
+            "footprint": footprint_stats(entry[1] for entry in reversed(self._local.values())),
+            "reloads": self.reloads,
+            "conflicts": self.conflicts
+        }
+
+    # -- a implementar por backend -------------------------------------------
+
+    def _read_version(self, session_id: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, str]]:
+        raise NotImplementedError
+
+    def _write(self, session_id: str, payload: str, expected: int) -> Optional[int]:
+        """Grava se a versão atual for `expected`; retorna a nova versão ou None."""
+        raise NotImplementedError
+
+    def _write_any(self, session_id: str, payload: str) -> int:
+        """Grava sem checar versão (sessão nova ou recriada)."""
+        raise NotImplementedError
+
+    def _delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def _ids(self) -> List[str]:
+        raise NotImplementedError
+
+
+class SQLiteSessionStore(SharedSessionStore):
+    """Sessões num arquivo SQLite em modo WAL (workers na mesma máquina)."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = SESSION_STORE_PATH):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+            "data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _update(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _read_version(self, session_id: str) -> Optional[int]:
+        rows = self._query("SELECT version FROM sessions WHERE session_id = ?", (session_id,))
+        return rows[0][0] if rows else None
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, str]]:
+        rows = self._query("SELECT version, data FROM sessions WHERE session_id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def _write(self, session_id: str, payload: str, expected: int) -> Optional[int]:
+        updated = self._update(
+            "UPDATE sessions SET data = ?, version = version + 1, updated_at = ? "
+            "WHERE session_id = ? AND version = ?",
+            (payload, time.time(), session_id, expected)
+        )
+        return expected + 1 if updated == 1 else None
+
+    def _write_any(self, session_id: str, payload: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, version, data, updated_at) VALUES (?, 1, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, "
+                "version = sessions.version + 1, updated_at = excluded.updated_at",
+                (session_id, payload, time.time())
+            )
+            return self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def _delete(self, session_id: str) -> bool:
+        return self._update("DELETE FROM sessions WHERE session_id = ?", (session_id,)) == 1
+
+    def _ids(self) -> List[str]:
+        return [row[0] for row in self._query("SELECT session_id FROM sessions")]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RedisError(Exception):
+    """Resposta de erro do servidor (-ERR ...)."""
+
+
+class RespConnection:
+    """
+    Cliente mínimo do protocolo do Redis (RESP2): comandos como arrays de
+    bulk strings, respostas +, -, :, $ e *. Reconecta uma vez se a conexão
+    caiu, exceto com retry=False (gravações: o comando pode ter sido executado).
+    """
+
+    def __init__(self, url: str = SESSION_STORE_URL, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            self._roundtrip(*auth)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def close(self) -> None:
+        if self._sock:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def command(self, *args, retry: bool = True) -> Any:
+        if self._sock is None:
+            self._connect()
+        try:
+            return self._roundtrip(*args)
+        except (ConnectionError, OSError):
+            self.close()
+            if not retry:
+                raise
+            self._connect()
+            return self._roundtrip(*args)
+
+    def _roundtrip(self, *args) -> Any:
+        self._sock.sendall(encode_command(*args))
+        return read_reply(self._reader)
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def read_reply(reader) -> Any:
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("Conexão com o servidor de sessões fechada")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        raise RedisError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)[:-2]
+        return data.decode("utf-8")
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Resposta inesperada do servidor: {line!r}")
+
+
+# Gravação condicional num comando só: confere a versão e grava version+data.
+# Com WATCH/MULTI/EXEC, uma reconexão no meio perdia o WATCH e o MULTI e o
+# HSET rodava sem checar a versão
+_CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if not current or tonumber(current) ~= tonumber(ARGV[1]) then
+  return false
+end
+local version = tonumber(ARGV[1]) + 1
+redis.call('HSET', KEYS[1], 'version', version, 'data', ARGV[2])
+return version
+"""
+
+_WRITE_ANY_SCRIPT = """
+local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('HSET', KEYS[1], 'data', ARGV[1])
+return version
+"""
+
+
+class RedisSessionStore(SharedSessionStore):
+    """
+    Sessões num servidor com protocolo Redis: um hash por sessão
+    (campos version e data). Gravação condicional atômica por script (EVAL).
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = SESSION_STORE_URL, prefix: str = SESSION_STORE_PREFIX, connection=None):
+        super().__init__()
+        self.prefix = prefix
+        self._conn = connection or RespConnection(url)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def _command(self, *args) -> Any:
+        with self._lock:
+            return self._conn.command(*args)
+
+    def _read_version(self, session_id: str) -> Optional[int]:
+        version = self._command("HGET", self._key(session_id), "version")
+        return int(version) if version is not None else None
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, str]]:
+        version, payload = self._command("HMGET", self._key(session_id), "version", "data")
+        if version is None or payload is None:
+            return None
+        return int(version), payload
+
+    def _write(self, session_id: str, payload: str, expected: int) -> Optional[int]:
+        try:
+            with self._lock:
+                version = self._conn.command("EVAL", _CAS_SCRIPT, 1, self._key(session_id), expected, payload, retry=False)
+        except (ConnectionError, OSError) as e:
+            # Sem saber se gravou: conflito (a requisição recarrega e repete)
+            print(f"[DEBUG] Conexão com o servidor de sessões caiu ao gravar {session_id}: {e}")
+            return None
+        return int(version) if version is not None else None
+
+    def _write_any(self, session_id: str, payload: str) -> int:
+        with self._lock:
+            version = self._conn.command("EVAL", _WRITE_ANY_SCRIPT, 1, self._key(session_id), payload, retry=False)
+        return int(version)
+
+    def _delete(self, session_id: str) -> bool:
+        return self._command("DEL", self._key(session_id)) == 1
+
+    def _ids(self) -> List[str]:
+        ids, cursor = [], "0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 500)
+            ids.extend(key[len(self.prefix):] for key in keys)
+            if cursor == "0":
+                return ids
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def create_session_store(backend: str = SESSION_STORE):
+    """Store configurado em SESSION_STORE (valor desconhecido: memory)."""
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    if backend != "memory":
+        print(f"[DEBUG] SESSION_STORE={backend} desconhecido, usando memory")
+    return MemorySessionStore()
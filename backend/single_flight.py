@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Single-flight: requisições idênticas simultâneas compartilham uma execução
+
+Duplo toque no botão de enviar ou retry do frontend podem levar a mesma
+sessão a concluir a seção duas vezes enquanto a primeira chamada ao LLM
+ainda está em andamento. Com a mesma chave (sessão, seção, hash das
+respostas), a segunda requisição passa a esperar a execução que já está em
+voo: uma chamada ao provider, um evento sectionN_completed, o mesmo texto
+(ou o mesmo erro) para todos.
+
+A execução só é cancelada quando todos os que esperam por ela desistem
+(ex: o único cliente desconectou). Nada fica guardado depois que ela
+termina - quem chegar depois gera de novo (e normalmente acerta o cache).
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    from generation_cache import normalize_answers
+except ImportError:
+    from backend.generation_cache import normalize_answers
+
+
+def answers_hash(answers: Dict[str, str]) -> str:
+    """Hash das respostas (mesma normalização de espaços do cache de textos)."""
+    payload = json.dumps(normalize_answers(answers), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Execuções em voo por chave, com contagem de quem está esperando."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+
+        # Contadores (execuções iniciadas e requisições que pegaram carona)
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa run() ou, se já houver uma execução com a mesma chave em
+        andamento, espera o resultado dela.
+        """
+        flight, _ = self.join(key, run)
+        return await self.wait(flight)
+
+    def join(self, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Tuple[_Flight, bool]:
+        """
+        Inicia run() ou pega a execução em andamento, sem esperar.
+        Retorna (execução, True se foi iniciada agora). O streaming usa
+        para saber, antes do primeiro await, se é ele quem emite os tokens.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            print(f"[DEBUG] Geração duplicada aguardando a que já está em andamento: {key}")
+            return flight, False
+
+        flight = _Flight(asyncio.ensure_future(run()))
+        self._flights[key] = flight
+        flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+        self.started += 1
+        return flight, True
+
+    async def wait(self, flight: _Flight) -> Any:
+        """Espera o resultado; o último que desistir cancela a execução."""
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # Último interessado desistiu: cancela a execução (libera o provider)
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def in_flight(self, key: Hashable) -> Optional[asyncio.Future]:
+        flight = self._flights.get(key)
+        return flight.task if flight else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
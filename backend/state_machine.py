@@ -25,6 +25,9 @@ class BOStateMachine:
 
     # Ordem das perguntas
     STEPS = ["1.1", "1.2", "1.3", "1.4", "1.5", "1.5.1", "1.5.2", "1.6", "1.7", "1.8", "1.9", "1.9.1", "1.9.2", "complete"]
+
+    # Por sessão só o estado; perguntas e steps ficam na classe
+    __slots__ = ("current_step", "answers", "step_index")
     
     def __init__(self):
         self.current_step = "1.1"  # Começar na primeira pergunta
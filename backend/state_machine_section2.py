@@ -39,6 +39,11 @@ class BOStateMachineSection2:
     - Se resposta = "SIM", percorre perguntas 2.1 até 2.7
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION2_QUESTIONS
+    STEPS = SECTION2_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "2.1"
         self.answers: Dict[str, str] = {}
@@ -33,6 +33,11 @@ class BOStateMachineSection3:
     - Se resposta = "SIM", percorre perguntas 3.2 até 3.8
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION3_QUESTIONS
+    STEPS = SECTION3_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "3.1"
         self.answers: Dict[str, str] = {}
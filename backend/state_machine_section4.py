@@ -30,6 +30,11 @@ class BOStateMachineSection4:
     - Se resposta = "SIM", percorre perguntas 4.2 até 4.5
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION4_QUESTIONS
+    STEPS = SECTION4_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "4.1"
         self.answers: Dict[str, str] = {}
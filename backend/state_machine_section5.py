@@ -27,6 +27,11 @@ class BOStateMachineSection5:
     A seção em si é opcional (só aparece quando há abordagem por fundada suspeita).
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION5_QUESTIONS
+    STEPS = SECTION5_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "5.1"
         self.answers: Dict[str, str] = {}
@@ -33,6 +33,11 @@ class BOStateMachineSection6:
     - Fundamento jurídico: Súmula Vinculante 11 (STF) + Decreto 8.858/2016 + Art. 40, IV
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION6_QUESTIONS
+    STEPS = SECTION6_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "6.1"
         self.answers: Dict[str, str] = {}
@@ -30,6 +30,11 @@ class BOStateMachineSection7:
     - Fundamento jurídico: Lei 11.343/06 (Lei de Drogas) + CPP Arts. 240§2 e 244
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION7_QUESTIONS
+    STEPS = SECTION7_STEPS
+    __slots__ = ("current_step", "answers", "step_index", "section_skipped")
+
     def __init__(self):
         self.current_step = "7.1"
         self.answers: Dict[str, str] = {}
@@ -38,6 +38,11 @@ class BOStateMachineSection8:
     - Fundamento jurídico: Lei 11.343/06 + Lei 13.869/19 + CPP Arts. 282-284
     """
 
+    # Tabelas compartilhadas por todas as instâncias; cada sessão guarda só o estado
+    QUESTIONS = SECTION8_QUESTIONS
+    STEPS = SECTION8_STEPS
+    __slots__ = ("current_step", "answers", "step_index")
+
     def __init__(self):
         self.current_step = "8.1"
         self.answers: Dict[str, str] = {}
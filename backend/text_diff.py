@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Diff palavra a palavra entre o texto antigo e o novo de uma seção
+
+Usado na regeneração após edição de resposta: o frontend aplica as
+operações sobre o texto que já está na tela em vez de trocar tudo.
+Os tokens mantêm o espaço em branco que os segue, então juntar "old" de
+todas as operações devolve o texto antigo e juntar "new" devolve o novo.
+
+similarity() resume o quanto dois textos mudaram (regressão de prompt).
+"""
+import difflib
+import re
+from typing import Dict, List
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text or "")
+
+
+def word_diff(old_text: str, new_text: str) -> List[Dict[str, str]]:
+    """
+    Operações {"op": equal|insert|delete|replace, "old": str, "new": str},
+    na ordem do texto.
+    """
+    old_tokens = tokenize(old_text)
+    new_tokens = tokenize(new_text)
+    matcher = difflib.SequenceMatcher(a=old_tokens, b=new_tokens, autojunk=False)
+    return [
+        {
+            "op": op,
+            "old": "".join(old_tokens[i1:i2]),
+            "new": "".join(new_tokens[j1:j2])
+        }
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+    ]
+
+
+def similarity(old_text: str, new_text: str) -> float:
+    """Fração das palavras em comum (0 a 1), ignorando o espaço em branco."""
+    old_words = (old_text or "").split()
+    new_words = (new_text or "").split()
+    if not old_words and not new_words:
+        return 1.0
+    return difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False).ratio()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: N conclusões de seção simultâneas (caminho síncrono vs assíncrono)
+
+Simula providers com latência fixa (sem rede, sem quota) e mede o tempo total
+de N gerações disparadas ao mesmo tempo dentro do event loop:
+
+- sync:  generate_sectionN_text() chamado direto no handler async (comportamento
+         antigo de /chat) - cada chamada bloqueia o loop, as gerações serializam
+- async: generate_text_async() com cliente assíncrono nativo - as gerações se
+         sobrepõem até LLM_MAX_CONCURRENCY
+
+Executar: python tests/benchmarks/bench_concurrent_generation.py [--n 8] [--latency 0.5]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from llm_service import LLMService
+
+
+def _completion(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class SlowSyncGroq:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        time.sleep(self.latency)
+        return _completion("Texto gerado.")
+
+
+class SlowAsyncGroq:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _completion("Texto gerado.")
+
+
+ANSWERS = {"2.1": "SIM", "2.2": "Rua das Flores, 123, Bairro Centro"}
+
+
+async def run_sync_path(service: LLMService, n: int) -> float:
+    async def handler():
+        # Igual ao /chat antigo: chamada bloqueante dentro de função async
+        return service.generate_section2_text(ANSWERS, provider="groq")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[handler() for _ in range(n)])
+    return time.perf_counter() - start
+
+
+async def run_async_path(service: LLMService, n: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[service.generate_text_async(2, ANSWERS, "groq") for _ in range(n)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=8, help="Gerações simultâneas")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latência simulada por chamada (s)")
+    args = parser.parse_args()
+
+    service = LLMService()
+    service.cache = None  # medir o provider, não o cache
+    service.scheduler = None  # nem a quota
+    service.groq_client = SlowSyncGroq(args.latency)
+    service.groq_async_client = SlowAsyncGroq(args.latency)
+
+    sync_elapsed = asyncio.run(run_sync_path(service, args.n))
+    async_elapsed = asyncio.run(run_async_path(service, args.n))
+
+    print(f"{args.n} gerações simultâneas, latência simulada {args.latency:.2f}s cada")
+    print(f"  sync  (bloqueante): {sync_elapsed:6.2f}s")
+    print(f"  async (nativo):     {async_elapsed:6.2f}s")
+    print(f"  speedup:            {sync_elapsed / async_elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: memória por sessão (dict + state machines com __dict__ vs SessionState com __slots__)
+
+Monta N sessões no formato de antes e no de agora e mede com tracemalloc
+os bytes alocados por sessão (sessão, state machines, respostas, textos,
+chave do dict de sessões):
+
+- antes:  dict livre por sessão, state machines com __dict__ por instância
+- depois: SessionState (session_state.py) e state machines com __slots__
+
+Dois cenários: sessão recém-criada (/new_session) e sessão em andamento
+(Seção 1 respondida com texto gerado, Seção 2 na 5ª pergunta).
+
+Executar: python tests/benchmarks/bench_session_memory.py [--counts 1000,10000,100000]
+"""
+import sys
+import os
+import argparse
+import gc
+import time
+import tracemalloc
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from session_state import new_session_state, session_footprint
+from state_machine import BOStateMachine
+from state_machine_section2 import BOStateMachineSection2
+
+SECTION1_ANSWERS = [
+    "22/03/2025, 21h11", "Sargento Silva e Soldado Souza, viatura {i}", "190",
+    "Denúncia de venda de drogas na praça {i}", "SIM", "Base do 5º BPM",
+    "Não houve alterações", "Praça Central, {i}, Bairro Centro", "Não informado",
+    "NÃO", "SIM", "Escola Estadual Rui Barbosa", "300 metros"
+]
+SECTION2_ANSWERS = ["SIM", "Rua das Flores, {i}", "Gol prata placa ABC{i}", "Sd. Faria viu o veículo"]
+
+
+class LegacyStateMachine:
+    """Só o estado, com __dict__ por instância (como as state machines antes dos slots)."""
+
+    def __init__(self, state_machine):
+        self.current_step = state_machine.current_step
+        self.answers = state_machine.answers
+        self.step_index = state_machine.step_index
+        if hasattr(state_machine, "section_skipped"):
+            self.section_skipped = state_machine.section_skipped
+
+
+def _answer(sm, template: str, i: int) -> None:
+    sm.store_answer(template.format(i=i))
+    sm.next_step()
+
+
+def _filled_sections(i: int):
+    sm1 = BOStateMachine()
+    for template in SECTION1_ANSWERS:
+        _answer(sm1, template, i)
+    sm2 = BOStateMachineSection2()
+    for template in SECTION2_ANSWERS:
+        _answer(sm2, template, i)
+    return {1: sm1, 2: sm2}
+
+
+def make_legacy(i: int, filled: bool) -> dict:
+    sections = _filled_sections(i) if filled else {1: BOStateMachine()}
+    return {
+        "bo_id": f"BO-20251220-{i:08x}",
+        "logged_to_db": filled,
+        "answer_count": len(SECTION1_ANSWERS) + len(SECTION2_ANSWERS) if filled else 0,
+        "pending_events": [],
+        "ip_address": f"10.0.{i % 256}.{i // 256 % 256}",
+        "user_agent": f"Mozilla/5.0 (Linux; Android 14) BO/{i}",
+        "sections": {number: LegacyStateMachine(sm) for number, sm in sections.items()},
+        "current_section": 2 if filled else 1,
+        "section1_text": f"Cumprindo a ordem de serviço {i}, a equipe foi acionada. " * 10 if filled else "",
+        "section2_text": "",
+        "section3_text": "",
+        "section4_text": "",
+        "section5_text": "",
+        "section6_text": "",
+        "section7_text": "",
+        "section8_text": ""
+    }
+
+
+def make_compact(i: int, filled: bool):
+    session_data = new_session_state(
+        f"BO-20251220-{i:08x}",
+        ip_address=f"10.0.{i % 256}.{i // 256 % 256}",
+        user_agent=f"Mozilla/5.0 (Linux; Android 14) BO/{i}"
+    )
+    if filled:
+        session_data["sections"] = _filled_sections(i)
+        session_data["logged_to_db"] = True
+        session_data["answer_count"] = len(SECTION1_ANSWERS) + len(SECTION2_ANSWERS)
+        session_data["current_section"] = 2
+        session_data["section1_text"] = f"Cumprindo a ordem de serviço {i}, a equipe foi acionada. " * 10
+    return session_data
+
+
+def bytes_per_session(make, count: int, filled: bool):
+    """(bytes por sessão, segundos para montar, uma sessão de exemplo)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    sessions = {f"{i:032x}": make(i, filled) for i in range(count)}
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sample = sessions[f"{0:032x}"]
+    del sessions
+    return allocated / count, elapsed, sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", default="1000,10000,100000", help="quantidades de sessões, separadas por vírgula")
+    args = parser.parse_args()
+    counts = [int(count) for count in args.counts.split(",")]
+
+    for filled, label in ((False, "sessão nova"), (True, "sessão em andamento")):
+        print(f"\n{label}")
+        print(f"  {'sessões':>8}  {'antes (B/sessão)':>17}  {'depois (B/sessão)':>18}  {'redução':>8}")
+        for count in counts:
+            before, _, _ = bytes_per_session(make_legacy, count, filled)
+            after, _, sample = bytes_per_session(make_compact, count, filled)
+            print(f"  {count:>8}  {before:>17,.0f}  {after:>18,.0f}  {1 - after / before:>8.0%}")
+        print(f"  session_footprint() de uma sessão (depois): {session_footprint(sample):,} B")
+
+
+if __name__ == "__main__":
+    main()
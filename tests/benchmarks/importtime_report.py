@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório de import-time do backend (estilo python -X importtime) com orçamento
+
+Sobe um processo novo (como o Render ao acordar do free tier), importa
+backend/main.py, roda o lifespan e faz o primeiro GET /health, e mede:
+
+- tempo total do início do processo até a resposta do /health
+- tempo cumulativo de import dos módulos de topo (os mais caros primeiro)
+- se algum SDK de provider (google.generativeai, groq) foi importado antes do
+  /health - eles devem carregar só no primeiro uso ou no warm-up
+
+Falha (exit 1) se o cold start passar de --budget-ms ou se um SDK for
+importado. Roda no CI (.github/workflows/test.yml).
+
+Executar: python tests/benchmarks/importtime_report.py [--budget-ms 3000] [--top 15]
+"""
+import sys
+import os
+import argparse
+import json
+import re
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+# SDKs que não podem entrar no caminho até o primeiro /health
+DEFERRED_MODULES = ["google.generativeai", "groq"]
+
+# Executado no processo medido: import + lifespan + primeiro /health
+COLD_START_CODE = """
+import json, sys, time
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    status = client.get("/health").status_code
+    loaded = [m for m in {deferred!r} if m in sys.modules]
+    done_at = time.time()
+print(json.dumps({{"status": status, "done_at": done_at, "loaded": loaded}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Linhas do -X importtime como {module, self_us, cumulative_us, depth}."""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2
+            })
+    return entries
+
+
+def measure_cold_start() -> Dict:
+    """Roda o cold start num processo novo (banco SQLite descartável, sem warm-up)."""
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": BACKEND_DIR,
+        "LLM_WARMUP": "false",
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "test-key-not-used"),
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "test-key-not-used"),
+    })
+    env.pop("DATABASE_URL", None)
+
+    code = COLD_START_CODE.format(deferred=DEFERRED_MODULES)
+    with tempfile.TemporaryDirectory() as workdir:
+        started_at = time.time()  # inclui o startup do interpretador
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=workdir, env=env, capture_output=True, text=True, timeout=120
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start falhou:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["elapsed_ms"] = (report.pop("done_at") - started_at) * 1000
+    report["imports"] = parse_importtime(result.stderr)
+    return report
+
+
+def top_level(imports: List[Dict], top: int) -> List[Dict]:
+    """Módulos importados direto pelo main (profundidade 1), do mais caro ao mais barato."""
+    first_level = [e for e in imports if e["depth"] == 1]
+    return sorted(first_level, key=lambda e: e["cumulative_us"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "3000")))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    report = measure_cold_start()
+    main_entry = next((e for e in report["imports"] if e["module"] == "main"), None)
+
+    print(f"{'cumulativo (ms)':>16}  {'próprio (ms)':>13}  módulo")
+    for entry in top_level(report["imports"], args.top):
+        print(f"{entry['cumulative_us'] / 1000:16.1f}  {entry['self_us'] / 1000:13.1f}  {entry['module']}")
+    print()
+    if main_entry:
+        print(f"import main:                 {main_entry['cumulative_us'] / 1000:.0f} ms")
+    print(f"cold start até 1º /health:   {report['elapsed_ms']:.0f} ms (orçamento {args.budget_ms:.0f} ms)")
+    print(f"SDKs carregados no caminho:  {', '.join(report['loaded']) or 'nenhum'}")
+
+    failures = []
+    if report["status"] != 200:
+        failures.append(f"/health respondeu {report['status']}")
+    if report["elapsed_ms"] > args.budget_ms:
+        failures.append("cold start acima do orçamento")
+    if report["loaded"]:
+        failures.append(f"SDK importado antes do primeiro uso: {', '.join(report['loaded'])}")
+
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
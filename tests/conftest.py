@@ -2,10 +2,116 @@
 """
 Fixtures pytest compartilhadas para todos os testes
 """
+import os
+import asyncio
 import pytest
 import requests
+from types import SimpleNamespace
 from typing import Dict
 
+# Testes não abrem conexões reais com os providers no startup do app
+os.environ.setdefault("LLM_WARMUP", "false")
+# nem gravam snapshot de sessões no diretório atual
+os.environ.setdefault("SESSION_SNAPSHOT_PATH", "")
+
+
+class FakeGemini:
+    """Imita GenerativeModel: espera `latency` segundos e levanta `error` ou devolve `text`"""
+
+    def __init__(self, latency: float = 0, text: str = " Texto do Gemini. ", error: Exception = None):
+        self.latency = latency
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def _respond(self):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(text=self.text)
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return self._respond()
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._respond()
+
+
+class FakeAsyncGroq:
+    """
+    Imita AsyncGroq: cada chamada "demora" `latency` segundos sem bloquear o
+    loop e levanta `error` ou devolve `text`. Guarda os parâmetros de cada
+    chamada (requests), o pico de chamadas simultâneas e se foi cancelada.
+    """
+
+    def __init__(self, latency: float = 0, text: str = "Texto do Groq.", error: Exception = None):
+        self.latency = latency
+        self.text = text
+        self.error = error
+        self.calls = 0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        self.requests.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        finally:
+            self.in_flight -= 1
+        if self.error:
+            raise self.error
+        message = SimpleNamespace(content=self.text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_gemini():
+    """Classe FakeGemini (GenerativeModel falso)"""
+    return FakeGemini
+
+
+@pytest.fixture
+def fake_groq():
+    """Classe FakeAsyncGroq (AsyncGroq falso)"""
+    return FakeAsyncGroq
+
+
+@pytest.fixture
+def llm_service():
+    """
+    Fábrica de LLMService isolado: sem cache, sem agendador de quota e sem
+    chamar API real. gemini/groq recebem os providers falsos (None = sem
+    API key); template_fallback desligado para os erros dos providers
+    chegarem ao chamador. Outros atributos vão em **attrs.
+    """
+    from llm_service import LLMService  # backend no path pelos próprios testes unitários
+
+    def make(gemini=None, groq=None, provider_chain=("gemini", "groq"), template_fallback=False, **attrs):
+        service = LLMService()
+        service.cache = None
+        service.scheduler = None
+        service.provider_chain = list(provider_chain)
+        service.gemini_model = gemini
+        service.gemini_section_models = {}
+        service.groq_async_client = groq
+        service.template_fallback = template_fallback
+        for name, value in attrs.items():
+            setattr(service, name, value)
+        return service
+
+    return make
+
 @pytest.fixture
 def api_base_url():
     """Base URL do backend para testes"""
@@ -3,6 +3,9 @@
 """
 Automação de Screenshots e Vídeo para Releases do BO Assistant
 Versão 2.0 - Com gravação de vídeo real (não slideshow)
+
+Para não gastar quota dos providers, suba o backend com
+LLM_REPLAY_MODE=replay (ver README.md, "Sem gastar quota").
 """
 
 import asyncio
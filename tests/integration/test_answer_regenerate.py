@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: PUT /chat/{session_id}/answer/{step}/regenerate
+Valida que só a seção do step editado é regenerada, que resposta igual
+(após normalização) não chama o provider e que o diff vem na resposta.
+
+Executar: python -m pytest tests/integration/test_answer_regenerate.py -v
+"""
+import sys
+import os
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app, sessions
+from backend.state_machine import BOStateMachine
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+ANSWERS_7 = [
+    "SIM",
+    "14 pedras de crack na lata azul, encontradas pelo Soldado Breno",
+    "Nenhum objeto",
+    "O Soldado Faria lacrou as substâncias no invólucro 01 e ficou responsável pelo material até a entrega na CEFLAN 2"
+]
+OLD_TEXT = "O Soldado Breno encontrou 14 pedras de crack na lata azul."
+
+
+def create_session(complete: bool = True):
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    for answer in ANSWERS_7 if complete else ANSWERS_7[:2]:
+        sm7.store_answer(answer)
+        sm7.next_step()
+
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {1: BOStateMachine(), 7: sm7},
+        "current_section": 7,
+        "section1_text": "Texto da seção 1.",
+        "section7_text": OLD_TEXT if complete else ""
+    }
+    return session_id
+
+
+def fake_provider(monkeypatch, text):
+    calls = []
+
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        calls.append((section_number, dict(section_data)))
+        return text, "groq"
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    return calls
+
+
+def test_edit_regenerates_owning_section_with_diff(monkeypatch):
+    new_text = "O Soldado Breno encontrou 20 pedras de crack na lata azul."
+    calls = fake_provider(monkeypatch, new_text)
+    session_id = create_session()
+
+    with TestClient(app) as client:
+        response = client.put(f"/chat/{session_id}/answer/7.2/regenerate", json={
+            "message": "20 pedras de crack na lata azul, encontradas pelo Soldado Breno",
+            "llm_provider": "groq"
+        })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["regenerated"] is True
+    assert body["section"] == 7
+    assert body["old_text"] == OLD_TEXT
+    assert body["generated_text"] == new_text
+    changes = [op for op in body["diff"] if op["op"] != "equal"]
+    assert changes == [{"op": "replace", "old": "14 ", "new": "20 "}]
+    assert "".join(op["new"] for op in body["diff"]) == new_text
+
+    assert len(calls) == 1 and calls[0][0] == 7
+    assert calls[0][1]["7.2"].startswith("20 pedras")
+    session_data = sessions[session_id]
+    assert session_data["section7_text"] == new_text
+    assert session_data["section1_text"] == "Texto da seção 1."
+    assert [e["event_type"] for e in session_data["pending_events"]] == ["section7_completed"]
+
+
+def test_same_normalized_answer_skips_provider(monkeypatch):
+    calls = fake_provider(monkeypatch, "Não deveria ser usado.")
+    session_id = create_session()
+
+    with TestClient(app) as client:
+        response = client.put(f"/chat/{session_id}/answer/7.2/regenerate", json={
+            "message": "  14 pedras de crack  na lata azul, encontradas pelo Soldado Breno ",
+            "llm_provider": "groq"
+        })
+
+    body = response.json()
+    assert body["regenerated"] is False
+    assert body["reason"] == "answer_unchanged"
+    assert body["generated_text"] == OLD_TEXT
+    assert body["diff"] == []
+    assert calls == []
+
+
+def test_incomplete_section_only_updates_answer(monkeypatch):
+    calls = fake_provider(monkeypatch, "Não deveria ser usado.")
+    session_id = create_session(complete=False)
+
+    with TestClient(app) as client:
+        response = client.put(f"/chat/{session_id}/answer/7.2/regenerate", json={
+            "message": "20 pedras de crack na lata azul, encontradas pelo Soldado Breno"
+        })
+
+    body = response.json()
+    assert body["regenerated"] is False
+    assert body["reason"] == "section_incomplete"
+    assert sessions[session_id]["sections"][7].answers["7.2"].startswith("20 pedras")
+    assert calls == []
+
+
+def test_rebuilt_session_with_same_answer_skips_provider_and_edit_event(monkeypatch):
+    calls = fake_provider(monkeypatch, "Não deveria ser usado.")
+    events = [
+        {"event_type": "answer_submitted", "data": {"step": f"7.{index}", "answer": answer}}
+        for index, answer in enumerate(ANSWERS_7, start=1)
+    ] + [{"event_type": "section7_completed", "data": {"section": 7, "generated_text": OLD_TEXT}}]
+    replayer_class = type(main_module.session_replayer)
+    monkeypatch.setattr(main_module, "session_replayer", replayer_class(lambda bo_id: len(events), lambda bo_id: events))
+    logged = []
+    monkeypatch.setattr(main_module.BOLogger, "log_event", staticmethod(lambda bo_id, event_type, data=None: logged.append(event_type)))
+
+    with TestClient(app) as client:
+        response = client.put(f"/chat/{uuid.uuid4()}/answer/7.2/regenerate", json={
+            "message": ANSWERS_7[1], "bo_id": "BO-TEST-REBUILT"
+        })
+
+    body = response.json()
+    assert body["reason"] == "answer_unchanged"
+    assert body["generated_text"] == OLD_TEXT
+    assert calls == []
+    assert "answer_edited" not in logged
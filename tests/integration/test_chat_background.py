@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: POST /chat?background=1 + GET /jobs/{job_id}
+Valida que a conclusão de seção responde 202 sem esperar o LLM e que o job
+grava o texto na sessão e o evento sectionN_completed ao terminar.
+
+Executar: python -m pytest tests/integration/test_chat_background.py -v
+"""
+import sys
+import os
+import asyncio
+import time
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app, sessions
+from backend.state_machine import BOStateMachine
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+ANSWER_7_4 = "O Soldado Faria lacrou as substâncias no invólucro 01 e ficou responsável pelo material até a entrega na CEFLAN 2"
+
+
+def create_session_at_step_7_4():
+    """Sessão em memória (ainda não registrada no banco) parada na pergunta 7.4"""
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    for answer in ["SIM", "14 pedras de crack na lata azul, encontradas pelo Soldado Breno", "Nenhum objeto"]:
+        sm7.store_answer(answer)
+        sm7.next_step()
+
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {1: BOStateMachine(), 7: sm7},
+        "current_section": 7,
+        "section7_text": ""
+    }
+    return session_id
+
+
+def wait_for_job(client, job_id, timeout=5.0):
+    """Consulta GET /jobs/{job_id} até o job terminar"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} não terminou em {timeout}s")
+
+
+def post_answer(client, session_id):
+    return client.post("/chat?background=1", json={
+        "session_id": session_id,
+        "message": ANSWER_7_4,
+        "current_section": 7,
+        "llm_provider": "groq"
+    })
+
+
+def test_background_returns_202_and_job_stores_text(monkeypatch):
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        await asyncio.sleep(0.3)
+        return "O Soldado Breno encontrou 14 pedras.", "groq"
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id = create_session_at_step_7_4()
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        response = post_answer(client, session_id)
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 202
+        assert elapsed < 0.3  # não esperou o LLM
+        body = response.json()
+        assert body["status"] == "queued"
+        assert response.headers["location"] == body["status_url"] == f"/jobs/{body['job_id']}"
+
+        job = wait_for_job(client, body["job_id"])
+
+    assert job["status"] == "done"
+    assert job["result"]["generated_text"] == "O Soldado Breno encontrou 14 pedras."
+    assert job["result"]["is_section_complete"] is True
+
+    session_data = sessions[session_id]
+    assert session_data["section7_text"] == "O Soldado Breno encontrou 14 pedras."
+    completed = [e for e in session_data["pending_events"] if e["event_type"] == "section7_completed"]
+    assert len(completed) == 1
+
+
+def test_background_job_records_error(monkeypatch):
+    async def fail(section_number, section_data, provider="gemini", use_cache=True):
+        raise Exception("Limite de requisições do Groq atingido (429)")
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fail)
+    session_id = create_session_at_step_7_4()
+
+    with TestClient(app) as client:
+        job = wait_for_job(client, post_answer(client, session_id).json()["job_id"])
+
+    assert job["status"] == "error"
+    assert job["error"]["status_code"] == 429
+    assert sessions[session_id]["section7_text"] == ""
+    errors = [e for e in sessions[session_id]["pending_events"] if e["event_type"] == "generation_error"]
+    assert len(errors) == 1
+
+
+def test_job_finishes_after_client_disconnects(monkeypatch):
+    """O job continua depois que a requisição original já terminou"""
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        await asyncio.sleep(0.2)
+        return "Texto gravado sem cliente.", "groq"
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id = create_session_at_step_7_4()
+
+    # Sair do contexto encerra o app; o lifespan espera os jobs aceitos
+    with TestClient(app) as client:
+        assert post_answer(client, session_id).status_code == 202
+
+    assert sessions[session_id]["section7_text"] == "Texto gravado sem cliente."
+
+
+def test_unknown_job_returns_404():
+    with TestClient(app) as client:
+        assert client.get("/jobs/nao-existe").status_code == 404
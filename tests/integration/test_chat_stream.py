@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: POST /chat?stream=1 (Server-Sent Events)
+Valida que tokens são emitidos conforme chegam e que o texto final é
+gravado em sectionN_text e no evento sectionN_completed ao fechar o stream.
+
+Executar: python -m pytest tests/integration/test_chat_stream.py -v
+"""
+import sys
+import os
+import json
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app, sessions
+from backend.state_machine import BOStateMachine
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+client = TestClient(app)
+
+ANSWER_7_4 = "O Soldado Faria lacrou as substâncias no invólucro 01 e ficou responsável pelo material até a entrega na CEFLAN 2"
+
+
+def create_session_at_step_7_4():
+    """Sessão em memória (ainda não registrada no banco) parada na pergunta 7.4"""
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    for answer in ["SIM", "14 pedras de crack na lata azul, encontradas pelo Soldado Breno", "Nenhum objeto"]:
+        sm7.store_answer(answer)
+        sm7.next_step()
+
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {1: BOStateMachine(), 7: sm7},
+        "current_section": 7,
+        "section7_text": ""
+    }
+    return session_id
+
+
+def parse_sse(body: str):
+    """Converte corpo text/event-stream em lista de (evento, dados)"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_tokens_and_stores_final_text(monkeypatch):
+    async def fake_stream(section_number, section_data, provider="gemini", served=None):
+        for chunk in ["O Soldado ", "Breno encontrou ", "14 pedras.  "]:
+            yield chunk
+
+    monkeypatch.setattr(main_module.llm_service, "stream_text_async", fake_stream)
+    session_id = create_session_at_step_7_4()
+
+    response = client.post("/chat?stream=1", json={
+        "session_id": session_id,
+        "message": ANSWER_7_4,
+        "current_section": 7,
+        "llm_provider": "groq"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    assert [e for e, _ in events] == ["token", "token", "token", "done"]
+    assert events[0][1]["text"] == "O Soldado "
+
+    done = events[-1][1]
+    assert done["generated_text"] == "O Soldado Breno encontrou 14 pedras."
+    assert done["is_section_complete"] is True
+
+    session_data = sessions[session_id]
+    assert session_data["section7_text"] == "O Soldado Breno encontrou 14 pedras."
+    completed = [e for e in session_data["pending_events"] if e["event_type"] == "section7_completed"]
+    assert len(completed) == 1
+    assert completed[0]["data"]["llm_provider"] == "groq"
+
+    del sessions[session_id]
+
+
+def test_stream_reports_provider_error_as_event(monkeypatch):
+    async def failing_stream(section_number, section_data, provider="gemini", served=None):
+        yield "O Soldado "
+        raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
+
+    monkeypatch.setattr(main_module.llm_service, "stream_text_async", failing_stream)
+    session_id = create_session_at_step_7_4()
+
+    response = client.post("/chat?stream=1", json={
+        "session_id": session_id,
+        "message": ANSWER_7_4,
+        "current_section": 7,
+        "llm_provider": "gemini"
+    })
+
+    events = parse_sse(response.text)
+    assert [e for e, _ in events] == ["token", "error"]
+    assert events[-1][1]["status_code"] == 429
+    assert sessions[session_id]["section7_text"] == ""
+
+    del sessions[session_id]
+
+
+def test_chat_without_providers_returns_template_text(monkeypatch):
+    async def unavailable(prompt, candidates):
+        raise main_module.ProviderUnavailableError("Sem quota", provider="groq", reason="quota")
+
+    monkeypatch.setattr(main_module.llm_service, "_call_with_failover", unavailable)
+    monkeypatch.setattr(main_module.llm_service, "cache", None)
+    monkeypatch.setattr(main_module.llm_service, "template_fallback", True)
+    session_id = create_session_at_step_7_4()
+
+    response = client.post("/chat", json={
+        "session_id": session_id,
+        "message": ANSWER_7_4,
+        "current_section": 7,
+        "llm_provider": "gemini"
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["fallback"] is True
+    assert body["generated_text"].startswith("Foram apreendidos 14 pedras de crack")
+    completed = [e for e in sessions[session_id]["pending_events"] if e["event_type"] == "section7_completed"]
+    assert completed[0]["data"]["llm_provider"] == "template"
+    assert completed[0]["data"]["fallback"] is True
+
+    del sessions[session_id]
+
+
+def test_non_completing_answer_stays_json():
+    """Com stream=1, respostas que não concluem a seção continuam em JSON"""
+    session_id = create_session_at_step_7_4()
+
+    response = client.post("/chat?stream=1", json={
+        "session_id": session_id,
+        "message": "curta",
+        "current_section": 7
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["validation_error"]
+
+    del sessions[session_id]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: POST /generate_all
+Valida que todas as seções concluídas e sem texto são geradas em paralelo
+numa única requisição, com resultado (ou erro) por seção.
+
+Executar: python -m pytest tests/integration/test_generate_all.py -v
+"""
+import sys
+import os
+import asyncio
+import time
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app, sessions
+from backend.llm_service import WholeBOResult
+from backend.state_machine import BOStateMachine
+from backend.state_machine_section2 import BOStateMachineSection2
+from backend.state_machine_section3 import BOStateMachineSection3
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+client = TestClient(app)
+
+
+def completed(state_machine, answers):
+    """State machine já concluída com as respostas dadas (como após /sync_session)"""
+    state_machine.answers = dict(answers)
+    state_machine.current_step = "complete"
+    return state_machine
+
+
+def create_restored_session():
+    """Seções 1 e 7 concluídas sem texto, 2 pulada, 3 ainda em andamento"""
+    session_id = str(uuid.uuid4())
+    sm2 = BOStateMachineSection2()
+    sm2.store_answer("NÃO")
+
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {
+            1: completed(BOStateMachine(), {"1.1": "22/03/2025, 21h11", "1.2": "Sargento Silva"}),
+            2: sm2,
+            3: BOStateMachineSection3(),
+            7: completed(BOStateMachineSection7(), {"7.1": "SIM", "7.2": "14 pedras de crack"}),
+        },
+        "current_section": 7,
+        "section1_text": "",
+        "section7_text": ""
+    }
+    return session_id
+
+
+def test_generates_pending_sections_concurrently(monkeypatch):
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        await asyncio.sleep(0.3)
+        return f"Texto da Seção {section_number}.", "groq"
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id = create_restored_session()
+
+    start = time.perf_counter()
+    response = client.post("/generate_all", json={"session_id": session_id, "llm_provider": "gemini"})
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["section"] for r in body["results"]] == [1, 7]
+    assert all(r["status"] == "generated" for r in body["results"])
+    assert body["skipped_sections"] == [2]
+    assert elapsed < 0.55  # duas seções de 0.3s em paralelo, não 0.6s
+
+    session_data = sessions[session_id]
+    assert session_data["section7_text"] == "Texto da Seção 7."
+    completed_events = [e for e in session_data["pending_events"] if e["event_type"].endswith("_completed")]
+    assert {e["event_type"] for e in completed_events} == {"section1_completed", "section7_completed"}
+    assert completed_events[0]["data"]["llm_provider"] == "groq"
+    assert completed_events[0]["data"]["failover_from"] == "gemini"
+
+    # Segunda chamada: nada pendente
+    again = client.post("/generate_all", json={"session_id": session_id}).json()
+    assert again["results"] == []
+    assert again["already_generated"] == [1, 7]
+
+    del sessions[session_id]
+
+
+def test_error_in_one_section_does_not_block_others(monkeypatch):
+    async def flaky_generate(section_number, section_data, provider="gemini", use_cache=True):
+        if section_number == 7:
+            raise Exception("Quota diária do Gemini excedida. Tente novamente mais tarde ou use outro modelo.")
+        return "Texto da Seção 1.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", flaky_generate)
+    session_id = create_restored_session()
+
+    body = client.post("/generate_all", json={"session_id": session_id}).json()
+    results = {r["section"]: r for r in body["results"]}
+
+    assert results[1]["status"] == "generated"
+    assert results[7]["status"] == "error"
+    assert results[7]["status_code"] == 429
+    assert sessions[session_id]["section7_text"] == ""
+
+    del sessions[session_id]
+
+
+def test_concurrency_cap(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+
+    async def counting_generate(section_number, section_data, provider="gemini", use_cache=True):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return "Texto.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", counting_generate)
+    monkeypatch.setattr(main_module, "GENERATE_ALL_CONCURRENCY", 1)
+    session_id = create_restored_session()
+
+    client.post("/generate_all", json={"session_id": session_id})
+    assert in_flight["max"] == 1
+
+    del sessions[session_id]
+
+
+def test_single_call_with_per_section_fallback(monkeypatch):
+    calls = {"single": [], "section": []}
+
+    async def fake_generate_bo(sections, provider="gemini", use_cache=True):
+        calls["single"].append(sorted(sections))
+        return WholeBOResult({1: "Texto da Seção 1."}, {1: "gemini"}, {7: "missing"})
+
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        calls["section"].append(section_number)
+        return f"Texto individual da Seção {section_number}.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_bo_async", fake_generate_bo)
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id = create_restored_session()
+
+    body = client.post("/generate_all", json={"session_id": session_id, "single_call": True}).json()
+    results = {r["section"]: r for r in body["results"]}
+
+    assert calls == {"single": [[1, 7]], "section": [7]}
+    assert results[1]["single_call"] is True
+    assert results[1]["generated_text"] == "Texto da Seção 1."
+    assert results[7]["status"] == "generated"
+    assert results[7]["fallback_reason"] == "missing"
+    assert sessions[session_id]["section7_text"] == "Texto individual da Seção 7."
+    events = {e["event_type"]: e["data"] for e in sessions[session_id]["pending_events"]}
+    assert events["section1_completed"]["single_call"] is True
+    assert "single_call" not in events["section7_completed"]
+
+    del sessions[session_id]
+
+
+def test_single_call_error_falls_back_to_every_section(monkeypatch):
+    async def failing_generate_bo(sections, provider="gemini", use_cache=True):
+        raise Exception("Erro ao gerar texto da Seção 0 com Gemini: 500")
+
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        return f"Texto da Seção {section_number}.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_bo_async", failing_generate_bo)
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    monkeypatch.setattr(main_module, "GENERATE_ALL_SINGLE_CALL", True)
+    session_id = create_restored_session()
+
+    body = client.post("/generate_all", json={"session_id": session_id}).json()
+
+    assert [(r["section"], r["status"], r["fallback_reason"]) for r in body["results"]] == [
+        (1, "generated", "error"),
+        (7, "generated", "error")
+    ]
+
+    del sessions[session_id]
+
+
+def test_template_fallback_is_upgraded_on_next_call(monkeypatch):
+    llm_up = {"value": False}
+
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        if not llm_up["value"]:
+            return f"Modelo da Seção {section_number}.", main_module.FALLBACK_PROVIDER
+        return f"Texto da Seção {section_number}.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id = create_restored_session()
+
+    body = client.post("/generate_all", json={"session_id": session_id}).json()
+    assert [(r["section"], r["fallback"]) for r in body["results"]] == [(1, True), (7, True)]
+    assert sessions[session_id]["section7_fallback"] is True
+    events = [e["data"] for e in sessions[session_id]["pending_events"] if e["event_type"] == "section7_completed"]
+    assert events[0]["fallback"] is True
+
+    # Provider voltou: as seções com texto de modelo são geradas de novo
+    llm_up["value"] = True
+    body = client.post("/generate_all", json={"session_id": session_id}).json()
+    assert [(r["section"], r["fallback"]) for r in body["results"]] == [(1, None), (7, None)]
+    assert body["already_generated"] == []
+    assert sessions[session_id]["section7_text"] == "Texto da Seção 7."
+    assert sessions[session_id]["section7_fallback"] is False
+
+    again = client.post("/generate_all", json={"session_id": session_id}).json()
+    assert again["already_generated"] == [1, 7]
+
+    del sessions[session_id]
+
+
+def test_unknown_session_returns_404():
+    response = client.post("/generate_all", json={"session_id": "nao-existe"})
+    assert response.status_code == 404
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: cancelamento da geração quando o cliente desconecta
+Valida que a chamada ao provider é cancelada, que nada é gravado em
+sectionN_text e que o evento generation_cancelled é registrado.
+
+Executar: python -m pytest tests/integration/test_generation_cancel.py -v
+"""
+import sys
+import os
+import asyncio
+import time
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+from fastapi import HTTPException
+
+import backend.main as main_module
+from backend.main import sessions, generate_section_response
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+class FakeRequest:
+    """Imita Request.is_disconnected(): desconecta depois de `after` segundos"""
+
+    def __init__(self, after: float):
+        self.deadline = time.monotonic() + after
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+def create_completed_section7_session():
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    sm7.answers = {"7.1": "SIM", "7.2": "14 pedras de crack"}
+    sm7.current_step = "complete"
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {7: sm7},
+        "current_section": 7,
+        "section7_text": ""
+    }
+    return session_id, sm7
+
+
+def test_disconnect_cancels_provider_call(monkeypatch):
+    state = {"cancelled": False}
+
+    async def slow_generate(section_number, section_data, provider="gemini", use_cache=True):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return "Nunca chega.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", slow_generate)
+    monkeypatch.setattr(main_module, "DISCONNECT_POLL_INTERVAL", 0.02)
+    session_id, sm7 = create_completed_section7_session()
+
+    start = time.perf_counter()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(generate_section_response(session_id, sm7, 7, "groq", None, request=FakeRequest(after=0.1)))
+
+    assert time.perf_counter() - start < 1
+    assert error.value.status_code == 499
+    assert state["cancelled"] is True
+
+    session_data = sessions[session_id]
+    assert session_data["section7_text"] == ""
+    events = [e["event_type"] for e in session_data["pending_events"]]
+    assert events == ["generation_cancelled"]
+    assert session_data["pending_events"][0]["data"]["reason"] == "client_disconnected"
+
+
+def test_connected_client_gets_text(monkeypatch):
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        await asyncio.sleep(0.1)
+        return "Texto gerado.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    monkeypatch.setattr(main_module, "DISCONNECT_POLL_INTERVAL", 0.02)
+    session_id, sm7 = create_completed_section7_session()
+
+    response = asyncio.run(generate_section_response(session_id, sm7, 7, "groq", None, request=FakeRequest(after=60)))
+
+    assert response.generated_text == "Texto gerado."
+    assert [e["event_type"] for e in sessions[session_id]["pending_events"]] == ["section7_completed"]
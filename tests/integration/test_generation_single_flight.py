@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: conclusões duplicadas da mesma seção (duplo toque/retry)
+Valida que duas gerações simultâneas com as mesmas respostas (com ou sem
+streaming) fazem uma só chamada ao provider, devolvem o mesmo texto e
+registram um só sectionN_completed.
+
+Executar: python -m pytest tests/integration/test_generation_single_flight.py -v
+"""
+import sys
+import os
+import asyncio
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+from fastapi import HTTPException
+
+import backend.main as main_module
+from backend.main import sessions, generate_section_response, stream_section_generation
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+def create_completed_section7_session():
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    sm7.answers = {"7.1": "SIM", "7.2": "14 pedras de crack"}
+    sm7.current_step = "complete"
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {7: sm7},
+        "current_section": 7,
+        "section7_text": ""
+    }
+    return session_id, sm7
+
+
+def test_double_submit_shares_one_generation(monkeypatch):
+    calls = []
+
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        calls.append(section_number)
+        await asyncio.sleep(0.1)
+        return "O Soldado Breno encontrou 14 pedras.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id, sm7 = create_completed_section7_session()
+
+    async def double_tap():
+        return await asyncio.gather(
+            generate_section_response(session_id, sm7, 7, "groq", None),
+            generate_section_response(session_id, sm7, 7, "groq", None)
+        )
+
+    first, second = asyncio.run(double_tap())
+
+    assert calls == [7]
+    assert first.generated_text == second.generated_text == "O Soldado Breno encontrou 14 pedras."
+    events = [e["event_type"] for e in sessions[session_id]["pending_events"]]
+    assert events == ["section7_completed"]
+
+
+def test_shared_error_is_logged_once(monkeypatch):
+    async def failing_generate(section_number, section_data, provider="gemini", use_cache=True):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("falha no provider")
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", failing_generate)
+    session_id, sm7 = create_completed_section7_session()
+
+    async def double_tap():
+        return await asyncio.gather(
+            generate_section_response(session_id, sm7, 7, "groq", None),
+            generate_section_response(session_id, sm7, 7, "groq", None),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(double_tap())
+
+    assert all(isinstance(r, HTTPException) and r.status_code == 500 for r in results)
+    events = [e["event_type"] for e in sessions[session_id]["pending_events"]]
+    assert events == ["generation_error"]
+
+
+def stream_events(session_id, sm7):
+    """Nomes dos eventos SSE de uma geração com ?stream=1"""
+    async def collect():
+        events = []
+        async for message in stream_section_generation(session_id, sm7, 7, "groq", None):
+            name = message.split("\n", 1)[0].removeprefix("event: ")
+            events.append(name)
+        return events
+    return collect()
+
+
+def fake_stream_counting(calls):
+    async def fake_stream(section_number, section_data, provider="gemini", served=None):
+        calls.append(section_number)
+        for piece in ["O Soldado Breno ", "encontrou 14 pedras."]:
+            await asyncio.sleep(0.05)
+            yield piece
+    return fake_stream
+
+
+def test_double_submit_while_streaming_shares_one_generation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main_module.llm_service, "stream_text_async", fake_stream_counting(calls))
+    session_id, sm7 = create_completed_section7_session()
+
+    async def double_tap():
+        return await asyncio.gather(stream_events(session_id, sm7), stream_events(session_id, sm7))
+
+    first, second = asyncio.run(double_tap())
+
+    assert calls == [7]
+    assert first == ["token", "token", "done"]
+    assert second == ["done"]
+    events = [e["event_type"] for e in sessions[session_id]["pending_events"]]
+    assert events == ["section7_completed"]
+
+
+def test_plain_request_waits_for_streaming_generation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main_module.llm_service, "stream_text_async", fake_stream_counting(calls))
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", None)  # não pode ser chamado
+    session_id, sm7 = create_completed_section7_session()
+
+    async def stream_then_retry():
+        streaming = asyncio.ensure_future(stream_events(session_id, sm7))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(streaming, generate_section_response(session_id, sm7, 7, "groq", None))
+
+    events, response = asyncio.run(stream_then_retry())
+
+    assert calls == [7]
+    assert events[-1] == "done"
+    assert response.generated_text == "O Soldado Breno encontrou 14 pedras."
+    assert [e["event_type"] for e in sessions[session_id]["pending_events"]] == ["section7_completed"]
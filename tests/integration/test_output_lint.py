@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: linter aplicado ao texto gerado antes de ir para a sessão
+Valida que o texto corrigido é o que fica em sectionN_text e na resposta,
+e que correções/sinalizações vão para o evento sectionN_completed.
+
+Executar: python -m pytest tests/integration/test_output_lint.py -v
+"""
+import sys
+import os
+import asyncio
+import uuid
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import backend.main as main_module
+from backend.main import sessions, generate_section_response
+from backend.state_machine_section7 import BOStateMachineSection7
+
+
+def create_completed_section7_session():
+    session_id = str(uuid.uuid4())
+    sm7 = BOStateMachineSection7()
+    sm7.answers = {"7.1": "SIM", "7.2": "14 pedras de crack"}
+    sm7.current_step = "complete"
+    sessions[session_id] = {
+        "bo_id": f"BO-TEST-{uuid.uuid4().hex[:6].upper()}",
+        "logged_to_db": False,
+        "answer_count": 0,
+        "pending_events": [],
+        "sections": {7: sm7},
+        "current_section": 7,
+        "section7_text": ""
+    }
+    return session_id, sm7
+
+
+def test_generated_text_is_repaired_and_flagged(monkeypatch):
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        return ("Foram apreendidas 14 pedras de crack (Art. 33 da Lei 11.343/06). "
+                "O autor estava em atitude suspeita."), provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id, sm7 = create_completed_section7_session()
+
+    response = asyncio.run(generate_section_response(session_id, sm7, 7, "groq", None))
+
+    expected = "Foram apreendidas 14 pedras de crack.  O autor estava em atitude suspeita."
+    assert response.generated_text == expected
+    assert response.lint_warnings == ['Termo vazio: "em atitude suspeita"']
+    assert sessions[session_id]["section7_text"] == expected
+
+    event = sessions[session_id]["pending_events"][0]
+    assert event["event_type"] == "section7_completed"
+    assert event["data"]["generated_text"] == expected
+    assert [i["rule"] for i in event["data"]["lint"]["repaired"]] == ["law_citation", "sentence_spacing"]
+    assert event["data"]["lint"]["flagged"] == [{"rule": "empty_term", "excerpt": "em atitude suspeita"}]
+
+
+def test_clean_text_has_no_lint_data(monkeypatch):
+    async def fake_generate(section_number, section_data, provider="gemini", use_cache=True):
+        return "Foram apreendidas 14 pedras de crack.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", fake_generate)
+    session_id, sm7 = create_completed_section7_session()
+
+    response = asyncio.run(generate_section_response(session_id, sm7, 7, "groq", None))
+
+    assert response.lint_warnings is None
+    assert "lint" not in sessions[session_id]["pending_events"][0]["data"]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: Seção 1 inteira pelo /chat em modo replay
+(LLM_REPLAY_MODE=replay, LLM_REPLAY_LATENCY_SCALE=0), sem rede nem API keys
+
+No CI o app já sobe em modo replay (ver .github/workflows/test.yml); aqui o
+LLMService do app recebe um ReplayProvider com cassette próprio, igual ao
+que o startup monta, para o teste não depender da ordem dos módulos.
+
+Executar: LLM_REPLAY_MODE=replay LLM_REPLAY_LATENCY_SCALE=0 python -m pytest tests/integration/test_replay_flow.py -v
+"""
+import sys
+import os
+import time
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app
+
+# Mesmo módulo que o llm_service importou (replay_provider ou backend.replay_provider)
+replay_module = sys.modules[type(main_module.llm_service).__module__.replace("llm_service", "replay_provider")]
+
+
+client = TestClient(app)
+
+SECTION1_ANSWERS = [
+    "22/03/2025, 21h11",
+    "Sargento Silva e Soldado Souza, viatura 1234",
+    "190",
+    "Denúncia de venda de drogas na praça central",
+    "NÃO",
+    "Rua das Acácias, número 456, bairro Floresta, próximo ao Bar do Zé",
+    "Sim, local com 3 ocorrências de tráfico no ano",
+    "Não há informação de facção",
+    "NÃO",
+]
+
+
+@pytest.fixture
+def replay(monkeypatch, tmp_path):
+    """LLMService do app em modo replay, sem atraso e com cassette vazio"""
+    service = main_module.llm_service
+    for name in ("replay_mode", "replay", "gemini_model", "gemini_section_models", "groq_client", "groq_async_client"):
+        monkeypatch.setattr(service, name, getattr(service, name))
+    monkeypatch.setattr(service, "cache", None)
+    provider = replay_module.ReplayProvider(
+        cassette=replay_module.Cassette(str(tmp_path / "cassette.json")), latency_scale=0
+    )
+    service.use_replay(provider)
+    return provider
+
+
+def answer_section1(answers):
+    session_id = client.post("/new_session").json()["session_id"]
+    for message in answers:
+        response = client.post("/chat", json={"session_id": session_id, "message": message, "current_section": 1})
+        assert response.status_code == 200
+        assert response.json()["validation_error"] is None
+    return session_id, response.json()
+
+
+def test_section1_runs_offline(replay):
+    start = time.perf_counter()
+    _, body = answer_section1(SECTION1_ANSWERS)
+
+    assert body["is_section_complete"] is True
+    assert body["generated_text"].startswith("Texto sintético da Seção 1 (modo replay).")
+    assert not body["fallback"]
+    assert time.perf_counter() - start < 5  # latency_scale=0: sem a espera simulada
+
+    stats = client.get("/api/llm/replay").json()
+    assert stats["mode"] == "replay"
+    assert stats["synthetic"] == 1 and stats["latency_scale"] == 0
+
+
+def test_recorded_text_is_replayed(replay):
+    session_id, _ = answer_section1(SECTION1_ANSWERS[:-1])
+    answers = dict(main_module.sessions[session_id]["sections"][1].answers, **{"1.9": SECTION1_ANSWERS[-1]})
+    prompt = main_module.llm_service._build_section_prompt(1, answers)
+    replay.cassette.put(
+        replay_module.prompt_hash(prompt.system, prompt.user),
+        "A guarnição foi acionada via 190 para atender denúncia de tráfico.", 1, "gemini", 1200
+    )
+
+    response = client.post("/chat", json={"session_id": session_id, "message": SECTION1_ANSWERS[-1], "current_section": 1})
+
+    assert response.json()["generated_text"] == "A guarnição foi acionada via 190 para atender denúncia de tráfico."
+    assert client.get("/api/llm/replay").json()["cassette_hits"] == 1
+
+
+@pytest.mark.skipif(os.getenv("LLM_REPLAY_MODE") != "replay", reason="app não subiu com LLM_REPLAY_MODE=replay")
+def test_app_started_in_replay_mode():
+    assert main_module.llm_service.replay_mode == "replay"
+    assert type(main_module.llm_service.groq_async_client).__name__ == "ReplayGroq"
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: sessões removidas da memória (SESSION_IDLE_TTL) e
+endpoints legados DELETE /session/{id} e /session/{id}/status
+
+Executar: python -m pytest tests/integration/test_session_eviction.py -v
+"""
+import sys
+import os
+import asyncio
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app
+
+
+client = TestClient(app)
+
+MemorySessionStore = sys.modules[type(main_module.sessions).__module__].MemorySessionStore
+
+
+def test_status_reports_current_section():
+    session_id = client.post("/new_session").json()["session_id"]
+    client.post("/chat", json={"session_id": session_id, "message": "22/03/2025, 21h11", "current_section": 1})
+
+    response = client.get(f"/session/{session_id}/status")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current_section"] == 1
+    assert data["current_step"] == "1.2"
+    assert data["answers_count"] == 1
+    assert data["is_complete"] is False
+
+
+def test_delete_session(monkeypatch):
+    marked = []
+    monkeypatch.setattr(main_module.BOLogger, "update_session_status", lambda bo_id, status: marked.append((bo_id, status)))
+    session_id = client.post("/new_session").json()["session_id"]
+    main_module.sessions[session_id]["logged_to_db"] = True
+    bo_id = main_module.sessions[session_id]["bo_id"]
+
+    assert client.delete(f"/session/{session_id}").status_code == 200
+    assert marked == [(bo_id, "abandoned")]
+    assert client.get(f"/session/{session_id}/status").status_code == 404
+    assert client.delete(f"/session/{session_id}").status_code == 404
+
+
+def test_sweeper_marks_logged_sessions_abandoned(monkeypatch):
+    now = [1000.0]
+    store = MemorySessionStore(ttl=60, max_entries=0, clock=lambda: now[0])
+    monkeypatch.setattr(main_module, "sessions", store)
+    marked = []
+    monkeypatch.setattr(main_module.BOLogger, "mark_sessions_abandoned", lambda bo_ids: marked.extend(bo_ids) or len(bo_ids))
+
+    logged_id = client.post("/new_session").json()["session_id"]
+    store[logged_id]["logged_to_db"] = True
+    logged_bo_id = store[logged_id]["bo_id"]
+    client.post("/new_session")
+    now[0] += 120
+
+    assert asyncio.run(main_module.sweep_sessions()) == 1
+    # Só a sessão que já estava no banco vira abandoned
+    assert marked == [logged_bo_id] and len(store) == 0
+
+    stats = client.get("/api/sessions/cache").json()
+    assert stats["sessions"] == 0
+    assert stats["evictions"]["ttl"] == 2
+    assert stats["sweeper"]["marked_abandoned"] >= 1
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: sessão perdida no servidor reconstruída pelos eventos
+do BO (bo_events), via /chat e /sync_session com bo_id
+
+Executar: python -m pytest tests/integration/test_session_replay.py -v
+"""
+import sys
+import os
+import uuid
+from datetime import datetime
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app
+
+# Mesmo módulo que o main importou (logger ou backend.logger)
+logger_module = sys.modules[main_module.BOLogger.__module__]
+
+
+client = TestClient(app)
+
+ANSWERS = ["22/03/2025, 21h11", "Sargento Silva e Soldado Souza, viatura 1234", "190"]
+
+
+def answered_session():
+    """Sessão com 3 respostas da Seção 1 (já gravada no banco), removida da memória"""
+    data = client.post("/new_session").json()
+    session_id, bo_id = data["session_id"], data["bo_id"]
+    for message in ANSWERS:
+        client.post("/chat", json={"session_id": session_id, "message": message, "current_section": 1})
+    assert main_module.sessions[session_id]["logged_to_db"]
+    del main_module.sessions[session_id]
+    return session_id, bo_id
+
+
+def test_chat_rebuilds_session_from_events():
+    session_id, bo_id = answered_session()
+
+    response = client.post("/chat", json={
+        "session_id": session_id, "message": "Denúncia de venda de drogas na praça central", "current_section": 1, "bo_id": bo_id
+    })
+
+    assert response.status_code == 200
+    assert response.json()["bo_id"] == bo_id
+    assert response.json()["current_step"] == "1.5"
+    session_data = main_module.sessions[session_id]
+    assert session_data["sections"][1].answers["1.3"] == "190"
+    assert session_data["answer_count"] == 4
+
+
+def test_sync_session_applies_only_new_answers():
+    session_id, bo_id = answered_session()
+    answers = {
+        "1.1": "resposta que não passaria na validação",
+        "1.2": ANSWERS[1],
+        "1.3": ANSWERS[2],
+        "1.4": "Denúncia de venda de drogas na praça central"
+    }
+
+    response = client.post("/sync_session", json={"session_id": session_id, "answers": answers, "bo_id": bo_id})
+
+    assert response.status_code == 200
+    assert response.json()["current_step"] == "1.5"
+    sm1 = main_module.sessions[session_id]["sections"][1]
+    assert sm1.answers["1.1"] == ANSWERS[0]
+    assert main_module.sessions[session_id]["answer_count"] == 4
+
+
+def test_answers_applied_by_sync_survive_next_rebuild():
+    session_id, bo_id = answered_session()
+    answers = {"1.4": "Denúncia de venda de drogas na praça central", "1.5": "NÃO"}
+    client.post("/sync_session", json={"session_id": session_id, "answers": answers, "bo_id": bo_id})
+    del main_module.sessions[session_id]
+
+    response = client.post("/chat", json={"session_id": session_id, "message": "SIM", "current_section": 1, "bo_id": bo_id})
+
+    assert response.status_code == 200
+    sm1 = main_module.sessions[session_id]["sections"][1]
+    assert sm1.answers["1.4"] == answers["1.4"] and sm1.answers["1.5"] == "NÃO"
+
+
+def test_events_with_same_timestamp_keep_write_order():
+    bo_id = f"BO-TEST-{uuid.uuid4().hex[:8]}"
+    same_instant = datetime(2025, 3, 22, 21, 11)
+    with logger_module.get_db() as db:
+        # Inseridos fora de ordem: só o seq diz qual veio antes
+        for seq, event_type in ((2, "answer_edited"), (1, "answer_submitted")):
+            db.add(logger_module.BOEvent(
+                event_id=f"evt_{seq}_{bo_id}", bo_id=bo_id, timestamp=same_instant, seq=seq,
+                event_type=event_type, data={"step": "1.1", "answer": "x", "new_answer": "y"}
+            ))
+            db.flush()
+        db.commit()
+
+    events = main_module.BOLogger.get_replay_events(bo_id, main_module.REPLAYED_EVENTS)
+    assert [event["event_type"] for event in events] == ["answer_submitted", "answer_edited"]
+
+
+def test_unknown_bo_still_recreates():
+    response = client.post("/chat", json={
+        "session_id": "sessao-sem-eventos", "message": "22/03/2025, 21h11", "current_section": 1, "bo_id": "BO-00000000-naoexiste"
+    })
+    assert response.status_code == 200
+    assert main_module.sessions["sessao-sem-eventos"]["bo_id"] != "BO-00000000-naoexiste"
+    assert client.post("/sync_session", json={"session_id": "outra-sessao", "answers": {}, "bo_id": "BO-00000000-naoexiste"}).status_code == 404
+
+
+def test_replay_stats():
+    session_id, bo_id = answered_session()
+    client.post("/chat", json={"session_id": session_id, "message": "Denúncia de venda de drogas", "current_section": 1, "bo_id": bo_id})
+    stats = client.get("/api/sessions/cache").json()["replay"]
+    assert stats["misses"] >= 1 and stats["events_replayed"] >= 3
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: snapshot das sessões no desligamento e restauração
+no startup (SESSION_SNAPSHOT_PATH)
+
+Executar: python -m pytest tests/integration/test_session_snapshot.py -v
+"""
+import sys
+import os
+import asyncio
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app
+
+
+MemorySessionStore = sys.modules[type(main_module.sessions).__module__].MemorySessionStore
+
+
+def use_snapshot(monkeypatch, tmp_path) -> str:
+    path = str(tmp_path / "sessions.gz")
+    monkeypatch.setattr(main_module, "SESSION_SNAPSHOT_PATH", path)
+    monkeypatch.setattr(main_module, "_snapshot_changes", None)
+    monkeypatch.setattr(main_module, "sessions", MemorySessionStore())
+    return path
+
+
+def restart(monkeypatch):
+    """Novo processo: store vazio"""
+    monkeypatch.setattr(main_module, "sessions", MemorySessionStore())
+    monkeypatch.setattr(main_module, "_snapshot_changes", None)
+
+
+def test_progress_survives_restart(monkeypatch, tmp_path):
+    path = use_snapshot(monkeypatch, tmp_path)
+
+    with TestClient(app) as client:
+        session_id = client.post("/new_session").json()["session_id"]
+        client.post("/chat", json={"session_id": session_id, "message": "22/03/2025, 21h11", "current_section": 1})
+        bo_id = main_module.sessions[session_id]["bo_id"]
+    assert os.path.exists(path)
+
+    restart(monkeypatch)
+    with TestClient(app) as client:
+        assert main_module.sessions[session_id]["bo_id"] == bo_id
+        response = client.post("/chat", json={"session_id": session_id, "message": "Sargento Silva e Soldado Souza, viatura 1234", "current_section": 1})
+        assert response.json()["current_step"] == "1.3"
+        stats = client.get("/api/sessions/cache").json()["snapshot"]
+        assert stats["restored"] >= 1
+
+
+def test_snapshot_only_when_changed(monkeypatch, tmp_path):
+    use_snapshot(monkeypatch, tmp_path)
+    client = TestClient(app)
+    client.post("/new_session")
+
+    assert asyncio.run(main_module.snapshot_sessions()) is True
+    assert asyncio.run(main_module.snapshot_sessions()) is False
+    client.post("/new_session")
+    assert asyncio.run(main_module.snapshot_sessions()) is True
+
+
+def test_unknown_session_is_recreated(monkeypatch, tmp_path):
+    use_snapshot(monkeypatch, tmp_path)
+    client = TestClient(app)
+
+    response = client.post("/chat", json={"session_id": "sessao-perdida", "message": "22/03/2025, 21h11", "current_section": 1})
+
+    assert response.status_code == 200
+    session_data = main_module.sessions["sessao-perdida"]
+    assert session_data["bo_id"].startswith("BO-")
+    assert session_data["pending_events"][0]["event_type"] == "session_recreated"
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integração: sessões em SQLite compartilhado (SESSION_STORE=sqlite)
+Simula dois workers: o app e um segundo SQLiteSessionStore no mesmo arquivo.
+
+Executar: python -m pytest tests/integration/test_session_store_workers.py -v
+"""
+import sys
+import os
+import asyncio
+import threading
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+
+import backend.main as main_module
+from backend.main import app
+
+
+client = TestClient(app)
+
+# Mesmo módulo que o main importou (session_store ou backend.session_store),
+# para SessionConflictError ser a mesma classe
+SQLiteSessionStore = sys.modules[type(main_module.sessions).__module__].SQLiteSessionStore
+
+
+def use_sqlite(monkeypatch, tmp_path):
+    """Store do app e store do 'outro worker' no mesmo arquivo"""
+    path = str(tmp_path / "sessions.db")
+    monkeypatch.setattr(main_module, "sessions", SQLiteSessionStore(path))
+    return SQLiteSessionStore(path)
+
+
+def test_answers_are_visible_to_other_worker(monkeypatch, tmp_path):
+    other_worker = use_sqlite(monkeypatch, tmp_path)
+
+    session_id = client.post("/new_session").json()["session_id"]
+    response = client.post("/chat", json={"session_id": session_id, "message": "22/03/2025, 21h11", "current_section": 1})
+    assert response.json()["current_step"] == "1.2"
+
+    # Próxima resposta chega no outro worker
+    session_data = other_worker[session_id]
+    assert session_data["sections"][1].answers["1.1"] == "22/03/2025, 21h11"
+    session_data["sections"][1].store_answer("Sargento Silva e Soldado Souza, viatura 1234")
+    session_data["sections"][1].next_step()
+    other_worker.save(session_id, session_data)
+
+    # E a seguinte volta para o primeiro, que lê a versão nova
+    response = client.post("/chat", json={"session_id": session_id, "message": "190", "current_section": 1})
+    assert response.json()["current_step"] == "1.4"
+
+
+def test_concurrent_write_returns_409(monkeypatch, tmp_path):
+    other_worker = use_sqlite(monkeypatch, tmp_path)
+    session_id = client.post("/new_session").json()["session_id"]
+
+    async def slow_generate(section_number, section_data, provider="gemini", use_cache=True):
+        # Enquanto o provider responde, outro worker grava a mesma sessão
+        other_worker.save(session_id, other_worker[session_id])
+        await asyncio.sleep(0)
+        return "Texto da Seção 2.", provider
+
+    monkeypatch.setattr(main_module.llm_service, "generate_with_provider_async", slow_generate)
+    session_data = main_module.sessions[session_id]
+    session_data["sections"][2] = main_module.BOStateMachineSection2()
+    sm2 = session_data["sections"][2]
+    for answer in ["SIM", "Rua A", "Gol prata", "Sd. Faria viu", "Nenhuma", "Sgt. deu ordem", "Parou", "Não houve", "Desceram", "Sd. Faria", "Sd. Souza", "Nada"]:
+        sm2.store_answer(answer)
+        sm2.next_step()
+    main_module.sessions.save(session_id, session_data)
+
+    response = client.post("/chat", json={"session_id": session_id, "message": "Sem irregularidades", "current_section": 2})
+
+    assert response.status_code == 409
+    assert other_worker[session_id]["section2_text"] == ""
+
+
+def test_store_io_runs_off_the_event_loop(monkeypatch, tmp_path):
+    use_sqlite(monkeypatch, tmp_path)
+    session_id = client.post("/new_session").json()["session_id"]
+    store = main_module.sessions
+    threads = set()
+    for name in ("_read_version", "_read", "_write"):
+        original = getattr(store, name)
+        monkeypatch.setattr(store, name, lambda *args, _original=original: threads.add(threading.current_thread().name) or _original(*args))
+
+    response = client.post("/chat", json={"session_id": session_id, "message": "22/03/2025, 21h11", "current_section": 1})
+
+    assert response.json()["current_step"] == "1.2"
+    assert threads and not any(name.startswith("MainThread") for name in threads)
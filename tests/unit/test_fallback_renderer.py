@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o texto de modelo (fallback_renderer.py) e para o
+uso dele no LLMService quando nenhum provider atende
+"""
+import sys
+import os
+import asyncio
+import pytest
+import time
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from fallback_renderer import FALLBACK_PROVIDER, render_fallback
+from llm_service import ProviderUnavailableError
+from session_state import SECTION_CLASSES
+
+
+SECTION1 = {
+    "1.1": "22/03/2025, 21h11",
+    "1.2": "Sargento Silva e Soldado Souza, viatura 1234",
+    "1.3": "190",
+    "1.4": "Denúncia de venda de drogas na praça.",
+    "1.5": "SIM",
+    "1.5.1": "Base do 5º BPM",
+    "1.5.2": "Não houve alterações",
+    "1.6": "Praça Central, Bairro Centro",
+    "1.7": "Não informado",
+    "1.8": "NÃO",
+    "1.9": "SIM",
+    "1.9.1": "Escola Estadual Rui Barbosa",
+    "1.9.2": "300 metros"
+}
+
+# Perguntas SIM/NÃO que só abrem (ou pulam) as seguintes: não viram frase
+GATE_QUESTIONS = {"1.5", "1.9", "2.1", "3.1", "4.1", "7.1"}
+
+SECTION8 = {
+    "8.1": "Sargento Silva deu voz de prisão por tráfico",
+    "8.2": "Conduzido na viatura 1234",
+    "8.3": "Permaneceu em silêncio",
+    "8.4": "Vapor",
+    "8.5": "REDS 2024-001",
+    "8.6": "Dinheiro fracionado",
+    "8.7": "Não identificado",
+    "8.8": "Não houve",
+    "8.9": "Não havia",
+    "8.10": "Soldado Souza",
+    "8.11": "Delegacia de plantão"
+}
+
+
+class TestRenderFallback:
+    """Testes para render_fallback"""
+
+    def test_section1_opening_and_order(self):
+        text = render_fallback(1, SECTION1, lambda raw: f"<{raw}>")
+        assert text.startswith(
+            "Cumprindo a ordem de serviço, prevista para <22/03/2025, 21h11>, a equipe composta por "
+            "Sargento Silva e Soldado Souza, viatura 1234 foi acionada"
+        )
+        assert "As informações recebidas relatavam denúncia de venda de drogas na praça." in text
+        assert text.index("A guarnição partiu de") < text.index("O local indicado foi")
+        assert text.endswith("situa-se a aproximadamente 300 metros de Escola Estadual Rui Barbosa.")
+
+    def test_missing_and_negative_optional_answers_are_omitted(self):
+        text = render_fallback(1, SECTION1)
+        assert "Não informado" not in text
+        assert "ponto de tráfico" not in text
+        assert "facção" not in text
+        assert "deslocamento" not in text
+
+    def test_skipped_section_renders_nothing(self):
+        for section, gate in ((2, "2.1"), (3, "3.1"), (4, "4.1"), (5, "5.1"), (6, "6.2"), (7, "7.1")):
+            assert render_fallback(section, {gate: "NÃO", f"{section}.3": "qualquer coisa"}) == ""
+
+    def test_every_section_renders_its_answers(self):
+        for section in range(2, 8):
+            answers = {f"{section}.1": "SIM", f"{section}.2": "Resposta dois", f"{section}.3": "Resposta três."}
+            text = render_fallback(section, answers)
+            assert "esposta dois" in text
+            assert "esposta três" in text
+            assert ".." not in text
+            assert ": " not in text
+
+    def test_every_state_machine_step_is_rendered(self):
+        for section, machine in SECTION_CLASSES.items():
+            steps = [step for step in machine.STEPS if step != "complete"]
+            answers = {step: f"resposta [{step}]" for step in steps}
+            text = render_fallback(section, answers)
+            for step in steps:
+                if step not in GATE_QUESTIONS:
+                    assert f"resposta [{step}]" in text, (section, step)
+
+    def test_section8_has_four_paragraphs(self):
+        text = render_fallback(8, SECTION8)
+        paragraphs = text.split("\n\n")
+        assert len(paragraphs) == 4
+        assert paragraphs[0].startswith("Foi dada voz de prisão ao autor (Sargento Silva")
+        assert paragraphs[1].startswith("Sobre os fatos, o preso permaneceu em silêncio.")
+        assert paragraphs[3].startswith("As garantias constitucionais foram informadas ao preso por Soldado Souza.")
+
+    def test_answers_read_as_sentences(self):
+        answers = {
+            "6.1": "NÃO",
+            "6.2": "SIM",
+            "6.3": "Empurrou o Cabo Lima e tentou correr",
+            "6.4": "Cabo Lima aplicou chave de braço e o autor foi contido",
+            "6.5": "Risco de fuga",
+            "6.6": "Sem ferimentos",
+        }
+        assert render_fallback(6, answers) == (
+            "O autor resistiu à abordagem.  "
+            "Na resistência, o autor empurrou o Cabo Lima e tentou correr.  "
+            "Para contê-lo, Cabo Lima aplicou chave de braço e o autor foi contido.  "
+            "O uso de algemas justificou-se por risco de fuga.  "
+            "Quanto à integridade física do autor, sem ferimentos."
+        )
+
+    def test_yes_and_no_answers_on_optional_questions(self):
+        text = render_fallback(1, {**SECTION1, "1.7": "Sim, 3 ocorrências no ano", "1.8": "Sim"})
+        assert "conhecido como ponto de tráfico de drogas (3 ocorrências no ano)." in text
+        assert "A área sofre atuação de facção criminosa." in text
+        text = render_fallback(2, {"2.1": "SIM", "2.3": "Gol prata", "2.5": "Não reagiram"})
+        assert "reação" not in text
+
+    def test_renders_in_milliseconds(self):
+        start = time.perf_counter()
+        for _ in range(100):
+            render_fallback(1, SECTION1)
+            render_fallback(8, SECTION8)
+        assert (time.perf_counter() - start) / 100 < 0.005
+
+
+@pytest.fixture
+def make_service(llm_service, fake_gemini):
+    """Gemini sem quota e Groq sem GROQ_API_KEY, com o texto de modelo ligado"""
+    def make():
+        quota = RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        return llm_service(gemini=fake_gemini(error=quota), template_fallback=True)
+    return make
+
+
+class TestServiceTemplateFallback:
+    """LLMService sem nenhum provider disponível"""
+
+    def test_generate_returns_template_text(self, make_service):
+        service = make_service()
+        text, provider = asyncio.run(service.generate_with_provider_async(8, SECTION8, "gemini"))
+        assert provider == FALLBACK_PROVIDER
+        assert text == render_fallback(8, SECTION8)
+        assert service.telemetry.stats()["template_fallbacks"] == {8: 1}
+
+    def test_template_text_is_not_cached(self, make_service):
+        service = make_service()
+        stored = []
+        service._cache_store = lambda *args: stored.append(args)
+        asyncio.run(service.generate_with_provider_async(8, SECTION8, "gemini"))
+        assert stored == []
+
+    def test_disabled_fallback_raises(self, make_service):
+        service = make_service()
+        service.template_fallback = False
+        try:
+            asyncio.run(service.generate_with_provider_async(8, SECTION8, "gemini"))
+            assert False, "Deveria ter lançado erro"
+        except (ProviderUnavailableError, ValueError):
+            pass
+
+    def test_missing_api_keys_fall_back(self, make_service):
+        service = make_service()
+        service.gemini_model = None
+        text, provider = asyncio.run(service.generate_with_provider_async(8, SECTION8, "gemini"))
+        assert provider == FALLBACK_PROVIDER and text == render_fallback(8, SECTION8)
+
+    def test_bugs_are_not_turned_into_template_text(self, make_service):
+        service = make_service()
+
+        async def broken_call(prompt, section_number):
+            raise KeyError("campo_inexistente")
+
+        service._call_gemini_async = broken_call
+        try:
+            asyncio.run(service.generate_with_provider_async(8, SECTION8, "gemini"))
+            assert False, "Deveria ter lançado erro"
+        except KeyError:
+            pass
+        assert service.telemetry.stats()["template_fallbacks"] == {}
+
+    def test_stream_falls_back_before_first_chunk(self, make_service):
+        service = make_service()
+
+        async def failing_stream(prompt, section_number):
+            raise ProviderUnavailableError("sem quota", provider="gemini", reason="quota")
+            yield  # pragma: no cover
+
+        service._stream_gemini_async = failing_stream
+        served = {}
+
+        async def collect():
+            return [chunk async for chunk in service.stream_text_async(8, SECTION8, "gemini", served=served)]
+
+        assert asyncio.run(collect()) == [render_fallback(8, SECTION8)]
+        assert served["provider"] == FALLBACK_PROVIDER
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o cache de textos gerados (generation_cache.py)
+"""
+import sys
+import os
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import generation_cache
+from generation_cache import GenerationCache, make_cache_key, normalize_answers
+from llm_service import LLMService, PROMPT_VERSION
+
+
+ANSWERS = {"2.1": "SIM", "2.2": "Rua das Flores, 123", "2.3": "VW Gol branco, placa ABC-1D23"}
+
+
+class CountingAsyncGroq:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f"Texto {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestCacheKey:
+    """Testes para make_cache_key / normalize_answers"""
+
+    def test_whitespace_does_not_change_key(self):
+        messy = {"2.3": "VW Gol  branco, placa ABC-1D23 ", "2.1": "SIM", "2.2": " Rua das Flores,\n123"}
+        assert make_cache_key(2, ANSWERS, "groq", "v1") == make_cache_key(2, messy, "groq", "v1")
+
+    def test_provider_and_version_change_key(self):
+        base = make_cache_key(2, ANSWERS, "groq", "v1")
+        assert base != make_cache_key(2, ANSWERS, "gemini", "v1")
+        assert base != make_cache_key(2, ANSWERS, "groq", "v2")
+        assert base != make_cache_key(3, ANSWERS, "groq", "v1")
+
+    def test_answer_change_changes_key(self):
+        edited = dict(ANSWERS, **{"2.3": "VW Gol prata, placa ABC-1D23"})
+        assert make_cache_key(2, ANSWERS, "groq", "v1") != make_cache_key(2, edited, "groq", "v1")
+
+    def test_normalize_keeps_case(self):
+        assert normalize_answers({"1.2": "Sgt  SILVA"}) == {"1.2": "Sgt SILVA"}
+
+
+class TestGenerationCache:
+    """Testes para GenerationCache"""
+
+    def test_miss_then_hit(self):
+        cache = GenerationCache(max_entries=4, persistent=False)
+        assert cache.get("k1") is None
+        cache.set("k1", "texto", 2, "groq", "v1")
+        assert cache.get("k1") == "texto"
+
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = GenerationCache(max_entries=2, persistent=False)
+        cache.set("a", "A", 1, "groq", "v1")
+        cache.set("b", "B", 1, "groq", "v1")
+        cache.get("a")  # "a" passa a ser o mais recente
+        cache.set("c", "C", 1, "groq", "v1")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+
+    def test_empty_text_not_stored(self):
+        cache = GenerationCache(persistent=False)
+        cache.set("k", "", 3, "groq", "v1")
+        assert cache.stats()["memory_entries"] == 0
+
+    def test_persistent_tier_survives_memory_clear(self):
+        cache = GenerationCache(persistent=True)
+        key = f"test-{uuid.uuid4().hex}"
+        cache.set(key, "texto persistido", 7, "groq", "v1")
+        cache.clear()
+
+        assert cache.get(key) == "texto persistido"
+        assert cache.stats()["persistent_hits"] == 1
+
+    def test_async_tier_queries_database_off_the_loop(self, monkeypatch):
+        stored, threads = {}, []
+
+        def save_cached_generation(cache_key, generated_text, **kwargs):
+            threads.append(threading.get_ident())
+            stored[cache_key] = generated_text
+
+        def get_cached_generation(cache_key):
+            threads.append(threading.get_ident())
+            return stored.get(cache_key)
+
+        monkeypatch.setattr(generation_cache.BOLogger, "save_cached_generation", save_cached_generation)
+        monkeypatch.setattr(generation_cache.BOLogger, "get_cached_generation", get_cached_generation)
+        cache = GenerationCache(persistent=True)
+
+        async def scenario():
+            await cache.set_async("k", "texto", 2, "groq", "v1")
+            cache.clear()
+            return await cache.get_any_async(["outra", "k"]), threading.get_ident()
+
+        hit, loop_thread = asyncio.run(scenario())
+
+        assert hit == ("k", "texto")
+        assert cache.stats()["persistent_hits"] == 1
+        assert threads and loop_thread not in threads
+
+
+class TestLLMServiceCache:
+    """Cache integrado ao LLMService: hits não chamam o provider"""
+
+    def make_service(self):
+        service = LLMService()
+        service.cache = GenerationCache(persistent=False)
+        service.scheduler = None
+        service.groq_async_client = CountingAsyncGroq()
+        return service
+
+    def test_second_identical_request_skips_provider(self):
+        service = self.make_service()
+        first = asyncio.run(service.generate_text_async(2, ANSWERS, "groq"))
+        second = asyncio.run(service.generate_text_async(2, dict(ANSWERS), "groq"))
+
+        assert first == second == "Texto 1"
+        assert service.groq_async_client.calls == 1
+        assert service.cache_stats()["provider_calls_saved"] == 1
+        assert service.cache_stats()["prompt_version"] == PROMPT_VERSION
+
+    def test_use_cache_false_forces_new_call(self):
+        service = self.make_service()
+        asyncio.run(service.generate_text_async(2, ANSWERS, "groq"))
+        regenerated = asyncio.run(service.generate_text_async(2, ANSWERS, "groq", use_cache=False))
+
+        assert regenerated == "Texto 2"
+        assert service.groq_async_client.calls == 2
+
+    def test_disabled_cache_reports_disabled(self):
+        service = LLMService()
+        service.cache = None
+        assert service.cache_stats() == {"enabled": False}
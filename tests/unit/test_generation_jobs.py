@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a fila de jobs de geração (generation_jobs.py)
+"""
+import sys
+import os
+import asyncio
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from generation_jobs import JobManager, JobQueueFullError
+
+
+class TestJobManager:
+    """Testes para JobManager"""
+
+    def test_workers_bound_concurrency(self):
+        manager = JobManager(workers=2, max_queue=10)
+        state = {"in_flight": 0, "max": 0}
+
+        async def run():
+            state["in_flight"] += 1
+            state["max"] = max(state["max"], state["in_flight"])
+            await asyncio.sleep(0.02)
+            state["in_flight"] -= 1
+            return {"ok": True}
+
+        async def scenario():
+            jobs = [manager.submit("s", 1, "groq", run) for _ in range(5)]
+            await manager.shutdown()
+            return jobs
+
+        jobs = asyncio.run(scenario())
+        assert all(job.status == "done" and job.result == {"ok": True} for job in jobs)
+        assert state["max"] == 2
+        assert manager.stats()["completed"] == 5
+
+    def test_error_keeps_status_code_and_detail(self):
+        manager = JobManager(workers=1)
+
+        class FakeHTTPException(Exception):
+            status_code = 429
+            detail = "⏳ Sem quota"
+
+        async def run():
+            raise FakeHTTPException()
+
+        async def scenario():
+            job = manager.submit("s", 3, "gemini", run)
+            await manager.shutdown()
+            return job
+
+        job = asyncio.run(scenario())
+        assert job.status == "error"
+        assert job.error == {"status_code": 429, "detail": "⏳ Sem quota"}
+        assert job.to_dict()["finished_at"] is not None
+
+    def test_full_queue_rejects(self):
+        manager = JobManager(workers=1, max_queue=1)
+
+        async def run():
+            await asyncio.sleep(0.01)
+            return {}
+
+        async def scenario():
+            manager.submit("s", 1, "groq", run)  # ainda na fila: worker não rodou
+            try:
+                manager.submit("s", 2, "groq", run)
+                assert False, "Deveria ter lançado JobQueueFullError"
+            except JobQueueFullError:
+                pass
+            await manager.shutdown()
+
+        asyncio.run(scenario())
+
+    def test_finished_jobs_are_trimmed(self):
+        manager = JobManager(workers=1, max_retained=2)
+
+        async def run():
+            return {}
+
+        async def scenario():
+            for _ in range(4):
+                manager.submit("s", 1, "groq", run)
+                await manager.drain()
+            await manager.shutdown()
+
+        asyncio.run(scenario())
+        assert len(manager.jobs) == 2
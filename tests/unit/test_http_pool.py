@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o pool HTTP dos providers (http_pool.py)
+"""
+import sys
+import os
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pytest
+
+from http_pool import ProviderHTTPPool
+from llm_service import LLMService
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # mantém a conexão aberta entre requisições
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestProviderHTTPPool:
+    """Testes para ProviderHTTPPool"""
+
+    def test_sync_client_reuses_connection(self, local_server):
+        pool = ProviderHTTPPool(pool_size=4, keepalive_connections=2, keepalive_expiry=30)
+        for _ in range(3):
+            assert pool.sync_client.get(local_server).text == "ok"
+
+        stats = pool.stats()
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 2
+        assert stats["max_connections"] == 4
+        asyncio.run(pool.aclose())
+
+    def test_async_client_reuses_connection(self, local_server):
+        pool = ProviderHTTPPool()
+
+        async def run():
+            for _ in range(3):
+                await pool.async_client.get(local_server)
+            connections = pool.stats()["connections"]["async"]
+            await pool.aclose()
+            return connections
+
+        connections = asyncio.run(run())
+        assert pool.new_connections == 1
+        assert connections is None or connections["open"] == 1
+
+    def test_http2_without_h2_falls_back(self):
+        pool = ProviderHTTPPool(http2=True)
+        try:
+            import h2  # noqa: F401
+            assert pool.http2 is True
+        except ImportError:
+            assert pool.http2 is False
+
+    def test_warm_up_records_each_provider(self):
+        pool = ProviderHTTPPool()
+
+        async def ok():
+            return None
+
+        async def fail():
+            raise ConnectionError("sem rede")
+
+        async def hang():
+            await asyncio.sleep(5)
+
+        warmups = asyncio.run(pool.warm_up({"groq": ok, "gemini": fail, "outro": hang}, timeout=0.05))
+        assert warmups["groq"]["ok"] is True
+        assert warmups["gemini"]["ok"] is False
+        assert "sem rede" in warmups["gemini"]["error"]
+        assert warmups["outro"]["error"].startswith("TimeoutError")
+
+
+class TestLLMServiceWarmUp:
+    """LLMService.warm_up usa chamadas que não gastam quota de geração"""
+
+    def test_targets_only_configured_providers(self):
+        service = LLMService()
+        service.gemini_api_key = None
+        calls = []
+
+        class FakeModels:
+            async def list(self):
+                calls.append("models.list")
+
+        service.groq_api_key = "x"
+        service.groq_async_client = SimpleNamespace(models=FakeModels())
+
+        warmups = asyncio.run(service.warm_up())
+        assert calls == ["models.list"]
+        assert set(warmups) == {"groq"}
+        assert service.pool_stats()["warmup"]["groq"]["ok"] is True
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do caminho de cold start: SDKs dos providers e schema do banco
+carregados sob demanda, não no import
+"""
+import sys
+import os
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import llm_service as llm_service_module
+from llm_service import LLMService
+from quota_scheduler import QuotaScheduler
+from importtime_report import measure_cold_start, parse_importtime
+
+
+class TestLazyProviderClients:
+    """Clientes do Gemini/Groq criados no primeiro uso"""
+
+    def test_constructor_does_not_create_clients(self):
+        service = LLMService()
+        assert service._gemini_model is llm_service_module._UNLOADED
+        assert service._groq_async_client is llm_service_module._UNLOADED
+
+    def test_is_configured_uses_api_key_before_loading(self):
+        service = LLMService()
+        service.gemini_api_key = "x"
+        service.groq_api_key = None
+        assert service._is_configured("gemini") is True
+        assert service._is_configured("groq") is False
+        assert service._gemini_model is llm_service_module._UNLOADED
+
+    def test_first_access_loads_client(self):
+        service = LLMService()
+        service.groq_api_key = None
+        assert service.groq_async_client is None
+        assert service.groq_client is None
+
+    def test_assigned_client_is_kept(self):
+        service = LLMService()
+        service.gemini_api_key = None
+        service.gemini_model = "fake"
+        service.load_providers()
+        assert service.gemini_model == "fake"
+        assert service.gemini_section_models == {}
+
+
+class TestLazyQuotaLoad:
+    """Estado gravado da quota lido no primeiro uso"""
+
+    def test_persistent_scheduler_loads_on_first_use(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(QuotaScheduler, "_load", lambda self: calls.append(1))
+        scheduler = QuotaScheduler(limits={"groq": {"rpd": 10, "rpm": 10}})
+        assert calls == []
+        scheduler.stats()
+        scheduler.try_acquire(["groq"])
+        assert calls == [1]
+
+
+class TestColdStartReport:
+    """Relatório de import-time usado no CI"""
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:      2000 |       5000 |   llm_service\n"
+            "import time:      1000 |       9000 | main\n"
+        )
+        entries = parse_importtime(stderr)
+        assert [(e["module"], e["depth"]) for e in entries] == [("json.decoder", 2), ("llm_service", 1), ("main", 0)]
+        assert entries[2]["cumulative_us"] == 9000
+
+    def test_health_without_provider_sdks(self):
+        report = measure_cold_start()
+        assert report["status"] == 200
+        assert report["loaded"] == []
+        assert any(e["module"] == "main" for e in report["imports"])
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o caminho assíncrono do LLMService
+(generate_text_async com clientes assíncronos nativos)
+"""
+import sys
+import os
+import asyncio
+import pytest
+import time
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from llm_service import ProviderUnavailableError
+
+
+SECTION_ANSWERS = {
+    1: {"1.1": "22/03/2025, 21h11", "1.2": "Sargento Silva, viatura 1234"},
+    2: {"2.1": "SIM", "2.2": "Rua das Flores, 123"},
+    3: {"3.1": "SIM", "3.2": "Esquina da Rua Sete"},
+    4: {"4.1": "SIM", "4.2": "Odor forte de maconha"},
+    5: {"5.1": "SIM", "5.2": "Homem entregando invólucros"},
+    6: {"6.1": "SIM", "6.2": "Empurrou o Cabo Rezende"},
+    7: {"7.1": "SIM", "7.2": "14 pedras de crack"},
+    8: {"8.1": "O Sargento Marco deu voz de prisão"},
+}
+
+
+@pytest.fixture
+def make_service(llm_service, fake_groq):
+    """Só o Groq falso, com latência configurável (Gemini nunca chama a API real)"""
+    def make(latency: float = 0.2):
+        return llm_service(groq=fake_groq(latency=latency, text="  Texto gerado.  "))
+    return make
+
+
+class TestGenerateTextAsync:
+    """Testes para LLMService.generate_text_async"""
+
+    def test_returns_stripped_text(self, make_service):
+        service = make_service(latency=0)
+        text = asyncio.run(service.generate_text_async(2, SECTION_ANSWERS[2], "groq"))
+        assert text == "Texto gerado."
+
+    def test_skipped_section_does_not_call_provider(self, make_service):
+        service = make_service(latency=0)
+        text = asyncio.run(service.generate_text_async(3, {"3.1": "NÃO"}, "groq"))
+        assert text == ""
+        assert service.groq_async_client.max_in_flight == 0
+
+    def test_section1_entrypoint_is_async(self, make_service):
+        service = make_service(latency=0)
+        text = asyncio.run(service.generate_section_text(SECTION_ANSWERS[1], provider="groq"))
+        assert text == "Texto gerado."
+
+    def test_concurrent_sections_do_not_serialize(self, make_service):
+        """8 seções com 0.2s de latência cada devem terminar em ~0.2s, não em 1.6s"""
+        service = make_service(latency=0.2)
+
+        async def run_all():
+            return await asyncio.gather(*[
+                service.generate_text_async(n, answers, "groq")
+                for n, answers in SECTION_ANSWERS.items()
+            ])
+
+        start = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+
+        assert results == ["Texto gerado."] * 8
+        assert service.groq_async_client.max_in_flight == 8
+        assert elapsed < 0.8
+
+    def test_concurrency_is_bounded(self, make_service):
+        service = make_service(latency=0.05)
+        service._semaphore = asyncio.Semaphore(2)
+
+        async def run_all():
+            await asyncio.gather(*[
+                service.generate_text_async(n, answers, "groq")
+                for n, answers in SECTION_ANSWERS.items()
+            ])
+
+        asyncio.run(run_all())
+        assert service.groq_async_client.max_in_flight == 2
+
+    def test_missing_key_raises(self, make_service):
+        service = make_service()
+        service.groq_async_client = None
+        try:
+            asyncio.run(service.generate_text_async(2, SECTION_ANSWERS[2], "groq"))
+            assert False, "Deveria ter lançado ValueError"
+        except ValueError as e:
+            assert "GROQ_API_KEY" in str(e)
+
+    def test_unsupported_provider(self, make_service):
+        service = make_service()
+        try:
+            asyncio.run(service.generate_text_async(2, SECTION_ANSWERS[2], "claude"))
+            assert False, "Deveria ter lançado NotImplementedError"
+        except NotImplementedError as e:
+            assert "Seção 2" in str(e)
+
+    def test_rate_limit_error_message(self, make_service):
+        service = make_service()
+
+        async def fail(**kwargs):
+            raise RuntimeError("Error code: 429 rate_limit_exceeded")
+
+        service.groq_async_client.chat.completions.create = fail
+        try:
+            asyncio.run(service.generate_text_async(2, SECTION_ANSWERS[2], "groq"))
+            assert False, "Deveria ter lançado Exception"
+        except Exception as e:
+            assert "Limite de requisições do Groq" in str(e)
+
+
+class FakeGroqStream:
+    """Imita o AsyncStream do Groq (chunks com choices[0].delta.content)"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self.pieces:
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class TestStreamTextAsync:
+    """Testes para LLMService.stream_text_async"""
+
+    def test_yields_chunks_in_order(self, make_service):
+        service = make_service()
+        captured = {}
+
+        async def create(**kwargs):
+            captured.update(kwargs)
+            return FakeGroqStream(["Durante ", None, "patrulhamento", ""])
+
+        service.groq_async_client.chat.completions.create = create
+
+        async def collect():
+            return [c async for c in service.stream_text_async(2, SECTION_ANSWERS[2], "groq")]
+
+        assert asyncio.run(collect()) == ["Durante ", "patrulhamento"]
+        assert captured["stream"] is True
+
+    def test_skipped_section_emits_nothing(self, make_service):
+        service = make_service()
+
+        async def collect():
+            return [c async for c in service.stream_text_async(4, {"4.1": "NÃO"}, "groq")]
+
+        assert asyncio.run(collect()) == []
+
+
+class SlowGroqStream:
+    """Stream que entrega um trecho a cada `interval` segundos"""
+
+    def __init__(self, pieces, interval):
+        self.pieces = pieces
+        self.interval = interval
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self.pieces:
+            await asyncio.sleep(self.interval)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class TestProviderDeadlines:
+    """Prazo por provider (LLM_TIMEOUT_*) e cancelamento"""
+
+    def test_slow_call_times_out(self, make_service):
+        service = make_service(latency=2)
+        service.provider_chain = []
+        service.timeouts["groq"] = 0.05
+
+        start = time.perf_counter()
+        try:
+            asyncio.run(service.generate_text_async(2, SECTION_ANSWERS[2], "groq"))
+            assert False, "Deveria ter lançado ProviderUnavailableError"
+        except ProviderUnavailableError as e:
+            assert e.reason == "timeout"
+        assert time.perf_counter() - start < 1
+        assert service.metrics()["providers"]["groq"]["error_classes"] == {"timeout": 1}
+
+    def test_stream_deadline_covers_whole_stream(self, make_service):
+        service = make_service()
+        service.provider_chain = []
+        service.timeouts["groq"] = 0.15
+
+        async def create(**kwargs):
+            return SlowGroqStream(["um ", "dois ", "três ", "quatro "], interval=0.06)
+
+        service.groq_async_client.chat.completions.create = create
+
+        async def collect():
+            received = []
+            try:
+                async for chunk in service.stream_text_async(2, SECTION_ANSWERS[2], "groq"):
+                    received.append(chunk)
+            except ProviderUnavailableError as e:
+                return received, e.reason
+            return received, None
+
+        received, reason = asyncio.run(collect())
+        assert reason == "timeout"
+        assert 0 < len(received) < 4
+
+    def test_cancelled_call_recorded(self, make_service):
+        service = make_service(latency=5)
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(service.generate_text_async(2, SECTION_ANSWERS[2], "groq"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(cancel_midway())
+        assert service.metrics()["providers"]["groq"]["error_classes"] == {"cancelled": 1}
+        assert service.groq_async_client.in_flight == 0
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a telemetria das chamadas ao LLM (llm_telemetry.py)
+"""
+import sys
+import os
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from llm_telemetry import LatencyHistogram, LLMTelemetry
+
+
+ANSWERS = {"2.1": "SIM", "2.2": "Rua das Flores, 123"}
+
+
+class UsageAsyncGroq:
+    """AsyncGroq falso que informa usage como a API real"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        if self.error:
+            raise self.error
+        usage = SimpleNamespace(prompt_tokens=812, completion_tokens=95, prompt_tokens_details=None)
+        message = SimpleNamespace(content="Texto gerado.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def make_service(llm_service):
+    """Só o Groq informado, sem failover"""
+    def make(groq):
+        return llm_service(groq=groq, provider_chain=[])
+    return make
+
+
+class TestLatencyHistogram:
+    """Testes para LatencyHistogram"""
+
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram([100, 200, 400])
+        for latency in [50, 80, 150, 150, 300, 900]:
+            histogram.observe(latency)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == [2, 2, 1, 1]
+        assert snapshot["count"] == 6
+        assert snapshot["max"] == 900
+        assert 100 <= snapshot["p50"] <= 200
+        assert 400 <= snapshot["p95"] <= 900
+
+    def test_empty_histogram(self):
+        snapshot = LatencyHistogram([100]).snapshot()
+        assert snapshot["p50"] is None
+        assert snapshot["avg"] is None
+
+
+class TestLLMTelemetry:
+    """Testes para LLMTelemetry"""
+
+    def test_aggregates_by_provider_and_section(self):
+        telemetry = LLMTelemetry([1000])
+        telemetry.record("gemini", 1, 500, "x" * 400, "y" * 40, prompt_tokens=100, completion_tokens=10)
+        telemetry.record("groq", 1, 1500, "x" * 400, "y" * 40)
+        telemetry.record("groq", 7, 800, "x" * 800, error_class="rate_limit")
+
+        stats = telemetry.stats()
+        assert stats["providers"]["groq"]["calls"] == 2
+        assert stats["providers"]["groq"]["error_classes"] == {"rate_limit": 1}
+        assert stats["providers"]["gemini"]["tokens_estimated"] == 0
+        assert stats["providers"]["groq"]["tokens_estimated"] == 2  # sem usage, inclusive no erro
+
+        section1 = stats["sections"][1]
+        assert section1["calls"] == 2
+        assert section1["latency_ms"]["buckets"] == [1, 1]
+        assert section1["prompt_tokens"] == 200  # 100 informados + 400/4 estimados
+        assert set(section1["providers"]) == {"gemini", "groq"}
+
+        assert stats["sections"][7]["completion_tokens"] == 0
+        assert stats["sections"][7]["error_rate"] == 1.0
+
+
+class TestLLMServiceTelemetry:
+    """Cada chamada do LLMService aparece na telemetria"""
+
+    def test_success_records_provider_usage(self, make_service):
+        service = make_service(UsageAsyncGroq())
+        asyncio.run(service.generate_text_async(2, ANSWERS, "groq"))
+
+        groq = service.metrics()["sections"][2]["providers"]["groq"]
+        assert groq["calls"] == 1
+        assert groq["prompt_tokens"] == 812
+        assert groq["completion_tokens"] == 95
+        assert groq["avg_prompt_chars"] > 0
+        assert groq["latency_ms"]["count"] == 1
+
+    def test_error_records_class(self, make_service):
+        service = make_service(UsageAsyncGroq(error=RuntimeError("Error code: 429 rate_limit_exceeded")))
+        try:
+            asyncio.run(service.generate_text_async(2, ANSWERS, "groq"))
+        except Exception:
+            pass
+
+        groq = service.metrics()["providers"]["groq"]
+        assert groq["errors"] == 1
+        assert groq["error_classes"] == {"rate_limit": 1}
+
+    def test_other_errors_use_exception_type(self, make_service):
+        service = make_service(UsageAsyncGroq(error=KeyError("choices")))
+        try:
+            asyncio.run(service.generate_text_async(2, ANSWERS, "groq"))
+        except Exception:
+            pass
+
+        assert service.metrics()["providers"]["groq"]["error_classes"] == {"KeyError": 1}
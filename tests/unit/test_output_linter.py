@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o linter do texto gerado (output_linter.py)
+"""
+import sys
+import os
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from output_linter import OutputLinter, fix_sentence_spacing
+
+
+ANSWERS = {"7.1": "SIM", "7.2": "14 pedras de crack e R$ 50,00", "7.3": "duas porções de maconha"}
+
+
+def rules(result, repaired):
+    return [issue.rule for issue in result.issues if issue.repaired is repaired]
+
+
+class TestSentenceSpacing:
+    """Dois espaços entre frases"""
+
+    def test_single_space_becomes_double(self):
+        text, fixed = fix_sentence_spacing("Primeira frase. Segunda frase! Terceira.")
+        assert text == "Primeira frase.  Segunda frase!  Terceira."
+        assert fixed == 2
+
+    def test_abbreviations_and_initials_are_kept(self):
+        text, fixed = fix_sentence_spacing("O Sgt. Silva e o Cb. J. Souza chegaram.  Depois saíram.")
+        assert text == "O Sgt. Silva e o Cb. J. Souza chegaram.  Depois saíram."
+        assert fixed == 0
+
+
+class TestOutputLinter:
+    """Correções determinísticas e sinalizações"""
+
+    def test_parenthetical_and_clause_citations_are_removed(self):
+        text = ("Foram apreendidas 14 pedras de crack (Art. 33 da Lei 11.343/06). "
+                "O autor foi conduzido, conforme o art. 302 do CPP.")
+        result = OutputLinter().lint(7, text, ANSWERS)
+
+        assert result.text == "Foram apreendidas 14 pedras de crack.  O autor foi conduzido."
+        assert rules(result, True) == ["law_citation", "law_citation", "sentence_spacing"]
+        assert result.warnings == []
+
+    def test_clause_between_commas_takes_both_commas(self):
+        result = OutputLinter().lint(7, "O autor, conforme o Art. 33 da Lei 11.343/06, foi preso.", ANSWERS)
+        assert result.text == "O autor foi preso."
+        assert rules(result, True) == ["law_citation"]
+
+    def test_citation_inside_sentence_is_flagged(self):
+        result = OutputLinter().lint(7, "O autor infringiu a Lei 11.343/06.", ANSWERS)
+        assert result.text == "O autor infringiu a Lei 11.343/06."
+        assert "law_citation" in rules(result, False)
+
+    def test_citation_as_predicate_is_flagged_not_removed(self):
+        for text in ("O autor foi enquadrado no artigo 33.  Fim.",
+                     "O fato está previsto no Art. 33 da Lei 11.343/06.",
+                     "A conduta está tipificada no art. 33 da Lei 11.343/06."):
+            result = OutputLinter().lint(7, text)
+            assert result.text == text
+            assert rules(result, True) == []
+            assert rules(result, False) == ["law_citation"]
+
+    def test_empty_term_as_adjunct_is_removed(self):
+        result = OutputLinter().lint(5, "O homem, em atitude suspeita, correu para o beco.", {})
+        assert result.text == "O homem correu para o beco."
+        assert rules(result, True) == ["empty_term"]
+
+    def test_empty_term_as_predicate_is_flagged(self):
+        result = OutputLinter().lint(5, "O indivíduo estava em atitude suspeita.", {})
+        assert result.text == "O indivíduo estava em atitude suspeita."
+        assert result.warnings == ['Termo vazio: "em atitude suspeita"']
+
+    def test_gerunds_are_flagged_once(self):
+        result = OutputLinter().lint(3, "Quando a equipe chegou, ele estava correndo e depois saiu correndo.", {})
+        assert [i.excerpt for i in result.issues if i.rule == "gerund"] == ["correndo"]
+
+    def test_numbers_must_come_from_answers(self):
+        text = "Foram apreendidas 14 pedras, 2 porções e R$ 50,00, além de 3 celulares."
+        result = OutputLinter().lint(7, text, ANSWERS)
+        assert [i.excerpt for i in result.issues if i.rule == "invented_number"] == ["3"]
+
+    def test_empty_text_and_disabled_linter_pass_through(self):
+        assert OutputLinter().lint(2, "", ANSWERS).issues == []
+        text = "Texto em atitude suspeita. Sem correção."
+        assert OutputLinter(enabled=False).lint(2, text, ANSWERS).text == text
+
+    def test_stats_count_by_rule(self):
+        linter = OutputLinter()
+        linter.lint(5, "O homem, em atitude suspeita, correu. Ele estava fugindo.", {})
+        linter.lint(5, "Texto correto.", {})
+
+        stats = linter.stats()
+        assert stats["texts"] == 2
+        assert stats["texts_with_issues"] == 1
+        assert stats["repaired"]["empty_term"] == 1
+        assert stats["repaired"]["sentence_spacing"] == 1
+        assert stats["flagged"]["gerund"] == 1
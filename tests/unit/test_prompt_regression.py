@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a regeneração em lote (prompt_regression.py)
+"""
+import sys
+import os
+import asyncio
+import json
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from prompt_regression import RateLimiter, load_cases, make_service, read_checkpoint, run_batch, summarize
+from quota_scheduler import AdmissionError
+from replay_provider import Cassette, ReplayProvider
+
+
+def completed_event(event_id, section, answers, text="Texto original da seção."):
+    return {
+        "event_id": event_id,
+        "bo_id": "BO-TEST-REG",
+        "event_type": f"section{section}_completed",
+        "data": {
+            "section": section,
+            "answers": answers,
+            "generated_text": text,
+            "llm_provider": "gemini",
+            "generation_time_ms": 2100
+        }
+    }
+
+
+EVENTS = [
+    completed_event("evt_1", 7, {"7.1": "SIM", "7.2": "14 pedras de crack"}),
+    completed_event("evt_2", 7, {"7.1": "SIM", "7.2": "14  pedras de crack "}),  # regeração
+    completed_event("evt_3", 8, {"8.1": "Sargento Silva", "8.2": "Viatura 1234"}),
+    completed_event("evt_4", 2, {"2.1": "NÃO"}, text=""),  # seção pulada
+]
+
+
+def replay_service(tmp_path):
+    service = make_service()
+    service.use_replay(ReplayProvider(cassette=Cassette(str(tmp_path / "cassette.json")), latency_scale=0))
+    service.scheduler = None
+    return service
+
+
+def run(service, cases, out_path, **kwargs):
+    kwargs.setdefault("progress", lambda message: None)
+    return asyncio.run(run_batch(service, cases, str(out_path), "groq", **kwargs))
+
+
+class TestLoadCases:
+    """Testes para load_cases"""
+
+    def test_dedupes_and_skips_empty_sections(self):
+        cases = load_cases(EVENTS)
+        assert [c.event_id for c in cases] == ["evt_1", "evt_3"]
+        assert cases[0].original_provider == "gemini"
+
+    def test_section_filter_and_no_dedupe(self):
+        assert [c.event_id for c in load_cases(EVENTS, sections=[7], dedupe=False)] == ["evt_1", "evt_2"]
+
+    def test_skips_template_fallback_text(self):
+        fallback = completed_event("evt_0", 7, {"7.1": "SIM", "7.2": "14 pedras de crack"}, text="Texto de modelo.")
+        fallback["data"].update(fallback=True, llm_provider="template", generation_time_ms=3)
+        cases = load_cases([fallback] + EVENTS)
+        assert [c.event_id for c in cases] == ["evt_1", "evt_3"]
+
+
+class TestRunBatch:
+    """Testes para run_batch com o provider de replay"""
+
+    def test_writes_comparison_and_resumes(self, tmp_path):
+        service = replay_service(tmp_path)
+        out = tmp_path / "regressao.jsonl"
+        cases = load_cases(EVENTS)
+
+        assert run(service, cases, out) == {"done": 2, "skipped": 0, "errors": 0, "stopped": False}
+        records = read_checkpoint(str(out))
+        record = next(r for r in records.values() if r["event_id"] == "evt_1")
+        assert record["status"] == "ok"
+        assert record["served_provider"] == "groq"
+        assert record["new"]["text"].startswith("Texto sintético da Seção 7")
+        assert record["original"]["text"] == "Texto original da seção."
+        assert 0 <= record["similarity"] <= 1
+        assert record["prompt_tokens_est"] > 0
+
+        # Segunda execução: nada a fazer
+        assert run(service, cases, out) == {"done": 0, "skipped": 2, "errors": 0, "stopped": False}
+
+    def test_prompt_version_change_reruns_cases(self, tmp_path):
+        service = replay_service(tmp_path)
+        out = tmp_path / "regressao.jsonl"
+        cases = load_cases(EVENTS)
+        run(service, cases, out)
+
+        service._prompt_version = lambda section: "nova-versao"
+        assert run(service, cases, out)["done"] == 2
+
+    def test_errors_are_retried_on_resume(self, tmp_path):
+        service = replay_service(tmp_path)
+        out = tmp_path / "regressao.jsonl"
+        cases = load_cases(EVENTS)
+        service.replay.error_rate = 1.0
+        service.replay.error_kinds = ["server"]
+
+        assert run(service, cases, out)["errors"] == 2
+        service.replay.error_rate = 0.0
+        assert run(service, cases, out)["done"] == 2
+
+    def test_stops_without_quota(self, tmp_path):
+        service = replay_service(tmp_path)
+        out = tmp_path / "regressao.jsonl"
+
+        async def no_quota(*args, **kwargs):
+            raise AdmissionError("Quota esgotada", retry_after=60)
+
+        service.generate_with_provider_async = no_quota
+        counts = run(service, load_cases(EVENTS), out, concurrency=1)
+
+        assert counts["stopped"] is True
+        assert counts["done"] == 0
+        assert read_checkpoint(str(out)) == {}
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        out = tmp_path / "regressao.jsonl"
+        out.write_text(json.dumps({"key": "a", "status": "ok"}) + "\n" + '{"key": "b", "sta', encoding="utf-8")
+        assert list(read_checkpoint(str(out))) == ["a"]
+
+
+class TestRateLimiter:
+    """Testes para RateLimiter"""
+
+    def test_spaces_calls(self):
+        limiter = RateLimiter(rpm=1200)  # uma chamada a cada 50 ms
+
+        async def three_calls():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(3):
+                await limiter.wait()
+            return loop.time() - start
+
+        assert asyncio.run(three_calls()) >= 0.09
+
+
+class TestSummarize:
+    """Testes para summarize"""
+
+    def test_stats_per_section(self, tmp_path):
+        service = replay_service(tmp_path)
+        out = tmp_path / "regressao.jsonl"
+        run(service, load_cases(EVENTS), out)
+
+        summary = summarize(read_checkpoint(str(out)).values())
+        assert summary["cases"] == 2
+        assert summary["errors"] == 0
+        assert set(summary["sections"]) == {7, 8}
+        section7 = summary["sections"][7]
+        assert section7["original_latency_ms"]["p50"] == 2100
+        assert section7["avg_chars"]["original"] == len("Texto original da seção.")
+        assert section7["avg_similarity"] is not None
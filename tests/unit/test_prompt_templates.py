@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para os templates de prompt pré-compilados (prompt_templates.py)
+"""
+import sys
+import os
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from prompt_templates import PROMPT_REGISTRY, PromptRegistry, PromptTemplate
+
+
+ANSWERS_7 = {
+    "7.1": "SIM",
+    "7.2": "14 pedras de crack na lata azul, encontradas pelo Soldado Breno",
+    "7.3": "Nenhum objeto",
+    "7.4": "Lacrado no invólucro 01 pelo Soldado Faria"
+}
+
+
+@pytest.fixture
+def make_service(llm_service):
+    """LLMService com registro de templates próprio (sem alterar o global)"""
+    def make(**attrs):
+        return llm_service(prompts=PromptRegistry(dict(PROMPT_REGISTRY.templates)), **attrs)
+    return make
+
+
+class TestPromptTemplates:
+    """Separação entre parte estática e bloco de respostas"""
+
+    def test_every_section_has_template(self):
+        assert sorted(PROMPT_REGISTRY.templates) == list(range(1, 9))
+
+    def test_answers_only_in_user_part(self, make_service):
+        service = make_service()
+        prompt = service._build_section_prompt(7, ANSWERS_7)
+
+        assert "14 pedras de crack" in prompt.user
+        assert "14 pedras de crack" not in prompt.system
+        assert "REGRA DE OURO" in prompt.system
+        assert prompt.user.endswith(PROMPT_REGISTRY.get(7).instruction)
+
+    def test_static_part_is_identical_across_calls(self, make_service):
+        service = make_service()
+        first = service._build_section_prompt(7, ANSWERS_7)
+        second = service._build_section_prompt(7, dict(ANSWERS_7, **{"7.3": "R$ 50,00"}))
+        assert first.system is second.system
+        assert first.user != second.user
+
+    def test_skipped_section_renders_nothing(self, make_service):
+        service = make_service()
+        assert service._build_section_prompt(2, {"2.1": "NÃO"}) is None
+
+    def test_version_changes_with_static_text(self):
+        original = PROMPT_REGISTRY.get(3)
+        edited = PromptTemplate(3, original.system + "\n- Nova regra", original.instruction)
+        assert edited.version != original.version
+
+
+class TestProviderRequests:
+    """A parte estática vai como instrução de sistema"""
+
+    def test_groq_sends_static_part_as_system_message(self, make_service, fake_groq):
+        service = make_service(groq=fake_groq(text="Texto."))
+        asyncio.run(service.generate_text_async(7, ANSWERS_7, "groq"))
+
+        system, user = service.groq_async_client.requests[0]["messages"]
+        assert system["role"] == "system" and system["content"] == PROMPT_REGISTRY.get(7).system
+        assert user["role"] == "user" and "14 pedras de crack" in user["content"]
+
+    def test_gemini_uses_section_model_with_user_part_only(self, make_service):
+        service = make_service()
+        sent = []
+
+        class SectionModel:
+            async def generate_content_async(self, contents):
+                sent.append(contents)
+                usage = SimpleNamespace(cached_content_token_count=900)
+                return SimpleNamespace(text="Texto.", usage_metadata=usage)
+
+        service.gemini_model = SimpleNamespace()
+        service.gemini_section_models = {7: SectionModel()}
+        asyncio.run(service.generate_text_async(7, ANSWERS_7, "gemini"))
+
+        assert sent[0].startswith("DADOS FORNECIDOS PELO USUÁRIO")
+        assert service.prompt_stats()["sections"][7]["provider_cached_tokens"] == 900
+
+
+class TestPromptStats:
+    """Tamanho por seção e tokens economizados"""
+
+    def test_stats_count_repeated_static_tokens(self):
+        registry = PromptRegistry(dict(PROMPT_REGISTRY.templates))
+        template = registry.get(5)
+        for _ in range(3):
+            registry.record_call(template.render("DADOS: x"))
+
+        section = registry.stats()["sections"][5]
+        assert section["calls"] == 3
+        assert section["static_tokens_est"] == template.system_tokens
+        assert section["avg_prompt_chars"] == len(template.system) + len(template.render("DADOS: x").user)
+        assert section["tokens_saved_est"] == 2 * template.system_tokens
+        assert registry.stats()["total_tokens_saved_est"] == 2 * template.system_tokens
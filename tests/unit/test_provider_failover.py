@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o failover entre providers (LLM_PROVIDER_CHAIN)
+"""
+import sys
+import os
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from llm_service import ProviderUnavailableError
+
+
+ANSWERS = {"2.1": "SIM", "2.2": "Rua das Flores, 123"}
+DAILY_QUOTA = '429 You exceeded your current quota. quota_id: "GenerateRequestsPerDayPerProjectPerModel-FreeTier"'
+
+
+@pytest.fixture
+def make_service(llm_service, fake_gemini, fake_groq):
+    """Gemini e Groq falsos, que falham com o erro informado"""
+    def make(gemini_error=None, groq_error=None):
+        return llm_service(gemini=fake_gemini(error=gemini_error), groq=fake_groq(error=groq_error))
+    return make
+
+
+class TestProviderFailover:
+    """Testes para LLMService.generate_with_provider_async"""
+
+    def test_primary_serves_when_available(self, make_service):
+        service = make_service()
+        text, provider = asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+        assert (text, provider) == ("Texto do Gemini.", "gemini")
+        assert service.groq_async_client.calls == 0
+
+    def test_quota_fails_over_to_groq(self, make_service):
+        service = make_service(gemini_error=RuntimeError("429 Resource has been exhausted (e.g. check quota)."))
+        text, provider = asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+        assert (text, provider) == ("Texto do Groq.", "groq")
+        assert service.gemini_model.calls == 1
+
+    def test_timeout_fails_over(self, make_service):
+        service = make_service(gemini_error=asyncio.TimeoutError())
+        _, provider = asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+        assert provider == "groq"
+
+    def test_groq_rate_limit_fails_over_to_gemini(self, make_service):
+        service = make_service(groq_error=RuntimeError("Error code: 429 rate_limit_exceeded"))
+        _, provider = asyncio.run(service.generate_with_provider_async(2, ANSWERS, "groq"))
+        assert provider == "gemini"
+
+    def test_other_errors_do_not_fail_over(self, make_service):
+        service = make_service(gemini_error=RuntimeError("400 API key not valid"))
+        try:
+            asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+            assert False, "Deveria ter lançado Exception"
+        except ProviderUnavailableError:
+            assert False, "Erro comum não deve virar ProviderUnavailableError"
+        except Exception as e:
+            assert "Erro ao gerar texto da Seção 2 com Gemini" in str(e)
+        assert service.groq_async_client.calls == 0
+
+    def test_all_providers_unavailable_raises_last_error(self, make_service):
+        service = make_service(
+            gemini_error=RuntimeError("429 quota"),
+            groq_error=RuntimeError("Error code: 429 rate_limit_exceeded")
+        )
+        try:
+            asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+            assert False, "Deveria ter lançado ProviderUnavailableError"
+        except ProviderUnavailableError as e:
+            assert e.provider == "groq"
+            assert e.reason == "rate_limit"
+
+    def test_empty_chain_disables_failover(self, make_service):
+        service = make_service(gemini_error=RuntimeError(DAILY_QUOTA))
+        service.provider_chain = []
+        try:
+            asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+            assert False, "Deveria ter lançado ProviderUnavailableError"
+        except ProviderUnavailableError as e:
+            assert "Quota diária do Gemini" in str(e)
+        assert service.groq_async_client.calls == 0
+
+    def test_unconfigured_primary_is_skipped(self, make_service):
+        service = make_service()
+        service.gemini_model = None
+        _, provider = asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+        assert provider == "groq"
+
+    def test_sync_path_fails_over(self, make_service, fake_gemini):
+        service = make_service(groq_error=RuntimeError("unused"))
+        service.gemini_model = fake_gemini(error=RuntimeError("429 quota"))
+        service.groq_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Texto sync."))])
+        )))
+        assert service.generate_section2_text(ANSWERS, provider="gemini") == "Texto sync."
+
+
+class TestStreamFailover:
+    """Failover no streaming só antes do primeiro trecho"""
+
+    def test_stream_fails_over_before_first_chunk(self, make_service):
+        service = make_service(gemini_error=RuntimeError("429 quota"))
+
+        async def create(**kwargs):
+            async def pieces():
+                for piece in ["Texto ", "do Groq."]:
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            return pieces()
+
+        service.groq_async_client.chat.completions.create = create
+        served = {}
+
+        async def collect():
+            return [c async for c in service.stream_text_async(2, ANSWERS, "gemini", served=served)]
+
+        assert asyncio.run(collect()) == ["Texto ", "do Groq."]
+        assert served["provider"] == "groq"
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o modo corrida (LLM_RACE_MODE): Gemini e Groq em paralelo
+"""
+import sys
+import os
+import asyncio
+import pytest
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from llm_service import race_sanity_problem
+
+
+ANSWERS = {"2.1": "SIM", "2.2": "Rua das Flores, 123"}
+GOOD_TEXT = "A equipe abordou o veículo na Rua das Flores, 123, após observar manobra brusca ao avistar a viatura."
+
+
+@pytest.fixture
+def make_service(llm_service, fake_gemini, fake_groq):
+    """Gemini e Groq falsos com latência e texto configuráveis, modo corrida na Seção 2"""
+    def make(gemini_latency, groq_latency, gemini_text=GOOD_TEXT, groq_text=GOOD_TEXT, gemini_error=None):
+        return llm_service(
+            gemini=fake_gemini(latency=gemini_latency, text=gemini_text, error=gemini_error),
+            groq=fake_groq(latency=groq_latency, text=groq_text),
+            race_mode=True,
+            race_sections={2},
+            race_bounds=(20, 2000),
+        )
+    return make
+
+
+async def generate_and_settle(service, provider="gemini"):
+    """Gera e espera o perdedor terminar em segundo plano"""
+    result = await service.generate_with_provider_async(2, ANSWERS, provider)
+    while service._race_losers:
+        await asyncio.sleep(0.01)
+    return result
+
+
+class TestRaceSanity:
+    """Testes para race_sanity_problem"""
+
+    def test_reasons(self):
+        assert race_sanity_problem("", 10, 100) == "empty"
+        assert race_sanity_problem("Desculpe, não posso ajudar com isso.", 10, 100) == "refusal"
+        assert race_sanity_problem("Curto.", 10, 100) == "too_short"
+        assert race_sanity_problem("x" * 101, 10, 100) == "too_long"
+        assert race_sanity_problem(GOOD_TEXT, 10, 200) is None
+
+
+class TestRaceMode:
+    """Testes para LLMService._race_async"""
+
+    def test_fastest_provider_wins_and_margin_is_recorded(self, make_service):
+        service = make_service(0.3, 0.05)
+        text, provider = asyncio.run(generate_and_settle(service))
+
+        assert (text, provider) == (GOOD_TEXT, "groq")
+        assert service.gemini_model.calls == 1
+        races = service.metrics()["races"][2]
+        assert races["races"] == 1
+        assert races["wins"] == {"groq": 1}
+        assert races["margin_ms"]["count"] == 1
+        assert 150 <= races["margin_ms"]["max"] <= 600
+
+    def test_insane_first_answer_is_skipped(self, make_service):
+        service = make_service(0.2, 0.01, groq_text="Não posso ajudar com isso, desculpe.")
+        text, provider = asyncio.run(generate_and_settle(service, provider="groq"))
+
+        assert provider == "gemini"
+        races = service.metrics()["races"][2]
+        assert races["rejected"] == {"groq": {"refusal": 1}}
+        assert races["wins"] == {"gemini": 1}
+
+    def test_failed_provider_loses_by_default(self, make_service):
+        service = make_service(0.01, 0.05, gemini_error=RuntimeError("boom"))
+        text, provider = asyncio.run(generate_and_settle(service))
+        assert provider == "groq"
+
+    def test_no_sane_answer_returns_first_text(self, make_service):
+        service = make_service(0.01, 0.05, gemini_text="Curto.", groq_text="Curto também.")
+        text, provider = asyncio.run(generate_and_settle(service))
+
+        assert (text, provider) == ("Curto.", "gemini")
+        assert service.metrics()["races"][2]["no_winner"] == 1
+
+    def test_sections_outside_race_use_chain(self, make_service):
+        service = make_service(0.01, 0.01)
+        service.race_sections = {7, 8}
+        asyncio.run(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+
+        assert service.groq_async_client.calls == 0
+        assert service.metrics()["races"] == {}
+
+    def test_caller_cancel_cancels_racers(self, make_service):
+        service = make_service(5, 5)
+
+        async def run():
+            task = asyncio.ensure_future(service.generate_with_provider_async(2, ANSWERS, "gemini"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        assert service.groq_async_client.cancelled is True
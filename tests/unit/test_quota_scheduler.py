@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o agendador com controle de quota (quota_scheduler.py)
+"""
+import sys
+import os
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import quota_scheduler
+from quota_scheduler import QuotaScheduler, AdmissionError
+from llm_service import LLMService
+
+
+# Meio-dia UTC: longe da virada do dia
+NOON = datetime(2025, 3, 22, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float = NOON):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(limits, clock=None, **kwargs) -> QuotaScheduler:
+    return QuotaScheduler(limits=limits, persistent=False, clock=clock or FakeClock(), **kwargs)
+
+
+class TestTokenBuckets:
+    """Buckets diário e por minuto"""
+
+    def test_routes_to_first_provider_with_budget(self):
+        scheduler = make_scheduler({"gemini": {"rpd": 1, "rpm": 10}, "groq": {"rpd": 100, "rpm": 10}})
+        assert scheduler.try_acquire(["gemini", "groq"]) == "gemini"
+        assert scheduler.try_acquire(["gemini", "groq"]) == "groq"
+
+    def test_minute_bucket_refills_over_time(self):
+        clock = FakeClock()
+        scheduler = make_scheduler({"groq": {"rpd": 100, "rpm": 2}}, clock)
+        assert scheduler.try_acquire(["groq"]) == "groq"
+        assert scheduler.try_acquire(["groq"]) == "groq"
+        assert scheduler.try_acquire(["groq"]) is None
+
+        clock.now += 30  # 2 RPM -> 1 token a cada 30s
+        assert scheduler.try_acquire(["groq"]) == "groq"
+
+    def test_daily_bucket_resets_at_utc_midnight(self):
+        clock = FakeClock()
+        scheduler = make_scheduler({"gemini": {"rpd": 1, "rpm": 10}}, clock)
+        scheduler.try_acquire(["gemini"])
+        assert scheduler.try_acquire(["gemini"]) is None
+        assert scheduler.stats()["providers"]["gemini"]["seconds_until_available"] == 12 * 3600
+
+        clock.now += 12 * 3600
+        assert scheduler.try_acquire(["gemini"]) == "gemini"
+
+    def test_provider_refusal_empties_bucket(self):
+        scheduler = make_scheduler({"gemini": {"rpd": 20, "rpm": 10}, "groq": {"rpd": 100, "rpm": 30}})
+        scheduler.mark_unavailable("gemini", "quota")
+        scheduler.mark_unavailable("groq", "rate_limit")
+
+        providers = scheduler.stats()["providers"]
+        assert providers["gemini"]["daily_remaining"] == 0
+        assert providers["groq"]["minute_remaining"] == 0
+        assert providers["groq"]["daily_remaining"] == 100
+
+    def test_state_survives_restart(self):
+        provider = f"test-{uuid.uuid4().hex[:8]}"
+        limits = {provider: {"rpd": 5, "rpm": 5}}
+        first = QuotaScheduler(limits=limits, clock=FakeClock())
+        first.try_acquire([provider])
+        first.try_acquire([provider])
+
+        restarted = QuotaScheduler(limits=limits, clock=FakeClock())
+        assert restarted.stats()["providers"][provider]["daily_remaining"] == 3
+
+    def test_admission_does_not_write_on_caller_thread(self, monkeypatch):
+        writes = []
+        gate = threading.Event()
+
+        def save_provider_quota(**state):
+            gate.wait(5)
+            writes.append((threading.get_ident(), state["daily_used"]))
+
+        monkeypatch.setattr(quota_scheduler.BOLogger, "save_provider_quota", save_provider_quota)
+        scheduler = QuotaScheduler(limits={"groq": {"rpd": 10, "rpm": 10}}, clock=FakeClock())
+        scheduler._loaded = True
+        for _ in range(3):
+            assert scheduler.try_acquire(["groq"]) == "groq"
+
+        # Banco "travado": a admissão já voltou sem esperar a gravação
+        assert writes == []
+        gate.set()
+        scheduler.flush()
+
+        # As três admissões viram uma única gravação, com o estado mais recente
+        assert [used for _, used in writes] == [3]
+        assert writes[0][0] != threading.get_ident()
+
+
+class TestAdmissionQueue:
+    """Fila com espera limitada"""
+
+    def test_waits_for_minute_refill(self):
+        scheduler = QuotaScheduler(limits={"groq": {"rpd": 1000, "rpm": 600}}, persistent=False, max_wait=1)
+        for _ in range(600):
+            scheduler.try_acquire(["groq"])
+
+        # 600 RPM -> 1 token a cada 0.1s
+        assert asyncio.run(scheduler.acquire(["groq"])) == "groq"
+        assert scheduler.stats()["queued"] == 1
+        assert scheduler.stats()["queue_depth"] == 0
+
+    def test_rejects_when_wait_exceeds_limit(self):
+        scheduler = make_scheduler({"gemini": {"rpd": 1, "rpm": 10}}, max_wait=5)
+        scheduler.try_acquire(["gemini"])
+        try:
+            asyncio.run(scheduler.acquire(["gemini"]))
+            assert False, "Deveria ter lançado AdmissionError"
+        except AdmissionError as e:
+            assert e.retry_after == 12 * 3600
+        assert scheduler.stats()["rejected"] == 1
+
+    def test_disabled_provider_is_skipped_with_finite_retry_after(self):
+        scheduler = make_scheduler({"gemini": {"rpd": 20, "rpm": 0}, "groq": {"rpd": 100, "rpm": 1}}, max_wait=5)
+        assert scheduler.try_acquire(["gemini", "groq"]) == "groq"
+        assert scheduler.seconds_until_available(["gemini", "groq"]) == 60
+        assert scheduler.stats()["providers"]["gemini"]["disabled"] is True
+        try:
+            asyncio.run(scheduler.acquire(["gemini"]))
+            assert False, "Deveria ter lançado AdmissionError"
+        except AdmissionError as e:
+            assert e.retry_after == 12 * 3600
+
+    def test_rejects_when_queue_is_full(self):
+        scheduler = make_scheduler({"groq": {"rpd": 100, "rpm": 1}}, max_queue=0)
+        scheduler.try_acquire(["groq"])
+        try:
+            asyncio.run(scheduler.acquire(["groq"]))
+            assert False, "Deveria ter lançado AdmissionError"
+        except AdmissionError as e:
+            assert "fila" in str(e)
+
+
+class TestLLMServiceScheduling:
+    """LLMService consulta o agendador antes de chamar o provider"""
+
+    def test_exhausted_provider_is_not_called(self):
+        calls = []
+
+        class Gemini:
+            async def generate_content_async(self, prompt):
+                calls.append("gemini")
+                return SimpleNamespace(text="Texto do Gemini.")
+
+        async def groq_create(**kwargs):
+            calls.append("groq")
+            message = SimpleNamespace(content="Texto do Groq.")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        service = LLMService()
+        service.cache = None
+        service.provider_chain = ["gemini", "groq"]
+        service.gemini_model = Gemini()
+        service.gemini_section_models = {}
+        service.groq_async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=groq_create)))
+        service.scheduler = make_scheduler({"gemini": {"rpd": 0, "rpm": 10}, "groq": {"rpd": 100, "rpm": 30}})
+
+        text, provider = asyncio.run(service.generate_with_provider_async(2, {"2.1": "SIM", "2.2": "Rua A"}, "gemini"))
+        assert (text, provider) == ("Texto do Groq.", "groq")
+        assert calls == ["groq"]
+        assert service.quota_stats()["providers"]["groq"]["daily_remaining"] == 99
+
+    def test_per_minute_429_keeps_daily_budget(self, llm_service, fake_gemini, fake_groq):
+        per_minute = RuntimeError(
+            '429 You exceeded your current quota. [violations { quota_id: '
+            '"GenerateRequestsPerMinutePerProjectPerModel-FreeTier" }, retry_delay { seconds: 38 }]'
+        )
+        service = llm_service(gemini=fake_gemini(error=per_minute), groq=fake_groq())
+        service.scheduler = make_scheduler({"gemini": {"rpd": 250, "rpm": 10}, "groq": {"rpd": 100, "rpm": 30}})
+
+        _, provider = asyncio.run(service.generate_with_provider_async(2, {"2.1": "SIM", "2.2": "Rua A"}, "gemini"))
+
+        gemini = service.quota_stats()["providers"]["gemini"]
+        assert provider == "groq"
+        assert gemini["daily_remaining"] == 249
+        assert gemini["minute_remaining"] == 0
+
+    def test_daily_429_empties_daily_budget(self, llm_service, fake_gemini, fake_groq):
+        per_day = RuntimeError('429 Resource has been exhausted. quota_id: "GenerateRequestsPerDayPerProjectPerModel-FreeTier"')
+        service = llm_service(gemini=fake_gemini(error=per_day), groq=fake_groq())
+        service.scheduler = make_scheduler({"gemini": {"rpd": 250, "rpm": 10}, "groq": {"rpd": 100, "rpm": 30}})
+
+        asyncio.run(service.generate_with_provider_async(2, {"2.1": "SIM", "2.2": "Rua A"}, "gemini"))
+
+        assert service.quota_stats()["providers"]["gemini"]["daily_remaining"] == 0
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o provider offline de record/replay (replay_provider.py)
+"""
+import sys
+import os
+import asyncio
+import pytest
+import time
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from replay_provider import Cassette, ReplayProvider, prompt_hash, synthetic_text
+from llm_service import ProviderUnavailableError
+
+
+ANSWERS = {"7.1": "SIM", "7.2": "14 pedras de crack na lata azul", "7.4": "Soldado Faria lacrou o material"}
+
+
+@pytest.fixture
+def make_service(llm_service, tmp_path):
+    """LLMService em modo replay com cassete em tmp_path (sem atraso por padrão)"""
+    def make(**replay_kwargs):
+        service = llm_service()
+        replay_kwargs.setdefault("latency_scale", 0)
+        service.use_replay(ReplayProvider(cassette=Cassette(str(tmp_path / "cassette.json")), **replay_kwargs))
+        return service
+    return make
+
+
+class TestSyntheticGenerator:
+    """Testes para o gerador sintético"""
+
+    def test_text_is_deterministic_and_uses_answers(self, make_service):
+        service = make_service()
+        first = asyncio.run(service.generate_text_async(7, ANSWERS, "groq"))
+        second = asyncio.run(service.generate_text_async(7, dict(ANSWERS), "gemini"))
+
+        assert first == second
+        assert first.startswith("Texto sintético da Seção 7")
+        assert "14 pedras de crack na lata azul" in first
+        assert "Não informado" not in first
+
+    def test_latency_is_deterministic_per_prompt(self):
+        replay = ReplayProvider(cassette=Cassette("/nao/existe.json"), latency_ms=1000, latency_sigma=0.5)
+        _, first, _ = replay.respond("groq", "sistema", "respostas")
+        _, second, _ = replay.respond("groq", "sistema", "respostas")
+        _, other, _ = replay.respond("groq", "sistema", "outras respostas")
+
+        assert first == second
+        assert first != other
+        assert 0.1 < first < 10
+
+    def test_latency_scale_zero_runs_at_full_speed(self, make_service):
+        service = make_service(latency_ms=5000, latency_scale=0)
+        start = time.perf_counter()
+        asyncio.run(service.generate_text_async(7, ANSWERS, "groq"))
+        assert time.perf_counter() - start < 1
+
+    def test_skips_labels_and_headers(self):
+        user = "INFORMAÇÕES COLETADAS:\nLocal exato: Rua das Flores\nFacção: Não informado\n\nGERE AGORA o texto:"
+        assert synthetic_text(1, user) == "Texto sintético da Seção 1 (modo replay). Rua das Flores."
+
+    def test_whole_bo_prompt_gets_json_per_section(self, make_service):
+        service = make_service()
+        sections = {1: {"1.1": "22/03/2025, 21h11", "1.2": "Sargento Silva"}, 7: ANSWERS}
+        for provider in ("gemini", "groq"):
+            result = asyncio.run(service.generate_bo_async(sections, provider))
+            assert result.fallback == {}
+            assert result.texts[7].startswith("Texto sintético da Seção 7")
+            assert "14 pedras de crack na lata azul" in result.texts[7]
+            assert "Uma chave" not in result.texts[7]
+
+
+class TestCassette:
+    """Cassette gravado no modo record e servido no replay"""
+
+    def test_recorded_text_is_replayed(self, make_service, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        service = make_service()
+        prompt = service._build_section_prompt(7, ANSWERS)
+        Cassette(path).put(prompt_hash(prompt.system, prompt.user), "Texto real gravado.", 7, "gemini", 1200)
+
+        service = make_service()  # recarrega o arquivo
+        text = asyncio.run(service.generate_text_async(7, ANSWERS, "groq"))
+
+        assert text == "Texto real gravado."
+        assert service.replay_stats()["cassette_hits"] == 1
+
+    def test_record_mode_writes_cassette(self, make_service, tmp_path):
+        recorder = make_service()
+        recorder.cassette = Cassette(str(tmp_path / "gravado.json"))
+        text = asyncio.run(recorder.generate_text_async(7, ANSWERS, "groq"))
+
+        prompt = recorder._build_section_prompt(7, ANSWERS)
+        entry = Cassette(str(tmp_path / "gravado.json")).get(prompt_hash(prompt.system, prompt.user))
+        assert entry["text"] == text
+        assert entry["provider"] == "groq"
+        assert entry["section"] == 7
+
+    def test_streaming_replays_in_chunks(self, make_service):
+        service = make_service()
+
+        async def collect():
+            return [c async for c in service.stream_text_async(7, ANSWERS, "groq")]
+
+        chunks = asyncio.run(collect())
+        assert len(chunks) > 1
+        assert "".join(chunks).strip() == asyncio.run(service.generate_text_async(7, ANSWERS, "gemini"))
+
+
+class TestInjectedErrors:
+    """Erros injetados passam pelo mesmo tratamento dos erros reais"""
+
+    def test_quota_error_fails_over_to_next_provider(self, make_service):
+        service = make_service(error_rate=1.0, error_kinds=["quota"])
+
+        try:
+            asyncio.run(service.generate_with_provider_async(7, ANSWERS, "gemini"))
+            assert False, "Deveria ter lançado ProviderUnavailableError"
+        except ProviderUnavailableError as e:
+            assert e.provider == "groq"  # tentou gemini, depois groq
+        assert service.replay_stats()["injected_errors"] == {"quota": 2}
+
+    def test_error_sequence_is_seeded(self):
+        def run():
+            replay = ReplayProvider(cassette=Cassette("/nao/existe.json"), error_rate=0.5, seed=42)
+            return [replay.respond("groq", "s", "u")[2] for _ in range(20)]
+
+        first = run()
+        assert first == run()
+        assert any(first) and not all(first)
+
+    def test_server_error_is_not_retried(self, make_service):
+        service = make_service(error_rate=1.0, error_kinds=["server"])
+        try:
+            asyncio.run(service.generate_text_async(7, ANSWERS, "gemini"))
+            assert False, "Deveria ter lançado Exception"
+        except ProviderUnavailableError:
+            assert False, "Erro 500 não deve acionar failover"
+        except Exception as e:
+            assert "Seção 7 com Gemini" in str(e)
+        assert service.replay_stats()["injected_errors"] == {"server": 1}
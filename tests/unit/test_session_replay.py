@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a reconstrução de sessões pelos eventos (session_replay.py)
+"""
+import sys
+import os
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from session_replay import SessionReplayer, replay_events
+
+
+def answer(step, value, **extra):
+    return {"event_type": "answer_submitted", "data": {"step": step, "answer": value, "is_valid": True, **extra}}
+
+
+SECTION1 = [
+    answer("1.1", "22/03/2025, 21h11"),
+    answer("1.2", "Sargento Silva e Soldado Souza, viatura 1234"),
+    answer("1.3", "190"),
+    {"event_type": "question_asked", "data": {"step": "1.4"}},
+    {"event_type": "validation_error", "data": {"step": "1.4", "answer": "x"}},
+]
+
+
+class TestReplayEvents:
+    """Testes para replay_events"""
+
+    def test_answers_advance_state_machine(self):
+        session_data = replay_events("BO-1", SECTION1)
+        sm1 = session_data["sections"][1]
+        assert sm1.current_step == "1.4"
+        assert sm1.answers["1.2"] == "Sargento Silva e Soldado Souza, viatura 1234"
+        assert session_data["answer_count"] == 3
+        assert session_data["logged_to_db"] is True
+        assert session_data["pending_events"] == []
+
+    def test_conditional_steps_are_skipped_like_in_chat(self):
+        events = SECTION1 + [answer("1.4", "Denúncia de tráfico na praça"), answer("1.5", "NÃO")]
+        assert replay_events("BO-1", events)["sections"][1].current_step == "1.6"
+
+    def test_edit_unblocks_current_step(self):
+        events = SECTION1 + [{"event_type": "answer_edited", "data": {"step": "1.4", "old_answer": "", "new_answer": "Denúncia anônima"}}]
+        sm1 = replay_events("BO-1", events)["sections"][1]
+        assert sm1.answers["1.4"] == "Denúncia anônima"
+        assert sm1.current_step == "1.5"
+
+    def test_edit_of_previous_answer_keeps_position(self):
+        events = SECTION1 + [{"event_type": "answer_edited", "data": {"step": "1.2", "new_answer": "Cabo Lima, viatura 99"}}]
+        sm1 = replay_events("BO-1", events)["sections"][1]
+        assert sm1.answers["1.2"] == "Cabo Lima, viatura 99"
+        assert sm1.current_step == "1.4"
+
+    def test_started_skipped_and_completed_sections(self):
+        events = [
+            {"event_type": "section1_completed", "data": {"section": 1, "generated_text": "Texto da Seção 1."}},
+            answer("2.1", "Sim", auto_responded=True),
+            {"event_type": "section_started", "data": {"section": 2}},
+            answer("2.2", "Rua das Flores, 123"),
+            {"event_type": "section_skipped", "data": {"section": 3, "reason": "Não houve campana", "skipped_from_button": True}},
+            {"event_type": "section4_completed", "data": {"section": 4, "generated_text": "Modelo.", "fallback": True}},
+        ]
+        session_data = replay_events("BO-1", events)
+        assert session_data["section1_text"] == "Texto da Seção 1."
+        assert session_data["sections"][2].current_step == "2.3"
+        assert session_data["sections"][3].was_section_skipped()
+        assert session_data["current_section"] == 3
+        assert session_data["section4_fallback"] is True
+
+    def test_skip_through_chat_is_not_applied_twice(self):
+        events = [answer("3.1", "NÃO"), {"event_type": "section_skipped", "data": {"section": 3, "reason": "x"}}]
+        sm3 = replay_events("BO-1", events)["sections"][3]
+        assert sm3.was_section_skipped() and sm3.answers == {"3.1": "NÃO"}
+
+    def test_no_state_events_returns_none(self):
+        assert replay_events("BO-1", []) is None
+        assert replay_events("BO-1", [{"event_type": "question_asked", "data": {"step": "1.1"}}]) is None
+
+
+class TestSessionReplayer:
+    """Testes para o cache do SessionReplayer"""
+
+    def make_replayer(self, events):
+        loads = []
+
+        def load(bo_id):
+            loads.append(bo_id)
+            return list(events)
+
+        return SessionReplayer(lambda bo_id: len(events), load), loads
+
+    def test_unchanged_bo_is_served_from_cache(self):
+        events = list(SECTION1[:3])
+        replayer, loads = self.make_replayer(events)
+
+        first = replayer.rebuild("BO-1")
+        second = replayer.rebuild("BO-1")
+        assert loads == ["BO-1"]
+        assert second is not first and second["sections"][1] is not first["sections"][1]
+        assert second["sections"][1].current_step == "1.4"
+        assert replayer.stats()["hits"] == 1
+
+    def test_new_event_invalidates_cache(self):
+        events = list(SECTION1[:3])
+        replayer, loads = self.make_replayer(events)
+        replayer.rebuild("BO-1")
+        events.append(answer("1.4", "Denúncia de tráfico na praça"))
+        assert replayer.rebuild("BO-1")["sections"][1].current_step == "1.5"
+        assert len(loads) == 2
+
+    def test_unknown_bo(self):
+        replayer, loads = self.make_replayer([])
+        assert replayer.rebuild("BO-X") is None
+        assert loads == [] and replayer.stats()["not_found"] == 1
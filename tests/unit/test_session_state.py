@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a sessão com __slots__ (session_state.py)
+"""
+import sys
+import os
+
+import pytest
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from session_state import (
+    SECTION_CLASSES,
+    SessionState,
+    footprint_stats,
+    new_session_state,
+    session_footprint,
+)
+from session_store import decode_session, encode_session
+
+
+class TestSessionState:
+    """SessionState se comporta como o dict de antes"""
+
+    def test_new_session_has_all_fields(self):
+        session_data = new_session_state("BO-1", ip_address="10.0.0.1")
+        assert session_data["bo_id"] == "BO-1"
+        assert session_data["ip_address"] == "10.0.0.1"
+        assert session_data["current_section"] == 1
+        assert session_data["section8_text"] == ""
+        assert list(session_data["sections"]) == [1]
+        assert "user_agent" not in session_data
+        assert session_data.get("user_agent") is None
+
+    def test_mapping_operations(self):
+        session_data = SessionState(bo_id="BO-1")
+        session_data.setdefault("pending_events", []).append({"event_type": "x"})
+        session_data["answer_count"] = session_data.get("answer_count", 0) + 1
+        assert dict(session_data) == {"bo_id": "BO-1", "pending_events": [{"event_type": "x"}], "answer_count": 1}
+        assert session_data == {"bo_id": "BO-1", "pending_events": [{"event_type": "x"}], "answer_count": 1}
+        del session_data["answer_count"]
+        with pytest.raises(KeyError):
+            session_data["answer_count"]
+
+    def test_unknown_keys_go_to_extra(self):
+        session_data = new_session_state("BO-1")
+        assert session_data._extra is None
+        session_data["section3_fallback"] = True
+        assert session_data["section3_fallback"] is True
+        assert list(session_data)[-1] == "section3_fallback"
+
+    def test_no_instance_dict(self):
+        session_data = new_session_state("BO-1")
+        assert not hasattr(session_data, "__dict__")
+        for cls in SECTION_CLASSES.values():
+            state_machine = cls()
+            assert not hasattr(state_machine, "__dict__")
+            assert cls.STEPS[0] == state_machine.current_step
+            with pytest.raises(AttributeError):
+                state_machine.unexpected = 1
+
+
+class TestDecodeSession:
+    """decode_session devolve SessionState com steps compartilhados"""
+
+    def test_roundtrip_returns_session_state(self):
+        session_data = new_session_state("BO-1")
+        sm1 = session_data["sections"][1]
+        sm1.store_answer("22/03/2025, 21h11")
+        sm1.next_step()
+        session_data["section2_fallback"] = True
+
+        restored = decode_session(encode_session(session_data))
+        assert isinstance(restored, SessionState)
+        assert restored == {**session_data, "sections": restored["sections"]}
+
+        restored_sm1 = restored["sections"][1]
+        assert restored_sm1.current_step is SECTION_CLASSES[1].STEPS[1]
+        assert next(iter(restored_sm1.answers)) is SECTION_CLASSES[1].STEPS[0]
+
+
+class TestFootprint:
+    """session_footprint conta só o que é da sessão"""
+
+    def test_answers_add_to_footprint(self):
+        session_data = new_session_state("BO-1")
+        empty = session_footprint(session_data)
+        session_data["sections"][1].store_answer("Sargento Silva e Soldado Souza, viatura 1234")
+        assert session_footprint(session_data) > empty
+
+    def test_shared_tables_are_not_counted(self):
+        session_data = new_session_state("BO-1")
+        sm1 = session_data["sections"][1]
+        before = session_footprint(session_data)
+        sm1.current_step = SECTION_CLASSES[1].STEPS[5]
+        assert session_footprint(session_data) == before
+
+    def test_footprint_stats(self):
+        sessions = [new_session_state(f"BO-{i}") for i in range(5)]
+        stats = footprint_stats(sessions, sample=3)
+        assert stats["sampled"] == 3
+        assert 0 < stats["avg_bytes"] <= stats["max_bytes"]
+        assert footprint_stats([])["avg_bytes"] is None
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o armazenamento de sessões (session_store.py)
+"""
+import sys
+import os
+import io
+import uuid
+
+import pytest
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import session_store
+from session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionConflictError,
+    SQLiteSessionStore,
+    decode_session,
+    encode_command,
+    encode_session,
+    read_reply,
+    read_snapshot,
+    request_scope,
+    write_snapshot,
+)
+from state_machine import BOStateMachine
+from state_machine_section2 import BOStateMachineSection2
+
+
+def make_session():
+    sm1 = BOStateMachine()
+    sm1.store_answer("22/03/2025, 21h11")
+    sm1.next_step()
+    sm2 = BOStateMachineSection2()
+    sm2.store_answer("NÃO")
+    return {
+        "bo_id": "BO-TEST-1",
+        "logged_to_db": False,
+        "answer_count": 1,
+        "pending_events": [{"event_type": "question_asked", "data": {"step": "1.1"}}],
+        "sections": {1: sm1, 2: sm2},
+        "current_section": 2,
+        "section1_text": ""
+    }
+
+
+class TestSerialization:
+    """Testes para encode_session/decode_session"""
+
+    def test_roundtrip_rebuilds_state_machines(self):
+        restored = decode_session(encode_session(make_session()))
+
+        assert set(restored["sections"]) == {1, 2}
+        sm1 = restored["sections"][1]
+        assert isinstance(sm1, BOStateMachine)
+        assert sm1.current_step == "1.2"
+        assert sm1.answers == {"1.1": "22/03/2025, 21h11"}
+        assert restored["sections"][2].was_section_skipped()
+        assert restored["pending_events"][0]["data"]["step"] == "1.1"
+
+    def test_restored_state_machine_keeps_working(self):
+        sm1 = decode_session(encode_session(make_session()))["sections"][1]
+        sm1.store_answer("Sargento Silva, viatura 1234")
+        sm1.next_step()
+        assert sm1.current_step == "1.3"
+
+
+class TestMemorySessionStore:
+    """Testes para MemorySessionStore"""
+
+    def test_behaves_like_dict(self):
+        store = MemorySessionStore()
+        session = make_session()
+        store["a"] = session
+        assert "a" in store and store["a"] is session and store.get("b") is None
+        assert list(store) == ["a"] and len(store) == 1
+        del store["a"]
+        assert "a" not in store
+
+    def test_save_bumps_version(self):
+        store = MemorySessionStore()
+        store["a"] = make_session()
+        assert store.save("a", store["a"]) == 2
+
+    def test_replaced_session_conflicts(self):
+        store = MemorySessionStore()
+        store["a"] = stale = make_session()
+        store["a"] = make_session()
+        with pytest.raises(SessionConflictError):
+            store.save("a", stale)
+        assert store.stats()["conflicts"] == 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemorySessionLimits:
+    """TTL, LRU e limite de bytes do MemorySessionStore"""
+
+    def test_sweep_removes_idle_sessions(self):
+        clock = FakeClock()
+        store = MemorySessionStore(ttl=60, max_entries=0, clock=clock)
+        store["old"] = make_session()
+        clock.now += 30
+        store["new"] = make_session()
+        clock.now += 40
+
+        evicted = store.sweep()
+        assert list(store) == ["new"]
+        assert evicted == [{"session_id": "old", "bo_id": "BO-TEST-1", "logged_to_db": False, "reason": "ttl"}]
+        assert store.sweep() == []
+
+    def test_reading_keeps_session_alive(self):
+        clock = FakeClock()
+        store = MemorySessionStore(ttl=60, max_entries=0, clock=clock)
+        store["a"] = make_session()
+        clock.now += 50
+        store["a"]
+        clock.now += 50
+        assert store.sweep() == [] and "a" in store
+
+    def test_max_entries_evicts_least_recently_used(self):
+        store = MemorySessionStore(ttl=0, max_entries=2)
+        store["a"] = make_session()
+        store["b"] = make_session()
+        store.get("a")
+        store["c"] = make_session()
+
+        assert sorted(store) == ["a", "c"]
+        assert store.sweep()[0]["session_id"] == "b"
+        assert store.stats()["evictions"]["lru"] == 1
+
+    def test_max_bytes_evicts_until_under_limit(self):
+        size = len(encode_session(make_session()).encode("utf-8"))
+        store = MemorySessionStore(ttl=0, max_entries=0, max_bytes=size * 2)
+        for session_id in ("a", "b", "c"):
+            store[session_id] = make_session()
+
+        stats = store.stats()
+        assert list(store) == ["b", "c"]
+        assert stats["bytes"] == size * 2 and stats["evictions"]["bytes"] == 1
+
+    def test_current_session_is_never_evicted(self):
+        store = MemorySessionStore(ttl=0, max_entries=1, max_bytes=1)
+        store["a"] = make_session()
+        assert store.save("a", store["a"]) == 2 and "a" in store
+
+    def test_evicted_session_save_conflicts(self):
+        store = MemorySessionStore(ttl=0, max_entries=1)
+        store["a"] = session = make_session()
+        store["b"] = make_session()
+        with pytest.raises(SessionConflictError):
+            store.save("a", session)
+
+
+class TestSnapshot:
+    """write_snapshot/read_snapshot e MemorySessionStore.restore"""
+
+    def test_roundtrip_keeps_order_and_idle_time(self, tmp_path):
+        clock = FakeClock()
+        store = MemorySessionStore(ttl=600, max_entries=0, clock=clock)
+        store["old"] = make_session()
+        clock.now += 100
+        store["new"] = make_session()
+        path = str(tmp_path / "sessions.gz")
+        entries = [(sid, idle, encode_session(data)) for sid, idle, data in store.snapshot_items()]
+        write_snapshot(path, entries)
+
+        restored = MemorySessionStore(ttl=600, max_entries=0, clock=clock)
+        assert restored.restore(read_snapshot(path)) == (2, 0)
+        assert list(restored) == ["old", "new"]
+        assert restored["new"]["sections"][1].answers["1.1"] == "22/03/2025, 21h11"
+        clock.now += 550  # "old" estava há 100s sem uso no snapshot
+        assert [item["session_id"] for item in restored.sweep()] == ["old"]
+
+    def test_expired_sessions_are_not_restored(self):
+        store = MemorySessionStore(ttl=60)
+        payload = encode_session(make_session())
+        assert store.restore([("a", 30.0, payload), ("b", 90.0, payload)]) == (1, 1)
+        assert list(store) == ["a"]
+
+    def test_downtime_counts_as_idle(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "sessions.gz")
+        write_snapshot(path, [("a", 10.0, encode_session(make_session()))])
+        real_time = session_store.time.time
+        monkeypatch.setattr(session_store.time, "time", lambda: real_time() + 3600)
+        assert read_snapshot(path)[0][1] >= 3610
+
+    def test_missing_and_corrupted_lines(self, tmp_path):
+        assert read_snapshot(str(tmp_path / "nada.gz")) == []
+        path = str(tmp_path / "sessions.gz")
+        write_snapshot(path, [("a", 1.0, encode_session(make_session())), ("b", 1.0, "{quebrado")])
+        store = MemorySessionStore()
+        assert store.restore(read_snapshot(path)) == (1, 0)
+
+
+class TestSQLiteSessionStore:
+    """Dois stores no mesmo arquivo = dois workers"""
+
+    def test_uses_wal(self, tmp_path):
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        assert store._query("PRAGMA journal_mode")[0][0] == "wal"
+
+    def test_workers_see_each_other_writes(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        worker_a, worker_b = SQLiteSessionStore(path), SQLiteSessionStore(path)
+
+        worker_a["s1"] = make_session()
+        session_b = worker_b["s1"]
+        session_b["sections"][1].store_answer("Sargento Silva, viatura 1234")
+        session_b["section1_text"] = "Texto"
+        worker_b.save("s1", session_b)
+
+        session_a = worker_a["s1"]
+        assert session_a["section1_text"] == "Texto"
+        assert session_a["sections"][1].answers["1.2"] == "Sargento Silva, viatura 1234"
+
+    def test_unchanged_session_is_not_decoded_again(self, tmp_path):
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        store["s1"] = make_session()
+        assert store["s1"] is store["s1"]
+        assert store.stats()["reloads"] == 0
+
+    def test_stale_save_conflicts(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        worker_a, worker_b = SQLiteSessionStore(path), SQLiteSessionStore(path)
+        worker_a["s1"] = make_session()
+        session_a = worker_a["s1"]
+        session_b = worker_b["s1"]
+
+        worker_b.save("s1", session_b)
+        session_a["section1_text"] = "perdido"
+        with pytest.raises(SessionConflictError):
+            worker_a.save("s1", session_a)
+
+        # Lendo de novo, o worker A vê a versão do B e pode gravar
+        assert worker_a["s1"]["section1_text"] == ""
+        assert worker_a.save("s1", worker_a["s1"]) == 3
+
+    def test_local_copy_is_bounded(self, tmp_path):
+        clock = FakeClock()
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        store.ttl, store.max_entries, store._clock = 60, 2, clock
+        for session_id in ("s1", "s2", "s3"):
+            store[session_id] = make_session()
+        assert store.stats()["cached"] == 2
+
+        clock.now += 120
+        assert store.sweep() == []
+        assert store.stats()["cached"] == 0
+        # Continua no arquivo: só a cópia local saiu
+        assert store["s1"]["bo_id"] == "BO-TEST-1" and len(store) == 3
+
+    def test_delete_and_ids(self, tmp_path):
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        store["s1"] = make_session()
+        store["s2"] = make_session()
+        del store["s1"]
+        assert list(store) == ["s2"] and "s1" not in store
+        with pytest.raises(KeyError):
+            store["s1"]
+
+    def test_request_scope_reads_each_session_once(self, tmp_path, monkeypatch):
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        store["s1"] = make_session()
+        queries = []
+        query = store._query
+        monkeypatch.setattr(store, "_query", lambda sql, params=(): queries.append(sql) or query(sql, params))
+
+        with request_scope():
+            assert "s1" in store and "s2" not in store
+            session_data = store["s1"]
+            assert store.get("s1") is session_data
+            reads = len(queries)
+            store.save("s1", session_data)
+        assert reads == 2  # versão de s1 (cópia local em dia) e de s2 (ausente)
+        "s1" in store
+        assert len(queries) == reads + 1
+
+
+class TestRespProtocol:
+    """Codificação de comandos e leitura de respostas do protocolo Redis"""
+
+    def test_encode_command(self):
+        assert encode_command("HSET", "k", "version", 2) == (
+            b"*4\r\n$4\r\nHSET\r\n$1\r\nk\r\n$7\r\nversion\r\n$1\r\n2\r\n"
+        )
+
+    def test_encode_counts_utf8_bytes(self):
+        assert encode_command("NÃO") == b"*1\r\n$4\r\nN\xc3\x83O\r\n"
+
+    def test_read_replies(self):
+        reader = io.BytesIO(b"+OK\r\n:3\r\n$-1\r\n*2\r\n$1\r\n7\r\n$4\r\nN\xc3\x83O\r\n*-1\r\n")
+        assert read_reply(reader) == "OK"
+        assert read_reply(reader) == 3
+        assert read_reply(reader) is None
+        assert read_reply(reader) == ["7", "NÃO"]
+        assert read_reply(reader) is None  # EXEC abortado pelo WATCH
+
+    def test_error_reply_raises(self):
+        with pytest.raises(Exception, match="WRONGTYPE"):
+            read_reply(io.BytesIO(b"-WRONGTYPE Operation against a key\r\n"))
+
+
+class FakeRespConnection:
+    """Servidor Redis de mentira: hashes em dict, EVAL dos dois scripts do store"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.commands = []
+        self.drop_next_eval = False
+
+    def command(self, *args, retry=True):
+        self.commands.append(args[0])
+        name, key = args[0], args[1] if len(args) > 1 else None
+        if name == "EVAL":
+            script, key = args[1], args[3]
+            if self.drop_next_eval:
+                self.drop_next_eval = False
+                raise ConnectionError("conexão caiu")
+            entry = self.hashes.setdefault(key, {})
+            if script == session_store._CAS_SCRIPT:
+                expected, payload = int(args[4]), args[5]
+                if entry.get("version") != expected:
+                    return None
+                entry.update(version=expected + 1, data=payload)
+                return expected + 1
+            entry["version"] = entry.get("version", 0) + 1
+            entry["data"] = args[4]
+            return entry["version"]
+        if name == "HGET":
+            value = self.hashes.get(key, {}).get(args[2])
+            return str(value) if value is not None else None
+        if name == "HMGET":
+            entry = self.hashes.get(key, {})
+            return [str(entry[field]) if field in entry else None for field in args[2:]]
+        if name == "DEL":
+            return 1 if self.hashes.pop(key, None) is not None else 0
+        raise AssertionError(f"comando inesperado: {name}")
+
+
+class TestRedisWrites:
+    """Gravação condicional por script, sem transação que uma reconexão quebre"""
+
+    def test_conditional_write_is_a_single_eval(self):
+        conn = FakeRespConnection()
+        worker_a, worker_b = RedisSessionStore(connection=conn), RedisSessionStore(connection=conn)
+        worker_a["s1"] = make_session()
+        session_a, session_b = worker_a["s1"], worker_b["s1"]
+        conn.commands.clear()
+
+        assert worker_b.save("s1", session_b) == 2
+        assert conn.commands == ["EVAL"]
+        with pytest.raises(SessionConflictError):
+            worker_a.save("s1", session_a)
+        assert conn.hashes["bo:session:s1"]["version"] == 2
+
+    def test_dropped_connection_is_a_conflict(self):
+        conn = FakeRespConnection()
+        store = RedisSessionStore(connection=conn)
+        store["s1"] = make_session()
+        session_data = store["s1"]
+        conn.drop_next_eval = True
+        with pytest.raises(SessionConflictError):
+            store.save("s1", session_data)
+        assert conn.hashes["bo:session:s1"]["version"] == 1
+        assert "WATCH" not in conn.commands and "MULTI" not in conn.commands
+
+
+@pytest.mark.skipif(not os.getenv("SESSION_STORE_TEST_URL"), reason="SESSION_STORE_TEST_URL não definido (servidor Redis)")
+class TestRedisSessionStore:
+    """Contra um servidor real: SESSION_STORE_TEST_URL=redis://localhost:6379/15"""
+
+    def test_workers_and_conflicts(self):
+        prefix = f"bo:test:{uuid.uuid4().hex}:"
+        url = os.environ["SESSION_STORE_TEST_URL"]
+        worker_a, worker_b = RedisSessionStore(url, prefix), RedisSessionStore(url, prefix)
+        try:
+            worker_a["s1"] = make_session()
+            session_a, session_b = worker_a["s1"], worker_b["s1"]
+            worker_b.save("s1", session_b)
+            with pytest.raises(SessionConflictError):
+                worker_a.save("s1", session_a)
+            assert list(worker_a) == ["s1"]
+        finally:
+            del worker_a["s1"]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para o single-flight de gerações (single_flight.py)
+"""
+import sys
+import os
+import asyncio
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+import pytest
+
+from single_flight import SingleFlight, answers_hash
+
+
+class TestAnswersHash:
+    """Testes para answers_hash"""
+
+    def test_whitespace_does_not_change_hash(self):
+        assert answers_hash({"7.1": "SIM", "7.2": "14  pedras "}) == answers_hash({"7.2": "14 pedras", "7.1": "SIM"})
+        assert answers_hash({"7.2": "14 pedras"}) != answers_hash({"7.2": "15 pedras"})
+
+
+class TestSingleFlight:
+    """Testes para SingleFlight.do"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def run():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "texto"
+
+        async def main():
+            return await asyncio.gather(*[flights.do("k", run) for _ in range(3)])
+
+        assert asyncio.run(main()) == ["texto"] * 3
+        assert calls == [1]
+        assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+    def test_error_is_shared_and_key_is_released(self):
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail), return_exceptions=True)
+            again = await flights.do("k", lambda: asyncio.sleep(0, result="ok"))
+            return results, again
+
+        results, again = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert again == "ok"
+        assert flights.started == 2
+
+    def test_execution_survives_while_someone_waits(self):
+        flights = SingleFlight()
+
+        async def run():
+            await asyncio.sleep(0.1)
+            return "texto"
+
+        async def main():
+            first = asyncio.ensure_future(flights.do("k", run))
+            second = asyncio.ensure_future(flights.do("k", run))
+            await asyncio.sleep(0.02)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(main()) == "texto"
+
+    def test_last_waiter_leaving_cancels_execution(self):
+        flights = SingleFlight()
+        state = {"cancelled": False}
+
+        async def run():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        async def main():
+            waiter = asyncio.ensure_future(flights.do("k", run))
+            await asyncio.sleep(0.02)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.sleep(0)
+            return flights.stats()["in_flight"]
+
+        assert asyncio.run(main()) == 0
+        assert state["cancelled"] is True
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Testes unitários para a geração do BO inteiro em uma chamada (generate_bo_async)
+"""
+import sys
+import os
+import asyncio
+import json
+import pytest
+
+# Adicionar backend ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from generation_cache import GenerationCache
+from llm_service import parse_whole_bo
+from prompt_templates import PROMPT_REGISTRY, WHOLE_BO_SECTION
+
+
+SECTIONS = {
+    1: {"1.1": "22/03/2025, 21h11", "1.2": "Sargento Silva"},
+    7: {"7.1": "SIM", "7.2": "14 pedras de crack"},
+    8: {"8.1": "Sargento Silva, por tráfico de drogas", "8.2": "Viatura 1234 até a delegacia"},
+}
+
+
+def as_json(payload) -> str:
+    """Resposta do Groq falso: o JSON do BO inteiro (ou o texto cru)"""
+    return payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+
+
+@pytest.fixture
+def make_service(llm_service, fake_groq):
+    """Só o Groq falso respondendo o JSON, com cache de textos em memória"""
+    def make(payload):
+        return llm_service(groq=fake_groq(text=as_json(payload)), provider_chain=["groq"], cache=GenerationCache(persistent=False))
+    return make
+
+
+class TestParseWholeBO:
+    """Testes para parse_whole_bo"""
+
+    def test_valid_json(self):
+        texts, problems = parse_whole_bo('{"1": " Texto um. ", "7": "Texto sete."}', [1, 7])
+        assert texts == {1: "Texto um.", 7: "Texto sete."}
+        assert problems == {}
+
+    def test_code_fence_and_surrounding_text(self):
+        assert parse_whole_bo('```json\n{"1": "Texto um."}\n```', [1])[0] == {1: "Texto um."}
+        assert parse_whole_bo('Aqui está:\n{"1": "Texto um."}\nPronto.', [1])[0] == {1: "Texto um."}
+
+    def test_invalid_json_falls_back_for_every_section(self):
+        texts, problems = parse_whole_bo("Seção 1: texto corrido", [1, 7])
+        assert texts == {}
+        assert problems == {1: "invalid_json", 7: "invalid_json"}
+
+    def test_malformed_sections_are_flagged_individually(self):
+        raw = json.dumps({"1": "Texto um.", "3": "", "7": ["lista"], "8": "Desculpe, não posso ajudar."})
+        texts, problems = parse_whole_bo(raw, [1, 3, 7, 8, 2])
+        assert texts == {1: "Texto um."}
+        assert problems == {3: "empty", 7: "not_text", 8: "refusal", 2: "missing"}
+
+    def test_too_long(self):
+        assert parse_whole_bo('{"1": "' + "a" * 50 + '"}', [1], max_chars=10)[1] == {1: "too_long"}
+
+
+class TestRenderWholeBO:
+    """Testes para PromptRegistry.render_whole_bo"""
+
+    def test_rules_and_answers_of_each_section(self):
+        prompt = PROMPT_REGISTRY.render_whole_bo({1: "INFO 1", 3: "", 7: "INFO 7"})
+        assert prompt.section == WHOLE_BO_SECTION
+        assert PROMPT_REGISTRY.get(1).system in prompt.system
+        assert PROMPT_REGISTRY.get(7).system in prompt.system
+        assert "=== SEÇÃO 3 ===" not in prompt.system + prompt.user
+        assert "=== SEÇÃO 1 ===\nINFO 1" in prompt.user
+        assert '{"1": "texto da Seção 1", "7": "texto da Seção 7"}' in prompt.user
+
+    def test_nothing_to_generate(self):
+        assert PROMPT_REGISTRY.render_whole_bo({2: ""}) is None
+
+
+class TestGenerateBOAsync:
+    """Testes para LLMService.generate_bo_async"""
+
+    def test_one_call_for_all_sections(self, make_service):
+        service = make_service({"1": "Texto um.", "7": "Texto sete.", "8": "Texto oito."})
+        groq = service.groq_async_client
+
+        result = asyncio.run(service.generate_bo_async(SECTIONS, "groq"))
+
+        assert len(groq.requests) == 1
+        assert groq.requests[0]["response_format"] == {"type": "json_object"}
+        assert result.texts == {1: "Texto um.", 7: "Texto sete.", 8: "Texto oito."}
+        assert result.providers == {1: "groq", 7: "groq", 8: "groq"}
+        assert result.fallback == {}
+        assert service.metrics()["whole_bo"] == {"calls": 1, "sections": 3, "fallback": {}}
+        assert WHOLE_BO_SECTION in service.metrics()["sections"]
+
+    def test_valid_sections_go_to_section_cache(self, make_service):
+        service = make_service({"1": "Texto um.", "7": "Texto sete.", "8": ""})
+        groq = service.groq_async_client
+
+        result = asyncio.run(service.generate_bo_async(SECTIONS, "groq"))
+        assert result.fallback == {8: "empty"}
+
+        # Geração por seção depois da chamada única: cache, sem nova chamada
+        text, provider = asyncio.run(service.generate_with_provider_async(7, SECTIONS[7], "groq"))
+        assert (text, provider) == ("Texto sete.", "groq")
+        assert len(groq.requests) == 1
+
+    def test_cached_sections_stay_out_of_the_prompt(self, make_service):
+        service = make_service({"7": "Texto sete.", "8": "Texto oito."})
+        groq = service.groq_async_client
+        asyncio.run(service.generate_bo_async(SECTIONS, "groq"))
+        assert len(groq.requests) == 1
+
+        groq.text = as_json({"1": "Outro texto um."})
+        result = asyncio.run(service.generate_bo_async(SECTIONS, "groq"))
+        # Só a Seção 1 faltava no cache: vai para a geração individual
+        assert result.fallback == {1: "single_section"}
+        assert result.texts == {7: "Texto sete.", 8: "Texto oito."}
+        assert len(groq.requests) == 1
+
+    def test_invalid_json_returns_every_section_to_caller(self, make_service):
+        service = make_service("Não é JSON")
+
+        result = asyncio.run(service.generate_bo_async(SECTIONS, "groq"))
+
+        assert result.texts == {}
+        assert result.fallback == {1: "invalid_json", 7: "invalid_json", 8: "invalid_json"}
+        assert service.metrics()["whole_bo"]["fallback"] == {"invalid_json": 3}